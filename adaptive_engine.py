@@ -24,11 +24,18 @@ Sections:
 import numpy as np
 import math
 from scipy import stats as sp_stats
-from scipy.stats import norm, beta as beta_dist
+from scipy.stats import norm, beta as beta_dist, qmc as sp_qmc
+from scipy.special import ndtri
 from dataclasses import dataclass, field
-from typing import Dict, List, Tuple, Optional
-from numba import njit, prange
+from typing import Dict, List, Tuple, Optional, Sequence
+from collections import deque
+from numba import njit, prange, vectorize, guvectorize
+import hashlib
+import time
 import warnings
+
+from universe_sketch import UniverseSketch
+
 warnings.filterwarnings('ignore')
 
 
@@ -94,6 +101,173 @@ def bsm_greeks_numba(S: float, K: float, T: float, r: float, sigma: float, is_ca
         
     return delta, gamma, theta, vega, vanna, volga, charm, speed
 
+@njit(cache=True)
+def bsm_all_numba(S: float, K: float, T: float, r: float, sigma: float, is_call: bool = True):
+    """Price and all nine `Greeks` from one d1/d2: (price, Δ, Γ, Θ, ν, ρ, vanna,
+    volga, charm, speed), in the units of `bsm_greeks_numba` (ρ per rate point)."""
+    if T <= 1e-6 or sigma <= 1e-6:
+        return bsm_price_numba(S, K, T, r, sigma, is_call), 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0
+
+    sqT = math.sqrt(T)
+    sT = sigma * sqT
+    d1 = (math.log(S / K) + (r + 0.5 * sigma**2) * T) / sT
+    d2 = d1 - sT
+    disc = K * math.exp(-r * T)
+
+    nd1 = n_pdf(d1)
+    gamma = nd1 / (S * sT)
+    vega = S * sqT * nd1 / 100
+    vanna = -nd1 * d2 / sigma
+    volga = vega * d1 * d2 / sigma
+    charm = (-nd1 * (r / sT - d2 / (2 * T))) / 365
+    speed = -gamma / S * (d1 / sT + 1)
+
+    if is_call:
+        n2 = n_cdf(d2)
+        price = S * n_cdf(d1) - disc * n2
+        delta = n_cdf(d1)
+        theta = (-(S * nd1 * sigma) / (2 * sqT) - r * disc * n2) / 365
+        rho = disc * T * n2 / 100
+    else:
+        n2 = n_cdf(-d2)
+        price = disc * n2 - S * n_cdf(-d1)
+        delta = n_cdf(d1) - 1
+        theta = (-(S * nd1 * sigma) / (2 * sqT) + r * disc * n2) / 365
+        rho = -disc * T * n2 / 100
+    return price, delta, gamma, theta, vega, rho, vanna, volga, charm, speed
+
+@njit(cache=True)
+def bsm_prob_otm_numba(S: float, K: float, T: float, r: float, sigma: float, is_call: bool = True):
+    """Risk-neutral P(expires out of the money); 0.5 when T or σ is degenerate."""
+    if T <= 0 or sigma <= 0:
+        return 0.5
+    d2 = (math.log(S / K) + (r - 0.5 * sigma**2) * T) / (sigma * math.sqrt(T))
+    return n_cdf(-d2) if is_call else n_cdf(d2)
+
+# Broadcasting ufuncs: arrays (or scalars) of S, K, T, r, σ, is_call in one
+# call, compiled per input types on first use. `bsm_price_greeks` returns the
+# price and all nine Greeks together from one d1/d2 per element.
+
+@vectorize(cache=True)
+def bsm_price_vec(S, K, T, r, sigma, is_call):
+    return bsm_price_numba(S, K, T, r, sigma, is_call)
+
+@vectorize(cache=True)
+def bsm_prob_otm_vec(S, K, T, r, sigma, is_call):
+    return bsm_prob_otm_numba(S, K, T, r, sigma, is_call)
+
+@vectorize(cache=True)
+def bsm_delta_vec(S, K, T, r, sigma, is_call):
+    return bsm_all_numba(S, K, T, r, sigma, is_call)[1]
+
+@vectorize(cache=True)
+def bsm_gamma_vec(S, K, T, r, sigma, is_call):
+    return bsm_all_numba(S, K, T, r, sigma, is_call)[2]
+
+@vectorize(cache=True)
+def bsm_theta_vec(S, K, T, r, sigma, is_call):
+    return bsm_all_numba(S, K, T, r, sigma, is_call)[3]
+
+@vectorize(cache=True)
+def bsm_vega_vec(S, K, T, r, sigma, is_call):
+    return bsm_all_numba(S, K, T, r, sigma, is_call)[4]
+
+@vectorize(cache=True)
+def bsm_rho_vec(S, K, T, r, sigma, is_call):
+    return bsm_all_numba(S, K, T, r, sigma, is_call)[5]
+
+@vectorize(cache=True)
+def bsm_vanna_vec(S, K, T, r, sigma, is_call):
+    return bsm_all_numba(S, K, T, r, sigma, is_call)[6]
+
+@vectorize(cache=True)
+def bsm_volga_vec(S, K, T, r, sigma, is_call):
+    return bsm_all_numba(S, K, T, r, sigma, is_call)[7]
+
+@vectorize(cache=True)
+def bsm_charm_vec(S, K, T, r, sigma, is_call):
+    return bsm_all_numba(S, K, T, r, sigma, is_call)[8]
+
+@vectorize(cache=True)
+def bsm_speed_vec(S, K, T, r, sigma, is_call):
+    return bsm_all_numba(S, K, T, r, sigma, is_call)[9]
+
+@guvectorize(['void(float64, float64, float64, float64, float64, boolean, ' + ', '.join(['float64[:]'] * 10) + ')'],
+             '(),(),(),(),(),()->' + ','.join(['()'] * 10), cache=True)
+def bsm_price_greeks(S, K, T, r, sigma, is_call, price, delta, gamma, theta, vega, rho, vanna, volga, charm, speed):
+    (price[0], delta[0], gamma[0], theta[0], vega[0], rho[0],
+     vanna[0], volga[0], charm[0], speed[0]) = bsm_all_numba(S, K, T, r, sigma, is_call)
+
+# Implied volatility: safeguarded Newton (rtsafe) on the BSM price. Newton
+# steps use raw vega; a step that leaves the bracket or stalls is replaced
+# by bisection, so every quote inside the no-arbitrage bounds converges.
+IV_LO, IV_HI = 1e-4, 5.0
+IV_XTOL = 1e-9                 # converged when the σ step / bracket is below this
+IV_MAX_ITER = 64
+
+@njit(cache=True)
+def implied_vol_numba(price: float, S: float, K: float, T: float, r: float, is_call: bool = True,
+                      guess: float = 0.0):
+    """σ such that BSM(σ) = price. Returns (σ, iterations); σ = NaN outside arbitrage bounds."""
+    if not (price > 0.0 and S > 0.0 and K > 0.0 and T > 1e-6):
+        return np.nan, 0
+    disc = K * math.exp(-r * T)
+    lower = max(S - disc, 0.0) if is_call else max(disc - S, 0.0)
+    upper = S if is_call else disc
+    if price <= lower or price >= upper:
+        return np.nan, 0
+    lo, hi = IV_LO, IV_HI
+    if bsm_price_numba(S, K, T, r, hi, is_call) < price:
+        return np.nan, 0
+    sqT = math.sqrt(T)
+    if guess <= IV_LO or guess >= IV_HI:
+        # Brenner–Subrahmanyam near the money, floored away from the wings
+        guess = max(math.sqrt(2.0 * math.pi / T) * price / S, 0.05)
+        guess = min(guess, 2.0)
+    sigma = guess
+    for it in range(IV_MAX_ITER):
+        sT = sigma * sqT
+        d1 = (math.log(S / K) + (r + 0.5 * sigma * sigma) * T) / sT
+        diff = bsm_price_numba(S, K, T, r, sigma, is_call) - price
+        if diff == 0.0:
+            return sigma, it + 1
+        if diff > 0.0:
+            hi = sigma
+        else:
+            lo = sigma
+        vega = S * sqT * n_pdf(d1)
+        step = diff / vega if vega > 0.0 else 0.0
+        nxt = sigma - step
+        if step == 0.0 or nxt <= lo or nxt >= hi:
+            nxt = 0.5 * (lo + hi)          # Newton left the bracket: bisect
+        if abs(nxt - sigma) < IV_XTOL or hi - lo < IV_XTOL:
+            return nxt, it + 1
+        sigma = nxt
+    return sigma, IV_MAX_ITER
+
+@njit(parallel=True, cache=True)
+def implied_vol_batch(price: np.ndarray, S: np.ndarray, K: np.ndarray, T: np.ndarray, r: float,
+                      is_call: np.ndarray, guess: np.ndarray):
+    """Vectorized IV + first-order Greeks for a flat batch of quotes.
+
+    Returns (sigma, delta, gamma, theta, vega, iters); Greeks use the solved
+    σ and the units of `bsm_greeks_numba` (θ per day, vega per vol point).
+    Unsolvable quotes get σ = NaN and zero Greeks.
+    """
+    n = len(price)
+    sigma = np.empty(n); iters = np.zeros(n, dtype=np.int32)
+    delta = np.zeros(n); gamma = np.zeros(n); theta = np.zeros(n); vega = np.zeros(n)
+    for i in prange(n):
+        v, k = implied_vol_numba(price[i], S[i], K[i], T[i], r, is_call[i], guess[i])
+        sigma[i] = v
+        iters[i] = k
+        if v == v:
+            d, g, t, vg, _, _, _, _ = bsm_greeks_numba(S[i], K[i], T[i], r, v, is_call[i])
+            delta[i] = d; gamma[i] = g; theta[i] = t; vega[i] = vg
+    return sigma, delta, gamma, theta, vega, iters
+
+MC_DRIFT = 0.07                # real-world drift of the simulated GBM
+
 @njit(parallel=True, cache=True)
 def generate_terminal_prices(S: float, sigma: float, T: float, n: int = 5000):
     """Vectorized terminal price generation with antithetic variates."""
@@ -102,7 +276,7 @@ def generate_terminal_prices(S: float, sigma: float, T: float, n: int = 5000):
     
     steps = 1
     dt = T / steps
-    drift = (0.07 - 0.5 * sigma**2) * dt
+    drift = (MC_DRIFT - 0.5 * sigma**2) * dt
     vol = sigma * math.sqrt(dt)
     
     terminal = np.empty(2 * n)
@@ -119,7 +293,7 @@ def generate_terminal_prices(S: float, sigma: float, T: float, n: int = 5000):
 def generate_paths_numba(S: float, sigma: float, T: float, n: int = 100, steps: int = 30):
     """Generate multiple price paths for visualization."""
     dt = T / steps
-    drift = (0.07 - 0.5 * sigma**2) * dt
+    drift = (MC_DRIFT - 0.5 * sigma**2) * dt
     vol = sigma * math.sqrt(dt)
     
     paths = np.empty((n, steps + 1))
@@ -128,77 +302,366 @@ def generate_paths_numba(S: float, sigma: float, T: float, n: int = 100, steps:
     for i in prange(n):
         for j in range(1, steps + 1):
             paths[i, j] = paths[i, j-1] * math.exp(drift + vol * np.random.standard_normal())
-            
+
     return paths
 
+def sobol_normals(n: int, d: int = 1, seed=None) -> np.ndarray:
+    """n × d standard normals from a scrambled Sobol sequence (inverse-CDF mapped).
+
+    Drawn as the first n points of a 2^m block; each `seed` is an independent
+    scrambling, so the spread of estimates across seeds is an honest error
+    bar. `seed=None` takes one from the global NumPy state.
+    """
+    if seed is None:
+        seed = int(np.random.randint(2**31 - 1))
+    m = max(int(math.ceil(math.log2(max(n, 2)))), 1)
+    u = sp_qmc.Sobol(d, scramble=True, seed=seed).random_base2(m)[:n]
+    return ndtri(np.clip(u, 1e-12, 1 - 1e-12))
+
+@njit(parallel=True, cache=True)
+def terminal_prices_from_normals(S: float, sigma: float, T: float, z: np.ndarray):
+    """`generate_terminal_prices` on supplied normals (one terminal price each)."""
+    n = len(z)
+    terminal = np.empty(n)
+    if T <= 0 or sigma <= 0:
+        terminal[:] = S
+        return terminal
+    drift = (MC_DRIFT - 0.5 * sigma**2) * T
+    vol = sigma * math.sqrt(T)
+    for i in prange(n):
+        terminal[i] = S * math.exp(drift + vol * z[i])
+    return terminal
+
+def _bridge_order(steps: int):
+    """Brownian-bridge fill order for `paths_from_normals`: (point, left, right)
+    per normal, the terminal point first, then midpoints by bisection."""
+    point, left, right = [steps], [0], [steps]
+    spans = [(0, steps)]
+    while spans:
+        nxt = []
+        for a, b in spans:
+            if b - a > 1:
+                c = (a + b) // 2
+                point.append(c); left.append(a); right.append(b)
+                nxt += [(a, c), (c, b)]
+        spans = nxt
+    return np.array(point, dtype=np.int64), np.array(left, dtype=np.int64), np.array(right, dtype=np.int64)
+
+@njit(parallel=True, cache=True)
+def paths_from_normals(S: float, sigma: float, T: float, z: np.ndarray,
+                       point: np.ndarray, left: np.ndarray, right: np.ndarray):
+    """GBM paths from an n × steps block of normals by Brownian-bridge construction:
+    z[:, 0] sets the terminal value and later columns refine ever-shorter
+    intervals, so the leading (best-distributed) QMC dimensions carry most of
+    the variance."""
+    n, steps = z.shape
+    dt = T / steps
+    drift = (MC_DRIFT - 0.5 * sigma**2) * dt
+    paths = np.empty((n, steps + 1))
+    for i in prange(n):
+        w = np.zeros(steps + 1)
+        for k in range(steps):
+            p, a, b = point[k], left[k], right[k]
+            if a == 0 and b == steps and p == steps:
+                w[p] = math.sqrt(T) * z[i, k]
+            else:
+                ta, tp, tb = a * dt, p * dt, b * dt
+                mean = w[a] + (tp - ta) / (tb - ta) * (w[b] - w[a])
+                w[p] = mean + math.sqrt((tp - ta) * (tb - tp) / (tb - ta)) * z[i, k]
+        for j in range(steps + 1):
+            paths[i, j] = S * math.exp(drift * j + sigma * w[j])
+    return paths
+
+@njit(cache=True)
+def leg_pnl(S_t: float, strikes: np.ndarray, prems: np.ndarray, types: np.ndarray, qtys: np.ndarray) -> float:
+    """P&L of all legs at one terminal price."""
+    v = 0.0
+    for j in range(len(strikes)):
+        K = strikes[j]
+        p = prems[j]
+        t = types[j]  # 0: Sell Call, 1: Buy Call, 2: Sell Put, 3: Buy Put
+        if t == 0:    # Sell Call
+            pnl = p - max(S_t - K, 0.0)
+        elif t == 1:  # Buy Call
+            pnl = -p + max(S_t - K, 0.0)
+        elif t == 2:  # Sell Put
+            pnl = p - max(K - S_t, 0.0)
+        else:         # Buy Put
+            pnl = -p + max(K - S_t, 0.0)
+        v += pnl * qtys[j]
+    return v
+
+@njit(cache=True)
+def _payoff_form(strikes, prems, types, qtys):
+    """Legs as branch-free terms: P&L = Σ w·max(d·(S − K), 0) − cost."""
+    d = np.where(types < 2, 1.0, -1.0)
+    w = np.where(types % 2 == 1, 1.0, -1.0) * qtys
+    return d, w, np.sum(w * prems)
+
+@njit(cache=True)
+def _payoff(S_t, strikes, d, w, cost):
+    v = -cost
+    for j in range(len(strikes)):
+        v += w[j] * max(d[j] * (S_t - strikes[j]), 0.0)
+    return v
+
 @njit(parallel=True, cache=True)
 def compute_strategy_pnl_numba(terminal: np.ndarray, strikes: np.ndarray, 
                                prems: np.ndarray, types: np.ndarray, qtys: np.ndarray):
     """O(N) vectorized strategy P&L across all terminal prices."""
     n_sims = len(terminal)
-    n_legs = len(strikes)
-    total_pnl = np.zeros(n_sims)
-    
-    for j in range(n_legs):
-        K = strikes[j]
-        p = prems[j]
-        t = types[j]  # 0: Sell Call, 1: Buy Call, 2: Sell Put, 3: Buy Put
-        m = qtys[j]
-        
-        for i in prange(n_sims):
-            S_t = terminal[i]
-            pnl = 0.0
-            if t == 0:    # Sell Call
-                pnl = p - max(S_t - K, 0.0)
-            elif t == 1:  # Buy Call
-                pnl = -p + max(S_t - K, 0.0)
-            elif t == 2:  # Sell Put
-                pnl = p - max(K - S_t, 0.0)
-            elif t == 3:  # Buy Put
-                pnl = -p + max(K - S_t, 0.0)
-            total_pnl[i] += pnl * m
-            
+    total_pnl = np.empty(n_sims)
+    d, w, cost = _payoff_form(strikes, prems, types, qtys)
+    for i in prange(n_sims):
+        total_pnl[i] = _payoff(terminal[i], strikes, d, w, cost)
     return total_pnl
 
-@dataclass
+PNL_CHUNKS = 64                # per-thread partials in the fused reductions
+PNL_BLOCK = 16384              # antithetic pairs drawn per block in `simulate_pnl_stats`
+TAIL_BINS = 256                # P&L histogram resolution for CVaR
+
+@njit(cache=True)
+def _tail_bin(v, edges, nb):
+    b = int((v - edges[0]) / (edges[nb] - edges[0]) * nb)
+    return min(max(b, 0), nb - 1)
+
+@njit(cache=True)
+def _merge(wins, count, shift, s1, s2, hist_n, hist_s):
+    """Chan et al. merge of per-chunk shifted sums → (n, wins, mean, M2, tail counts, tail sums)."""
+    n, w, mu, q = 0, 0, 0.0, 0.0
+    for c in range(len(count)):
+        nc = count[c]
+        if nc == 0:
+            continue
+        mc = shift[c] + s1[c] / nc
+        d = mc - mu
+        q += (s2[c] - s1[c] * s1[c] / nc) + d * d * n * nc / (n + nc)
+        mu += d * nc / (n + nc)
+        n += nc
+        w += wins[c]
+    return n, w, mu, max(q, 0.0), hist_n.sum(axis=0), hist_s.sum(axis=0)
+
+@njit(parallel=True, cache=True)
+def pnl_stats_numba(terminal: np.ndarray, strikes: np.ndarray, prems: np.ndarray,
+                    types: np.ndarray, qtys: np.ndarray, edges: np.ndarray):
+    """`compute_strategy_pnl_numba` fused with its reductions: one parallel pass,
+    legs valued in registers, no P&L array. Per-chunk wins and sums (shifted
+    by the chunk's first P&L) are merged at the end. Returns (n, wins, mean,
+    M2, tail counts, tail sums); `edges` (empty to skip) bins P&L for CVaR."""
+    n = len(terminal)
+    chunks = min(PNL_CHUNKS, max(n, 1))
+    nb = max(len(edges) - 1, 0)
+    wins = np.zeros(chunks, dtype=np.int64); count = np.zeros(chunks, dtype=np.int64)
+    shift = np.zeros(chunks); s1 = np.zeros(chunks); s2 = np.zeros(chunks)
+    hist_n = np.zeros((chunks, nb), dtype=np.int64); hist_s = np.zeros((chunks, nb))
+    dr, wt, cost = _payoff_form(strikes, prems, types, qtys)
+    for c in prange(chunks):
+        lo, hi = c * n // chunks, (c + 1) * n // chunks
+        if hi == lo:
+            continue
+        k = _payoff(terminal[lo], strikes, dr, wt, cost)
+        w, a, b = 0, 0.0, 0.0
+        for i in range(lo, hi):
+            v = _payoff(terminal[i], strikes, dr, wt, cost)
+            w += v > 0
+            a += v - k
+            b += (v - k) * (v - k)
+            if nb > 0:
+                j = _tail_bin(v, edges, nb)
+                hist_n[c, j] += 1; hist_s[c, j] += v
+        wins[c] = w; count[c] = hi - lo; shift[c] = k; s1[c] = a; s2[c] = b
+    return _merge(wins, count, shift, s1, s2, hist_n, hist_s)
+
+@njit(parallel=True, cache=True)
+def simulate_pnl_stats(S: float, sigma: float, T: float, n: int, strikes: np.ndarray, prems: np.ndarray,
+                       types: np.ndarray, qtys: np.ndarray, edges: np.ndarray):
+    """`pnl_stats_numba` over n antithetic pairs drawn in place, as
+    `generate_terminal_prices` would, without the terminal array: normals are
+    drawn serially `PNL_BLOCK` pairs at a time (same stream at any thread
+    count), then each block is valued and reduced in parallel chunks."""
+    chunks = PNL_CHUNKS
+    nb = max(len(edges) - 1, 0)
+    wins = np.zeros(chunks, dtype=np.int64); count = np.zeros(chunks, dtype=np.int64)
+    shift = np.zeros(chunks); s1 = np.zeros(chunks); s2 = np.zeros(chunks)
+    hist_n = np.zeros((chunks, nb), dtype=np.int64); hist_s = np.zeros((chunks, nb))
+    drift, vol = 0.0, 0.0
+    if T > 0 and sigma > 0:
+        drift = (MC_DRIFT - 0.5 * sigma**2) * T
+        vol = sigma * math.sqrt(T)
+    s0 = S * math.exp(drift)                       # median terminal price; paths are s0·e^{±vol·z}
+    dr, wt, cost = _payoff_form(strikes, prems, types, qtys)
+    k = _payoff(s0, strikes, dr, wt, cost)
+    shift[:] = k
+    for blo in range(0, n, PNL_BLOCK):
+        m = min(PNL_BLOCK, n - blo)
+        z = np.random.standard_normal(m)
+        for c in prange(chunks):
+            w, a, b = 0, 0.0, 0.0
+            for i in range(c * m // chunks, (c + 1) * m // chunks):
+                g = math.exp(vol * z[i])
+                for v in (_payoff(s0 * g, strikes, dr, wt, cost), _payoff(s0 / g, strikes, dr, wt, cost)):
+                    w += v > 0
+                    a += v - k
+                    b += (v - k) * (v - k)
+                    if nb > 0:
+                        j = _tail_bin(v, edges, nb)
+                        hist_n[c, j] += 1; hist_s[c, j] += v
+            wins[c] += w; count[c] += 2 * ((c + 1) * m // chunks - c * m // chunks); s1[c] += a; s2[c] += b
+    return _merge(wins, count, shift, s1, s2, hist_n, hist_s)
+
+def tail_cvar(hist_n: np.ndarray, hist_s: np.ndarray, n: int, alpha: float) -> float:
+    """Mean of the worst `alpha` share of P&L from the fused tail histogram.
+    Whole bins contribute their exact sums; the bin holding the quantile
+    contributes pro rata at its own mean."""
+    need = alpha * n
+    taken, total = 0.0, 0.0
+    for c, s in zip(hist_n, hist_s):
+        if c == 0:
+            continue
+        k = min(c, need - taken)
+        total += s * k / c
+        taken += k
+        if taken >= need:
+            break
+    return total / max(taken, 1e-12)
+
+@njit(cache=True)
+def lognormal_pnl_stats(S: float, sigma: float, T: float, K: np.ndarray, is_call: np.ndarray,
+                        qty: np.ndarray, prem: np.ndarray, n_legs: int):
+    """Exact (PoP, EV, σ) of European legs expiring at T under the simulated GBM.
+
+    P&L = Σ qty·(intrinsic − premium) is linear between sorted strikes, so
+    each piece a + b·S_T integrates against the lognormal with normal CDFs:
+    P(L<S_T<U), E[S_T·1] and E[S_T²·1] are N(d) − N(d) at shifts 0, v, 2v.
+    `qty` is signed (long > 0); matches `MC.analyze` as paths → ∞.
+    """
+    knots = np.empty(n_legs + 2)
+    knots[0] = 0.0
+    for j in range(n_legs):
+        knots[j + 1] = K[j]
+    knots[n_legs + 1] = np.inf
+    knots[1:n_legs + 1] = np.sort(knots[1:n_legs + 1])
+    cost = 0.0
+    for j in range(n_legs):
+        cost += qty[j] * prem[j]
+    if T <= 0 or sigma <= 0:
+        v0 = -cost
+        for j in range(n_legs):
+            v0 += qty[j] * (max(S - K[j], 0.0) if is_call[j] else max(K[j] - S, 0.0))
+        return (1.0 if v0 > 0 else 0.0), v0, 0.0
+    m = (MC_DRIFT - 0.5 * sigma * sigma) * T
+    v = sigma * math.sqrt(T)
+    e1 = S * math.exp(MC_DRIFT * T)
+    e2 = S * S * math.exp(2.0 * m + 2.0 * v * v)
+    pop, ev, ex2 = 0.0, 0.0, 0.0
+    for i in range(n_legs + 1):
+        L, U = knots[i], knots[i + 1]
+        if U <= L:
+            continue
+        a, b = -cost, 0.0
+        for j in range(n_legs):
+            if is_call[j] and K[j] <= L:
+                a -= qty[j] * K[j]; b += qty[j]
+            elif not is_call[j] and K[j] >= U:
+                a += qty[j] * K[j]; b -= qty[j]
+        dL = -np.inf if L <= 0 else (math.log(L / S) - m) / v
+        dU = np.inf if U == np.inf else (math.log(U / S) - m) / v
+        p0 = n_cdf(dU) - n_cdf(dL)
+        p1 = e1 * (n_cdf(dU - v) - n_cdf(dL - v))
+        p2 = e2 * (n_cdf(dU - 2 * v) - n_cdf(dL - 2 * v))
+        ev += a * p0 + b * p1
+        ex2 += a * a * p0 + 2 * a * b * p1 + b * b * p2
+        # profitable part of the piece: a + b·x > 0
+        lo, hi = L, U
+        if b > 0:
+            lo = max(L, -a / b)
+        elif b < 0:
+            hi = min(U, -a / b)
+        elif a <= 0:
+            continue
+        if hi > lo:
+            dl = -np.inf if lo <= 0 else (math.log(lo / S) - m) / v
+            dh = np.inf if hi == np.inf else (math.log(hi / S) - m) / v
+            pop += n_cdf(dh) - n_cdf(dl)
+    return pop, ev, math.sqrt(max(ex2 - ev * ev, 0.0))
+
+@dataclass(slots=True)
 class Greeks:
     delta: float = 0.0; gamma: float = 0.0; theta: float = 0.0
     vega: float = 0.0; rho: float = 0.0
     vanna: float = 0.0; volga: float = 0.0; charm: float = 0.0; speed: float = 0.0
 
     def __add__(self, other):
-        return Greeks(**{f: getattr(self, f) + getattr(other, f) for f in ['delta','gamma','theta','vega','rho','vanna','volga','charm','speed']})
+        return Greeks(self.delta + other.delta, self.gamma + other.gamma, self.theta + other.theta,
+                      self.vega + other.vega, self.rho + other.rho, self.vanna + other.vanna,
+                      self.volga + other.volga, self.charm + other.charm, self.speed + other.speed)
+
+    def __iadd__(self, other):
+        self.delta += other.delta; self.gamma += other.gamma; self.theta += other.theta
+        self.vega += other.vega; self.rho += other.rho; self.vanna += other.vanna
+        self.volga += other.volga; self.charm += other.charm; self.speed += other.speed
+        return self
 
     def negate(self):
-        return Greeks(**{f: -getattr(self, f) for f in ['delta','gamma','theta','vega','rho','vanna','volga','charm','speed']})
+        return self.scale(-1)
 
     def scale(self, n):
-        return Greeks(**{f: getattr(self, f) * n for f in ['delta','gamma','theta','vega','rho','vanna','volga','charm','speed']})
+        return Greeks(self.delta * n, self.gamma * n, self.theta * n, self.vega * n, self.rho * n,
+                      self.vanna * n, self.volga * n, self.charm * n, self.speed * n)
+
+    def as_array(self) -> np.ndarray:
+        """The nine Greeks in field order (the column layout of `net_greeks_batch`)."""
+        return np.array([self.delta, self.gamma, self.theta, self.vega, self.rho,
+                         self.vanna, self.volga, self.charm, self.speed])
 
 class BSM:
-    """Wrapper for Numba-optimized Black-Scholes-Merton functions."""
+    """Wrapper for Numba-optimized Black-Scholes-Merton functions.
+
+    Every method broadcasts: pass arrays of S / K / T / σ (a strike ladder, a
+    terminal-price grid) and the work happens in one ufunc call. `greeks` then
+    returns a `Greeks` of arrays.
+    """
     R = 0.07
 
     @classmethod
     def greeks(cls, S, K, T, r, sigma, otype='call'):
-        d, g, t, v, vn, vg, ch, sp = bsm_greeks_numba(S, K, T, r, sigma, is_call=(otype == 'call'))
-        return Greeks(delta=d, gamma=g, theta=t, vega=v, vanna=vn, volga=vg, charm=ch, speed=sp)
+        if np.ndim(S) or np.ndim(K) or np.ndim(T) or np.ndim(sigma):
+            return Greeks(*cls.price_greeks(S, K, T, r, sigma, otype)[1:])
+        _, d, g, t, v, rh, vn, vg, ch, sp = bsm_all_numba(S, K, T, r, sigma, otype == 'call')
+        return Greeks(delta=d, gamma=g, theta=t, vega=v, rho=rh, vanna=vn, volga=vg, charm=ch, speed=sp)
+
+    @classmethod
+    def price_greeks(cls, S, K, T, r, sigma, otype='call'):
+        """(price, Δ, Γ, Θ, ν, ρ, vanna, volga, charm, speed) arrays, broadcast
+        over the inputs, from one pass of `bsm_price_greeks`."""
+        return bsm_price_greeks(*cls._f64(S, K, T, r, sigma), np.asarray(otype) == 'call')
 
     @classmethod
     def call(cls, S, K, T, r, sigma):
+        if np.ndim(S) or np.ndim(K) or np.ndim(T) or np.ndim(sigma):
+            return bsm_price_vec(*cls._f64(S, K, T, r, sigma), True)
         return bsm_price_numba(S, K, T, r, sigma, is_call=True)
 
     @classmethod
     def put(cls, S, K, T, r, sigma):
+        if np.ndim(S) or np.ndim(K) or np.ndim(T) or np.ndim(sigma):
+            return bsm_price_vec(*cls._f64(S, K, T, r, sigma), False)
         return bsm_price_numba(S, K, T, r, sigma, is_call=False)
 
     @classmethod
     def prob_otm(cls, S, K, T, sigma, otype='call'):
+        if np.ndim(S) or np.ndim(K) or np.ndim(T) or np.ndim(sigma):
+            return bsm_prob_otm_vec(*cls._f64(S, K, T, cls.R, sigma), np.asarray(otype) == 'call')
         if T <= 0 or sigma <= 0: return 0.5
         sT = sigma * math.sqrt(T)
         d2 = (math.log(S / K) + (cls.R - 0.5 * sigma**2) * T) / sT
         return n_cdf(-d2) if otype == 'call' else n_cdf(d2)
 
+    @staticmethod
+    def _f64(*xs):
+        # one compiled loop per ufunc: feed float64 regardless of int strikes / Python floats
+        return [np.asarray(x, dtype=np.float64) for x in xs]
+
     @classmethod
     def risk_score(cls, g, iv, rvw=1.0):
         """§6.3: Composite Risk Score — regime-weighted"""
@@ -211,23 +674,147 @@ class BSM:
         tail = min(abs(g.vanna) + abs(g.volga) * 0.1, 2.0) * w[4]
         return min((delta_r + gamma_r + vega_r + theta_p + tail) * 100, 100)
 
+    @classmethod
+    def risk_score_batch(cls, g: np.ndarray, iv: np.ndarray, rvw=1.0) -> np.ndarray:
+        """`risk_score` over rows of net Greeks (columns in `Greeks` field order)."""
+        w = np.array([0.25, 0.20, 0.25, 0.15, 0.15])
+        w[2] *= rvw; w /= w.sum()
+        delta_r = np.abs(g[:, 0]) * w[0]
+        gamma_r = np.minimum(np.abs(g[:, 1]) * iv * 100, 2.0) * w[1]
+        vega_r = np.minimum(np.abs(g[:, 3]) / np.maximum(iv * 100, 1), 2.0) * w[2]
+        theta_p = np.minimum(np.maximum(-g[:, 2], 0) / np.maximum(np.abs(g[:, 2]) + 1, 1), 1.0) * w[3]
+        tail = np.minimum(np.abs(g[:, 5]) + np.abs(g[:, 6]) * 0.1, 2.0) * w[4]
+        return np.minimum((delta_r + gamma_r + vega_r + theta_p + tail) * 100, 100)
+
 class MC:
-    """Wrapper for Numba-optimized Monte Carlo functions."""
-    
+    """Wrapper for Numba-optimized Monte Carlo functions.
+
+    `SAMPLER` picks the normals behind every call that doesn't pass its own
+    `sampler`: 'antithetic' (pseudo-random ±z pairs) or 'sobol' (scrambled
+    Sobol, `sobol_normals`). For the smooth 1-D terminal distribution Sobol
+    error falls close to O(1/n) against O(1/√n).
+    """
+
+    SAMPLER = 'antithetic'
+    QMC_BLOCK = 1024            # points per independent scrambling in sequential Sobol runs
+    QMC_MIN_BLOCKS = 4          # scramblings before their spread is trusted as an error bar
+
     @staticmethod
-    def terminal_prices(S, sigma, T, n=10000):
+    def terminal_prices(S, sigma, T, n=10000, sampler=None, seed=None):
+        """2n terminal prices: n antithetic pairs, or 2n scrambled Sobol points."""
+        if (sampler or MC.SAMPLER) == 'sobol':
+            return terminal_prices_from_normals(S, sigma, T, sobol_normals(2 * n, 1, seed)[:, 0])
         return generate_terminal_prices(S, sigma, T, n)
 
     @staticmethod
-    def paths(S, sigma, T, n=100, steps=30):
+    def paths(S, sigma, T, n=100, steps=30, sampler=None, seed=None):
+        if (sampler or MC.SAMPLER) == 'sobol':
+            return paths_from_normals(S, sigma, T, sobol_normals(n, steps, seed), *_bridge_order(steps))
         return generate_paths_numba(S, sigma, T, n, steps)
     
     @staticmethod
-    def analyze(S, sigma, T, legs, n=10000, sim_vol=None):
+    def analyze(S, sigma, T, legs, n=10000, sim_vol=None, terminal=None, sequential=False, sampler=None,
+                tail=None):
+        """PoP / EV / σ of `legs` at T in one fused pass (`simulate_pnl_stats` /
+        `pnl_stats_numba`, no P&L array). Pass one `terminal` draw (`terminal_prices`)
+        to value several structures on the same underlying with common random numbers.
+        `tail=α` appends the CVaR: mean P&L of the worst α share of paths.
+
+        `sequential=True` treats `n` as a budget: batches of `ComputeTriage.BATCH`
+        antithetic pairs run until the PoP and EV standard errors meet
+        `ComputeTriage.POP_SE` / `EV_SE`, and (pop, ev, std, paths used) is returned.
+        Under Sobol the batches are independent scramblings of `QMC_BLOCK`
+        points and the standard errors come from their spread. It draws its own
+        paths and keeps no tail histogram, so it cannot take `terminal` or `tail`
+        (ValueError).
+        """
         vol_for_sim = sim_vol if sim_vol is not None else sigma
-        terminal = generate_terminal_prices(S, vol_for_sim, T, n)
-        
-        # Prepare arrays for Numba
+        if sequential:
+            if tail or terminal is not None:
+                raise ValueError("MC.analyze: sequential=True cannot be combined with tail or terminal")
+            if (sampler or MC.SAMPLER) == 'sobol':
+                return MC._analyze_scrambled(S, vol_for_sim, T, legs, n)
+            return MC._analyze_sequential(S, vol_for_sim, T, legs, n)
+        strikes, prems, types, qtys = MC._leg_arrays(legs)
+        edges = MC._tail_edges(S, vol_for_sim, T, strikes, prems, types, qtys) if tail else np.empty(0)
+        if terminal is None and (sampler or MC.SAMPLER) != 'sobol':
+            count, wins, ev, m2, hist_n, hist_s = simulate_pnl_stats(
+                float(S), float(vol_for_sim), float(T), n, strikes, prems, types, qtys, edges)
+        else:
+            if terminal is None:
+                terminal = MC.terminal_prices(S, vol_for_sim, T, n, sampler)
+            count, wins, ev, m2, hist_n, hist_s = pnl_stats_numba(terminal, strikes, prems, types, qtys, edges)
+        out = (wins / count, float(ev), math.sqrt(m2 / count))
+        return out + (tail_cvar(hist_n, hist_s, count, tail),) if tail else out
+
+    @staticmethod
+    def analytic(S, sigma, T, legs, sim_vol=None):
+        """`analyze` in closed form (`lognormal_pnl_stats`): exact for legs that
+        all expire at T, at microsecond cost."""
+        strikes, prems, types, qtys = MC._leg_arrays(legs)
+        signed = np.where(types % 2 == 0, -1.0, 1.0) * qtys
+        pop, ev, std = lognormal_pnl_stats(float(S), float(sim_vol if sim_vol is not None else sigma), float(T),
+                                           strikes, types < 2, signed, prems, len(legs))
+        return float(pop), float(ev), float(std)
+
+    @staticmethod
+    def _analyze_sequential(S, vol, T, legs, max_pairs):
+        strikes, prems, types, qtys = MC._leg_arrays(legs)
+        credit = float(np.sum(np.where(types % 2 == 0, 1.0, -1.0) * qtys * prems))
+        ev_target = ComputeTriage.EV_SE * max(abs(credit), 0.01)
+        wins, count, mean, m2 = 0, 0, 0.0, 0.0
+        none = np.empty(0)
+        while count < 2 * max_pairs:
+            nb, wb, mb, m2b, _, _ = simulate_pnl_stats(
+                float(S), float(vol), float(T), min(ComputeTriage.BATCH, max_pairs - count // 2),
+                strikes, prems, types, qtys, none)
+            # Chan et al. merge of (count, mean, M2) with the batch
+            d = mb - mean
+            m2 += m2b + d * d * count * nb / (count + nb)
+            mean += d * nb / (count + nb)
+            count += nb; wins += wb
+            pop, std = wins / count, math.sqrt(m2 / count)
+            if (math.sqrt(max(pop * (1 - pop), 1e-4) / count) <= ComputeTriage.POP_SE
+                    and std / math.sqrt(count) <= ev_target):
+                break
+        return pop, mean, std, count
+
+    @staticmethod
+    def _analyze_scrambled(S, vol, T, legs, max_pairs):
+        # Randomized QMC: every block is an independent scrambling, so block
+        # estimates are iid and their spread / √blocks is the standard error.
+        strikes, prems, types, qtys = MC._leg_arrays(legs)
+        credit = float(np.sum(np.where(types % 2 == 0, 1.0, -1.0) * qtys * prems))
+        ev_target = ComputeTriage.EV_SE * max(abs(credit), 0.01)
+        pops, evs, m2s = [], [], []
+        blocks = max(2 * max_pairs // MC.QMC_BLOCK, MC.QMC_MIN_BLOCKS)
+        none = np.empty(0)
+        while len(pops) < blocks:
+            nb, wb, mb, m2b, _, _ = pnl_stats_numba(
+                terminal_prices_from_normals(S, vol, T, sobol_normals(MC.QMC_BLOCK)[:, 0]),
+                strikes, prems, types, qtys, none)
+            pops.append(wb / nb); evs.append(float(mb)); m2s.append(m2b / nb)
+            k = len(pops)
+            if (k >= MC.QMC_MIN_BLOCKS and np.std(pops, ddof=1) / math.sqrt(k) <= ComputeTriage.POP_SE
+                    and np.std(evs, ddof=1) / math.sqrt(k) <= ev_target):
+                break
+        # pooled σ: within-block variance plus the spread of block means
+        std = math.sqrt(float(np.mean(m2s)) + float(np.var(evs)))
+        return float(np.mean(pops)), float(np.mean(evs)), std, len(pops) * MC.QMC_BLOCK
+
+    @staticmethod
+    def _tail_edges(S, vol, T, strikes, prems, types, qtys):
+        # P&L is piecewise linear in S_T: its range over ±8σ of the terminal
+        # distribution is spanned by the strikes and those two end points.
+        w = 8 * vol * math.sqrt(max(T, 0.0))
+        pts = np.concatenate([strikes, [S * math.exp(-w), S * math.exp(w)]])
+        pts = pts[(pts >= pts[-2]) & (pts <= pts[-1])]
+        v = [leg_pnl(x, strikes, prems, types, qtys) for x in pts]
+        lo, hi = min(v), max(v)
+        return np.linspace(lo, hi if hi > lo else lo + 1.0, TAIL_BINS + 1)
+
+    @staticmethod
+    def _leg_arrays(legs):
         strikes = np.array([l['strike'] for l in legs], dtype=np.float64)
         prems = np.array([l['premium'] for l in legs], dtype=np.float64)
         qtys = np.array([l.get('qty', 1) for l in legs], dtype=np.float64)
@@ -239,13 +826,7 @@ class MC:
             elif 'buy' in lt and 'call' in lt: types[i] = 1
             elif 'sell' in lt and 'put' in lt: types[i] = 2
             elif 'buy' in lt and 'put' in lt: types[i] = 3
-            
-        pnl = compute_strategy_pnl_numba(terminal, strikes, prems, types, qtys)
-        
-        pop = float(np.mean(pnl > 0))
-        ev = float(np.mean(pnl))
-        std = float(np.std(pnl))
-        return pop, ev, std
+        return strikes, prems, types, qtys
 
     @staticmethod
     def expected_move(S, σ, T):
@@ -288,6 +869,23 @@ class SignalSpace:
             stock.get('PCR', 1.0), float(stock.get('CUSUM_Alert', False)),
         ], dtype=np.float64)
 
+    SIGNAL_DEFAULTS = (50, 20, 20, 50, 20, 0, 0.95, 1.0, False)   # `extract`'s fallbacks
+    PCT_KEYS = (5, 10, 15, 20, 25, 33, 50, 67, 75, 80, 85, 90, 95)
+
+    @staticmethod
+    def extract_batch(rows: Sequence[dict]) -> np.ndarray:
+        """`extract` over N rows → N × 9 signal matrix."""
+        fields = tuple(zip(SignalSpace.RAW_SIGNALS, SignalSpace.SIGNAL_DEFAULTS))
+        return np.array([[r.get(k, d) for k, d in fields] for r in rows],
+                        dtype=np.float64).reshape(len(rows), len(fields))
+
+    @staticmethod
+    def extract_frame(df) -> np.ndarray:
+        """`extract_batch` straight from an analytics DataFrame's columns."""
+        return np.column_stack([
+            df[k].to_numpy(dtype=np.float64, na_value=np.nan) if k in df.columns else np.full(len(df), float(d))
+            for k, d in zip(SignalSpace.RAW_SIGNALS, SignalSpace.SIGNAL_DEFAULTS)]).reshape(len(df), -1)
+
     @staticmethod
     def standardize(stock: dict, ustats: dict) -> dict:
         """Map raw features to stationary Z-scores."""
@@ -317,9 +915,8 @@ class SignalSpace:
         mads = np.maximum(mads, 1e-6)
 
         # Full percentile grid for adaptive thresholds
-        pct_keys = [5, 10, 15, 20, 25, 33, 50, 67, 75, 80, 85, 90, 95]
         percentiles = {}
-        for p in pct_keys:
+        for p in SignalSpace.PCT_KEYS:
             percentiles[p] = np.nanpercentile(all_signals, p, axis=0)
 
         # Cross-correlation (rank-based = robust)
@@ -330,6 +927,35 @@ class SignalSpace:
             corr_matrix = np.corrcoef(valid.T)
             corr_matrix = np.nan_to_num(corr_matrix, nan=0)
 
+        return SignalSpace._derive_stats(n, d, medians, mads, percentiles, np.nanmean(all_signals, axis=0),
+                                         np.nanstd(all_signals, axis=0), corr_matrix, valid)
+
+    @staticmethod
+    def universe_stats_from_sketch(sketch: UniverseSketch) -> dict:
+        """`compute_universe_stats` from a `UniverseSketch` (streaming mode).
+
+        Means, stds and correlations come from the exact moments; MADs,
+        crowding, entropies and interactions from the row sample; percentiles
+        and medians from the sample too while it holds the whole universe,
+        else from the quantile sketches (relative error α). So the stats equal
+        `compute_universe_stats` up to float rounding for universes that fit.
+        """
+        n, d = sketch.n, sketch.d
+        if n < 5:
+            return {'valid': False}
+        grid = sketch.percentiles(SignalSpace.PCT_KEYS)
+        percentiles = {p: grid[i] for i, p in enumerate(SignalSpace.PCT_KEYS)}
+        medians = percentiles[50]
+        sample = sketch.sample.matrix(d)
+        mads = np.maximum(np.median(np.abs(sample - medians), axis=0) * 1.4826, 1e-6)
+        corr_matrix = sketch.moments.corr() if n >= 10 else np.eye(d)
+        return SignalSpace._derive_stats(n, d, medians, mads, percentiles, sketch.moments.mean.copy(),
+                                         sketch.moments.std(), corr_matrix, sample)
+
+    @staticmethod
+    def _derive_stats(n, d, medians, mads, percentiles, means, stds, corr_matrix, valid) -> dict:
+        """Signal weights, crowding, entropies and interactions from the summary
+        statistics and the complete rows `valid` (the whole universe, or a sample)."""
         # Independence: 1 - avg|corr| with others
         avg_abs = (np.abs(corr_matrix).sum(axis=1) - 1) / max(d - 1, 1)
         independence = 1.0 - avg_abs
@@ -384,9 +1010,11 @@ class SignalSpace:
         return {
             'valid': True, 'n': n, 'd': d,
             'medians': medians, 'mads': mads,
-            'means': np.nanmean(all_signals, axis=0),
-            'stds': np.nanstd(all_signals, axis=0),
+            'means': means,
+            'stds': stds,
             'percentiles': percentiles,
+            'pct_levels': np.array(SignalSpace.PCT_KEYS, dtype=np.float64),
+            'pct_grid': np.array([percentiles[p] for p in SignalSpace.PCT_KEYS]),
             'corr_matrix': corr_matrix,
             'independence': independence,
             'crowding': crowding,
@@ -412,6 +1040,41 @@ class SignalSpace:
                 return (prev_p + frac * (p - prev_p)) / 100.0
         return 0.99
 
+    @staticmethod
+    def percentile_rank_batch(values: np.ndarray, ustats: dict, idx: int) -> np.ndarray:
+        """`percentile_rank` over an array: one `searchsorted` into the
+        precomputed percentile grid, then the same piecewise-linear map
+        (a tie in the grid maps to its upper level, as the scalar scan does)."""
+        levels = ustats.get('pct_levels')
+        if levels is None:
+            keys = sorted(ustats['percentiles'])
+            levels = np.array(keys, dtype=np.float64)
+            grid = np.array([ustats['percentiles'][p][idx] for p in keys])
+        else:
+            grid = ustats['pct_grid'][:, idx]
+        v = np.asarray(values, dtype=np.float64)
+        i = np.searchsorted(grid, v, side='left')        # first level with v <= grid
+        above = (i == len(grid)) | np.isnan(v)
+        i = np.clip(i, 1, len(grid) - 1)
+        lo, hi = grid[i - 1], grid[i]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            frac = (v - lo) / (hi - lo)
+            rank = np.where(hi - lo < 1e-6, levels[i], levels[i - 1] + frac * (levels[i] - levels[i - 1])) / 100.0
+        rank = np.where(v <= grid[0], levels[0] / 100.0, rank)
+        return np.where(above, 0.99, rank)
+
+    @staticmethod
+    def grid_histogram(sigs: np.ndarray, ustats: dict) -> np.ndarray:
+        """Fraction of each signal's non-NaN values between consecutive levels
+        of the calibrated percentile grid → (len(PCT_KEYS) + 1) × d."""
+        grid = ustats['pct_grid']
+        hist = np.zeros((len(grid) + 1, sigs.shape[1]))
+        for j in range(sigs.shape[1]):
+            v = sigs[:, j][~np.isnan(sigs[:, j])]
+            if len(v):
+                hist[:, j] = np.bincount(np.searchsorted(grid[:, j], v), minlength=len(grid) + 1) / len(v)
+        return hist
+
 
 # ═══════════════════════════════════════════════════════════════════════════════
 # §2  FUZZY REGIME
@@ -430,8 +1093,52 @@ class RegimeState:
     transition_risk: float       # P(regime shift imminent)
     stability: float             # [0,1] overall stability
 
+@dataclass
+class RegimeBatch:
+    """`RegimeState` fields for N stocks as arrays (rows of `vol_probs` and
+    `trend_probs` are the per-stock probability vectors)."""
+    vol_probs: np.ndarray        # N × 6
+    trend_probs: np.ndarray      # N × 5
+    iv_regime_rank: np.ndarray
+    structural_break_prob: np.ndarray
+    entropy: np.ndarray
+    transition_risk: np.ndarray
+    stability: np.ndarray
+    _states: Optional[List[RegimeState]] = field(default=None, init=False, repr=False)
+
+    def __len__(self):
+        return len(self.entropy)
+
+    def state(self, i: int) -> RegimeState:
+        return RegimeState(
+            vol_probs=self.vol_probs[i], trend_probs=self.trend_probs[i],
+            iv_regime_rank=float(self.iv_regime_rank[i]),
+            structural_break_prob=float(self.structural_break_prob[i]),
+            entropy=float(self.entropy[i]), transition_risk=float(self.transition_risk[i]),
+            stability=float(self.stability[i]))
+
+    def states(self) -> List[RegimeState]:
+        if self._states is None:
+            self._states = [self.state(i) for i in range(len(self))]
+        return self._states
+
+    @classmethod
+    def from_states(cls, states: Sequence[RegimeState]) -> 'RegimeBatch':
+        if isinstance(states, RegimeBatch):
+            return states
+        col = lambda f: np.array([getattr(g, f) for g in states], dtype=np.float64)
+        return cls(vol_probs=col('vol_probs').reshape(len(states), 6),
+                   trend_probs=col('trend_probs').reshape(len(states), 5),
+                   iv_regime_rank=col('iv_regime_rank'), structural_break_prob=col('structural_break_prob'),
+                   entropy=col('entropy'), transition_risk=col('transition_risk'), stability=col('stability'))
+
+
 class FuzzyRegime:
 
+    # Row fields `compute` reads, for `features` / `compute_batch`
+    FIELDS = ('IVPercentile', 'price', 'ma20_daily', 'ma50_daily', 'rsi_daily', '% change',
+              'adx', 'kalman_trend', 'GARCH_Persistence', 'CUSUM_Alert')
+
     @staticmethod
     def _soft_assign(value_rank: float, state_centers: np.ndarray,
                      state_widths: np.ndarray) -> np.ndarray:
@@ -490,7 +1197,8 @@ class FuzzyRegime:
 
         # Apply stickiness (Dampening) if transitioning
         if prev_regime is not None:
-            # 95% persistence to ensure institutional stability in cross-sectional scans
+            # 95% persistence on the same symbol's regime from an earlier period
+            # (`RegimeStore.prev`), so each stock's regime is independent of the others
             vol_probs = 0.95 * prev_regime.vol_probs + 0.05 * vol_probs
             trend_probs = 0.95 * prev_regime.trend_probs + 0.05 * trend_probs
 
@@ -527,6 +1235,121 @@ class FuzzyRegime:
             iv_regime_rank=iv_rank, structural_break_prob=break_prob,
             entropy=entropy, transition_risk=t_risk, stability=stab)
 
+    @staticmethod
+    def features(rows: Sequence[dict]) -> np.ndarray:
+        """N × len(FIELDS) input matrix with `compute`'s defaults (MAs default to price)."""
+        out = np.empty((len(rows), len(FuzzyRegime.FIELDS)))
+        for i, r in enumerate(rows):
+            price = r.get('price', 100)
+            out[i] = (r.get('IVPercentile', 50), price, r.get('ma20_daily', price), r.get('ma50_daily', price),
+                      r.get('rsi_daily', 50), r.get('% change', 0), r.get('adx', 20), r.get('kalman_trend', 0),
+                      r.get('GARCH_Persistence', 0.95), r.get('CUSUM_Alert', False))
+        return out
+
+    @staticmethod
+    def compute_batch(X: np.ndarray, ustats: dict, prev: Sequence[Optional[RegimeState]] = None) -> RegimeBatch:
+        """`compute` for N stocks at once from `features(rows)`; `prev[i]` is
+        stock i's earlier regime (or None) for the stickiness blend."""
+        ivp, price, ma20, ma50, rsi, mom, adx, kalman, garch_p, cusum = X.T
+        n, valid = len(X), ustats.get('valid')
+        cusum = cusum != 0                                  # truthiness, as `if cusum` (NaN counts)
+
+        iv_rank = SignalSpace.percentile_rank_batch(ivp, ustats, 0) if valid else ivp / 100
+        if valid:
+            centers = np.array([0.05, 0.175, 0.50, 0.825, 0.925, 0.975])
+            widths = np.array([0.05, 0.075, 0.25, 0.075, 0.025, 0.025])
+            vol_probs = np.exp(-0.5 * ((iv_rank[:, None] - centers) / np.maximum(widths, 0.01)) ** 2)
+            vol_probs /= vol_probs.sum(axis=1, keepdims=True) + 1e-12
+        else:
+            vol_probs = np.tile(np.array([0, 0.1, 0.6, 0.2, 0.1, 0.0]), (n, 1))
+
+        # Trend: mean of the signals `estimate_trend_regime` includes per row
+        with np.errstate(divide='ignore', invalid='ignore'):
+            terms = ((ma20 > 0, np.clip((price / ma20 - 1) * 100 / 5, -1, 1)),
+                     (ma50 > 0, np.clip((price / ma50 - 1) * 100 / 8, -1, 1)),
+                     (True, np.clip((rsi - 50) / 25, -1, 1)),
+                     (np.abs(mom) > 0, np.clip(mom / 5, -1, 1)),
+                     (True, np.clip(kalman / 3, -1, 1)))
+        total, count = np.zeros(n), np.zeros(n)
+        for on, x in terms:
+            total = total + np.where(on, x, 0.0)
+            count = count + on
+        adx_rank = SignalSpace.percentile_rank_batch(adx, ustats, 4) if valid else adx / 50
+        trend_score = np.clip(total / count * (0.5 + adx_rank), -1, 1)
+        centers = np.array([-0.8, -0.35, 0.0, 0.35, 0.8])
+        widths = np.array([0.20, 0.20, 0.25, 0.20, 0.20])
+        trend_probs = np.exp(-0.5 * ((trend_score[:, None] - centers) / np.maximum(widths, 0.01)) ** 2)
+        trend_probs /= trend_probs.sum(axis=1, keepdims=True) + 1e-12
+
+        if prev is not None:
+            has = np.array([g is not None for g in prev], dtype=bool)
+            if has.any():
+                pv = RegimeBatch.from_states([g for g in prev if g is not None])
+                vol_probs[has] = 0.95 * pv.vol_probs + 0.05 * vol_probs[has]
+                trend_probs[has] = 0.95 * pv.trend_probs + 0.05 * trend_probs[has]
+
+        break_prob = np.clip(np.where(cusum, 0.80, 0.05) * (2 - garch_p), 0, 0.95)
+
+        def H(p):
+            on = p > 1e-12
+            k = on.sum(axis=1)
+            with np.errstate(divide='ignore', invalid='ignore'):
+                h = -np.sum(np.where(on, p * np.log2(p), 0.0), axis=1) / np.maximum(np.log2(np.maximum(k, 1)), 1)
+            return np.where(k > 0, h, 0.0)
+        entropy = (H(vol_probs) + H(trend_probs)) / 2
+
+        stab = 0.5 + np.where((0.25 <= iv_rank) & (iv_rank <= 0.75), 0.15, 0.0)
+        stab = stab + np.where((40 <= rsi) & (rsi <= 60), 0.10, 0.0)
+        stab = stab + np.where(garch_p > 0.90, 0.10, 0.0)
+        stab = np.clip(stab - np.where(cusum, 0.25, 0.0), 0.1, 0.95)
+
+        t_risk = 0.20 + np.where(garch_p < 0.90, 0.15, np.where(garch_p > 0.97, -0.10, 0.0))
+        t_risk = t_risk + np.where(cusum, 0.30, 0.0)
+        t_risk = t_risk + np.where((iv_rank > 0.90) | (iv_rank < 0.10), 0.15, 0.0)
+        t_risk = np.clip(t_risk + (1 - stab) * 0.20, 0.05, 0.95)
+
+        return RegimeBatch(vol_probs=vol_probs, trend_probs=trend_probs, iv_regime_rank=iv_rank,
+                           structural_break_prob=break_prob, entropy=entropy,
+                           transition_risk=t_risk, stability=stab)
+
+
+class RegimeStore:
+    """Each symbol's latest regime, persisted so stickiness is per symbol over time.
+
+    A record is (tag, regime, prev), where `tag` names the observation period
+    (the trading day). `prev(symbol, tag)` is the symbol's regime from an
+    earlier period. A stock's regime therefore never depends on the other rows
+    of a scan or on their order, and rescanning within a period is idempotent.
+    `cache` is any diskcache-like store; None keeps the records in-process.
+    """
+
+    def __init__(self, cache=None, key: str = "regime_store"):
+        self.cache = cache
+        self.key = key
+        self._records: Optional[Dict[str, Tuple[str, RegimeState, Optional[RegimeState]]]] = None
+        self._dirty = False
+
+    def records(self) -> Dict[str, Tuple[str, RegimeState, Optional[RegimeState]]]:
+        if self._records is None:
+            self._records = dict(self.cache.get(self.key, {})) if self.cache is not None else {}
+        return self._records
+
+    def prev(self, symbol: str, tag: str) -> Optional[RegimeState]:
+        rec = self.records().get(symbol)
+        if rec is None:
+            return None
+        return rec[2] if rec[0] == tag else rec[1]
+
+    def put(self, symbol: str, tag: str, regime: RegimeState):
+        self.records()[symbol] = (tag, regime, self.prev(symbol, tag))
+        self._dirty = True
+
+    def flush(self):
+        """Write the records back in one set (a scan's worth of `put`s)."""
+        if self._dirty and self.cache is not None:
+            self.cache.set(self.key, self._records)
+        self._dirty = False
+
 
 # ═══════════════════════════════════════════════════════════════════════════════
 # §3  ADAPTIVE GATING
@@ -554,6 +1377,14 @@ STRATEGY_STRUCTURE = {
 
 class AdaptiveGating:
 
+    # Affinity vectors: how much each trend state helps a strategy's direction
+    TREND_AFFINITY = {
+        'BULLISH':  np.array([0.05, 0.15, 0.30, 0.70, 0.95]),
+        'BEARISH':  np.array([0.95, 0.70, 0.30, 0.15, 0.05]),
+        'NEUTRAL':  np.array([0.10, 0.40, 0.95, 0.40, 0.10]),
+        'VOLATILE': np.array([0.80, 0.30, 0.10, 0.30, 0.80]),
+    }
+
     @staticmethod
     def iv_viability(sname: str, iv_rank: float) -> float:
         """Sigmoid viability — no hard thresholds."""
@@ -598,14 +1429,7 @@ class AdaptiveGating:
     def trend_alignment(sname: str, trend_probs: np.ndarray) -> float:
         """Dot product of trend distribution with strategy affinity."""
         d = STRATEGY_STRUCTURE.get(sname, {}).get('direction', 'NEUTRAL')
-        # Affinity vectors: how much each trend state helps this strategy
-        affinities = {
-            'BULLISH':  np.array([0.05, 0.15, 0.30, 0.70, 0.95]),
-            'BEARISH':  np.array([0.95, 0.70, 0.30, 0.15, 0.05]),
-            'NEUTRAL':  np.array([0.10, 0.40, 0.95, 0.40, 0.10]),
-            'VOLATILE': np.array([0.80, 0.30, 0.10, 0.30, 0.80]),
-        }
-        a = affinities.get(d, affinities['NEUTRAL'])
+        a = AdaptiveGating.TREND_AFFINITY.get(d, AdaptiveGating.TREND_AFFINITY['NEUTRAL'])
         return np.clip(np.dot(trend_probs, a), 0.05, 0.95)
 
     @staticmethod
@@ -631,12 +1455,46 @@ class AdaptiveGating:
         components = np.maximum(components, 0.01)
         return np.prod(components) ** (1.0 / len(components))
 
+    @staticmethod
+    def compute_viability_batch(names: Sequence[str], regimes: 'RegimeBatch', dte: int) -> np.ndarray:
+        """`compute_viability` for N stocks × len(names) strategies in one pass.
+
+        The per-strategy structure (IV curve, DTE fitness, break and entropy
+        coefficients, trend affinity) is resolved once per name; the regime
+        columns broadcast against it.
+        """
+        ss = [STRATEGY_STRUCTURE.get(n, {}) for n in names]
+        stype = np.array([s.get('type', 'HYBRID') for s in ss])
+        direction = [s.get('direction', 'NEUTRAL') for s in ss]
+        volatile = np.array([d == 'VOLATILE' for d in direction])
+        stable = np.array([bool(s.get('needs_stability')) for s in ss])
+        affinity = np.array([AdaptiveGating.TREND_AFFINITY.get(d, AdaptiveGating.TREND_AFFINITY['NEUTRAL'])
+                             for d in direction]).reshape(len(names), 5)
+
+        r = regimes.iv_regime_rank[:, None]
+        iv = np.where(stype == 'CREDIT', np.clip(1.0 / (1 + np.exp(-6 * (r - 0.35))), 0.05, 1.0),
+             np.where(stype == 'DEBIT', np.clip(1.0 / (1 + np.exp(6 * (r - 0.65))), 0.05, 1.0),
+                      np.clip(0.6 + 0.4 * np.exp(-8 * (r - 0.5) ** 2), 0.05, 1.0)))
+        fit = np.array([AdaptiveGating.dte_fitness(n, dte) for n in names], dtype=np.float64)
+        brk = 1.0 + np.where(volatile, 0.3, np.where(stable, -0.5, -0.2)) * regimes.structural_break_prob[:, None]
+        trend = np.clip(regimes.trend_probs @ affinity.T, 0.05, 0.95)
+        anti = 1.0 + np.where(volatile, 0.25, np.where(stable, -0.20, 0.0)) * regimes.entropy[:, None]
+
+        v = np.maximum(iv, 0.01) * np.maximum(fit, 0.01)
+        v = v * np.maximum(brk, 0.01) * np.maximum(trend, 0.01) * np.maximum(anti, 0.01)
+        return v ** (1.0 / 5)
+
     @staticmethod
     def min_premium(price: float, dte: int) -> float:
         """Adaptive — relative to stock price, not fixed ₹0.50."""
         dte_factor = max(0.3, min(1.0, dte / 30))
         return max(0.10, price * 0.0002 * dte_factor)
 
+    @staticmethod
+    def min_premium_batch(price: np.ndarray, dte: int) -> np.ndarray:
+        dte_factor = max(0.3, min(1.0, dte / 30))
+        return np.maximum(0.10, price * 0.0002 * dte_factor)
+
 class CostScrub:
     """Indian FnO Transaction Cost Model."""
     @staticmethod
@@ -660,6 +1518,25 @@ class CostScrub:
             'penalty': np.clip(1.0 - (impact / 0.35)**2, 0.0, 1.0)
         }
 
+    @staticmethod
+    def calculate_batch(net_credit, max_profit, lot_size, n_legs, price) -> dict:
+        """`calculate` over arrays of candidates (same keys, array values)."""
+        brokerage = 40 * np.maximum(1, n_legs // 2)
+        premium = np.abs(np.where(net_credit != 0, net_credit, max_profit)) * lot_size
+        stt = premium * 0.0005
+        txn_charge = premium * 0.00053
+        gst = (brokerage + txn_charge) * 0.18
+        slippage = price * lot_size * 0.0005 * n_legs
+
+        total = brokerage + stt + txn_charge + gst + slippage
+        impact = total / np.maximum(np.abs(max_profit), 1)
+        return {
+            'total_cost': total,
+            'impact_pct': impact * 100,
+            'is_hollow': impact > 0.50,
+            'penalty': np.clip(1.0 - (impact / 0.35)**2, 0.0, 1.0)
+        }
+
 
 # ═══════════════════════════════════════════════════════════════════════════════
 # §4  ADAPTIVE ENSEMBLE
@@ -686,6 +1563,20 @@ class AdaptiveEnsemble:
         agreement = 1.0 - min(gap / 0.30, 1.0)
         return mean, std, agreement
 
+    @staticmethod
+    def fuse_batch(pop_bsm: np.ndarray, pop_mc: np.ndarray, n_paths=10000
+                   ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """`fuse` over arrays; `n_paths` may be a scalar or per-candidate array."""
+        mc_se = np.sqrt(np.maximum(pop_mc * (1 - pop_mc), 1e-6) / np.maximum(n_paths, 100))
+        gap = np.abs(pop_bsm - pop_mc)
+        w_b = np.where(gap < 0.05, 0.45, np.where(gap < 0.15, 0.30, 0.15))
+        w_m = np.where(gap < 0.05, 0.55, np.where(gap < 0.15, 0.70, 0.85))
+
+        mean = np.clip(w_b * pop_bsm + w_m * pop_mc, 0.01, 0.99)
+        std = np.clip(np.sqrt((w_b * gap) ** 2 + mc_se ** 2), 0.005, 0.25)
+        agreement = 1.0 - np.minimum(gap / 0.30, 1.0)
+        return mean, std, agreement
+
 
 # ═══════════════════════════════════════════════════════════════════════════════
 # §5  PROBABILISTIC SCORING
@@ -745,6 +1636,34 @@ class ProbabilisticScoring:
             viability=viability, model_agreement=model_agreement,
             signal_quality=signal_quality)
 
+    @staticmethod
+    def compute_batch(pop_mean, pop_std, ev_ratio, sharpe, viability,
+                      regime_entropy, model_agreement, signal_quality,
+                      transition_risk) -> Dict[str, np.ndarray]:
+        """`compute` over arrays of candidates; returns the distribution fields
+        as columns ('mean', 'std', 'ci_lower', 'ci_upper', 'entropy', 'pop',
+        'ev', 'sharpe', 'viability')."""
+        ev_s = np.clip((ev_ratio + 1) / 2, 0, 1)
+        sh_s = np.clip((sharpe + 2) / 5, 0, 1)
+        cert = np.clip(np.column_stack([
+            1.0 - pop_std * 3,
+            np.full(len(pop_mean), 0.70),
+            np.minimum(1.0, np.abs(sharpe) * 2),
+            np.full(len(pop_mean), signal_quality),
+        ]), 0.1, 1.0)
+        scores = np.column_stack([pop_mean, ev_s, sh_s, viability])
+        weights = cert / (cert.sum(axis=1, keepdims=True) + 1e-12)
+        raw = np.sum(scores * weights, axis=1)
+
+        damped = raw * (1 - 0.4 * regime_entropy) * (1 - 0.3 * transition_risk) * (0.7 + 0.3 * model_agreement)
+        mean = np.clip(damped * 100, 0, 100)
+        total_std = np.clip(np.sqrt(np.sum(weights**2 * (1-cert)**2, axis=1) * 100**2 + (pop_std*100)**2) * 0.5, 1, 30)
+        ci_lo = np.maximum(0, mean - 1.28 * total_std)
+        ci_hi = np.minimum(100, mean + 1.28 * total_std)
+        return {'mean': mean, 'std': total_std, 'ci_lower': ci_lo, 'ci_upper': ci_hi,
+                'entropy': np.minimum((ci_hi - ci_lo) / 50, 1.0),
+                'pop': pop_mean, 'ev': ev_s, 'sharpe': sh_s, 'viability': viability}
+
 
 # ═══════════════════════════════════════════════════════════════════════════════
 # §6  META-INTELLIGENCE
@@ -872,7 +1791,12 @@ class EntropyGovernor:
         if not regimes: return 0.5
         r_ent = np.mean([r.entropy for r in regimes])
         c_ent = np.mean([c.entropy for c in convictions]) if convictions else 0.5
-        return np.clip(r_ent * 0.6 + c_ent * 0.4, 0, 1)
+        return EntropyGovernor.blend(r_ent, c_ent)
+
+    @staticmethod
+    def blend(regime_entropy: float, conviction_entropy: float) -> float:
+        """`system_entropy` from the mean regime and conviction entropies."""
+        return np.clip(regime_entropy * 0.6 + conviction_entropy * 0.4, 0, 1)
 
     @staticmethod
     def risk_budget(sys_entropy: float, avg_transition: float) -> float:
@@ -921,6 +1845,19 @@ class AdaptiveKelly:
 
         return np.clip(k_final * risk_budget * certainty * drawdown_mult, 0, 0.25)
 
+    @staticmethod
+    def compute_batch(pop_mean, pop_std, max_profit, max_loss,
+                      mc_ev, mc_std, risk_budget, drawdown_mult=1.0) -> np.ndarray:
+        with np.errstate(divide='ignore', invalid='ignore'):
+            b = max_profit / np.where(max_loss > 0, max_loss, 1.0)
+            k_raw = (b * pop_mean - (1 - pop_mean)) / np.maximum(b, 0.01)
+            certainty = np.maximum(0.1, 1.0 - pop_std * 5)
+            cap = np.maximum(max_loss, 1)
+            k_cont = (mc_ev / cap) / np.maximum((mc_std / cap) ** 2, 0.001)
+            k_final = np.where((mc_std > 0.01) & (mc_ev > 0), 0.4 * k_raw + 0.6 * k_cont, k_raw)
+            k = np.clip(k_final * risk_budget * certainty * drawdown_mult, 0, 0.25)
+        return np.where((max_loss > 0) & (max_profit > 0) & (k_raw > 0), k, 0.0)
+
 
 # ═══════════════════════════════════════════════════════════════════════════════
 # §9  PORTFOLIO AWARENESS
@@ -1008,6 +1945,26 @@ class AdaptiveStrikes:
         K = S * np.exp(-(d1_t * iv * np.sqrt(T) - (r + iv**2/2) * T))
         return max(1, round(abs(S - K) / gap))
 
+    @staticmethod
+    def target_delta_batch(sname: str, iv_regime_rank: np.ndarray, entropy: np.ndarray) -> np.ndarray:
+        """`target_delta` for one strategy across many regimes."""
+        d = STRATEGY_STRUCTURE.get(sname, {}).get('direction', 'NEUTRAL')
+        base = {'NEUTRAL': 0.20, 'BULLISH': 0.30, 'BEARISH': 0.30, 'VOLATILE': 0.25}.get(d, 0.25)
+        iv_adj = -0.08 * (iv_regime_rank - 0.5)
+        trend_adj = 0.05 * (1 - entropy) if d in ('BULLISH', 'BEARISH') else 0
+        return np.clip(base + iv_adj + trend_adj, 0.10, 0.45)
+
+    @staticmethod
+    def gaps_for_delta_batch(target_delta, S, T, iv, gap) -> np.ndarray:
+        """`gaps_for_delta` over arrays; `T` may be scalar."""
+        d1_t = -norm.ppf(np.maximum(target_delta, 0.01))
+        r = 0.065
+        Tc = np.maximum(T, 0.0)
+        K = S * np.exp(-(d1_t * iv * np.sqrt(Tc) - (r + iv**2/2) * Tc))
+        with np.errstate(divide='ignore', invalid='ignore'):
+            n = np.maximum(1, np.round(np.abs(S - K) / gap))
+        return np.where((T <= 0) | (iv <= 0) | (gap <= 0), 1, n).astype(np.int64)
+
 
 # ═══════════════════════════════════════════════════════════════════════════════
 # §11  COMPUTE TRIAGE
@@ -1036,11 +1993,43 @@ class ComputeTriage:
         if viability > 0.30: return 5000
         return 2000
 
+    # Sequential MC: simulate in batches until both standard errors meet target
+    POP_SE = 0.005          # PoP standard error (half a point)
+    EV_SE = 0.02            # EV standard error, as a fraction of |net premium|
+    BATCH = 1000            # antithetic pairs per sequential batch
+
+    @staticmethod
+    def should_run_mc_batch(bsm_pop: np.ndarray, viability: np.ndarray) -> np.ndarray:
+        """`should_run_mc` over arrays."""
+        return ~(((bsm_pop < 0.35) & (viability < 0.20)) | (bsm_pop > 0.98))
+
+    @staticmethod
+    def adaptive_mc_paths_batch(viability: np.ndarray) -> np.ndarray:
+        """`adaptive_mc_paths` over arrays (antithetic pairs, as `MC.analyze`'s n)."""
+        return np.where(viability > 0.60, 10000, np.where(viability > 0.30, 5000, 2000)).astype(np.int64)
+
 
 # ═══════════════════════════════════════════════════════════════════════════════
 # §12  ADAPTIVE ENGINE — Master Orchestrator
 # ═══════════════════════════════════════════════════════════════════════════════
 
+@dataclass
+class Calibration:
+    """When and from what the engine's universe stats were last built, and
+    how far the latest snapshot checked against them has drifted."""
+    at: float = 0.0                         # time.time() of the last (re)calibration
+    ms: float = 0.0                         # its wall-clock cost
+    rows: int = 0
+    digest: str = ''                        # signal-matrix digest it was built from
+    reference: Optional[np.ndarray] = None  # `grid_histogram` of that matrix
+    drift: float = 0.0                      # distance of the last changed snapshot
+    runs: int = 0
+    skipped: int = 0                        # changed snapshots within tolerance
+
+    def age(self) -> float:
+        return time.time() - self.at if self.runs else float('inf')
+
+
 class AdaptiveEngine:
     """Replaces the entire hardcoded scoring pipeline.
 
@@ -1057,38 +2046,133 @@ class AdaptiveEngine:
     10. meta()            → MetaIntelligence monitors system health
     """
 
+    # State is scoped to scan cycles: `begin_cycle()` opens one (a fresh engine
+    # starts with one open), `end_cycle()` freezes its governance inputs so Deep
+    # Analysis reruns read them without adding to them. Cross-cycle history lives
+    # in fixed-size deques, so a long session holds O(1) state.
+
+    # Universe stats are rebuilt only when a snapshot drifts from them: the
+    # largest per-signal total-variation distance between its histogram over the
+    # calibrated percentile grid and the calibration frame's own.
+    DRIFT_TOLERANCE = 0.10
+    CYCLE_REGIMES = 4096        # regime states kept per cycle for validation
+    TRANSITION_HISTORY = 64     # per-cycle mean transition risks
+    ACCURACY_HISTORY = 50
+    IC_HISTORY = 100
+
     def __init__(self):
         self.universe_stats = {'valid': False}
-        self.regime_states: List[RegimeState] = []
-        self.conviction_dists: List[ConvictionDistribution] = []
-        self._historical_ic: List[float] = []
-        self._recent_accuracy: List[bool] = []
-        self._transition_history: List[float] = []
+        self.sketch: Optional[UniverseSketch] = None
+        self.calibration = Calibration()
+        self.cycle = 0
+        self._historical_ic = deque(maxlen=self.IC_HISTORY)
+        self._recent_accuracy = deque(maxlen=self.ACCURACY_HISTORY)
+        self._transition_history = deque(maxlen=self.TRANSITION_HISTORY)
+        self.begin_cycle()
 
     # ── Phase 1: Calibrate ──
-    def calibrate(self, df) -> dict:
-        sigs = []
-        for _, row in df.iterrows():
-            s = SignalSpace.extract(row.to_dict())
-            if not np.isnan(s).any():
-                sigs.append(s)
-        if sigs:
-            self.universe_stats = SignalSpace.compute_universe_stats(np.array(sigs))
+    def calibrate(self, df, streaming: bool = False) -> dict:
+        """Universe stats from the analytics frame. `streaming` keeps a live
+        `UniverseSketch` on the engine instead: each call syncs it to `df`,
+        touching only the symbols whose signals changed, and derives the
+        stats from the sketch."""
+        t0 = time.perf_counter()
+        sigs = SignalSpace.extract_frame(df)
+        if streaming:
+            if self.sketch is None:
+                self.sketch = UniverseSketch(len(SignalSpace.RAW_SIGNALS))
+            symbols = df['Instrument'].tolist() if 'Instrument' in df.columns else list(range(len(df)))
+            self.sketch.sync(symbols, sigs)
+            if self.sketch.n:
+                self.universe_stats = SignalSpace.universe_stats_from_sketch(self.sketch)
+        else:
+            full = sigs[~np.isnan(sigs).any(axis=1)]
+            if len(full):
+                self.universe_stats = SignalSpace.compute_universe_stats(full)
+        self._stamp(t0, sigs)
+        return self.universe_stats
+
+    def calibrate_from(self, sketch: UniverseSketch) -> dict:
+        """Universe stats from any sketch, e.g. `UniverseSketch.merged` over a
+        rolling window of day shards."""
+        t0 = time.perf_counter()
+        if sketch.n:
+            self.universe_stats = SignalSpace.universe_stats_from_sketch(sketch)
+        self._stamp(t0, None, rows=sketch.n)
         return self.universe_stats
 
+    def refresh(self, df, tolerance: float = None) -> bool:
+        """Recalibrate on a new snapshot only if it has drifted. An unchanged
+        signal matrix costs one digest; a changed one is measured by `drift`,
+        and past `tolerance` the streaming sketch is synced — only the changed
+        symbols — and the stats rederived. Returns whether they were rebuilt."""
+        if not self.universe_stats.get('valid'):
+            self.calibrate(df, streaming=True)
+            return True
+        sigs = SignalSpace.extract_frame(df)
+        if self._digest(sigs) == self.calibration.digest:
+            return False
+        self.calibration.drift = self.drift(sigs)
+        if self.calibration.drift < (self.DRIFT_TOLERANCE if tolerance is None else tolerance):
+            self.calibration.skipped += 1
+            return False
+        self.calibrate(df, streaming=True)
+        return True
+
+    def drift(self, sigs: np.ndarray) -> float:
+        """Largest per-signal total-variation distance between `sigs` and the
+        calibration frame, over the bins of the calibrated percentile grid
+        (against the grid's nominal bin masses after `calibrate_from`)."""
+        ref = self.calibration.reference
+        if ref is None:
+            levels = np.asarray(SignalSpace.PCT_KEYS, dtype=np.float64)
+            ref = np.diff(np.concatenate(([0.0], levels, [100.0])))[:, None] / 100.0
+        hist = SignalSpace.grid_histogram(sigs, self.universe_stats)
+        return float(0.5 * np.abs(hist - ref).sum(axis=0).max())
+
+    @staticmethod
+    def _digest(sigs: np.ndarray) -> str:
+        return hashlib.blake2b(np.ascontiguousarray(sigs).tobytes(), digest_size=16).hexdigest()
+
+    def _stamp(self, t0: float, sigs: Optional[np.ndarray], rows: int = 0):
+        c = self.calibration
+        c.at, c.ms, c.runs = time.time(), (time.perf_counter() - t0) * 1000, c.runs + 1
+        valid = self.universe_stats.get('valid')
+        c.rows = len(sigs) if sigs is not None else rows
+        c.digest = self._digest(sigs) if sigs is not None else ''
+        c.reference = SignalSpace.grid_histogram(sigs, self.universe_stats) if sigs is not None and valid else None
+
     # ── Phase 2: Regime ──
     def compute_regime(self, stock: dict, prev_regime: RegimeState = None) -> RegimeState:
         # Stationary feature mapping
         standardized_stock = SignalSpace.standardize(stock, self.universe_stats)
         r = FuzzyRegime.compute(standardized_stock, self.universe_stats, prev_regime)
-        self.regime_states.append(r)
-        self._transition_history.append(r.transition_risk)
+        if self._cycle_open:
+            self.regime_states.append(r)
+            self._regime_entropy += r.entropy
+            self._transition_risk += r.transition_risk
+            self._regime_count += 1
         return r
 
+    def compute_regimes(self, rows: Sequence[dict],
+                        prev_regimes: Sequence[Optional[RegimeState]] = None) -> RegimeBatch:
+        """`compute_regime` for a universe of rows in one vectorized pass."""
+        rb = FuzzyRegime.compute_batch(FuzzyRegime.features(rows), self.universe_stats, prev_regimes)
+        if self._cycle_open and len(rb):
+            self.regime_states.extend(rb.states())
+            self._regime_entropy += float(np.sum(rb.entropy))
+            self._transition_risk += float(np.sum(rb.transition_risk))
+            self._regime_count += len(rb)
+        return rb
+
     # ── Phase 3: Viability ──
     def compute_viability(self, sname: str, regime: RegimeState, dte: int) -> float:
         return AdaptiveGating.compute_viability(sname, regime, dte)
 
+    def compute_viability_batch(self, names: Sequence[str], regimes, dte: int) -> np.ndarray:
+        """N × len(names) viability matrix for a `RegimeBatch` (or `RegimeState`s)."""
+        return AdaptiveGating.compute_viability_batch(names, RegimeBatch.from_states(regimes), dte)
+
     # ── Phase 4: Triage ──
     def should_mc(self, bsm_pop: float, viability: float) -> bool:
         return ComputeTriage.should_run_mc(bsm_pop, viability)
@@ -1124,15 +2208,36 @@ class AdaptiveEngine:
         cd = ProbabilisticScoring.compute(
             pop_mean, pop_std, ev_ratio, sharpe, adjusted_viability,
             regime.entropy, model_agreement, min(sq, 1.0), regime.transition_risk)
-        self.conviction_dists.append(cd)
+        if self._cycle_open:
+            self._conviction_entropy += cd.entropy
+            self._conviction_count += 1
         return cd
 
     # ── Phase 7: Kelly ──
+    def score_batch(self, pop_mean, pop_std, ev_ratio, sharpe, viability,
+                    regime_entropy, transition_risk, model_agreement,
+                    cost_penalty=1.0) -> Dict[str, np.ndarray]:
+        """`score` for a batch of candidates: per-candidate regime entropy and
+        transition risk arrays, cost penalty from `CostScrub.calculate_batch`."""
+        sq = np.mean(self.universe_stats.get('signal_weights', [0.1])) * 10 \
+            if self.universe_stats.get('valid') else 0.5
+        cols = ProbabilisticScoring.compute_batch(
+            pop_mean, pop_std, ev_ratio, sharpe, viability * cost_penalty,
+            regime_entropy, model_agreement, min(sq, 1.0), transition_risk)
+        if self._cycle_open:
+            self._conviction_entropy += float(np.sum(cols['entropy']))
+            self._conviction_count += len(cols['entropy'])
+        return cols
+
+    def kelly_batch(self, pop_mean, pop_std, max_profit, max_loss, mc_ev, mc_std):
+        """`kelly` for a batch: one risk budget from the system state after scoring it."""
+        rb = self.risk_budget()
+        dm = MetaIntelligence.drawdown_multiplier(list(self._recent_accuracy)[-10:])
+        return AdaptiveKelly.compute_batch(pop_mean, pop_std, max_profit, max_loss, mc_ev, mc_std, rb, dm)
+
     def kelly(self, pop_mean, pop_std, max_profit, max_loss, mc_ev, mc_std):
-        se = self.system_entropy()
-        at = np.mean(self._transition_history[-20:]) if self._transition_history else 0.3
-        rb = EntropyGovernor.risk_budget(se, at)
-        dm = MetaIntelligence.drawdown_multiplier(self._recent_accuracy)
+        rb = self.risk_budget()
+        dm = MetaIntelligence.drawdown_multiplier(list(self._recent_accuracy)[-10:])
         return AdaptiveKelly.compute(pop_mean, pop_std, max_profit, max_loss, mc_ev, mc_std, rb, dm)
 
     # ── Phase 8: Diversify ──
@@ -1141,7 +2246,13 @@ class AdaptiveEngine:
 
     # ── Phase 9: Govern ──
     def system_entropy(self) -> float:
-        return EntropyGovernor.system_entropy(self.regime_states, self.conviction_dists)
+        if not self._regime_count: return 0.5
+        c_ent = self._conviction_entropy / self._conviction_count if self._conviction_count else 0.5
+        return EntropyGovernor.blend(self._regime_entropy / self._regime_count, c_ent)
+
+    def risk_budget(self) -> float:
+        at = self._transition_risk / self._regime_count if self._regime_count else 0.3
+        return EntropyGovernor.risk_budget(self.system_entropy(), at)
 
     def confidence_threshold(self) -> float:
         return EntropyGovernor.confidence_threshold(self.system_entropy())
@@ -1154,10 +2265,10 @@ class AdaptiveEngine:
         return MetaIntelligence.reflexivity_penalty(strategy_counts, direction_counts)
 
     def edge_health(self):
-        return MetaIntelligence.edge_health(self._historical_ic)
+        return MetaIntelligence.edge_health(list(self._historical_ic))
 
     def adaptation_speed(self):
-        return MetaIntelligence.adaptation_speed(self._transition_history)
+        return MetaIntelligence.adaptation_speed(list(self._transition_history)[-10:])
 
     def thompson_sample(self, dists):
         return MetaIntelligence.thompson_sample(dists)
@@ -1174,18 +2285,26 @@ class AdaptiveEngine:
     # ── Bookkeeping ──
     def record_outcome(self, conviction, realized_pnl_positive: bool):
         """Called after expiry to track prediction quality."""
-        self._recent_accuracy.append(realized_pnl_positive)
-        # Keep only last 50
-        if len(self._recent_accuracy) > 50:
-            self._recent_accuracy = self._recent_accuracy[-50:]
+        self._recent_accuracy.append(bool(realized_pnl_positive))
 
     def record_ic(self, ic_value: float):
         """Record rolling information coefficient."""
         self._historical_ic.append(ic_value)
-        if len(self._historical_ic) > 100:
-            self._historical_ic = self._historical_ic[-100:]
 
-    def reset_cycle(self):
-        """Reset per-analysis-run state (keep historical data)."""
-        self.regime_states = []
-        self.conviction_dists = []
+    def begin_cycle(self):
+        """Open a scan cycle: clear per-cycle state (keep historical data)."""
+        self.cycle += 1
+        self._cycle_open = True
+        self.regime_states = deque(maxlen=self.CYCLE_REGIMES)
+        self._regime_entropy, self._transition_risk, self._regime_count = 0.0, 0.0, 0
+        self._conviction_entropy, self._conviction_count = 0.0, 0
+
+    def end_cycle(self):
+        """Close the cycle: later regimes and scores are not recorded, and the
+        governance reads (entropy, risk budget, thresholds) stay the cycle's.
+        The cycle's mean transition risk joins the cross-cycle history."""
+        if self._cycle_open and self._regime_count:
+            self._transition_history.append(self._transition_risk / self._regime_count)
+        self._cycle_open = False
+
+    reset_cycle = begin_cycle
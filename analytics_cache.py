@@ -0,0 +1,158 @@
+"""
+    ╔══════════════════════════════════════════════════════════════════════════╗
+    ║  VAAYDO — Content-Addressed Analytics Cache v1.0                       ║
+    ║  Per-symbol rows keyed on inputs, code version and parameters          ║
+    ║  Hemrek Capital                                                        ║
+    ╚══════════════════════════════════════════════════════════════════════════╝
+
+An analytics row is a pure function of (symbol, its bars, analytics code,
+parameters). The key is a digest of exactly those, so:
+  • no new bar (nights, weekends, holidays) → every symbol hits
+  • an intraday partial bar moves → only that symbol recomputes
+  • a dividend/split re-adjustment rewrites history → that symbol recomputes
+  • the analytics code changes → every key changes, nothing stale is served
+
+Only rows the analytics actually consume are hashed (bars with a close).
+"""
+
+import hashlib
+import inspect
+import json
+import numpy as np
+import pandas as pd
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+OHLCV_FIELDS = ('Open', 'High', 'Low', 'Close', 'Volume')
+ROW_TTL = 14 * 86400           # content keys never go stale; TTL only bounds disk use
+WINDOW_SLACK_DAYS = 14         # extra history synced so an anchored window is always full
+_NO_ROW = {}                   # cached "too little history" result
+
+
+def code_digest(*objs) -> str:
+    """Digest of the source of modules/functions that produce a row."""
+    h = hashlib.blake2b(digest_size=8)
+    for obj in objs:
+        try:
+            h.update(inspect.getsource(obj).encode())
+        except (OSError, TypeError):
+            h.update(repr(obj).encode())
+    return h.hexdigest()
+
+def input_fingerprints(raw: pd.DataFrame, symbols_ns: List[str], salt: str,
+                       per_symbol: Optional[Dict[str, object]] = None) -> Dict[str, str]:
+    """Symbol → digest of its close-bearing bars in a `group_by='ticker'` frame.
+
+    `salt` carries code version and global parameters; `per_symbol` adds
+    symbol-specific parameters (e.g. lot size). Symbols absent from `raw`
+    get no key.
+    """
+    per_symbol = per_symbol or {}
+    if not isinstance(raw.columns, pd.MultiIndex) or raw.empty:
+        return {}
+    dates = pd.DatetimeIndex(raw.index).normalize().values.astype('datetime64[D]').astype(np.int64)
+    block = raw.to_numpy(dtype=np.float64)
+    position = {c: i for i, c in enumerate(raw.columns.tolist())}
+    keys = {}
+    for sym in symbols_ns:
+        idx = [position.get((sym, f), -1) for f in OHLCV_FIELDS]
+        if min(idx) < 0:
+            continue
+        x = block[:, idx]
+        keep = ~np.isnan(x[:, 3])
+        h = hashlib.blake2b(digest_size=16)
+        h.update(salt.encode())
+        h.update(sym.encode())
+        h.update(repr(per_symbol.get(sym)).encode())
+        h.update(dates[keep].tobytes())
+        h.update(np.ascontiguousarray(x[keep]).tobytes())
+        keys[sym] = h.hexdigest()
+    return keys
+
+def frame_digest(df: pd.DataFrame, salt: str = "") -> str:
+    """Digest of a whole frame (labels and values), e.g. an analytics snapshot."""
+    h = hashlib.blake2b(digest_size=16)
+    h.update(salt.encode())
+    h.update(repr(df.columns.tolist()).encode())
+    try:
+        h.update(pd.util.hash_pandas_object(df, index=True).values.tobytes())
+    except TypeError:
+        # Unhashable cells (lists/dicts) hash by their repr
+        h.update(pd.util.hash_pandas_object(df.astype(str), index=True).values.tobytes())
+    return h.hexdigest()
+
+
+@dataclass
+class CacheCounters:
+    """Refresh- and symbol-level outcomes, persisted alongside the rows."""
+    hit: int = 0               # every symbol served from cache
+    partial: int = 0           # some symbols recomputed
+    miss: int = 0              # every symbol recomputed
+    symbols_hit: int = 0
+    symbols_miss: int = 0
+
+    def record(self, n_hit: int, n_miss: int):
+        self.symbols_hit += n_hit
+        self.symbols_miss += n_miss
+        if n_miss == 0:
+            self.hit += 1
+        elif n_hit == 0:
+            self.miss += 1
+        else:
+            self.partial += 1
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.symbols_hit + self.symbols_miss
+        return self.symbols_hit / total if total else 0.0
+
+    def summary(self) -> str:
+        return (f"cache {self.hit} hit · {self.partial} partial · {self.miss} miss "
+                f"({self.hit_rate:.0%} of symbols)")
+
+class RowCache:
+    """Per-symbol analytics rows in a diskcache namespace, addressed by content."""
+
+    def __init__(self, cache, prefix: str, ttl: int = ROW_TTL):
+        self.cache = cache
+        self.prefix = prefix
+        self.ttl = ttl
+        self.counters = cache.get(f"{prefix}__counters") or CacheCounters()
+
+    def lookup(self, keys: Dict[str, str]) -> Tuple[Dict[str, Dict], List[str]]:
+        """(symbol → cached row, symbols to recompute). Counts the outcome."""
+        rows, stale = {}, []
+        for sym, key in keys.items():
+            row = self.cache.get(f"{self.prefix}_{key}")
+            if row is None:
+                stale.append(sym)
+            else:
+                rows[sym] = row
+        self.counters.record(len(rows), len(stale))
+        self.cache.set(f"{self.prefix}__counters", self.counters)
+        return rows, stale
+
+    def store(self, keys: Dict[str, str], rows: Dict[str, Optional[Dict]]):
+        """Cache fresh rows; symbols that produced no row are cached as such."""
+        for sym, row in rows.items():
+            if sym in keys:
+                self.cache.set(f"{self.prefix}_{keys[sym]}", row if row else _NO_ROW, expire=self.ttl)
+
+    @staticmethod
+    def present(rows: Dict[str, Dict], symbols_ns: List[str]) -> List[Dict]:
+        """Rows in universe order, dropping cached no-row markers."""
+        return [rows[s] for s in symbols_ns if rows.get(s)]
+
+def anchored_window(raw: pd.DataFrame, days: int) -> pd.DataFrame:
+    """Last `days` calendar days ending at the newest bar, not at wall-clock now.
+
+    A window anchored on `now` slides overnight and changes every key; one
+    anchored on the data only moves when a new bar arrives.
+    """
+    if raw.empty:
+        return raw
+    return raw.loc[raw.index >= raw.index.max() - pd.Timedelta(days=days)]
+
+def params_salt(version: str, code: str, **params) -> str:
+    """Global part of every key: release, analytics source digest, parameters."""
+    return f"{version}|{code}|{json.dumps(params, sort_keys=True, default=str)}"
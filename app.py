@@ -44,15 +44,30 @@ import os
 import hashlib
 from datetime import datetime, timedelta, date
 from concurrent.futures import ThreadPoolExecutor, as_completed
-from joblib import Parallel, delayed
 import diskcache
 from scipy.stats import norm
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from enum import Enum
-from typing import List, Dict, Tuple, Optional
+from typing import List, Dict, Tuple, Optional, Callable
+from collections.abc import Mapping
 from adaptive_engine import (
     AdaptiveEngine, STRATEGY_STRUCTURE, AdaptiveGating, 
-    FuzzyRegime, SignalSpace, Greeks, BSM, MC, CostScrub
+    FuzzyRegime, SignalSpace, Greeks, BSM, MC, RegimeStore
+)
+import adaptive_engine
+import strategy_batch
+import strategy_specs
+import panel_analytics
+from panel_analytics import (
+    panel_from_download, compute_panel_analytics, IndicatorState, fit_garch_panel
+)
+from ohlcv_store import OHLCVStore, SYNC_LEASE
+from vol_surface import SurfaceStore, SURFACE_LEASE
+from strategy_batch import UniverseBatch, score_universe
+from strategy_specs import STRATEGY_SPECS
+from analytics_cache import (
+    RowCache, input_fingerprints, params_salt, code_digest, anchored_window, frame_digest,
+    WINDOW_SLACK_DAYS
 )
 from datetime import datetime, timedelta, date
 import requests
@@ -92,6 +107,16 @@ _engine = None
 # § Persistence Layer: DiskCache
 cache_dir = os.path.join(os.path.expanduser("~"), ".vaaydo_cache")
 app_cache = diskcache.Cache(cache_dir)
+# § Persistence Layer: per-symbol Parquet history, delta-synced
+ohlcv_store = OHLCVStore(os.path.join(cache_dir, "ohlcv"))
+# § Persistence Layer: per-symbol analytics rows, keyed on bars + code + params
+yf_rows = RowCache(app_cache, "yf_row")
+YF_ANALYTICS_CODE = code_digest(panel_analytics)
+# § Persistence Layer: per-symbol SVI/SSVI surfaces, refit by the NseKit chain sweep
+vol_surfaces = SurfaceStore(app_cache)
+# § Persistence Layer: each symbol's last regime, for per-symbol temporal stickiness
+regime_store = RegimeStore(app_cache)
+SCAN_ENGINE_CODE = code_digest(adaptive_engine, strategy_batch, strategy_specs)
 
 # ═══════════════════════════════════════════════════════════════════════════════
 # DESIGN SYSTEM
@@ -294,7 +319,10 @@ def get_fno_symbols():
 
 @st.cache_data(ttl=300, show_spinner=False)
 def _compute_yf_analytics_single(sym_ns: str, raw: pd.DataFrame, is_multi: bool) -> Optional[Dict]:
-    """Analytics worker for yfinance fallback — parallelizable."""
+    """Per-symbol reference implementation of the yfinance analytics.
+
+    The live path runs `compute_panel_analytics` over the whole universe;
+    this worker is kept to validate the panel engine symbol by symbol."""
     try:
         sym = sym_ns.replace('.NS', '')
         if is_multi:
@@ -437,41 +465,68 @@ def _compute_yf_analytics_single(sym_ns: str, raw: pd.DataFrame, is_multi: bool)
         return None
 
 def fetch_all_data(symbols_ns: list, days_back: int = 400):
-    """Master data engine: OHLCV → all analytics — Parallel & Persistent."""
-    # 1. Cache Check
-    sym_hash = hashlib.md5("".join(sorted(symbols_ns)).encode()).hexdigest()
-    cache_key = f"yf_analytics_{sym_hash}_{datetime.now().strftime('%Y%m%d_%H')}"
-    
-    cached_df = app_cache.get(cache_key)
-    if cached_df is not None:
-        return cached_df, f"✓ Analytics loaded from cache ({len(cached_df)} symbols)"
-
-    end = datetime.now(); start = end - timedelta(days=days_back + 60)
+    """Master data engine: OHLCV → all analytics — Vectorized & Persistent."""
+    # 1. Local history + yfinance delta since each symbol's last stored bar
+    end = datetime.now(); start = end - timedelta(days=days_back + 60 + WINDOW_SLACK_DAYS)
     try:
-        raw = yf.download(symbols_ns, start=start, end=end, progress=False, auto_adjust=True, group_by='ticker', threads=True)
+        raw, sync = ohlcv_store.sync(symbols_ns, start, end, max_age=SYNC_LEASE)
     except Exception as e:
         return pd.DataFrame(), f"Download failed: {e}"
     if raw.empty:
         return pd.DataFrame(), "No data from yfinance"
+    raw = anchored_window(raw, days_back + 60)
 
     is_multi = isinstance(raw.columns, pd.MultiIndex)
-    
-    # 2. Parallel Processing via Joblib
-    results = Parallel(n_jobs=-1, backend="loky")(
-        delayed(_compute_yf_analytics_single)(sym_ns, raw, is_multi)
-        for sym_ns in symbols_ns
-    )
-    results = [r for r in results if r is not None]
 
+    # 2. Content-addressed rows: only symbols whose bars, lot size or the
+    #    analytics code changed are recomputed
+    salt = params_salt(VERSION, YF_ANALYTICS_CODE, days_back=days_back)
+    keys = input_fingerprints(raw, symbols_ns, salt,
+                              per_symbol={s: LOT_SIZES.get(s.replace('.NS', '')) for s in symbols_ns})
+    rows, stale = yf_rows.lookup(keys) if is_multi else ({}, list(symbols_ns))
+
+    # 3. Indicator state folds in only the new bars; full panel pass otherwise.
+    #    GARCH(1,1) is refit per new bar, warm-started from the last fit.
+    mode = "cached"
+    garch = None
+    if stale:
+        sym_hash = hashlib.md5("".join(sorted(symbols_ns)).encode()).hexdigest()
+        state_key = f"yf_state_{sym_hash}"
+        warm = app_cache.get("yf_garch_params") or {}
+        state = app_cache.get(state_key)
+        if state is not None and state.advance(raw):
+            refit = state.garch_stale(stale)
+            if refit:
+                state.set_garch(fit_garch_panel(panel_from_download(raw, refit, True), warm))
+            garch = state.garch.take(stale)
+            fresh = state.snapshot(LOT_SIZES, symbols=stale)
+            mode = "incremental"
+        else:
+            panel = panel_from_download(raw, stale, is_multi)
+            garch = fit_garch_panel(panel, warm)
+            fresh = compute_panel_analytics(panel, lot_sizes=LOT_SIZES, garch=garch)
+            state = IndicatorState.from_download(raw, symbols_ns) if is_multi else None
+            mode = "full"
+            if state is not None:
+                state.set_garch(garch)
+        if state is not None:
+            app_cache.set(state_key, state)
+        app_cache.set("yf_garch_params", {**warm, **garch.params()})
+
+        by_symbol = {f"{r['Instrument']}.NS": r for r in fresh}
+        fresh = {s: by_symbol.get(s) for s in stale}
+        yf_rows.store(keys, fresh)
+        rows.update({s: r for s, r in fresh.items() if r})
+
+    results = RowCache.present(rows, symbols_ns)
     if not results:
         return pd.DataFrame(), "No valid data extracted"
-    
+
     df_final = pd.DataFrame(results)
-    
-    # 3. Persist to cache
-    app_cache.set(cache_key, df_final, expire=3600)
-    
-    return df_final, f"✓ Parallel Analytics for {len(results)} symbols via yfinance"
+    detail = f"{mode} {len(stale)}/{len(symbols_ns)} · {sync.summary()}"
+    if garch is not None:
+        detail += f" · {garch.summary()}"
+    return df_final, f"✓ Panel Analytics for {len(results)} symbols via yfinance ({detail} · {yf_rows.counters.summary()})"
 
 
 # ═══════════════════════════════════════════════════════════════════════════════
@@ -486,7 +541,7 @@ class TrendRegime(Enum):
     STRONG_UP = "STRONG UP"; UP = "UPTREND"; NEUTRAL = "NEUTRAL"
     DOWN = "DOWNTREND"; STRONG_DOWN = "STRONG DOWN"
 
-@dataclass
+@dataclass(slots=True)
 class StrategyResult:
     name: str; legs: List[Dict]; max_profit: float; max_loss: float
     breakeven_lower: float; breakeven_upper: float
@@ -499,6 +554,7 @@ class StrategyResult:
     conviction_std: float = 0.0; conviction_ci_lower: float = 0.0; conviction_ci_upper: float = 0.0
     viability: float = 0.0; model_agreement: float = 0.0; pop_std: float = 0.0
     lot_size: int = 1; mp_lot: float = 0.0
+    mc_paths: int = 0                 # Monte Carlo paths simulated; 0 = closed-form lognormal stats
 
 
 # ═══════════════════════════════════════════════════════════════════════════════
@@ -546,31 +602,11 @@ def regime_stability(ivp, rsi, garch_persist, cusum_alert):
     if cusum_alert: score -= 0.25
     return max(0.0, min(1.0, score))
 
-def regime_vol_weight(vr):
-    return {VolRegime.COMPRESSED: 0.6, VolRegime.LOW: 0.8, VolRegime.NORMAL: 1.0,
-            VolRegime.ELEVATED: 1.3, VolRegime.HIGH: 1.6, VolRegime.EXTREME: 2.0}.get(vr, 1.0)
-
 
 # ═══════════════════════════════════════════════════════════════════════════════
-# KELLY + CONVICTION + HELPERS
+# STRIKE HELPERS
 # ═══════════════════════════════════════════════════════════════════════════════
 
-def kelly(p, w, l, confidence=1.0, mc_ev=None, mc_std=None):
-    """Kelly: continuous f* = (EV/capital) / (σ/capital)² → normalized by max_loss."""
-    if mc_ev is not None and mc_std is not None and mc_std > 0.01:
-        capital = max(abs(l), abs(w), 1)
-        ev_n = mc_ev / capital
-        std_n = mc_std / capital
-        if std_n > 0.001:
-            k = ev_n / (std_n ** 2)
-        else:
-            k = 0
-        return max(0, min(k * 0.5 * max(0.5, min(confidence, 1.0)), 0.25))
-    if l <= 0 or w <= 0: return 0.0
-    b = w / abs(l)
-    k = (b * p - (1 - p)) / b
-    return max(0, min(k * 0.5 * max(0.5, min(confidence, 1.0)), 0.25))
-
 def auto_gap(price):
     """NSE actual strike intervals (2024-25 contract specs)"""
     if price <= 50: return 0.5
@@ -586,53 +622,6 @@ def auto_gap(price):
 def snap(x, g):
     return round(x / g) * g
 
-def clamp_sharpe(ev, std, max_loss=None):
-    """Sharpe ratio with optional capital normalization for cross-strategy comparison."""
-    if std < 0.01 or np.isnan(ev) or np.isnan(std): return 0.0
-    # If max_loss provided, normalize to get return-based Sharpe
-    if max_loss and max_loss > 0:
-        ev_n = ev / max_loss
-        std_n = std / max_loss
-        if std_n < 0.001: return 0.0
-        result = ev_n / std_n
-    else:
-        result = ev / std
-    return max(-5.0, min(5.0, result)) if not np.isnan(result) else 0.0
-
-def clamp_rr(nc, ml):
-    """FIX #6: Clamp risk-reward to [0, 50]"""
-    if ml <= 0: return 0.0
-    return max(0.0, min(50.0, nc / ml))
-
-def span_margin(S, iv, lot_size=1, dte=30):
-    """SPAN-like margin: scales with DTE and IV. Lower for near-expiry."""
-    # SPAN ≈ max(premium_margin, movement_margin)
-    # Movement scales with sqrt(DTE) not sqrt(30)
-    t_factor = max(dte, 1) / 365
-    sigma_move = S * iv * np.sqrt(t_factor) * 2.5  # 2.5σ move over DTE
-    base_margin = S * 0.12  # minimum 12% of spot (NSE floor)
-    return max(base_margin, sigma_move) * lot_size
-
-def ensemble_pop(pop_bsm, pop_mc):
-    """§9.2: Inverse-variance weighted fusion"""
-    w_bsm = 1.0 / (0.08**2)  # BSM RMSE ~8%
-    w_mc = 1.0 / (0.05**2)   # MC RMSE ~5%
-    result = (w_bsm * pop_bsm + w_mc * pop_mc) / (w_bsm + w_mc)
-    return result if not np.isnan(result) else 0.5
-
-def conviction_unified(ra, pop, ev_ratio, sharpe, stability, iv_norm,
-                       prem_quality=1.0, dte_fitness=1.0, cusum_penalty=1.0):
-    ev_n = max(0, min(1, (ev_ratio + 1) / 2))
-    sh_n = max(0, min(1, (sharpe + 2) / 5))
-    pq_n = max(0, min(1, prem_quality))
-    df_n = max(0, min(1, dte_fitness))
-    raw = (0.20 * ra + 0.22 * pop + 0.12 * ev_n + 0.15 * sh_n +
-           0.08 * stability + 0.08 * iv_norm + 0.08 * pq_n + 0.07 * df_n)
-    result = raw * 100 * cusum_penalty
-    return max(0, min(100, result)) if not np.isnan(result) else 30.0
-
-
-
 
 # ═══════════════════════════════════════════════════════════════════════════════
 # STRATEGY BIAS CLASSIFICATION
@@ -837,24 +826,7 @@ def get_type_tag(strategy_name):
 # L6: STRATEGY ENGINE — All 10 with real MC, full Greeks, proper payoffs
 # ═══════════════════════════════════════════════════════════════════════════════
 
-ALL_STRATS = ['Short Strangle','Short Straddle','Iron Condor','Iron Butterfly',
-              'Bull Put Spread','Bear Call Spread','Bull Call Spread','Bear Put Spread',
-              'Long Straddle','Long Strangle',
-              'Calendar Spread','Jade Lizard','Broken Wing Butterfly','Ratio Spread']
-
-# MIN_PREMIUM replaced by adaptive: engine.min_premium(price, dte)
-# Kept as fallback for when engine not available
-MIN_PREMIUM = 0.50
-
-def compute_full_greeks(S, T, r, iv, legs_spec):
-    """Compute net Greeks for any multi-leg strategy using BSM"""
-    net = Greeks()
-    for lspec in legs_spec:
-        K, otype, qty = lspec['strike'], lspec['otype'], lspec['qty']
-        g = BSM.greeks(S, K, T, r, iv, otype)
-        net = net + g.scale(qty)
-    return net
-
+ALL_STRATS = list(STRATEGY_SPECS)   # registry order
 
 def _compute_quality(net_credit, max_loss, max_profit, name, cusum):
     stype = STRATEGY_TYPE.get(name, 'HYBRID')
@@ -880,444 +852,195 @@ def _compute_quality(net_credit, max_loss, max_profit, name, cusum):
     return max(0.0, min(1.0, _pq)), max(0.5, min(1.1, _cp))
 
 
-# ── v4.0 Adaptive scoring helper ──
+# ── Strategy scoring: every structure is a spec (strategy_specs) on one leg pricer (strategy_batch) ──
 _engine = None  # Set during main() after calibration
 
-def _adaptive_tail(name, legs, mp, ml, pop_b, pop_m, ev, std, ng, iv, be_lower, be_upper,
-                   nc=0, width=0, settings=None, regime=None):
-    """Unified scoring tail using AdaptiveEngine — replaces ensemble_pop + conviction_unified + kelly."""
-    global _engine
-    dte_val = settings.get('dte', 5) if settings else 5
-    if _engine and regime:
-        # Extract strategy info for cost scrubbing
-        s_info = {
-            'net_credit': nc, 'max_profit': mp, 
-            'lot_size': legs[0].get('lot_size', 1) if legs else 1,
-            'n_legs': len(legs), 'price': be_lower # proxy for spot
-        }
-        
-        # Phase 0: Economic Gate
-        costs = CostScrub.calculate(s_info['net_credit'], s_info['max_profit'], 
-                                   s_info['lot_size'], s_info['n_legs'], s_info['price'])
-        if costs['is_hollow']:
-            if 'dropped_count' not in st.session_state: st.session_state.dropped_count = 0
-            st.session_state.dropped_count += 1
-            return None # Fail immediately if costs eat the alpha (Gate: >50% impact)
-
-        pop_mean, pop_std, agreement = _engine.fuse_pop(pop_b, pop_m)
-        viability = _engine.compute_viability(name, regime, dte_val)
-        sh = clamp_sharpe(ev, std, abs(ml) if ml else None)
-        ev_denom = max(abs(nc) if nc else abs(mp), 0.01)
-        ev_ratio = ev / ev_denom
-        cd = _engine.score(pop_mean, pop_std, ev_ratio, sh, viability, regime, agreement, strategy_info=s_info)
-        kf = _engine.kelly(pop_mean, pop_std, abs(mp), abs(ml), ev, std)
-        rs = BSM.risk_score(ng, iv, 1.0)
-        return StrategyResult(name=name, legs=legs, max_profit=mp, max_loss=ml,
-            breakeven_lower=be_lower, breakeven_upper=be_upper,
-            pop_bsm=pop_b, pop_mc=pop_m, pop_ensemble=pop_mean, expected_value=ev,
-            sharpe_ratio=sh, kelly_fraction=kf, net_greeks=ng,
-            conviction_score=cd.mean, optimal_dte=dte_val, risk_score=rs,
-            stability_score=regime.stability, width=width, net_credit=nc,
-            risk_reward=clamp_rr(nc, ml), regime_alignment=viability,
-            conviction_std=cd.std, conviction_ci_lower=cd.ci_lower,
-            conviction_ci_upper=cd.ci_upper, viability=viability,
-            model_agreement=agreement, pop_std=pop_std,
-            lot_size=s_info['lot_size'], mp_lot=mp)
-    else:
-        # Fallback to old pipeline if engine not initialized
-        pop_e = ensemble_pop(pop_b, pop_m)
-        sh = clamp_sharpe(ev, std, abs(ml) if ml else None)
-        ev_denom = max(abs(nc) if nc else abs(mp), 0.01)
-        ev_ratio = ev / ev_denom
-        kf = kelly(pop_e, abs(mp), abs(ml))
-        rs = BSM.risk_score(ng, iv, 1.0) if ng else 0
-        cs = conviction_unified(0.5, pop_e, ev_ratio, sh, 0.5, 0.5, 0.5, 0.5)
-        return StrategyResult(name=name, legs=legs, max_profit=mp, max_loss=ml,
-            breakeven_lower=be_lower, breakeven_upper=be_upper,
-            pop_bsm=pop_b, pop_mc=pop_m, pop_ensemble=pop_e, expected_value=ev,
-            sharpe_ratio=sh, kelly_fraction=kf, net_greeks=ng,
-            conviction_score=cs, optimal_dte=settings.get('dte',5) if settings else 5,
-            risk_score=rs, stability_score=0.5, width=width, net_credit=nc,
-            risk_reward=clamp_rr(nc, ml), regime_alignment=0.5,
-            lot_size=legs[0].get('lot_size', 1) if legs else 1, mp_lot=mp)
+def score_strategies(stock, settings, regime=None, names=ALL_STRATS):
+    """Score `names` for one stock → [StrategyResult] in `names` order, skipping
+    strategies that fail their spec's rules or the cost scrub.
+
+    A one-stock universe batch, so Deep Analysis and the universe scan price
+    and score candidates identically. Viability is reported, not gated: every
+    named strategy is built.
+    """
+    S, iv, ivp = stock.get('price'), stock.get('ATMIV'), stock.get('IVPercentile')
+    if any(v is None or pd.isna(v) for v in (S, iv, ivp)) or S <= 0 or iv <= 0:
+        return []
+    engine = _engine or AdaptiveEngine()
+    regime = regime or engine.compute_regime(stock)
+    tr = detect_trend(S, stock.get('ma20_daily', S), stock.get('ma50_daily', S), stock.get('rsi_daily', 50),
+                      stock.get('% change', 0), stock.get('adx', 20), stock.get('kalman_trend', 0))
+    batch = UniverseBatch.from_rows([stock], [regime], ['UP' in tr.value or tr == TrendRegime.NEUTRAL],
+                                    settings['dte'], surfaces=vol_surfaces)
+    viab = engine.compute_viability_batch(names, [regime], settings['dte'])
+    pairs = score_universe(batch, names, viab, engine, min_viability=-np.inf)
+    st.session_state.dropped_count = st.session_state.get('dropped_count', 0) + pairs.n_hollow
+    return [StrategyResult(**pairs.result_fields(i, regime.stability)) for i in range(len(pairs))]
 
 def score_strategy(name, stock, settings, iv_mult=1.0, regime=None):
-    S = stock['price']; iv = stock['ATMIV'] / 100; ivp = stock['IVPercentile']
-    # NaN guard
-    if any(np.isnan(v) for v in [S, iv, ivp] if isinstance(v, (int, float))):
-        return None
-    if S <= 0 or iv <= 0: return None
-    T = settings['dte'] / 365; r = BSM.R; g = auto_gap(S)
-    rsi = stock.get('rsi_daily', 50); adx = stock.get('adx', 20)
-    kalman_t = stock.get('kalman_trend', 0)
-    ivp = stock.get('IVPercentile', 50)
-    dte_val = settings['dte']
-    # v4.0: DTE gating now handled by adaptive viability in main loop
-    _cusum = stock.get('CUSUM_Alert', False)
-    garch_p = stock.get('GARCH_Persistence', 0.95)
-    cusum = stock.get('CUSUM_Alert', False)
-    lot = stock.get('lot_size', 1)
-    # VRP: simulate with realized vol, not IV — captures option selling edge
-    rv = stock.get('RV_Composite', iv * 100)
-    garch_v = stock.get('GARCH_Vol', iv * 100)
-    sim_vol = min(iv, max(rv, garch_v) / 100 * 1.05)  # sim_vol ≤ IV, ≥ RV
-    # v4.0: regime passed in as parameter, old detection kept for Deep Analysis tab
-    vr = detect_vol_regime(ivp)
-    tr = detect_trend(S, stock.get('ma20_daily', S), stock.get('ma50_daily', S), rsi,
-                      stock.get('% change', 0), adx, kalman_t)
-    stab = regime_stability(ivp, rsi, garch_p, cusum)
-    rvw = regime_vol_weight(vr)
-    em = S * iv * np.sqrt(max(T, 1e-6))
-    iv_norm = min(ivp / 100, 1.0)
-    min_wing = max(g, 1)  # FIX #11: minimum 1 gap width
-    _min_prem = _engine.min_premium(S, settings['dte']) if _engine else MIN_PREMIUM
-
-    # v4.0: Adaptive strike placement via delta targeting
-    def _n_gaps(fallback_mult=0.5):
-        """Get number of gaps OTM from engine or EM fallback."""
-        if _engine and regime:
-            td = _engine.target_delta(name, regime)
-            return max(1, _engine.strike_gaps(td, S, T, iv, g))
-        return max(1, round(em * fallback_mult / g)) if g > 0 else 1
+    """One strategy for one stock (`score_strategies`); None if it is not tradeable."""
+    res = score_strategies(stock, settings, regime, [name])
+    return res[0] if res else None
 
-    try:
-        if name == 'Short Strangle':
-            # Place shorts at ~0.7 EM OTM (balance premium vs safety)
-            n_otm = _n_gaps(0.7)  # v4.0: adaptive delta-based placement
-            # For short DTE with wide gaps, ensure at least 1 gap OTM
-            n_otm = max(n_otm, 1)
-            cK = snap(S + n_otm * g, g)
-            pK = snap(S - n_otm * g, g)
-            # Validate delta-based: if premium too low, move closer
-            for _ in range(3):
-                cp_test = BSM.call(S,cK,T,r,iv) + BSM.put(S,pK,T,r,iv)
-                if cp_test >= _min_prem: break
-                cK = max(cK - g, snap(S + g, g))
-                pK = min(pK + g, snap(S - g, g))
-            if cK <= S: cK = snap(S + g, g)
-            if pK >= S: pK = snap(S - g, g)
-            cp = BSM.call(S,cK,T,r,iv); pp = BSM.put(S,pK,T,r,iv)
-            nc = cp + pp
-            if nc < _min_prem: return None
-            ml = span_margin(S, iv, dte=settings['dte'])  # SPAN scales with DTE
-            legs = [{'type':'Sell Call','strike':cK,'premium':cp,'qty':1},
-                    {'type':'Sell Put','strike':pK,'premium':pp,'qty':1}]
-            pop_b = max(0, BSM.prob_otm(S,cK,T,iv,'call') + BSM.prob_otm(S,pK,T,iv,'put') - 1)
-            pop_m, ev, std = MC.analyze(S, iv, T, legs, sim_vol=sim_vol)
-            ng = compute_full_greeks(S, T, r, iv, [{'strike':cK,'otype':'call','qty':-1}, {'strike':pK,'otype':'put','qty':-1}])
-            return _adaptive_tail(name, legs, nc, ml, pop_b, pop_m, ev, std, ng, iv,
-                pK-nc, cK+nc, nc=nc, width=cK-pK, settings=settings, regime=regime)
-
-        elif name == 'Short Straddle':
-            K = snap(S, g)
-            cp = BSM.call(S,K,T,r,iv); pp = BSM.put(S,K,T,r,iv)
-            nc = cp + pp
-            if nc < _min_prem: return None
-            ml = span_margin(S, iv, dte=settings['dte'])
-            legs = [{'type':'Sell Call','strike':K,'premium':cp,'qty':1},
-                    {'type':'Sell Put','strike':K,'premium':pp,'qty':1}]
-            pop_b = max(0, BSM.prob_otm(S,K+nc,T,iv,'call') + BSM.prob_otm(S,K-nc,T,iv,'put') - 1)
-            pop_m, ev, std = MC.analyze(S, iv, T, legs, sim_vol=sim_vol)
-            ng = compute_full_greeks(S, T, r, iv, [{'strike':K,'otype':'call','qty':-1}, {'strike':K,'otype':'put','qty':-1}])
-            return _adaptive_tail(name, legs, nc, ml, pop_b, pop_m, ev, std, ng, iv,
-                K-nc, K+nc, nc=nc, width=0, settings=settings, regime=regime)
-
-        elif name == 'Iron Condor':
-            # Short strikes: ~0.6 EM OTM (tighter than strangle, wider than BPS)
-            n_short = _n_gaps(0.6)  # v4.0: adaptive
-            sc = snap(S + n_short * g, g)
-            sp = snap(S - n_short * g, g)
-            # Wings: 2 gaps beyond shorts
-            lc = sc + max(2 * g, min_wing)
-            lp = sp - max(2 * g, min_wing)
-            # Tighten if premium too low
-            for _ in range(3):
-                nc_test = (BSM.call(S,sc,T,r,iv)-BSM.call(S,lc,T,r,iv)) + (BSM.put(S,sp,T,r,iv)-BSM.put(S,lp,T,r,iv))
-                if nc_test >= _min_prem: break
-                sc = max(sc - g, snap(S + g, g))
-                sp = min(sp + g, snap(S - g, g))
-                lc = sc + max(2 * g, min_wing)
-                lp = sp - max(2 * g, min_wing)
-            nc = (BSM.call(S,sc,T,r,iv)-BSM.call(S,lc,T,r,iv)) + (BSM.put(S,sp,T,r,iv)-BSM.put(S,lp,T,r,iv))
-            if nc < _min_prem: return None
-            w_spread = lc - sc; ml = max(w_spread - nc, 1)
-            legs = [{'type':'Sell Call','strike':sc,'premium':BSM.call(S,sc,T,r,iv),'qty':1},
-                    {'type':'Buy Call','strike':lc,'premium':BSM.call(S,lc,T,r,iv),'qty':1},
-                    {'type':'Sell Put','strike':sp,'premium':BSM.put(S,sp,T,r,iv),'qty':1},
-                    {'type':'Buy Put','strike':lp,'premium':BSM.put(S,lp,T,r,iv),'qty':1}]
-            pop_b = max(0, BSM.prob_otm(S,sc,T,iv,'call') + BSM.prob_otm(S,sp,T,iv,'put') - 1)
-            pop_m, ev, std = MC.analyze(S, iv, T, legs, sim_vol=sim_vol)
-            ng = compute_full_greeks(S, T, r, iv, [{'strike':sc,'otype':'call','qty':-1}, {'strike':lc,'otype':'call','qty':1}, {'strike':sp,'otype':'put','qty':-1}, {'strike':lp,'otype':'put','qty':1}])
-            return _adaptive_tail(name, legs, nc, ml, pop_b, pop_m, ev, std, ng, iv,
-                sp-nc, sc+nc, nc=nc, width=w_spread, settings=settings, regime=regime)
-
-        elif name == 'Iron Butterfly':
-            K = snap(S, g)
-            # Wings: ~0.8 EM from ATM (wider = more credit captured)
-            n_wing = max(2, _n_gaps(0.8))  # v4.0: adaptive
-            ww = max(n_wing * g, min_wing)
-            nc = (BSM.call(S,K,T,r,iv)+BSM.put(S,K,T,r,iv)) - (BSM.call(S,K+ww,T,r,iv)+BSM.put(S,K-ww,T,r,iv))
-            if nc < _min_prem: return None
-            ml = max(ww - nc, 1)
-            legs = [{'type':'Sell Call','strike':K,'premium':BSM.call(S,K,T,r,iv),'qty':1},
-                    {'type':'Sell Put','strike':K,'premium':BSM.put(S,K,T,r,iv),'qty':1},
-                    {'type':'Buy Call','strike':K+ww,'premium':BSM.call(S,K+ww,T,r,iv),'qty':1},
-                    {'type':'Buy Put','strike':K-ww,'premium':BSM.put(S,K-ww,T,r,iv),'qty':1}]
-            pop_m, ev, std = MC.analyze(S, iv, T, legs, sim_vol=sim_vol)
-            pop_b = max(0, BSM.prob_otm(S,K+nc,T,iv,'call') + BSM.prob_otm(S,K-nc,T,iv,'put') - 1)
-            ng = compute_full_greeks(S, T, r, iv, [{'strike':K,'otype':'call','qty':-1}, {'strike':K,'otype':'put','qty':-1}, {'strike':K,'otype':'call','qty':1}, {'strike':K,'otype':'put','qty':1}])
-            return _adaptive_tail(name, legs, nc, ml, pop_b, pop_m, ev, std, ng, iv,
-                K-nc, K+nc, nc=nc, width=ww, settings=settings, regime=regime)
-
-        elif name == 'Bull Put Spread':
-            # Short put: 1 gap OTM, long put: 2 more gaps below
-            n_short = _n_gaps(0.5)  # v4.0: adaptive
-            sp_k = snap(S - n_short * g, g)
-            lp_k = sp_k - max(2 * g, min_wing)
-            # Tighten if premium too low
-            for _ in range(3):
-                nc_test = BSM.put(S,sp_k,T,r,iv) - BSM.put(S,lp_k,T,r,iv)
-                if nc_test >= _min_prem: break
-                sp_k = min(sp_k + g, snap(S - g, g))
-                lp_k = sp_k - max(2 * g, min_wing)
-            nc = BSM.put(S,sp_k,T,r,iv) - BSM.put(S,lp_k,T,r,iv)
-            if nc < _min_prem: return None
-            ml = max((sp_k - lp_k) - nc, 1)
-            legs = [{'type':'Sell Put','strike':sp_k,'premium':BSM.put(S,sp_k,T,r,iv),'qty':1},
-                    {'type':'Buy Put','strike':lp_k,'premium':BSM.put(S,lp_k,T,r,iv),'qty':1}]
-            pop_b = BSM.prob_otm(S, sp_k, T, iv, 'put')
-            pop_m, ev, std = MC.analyze(S, iv, T, legs, sim_vol=sim_vol)
-            ng = compute_full_greeks(S, T, r, iv, [{'strike':sp_k,'otype':'put','qty':-1}, {'strike':lp_k,'otype':'put','qty':1}])
-            return _adaptive_tail(name, legs, nc, ml, pop_b, pop_m, ev, std, ng, iv,
-                sp_k-nc, S*10, nc=nc, width=sp_k-lp_k, settings=settings, regime=regime)
-
-        elif name == 'Bear Call Spread':
-            n_short = _n_gaps(0.5)  # v4.0: adaptive
-            sc_k = snap(S + n_short * g, g)
-            lc_k = sc_k + max(2 * g, min_wing)
-            # Tighten if premium too low
-            for _ in range(3):
-                nc_test = BSM.call(S,sc_k,T,r,iv) - BSM.call(S,lc_k,T,r,iv)
-                if nc_test >= _min_prem: break
-                sc_k = max(sc_k - g, snap(S + g, g))
-                lc_k = sc_k + max(2 * g, min_wing)
-            nc = BSM.call(S,sc_k,T,r,iv) - BSM.call(S,lc_k,T,r,iv)
-            if nc < _min_prem: return None
-            ml = max((lc_k - sc_k) - nc, 1)
-            legs = [{'type':'Sell Call','strike':sc_k,'premium':BSM.call(S,sc_k,T,r,iv),'qty':1},
-                    {'type':'Buy Call','strike':lc_k,'premium':BSM.call(S,lc_k,T,r,iv),'qty':1}]
-            pop_b = BSM.prob_otm(S, sc_k, T, iv, 'call')
-            pop_m, ev, std = MC.analyze(S, iv, T, legs, sim_vol=sim_vol)
-            ng = compute_full_greeks(S, T, r, iv, [{'strike':sc_k,'otype':'call','qty':-1}, {'strike':lc_k,'otype':'call','qty':1}])
-            return _adaptive_tail(name, legs, nc, ml, pop_b, pop_m, ev, std, ng, iv,
-                0, sc_k+nc, nc=nc, width=lc_k-sc_k, settings=settings, regime=regime)
-
-        elif name == 'Bull Call Spread':
-            # Debit spread: buy lower call, sell higher call — bullish
-            n_long = _n_gaps(0.3)  # v4.0: adaptive
-            lc_k = snap(S - n_long * g, g)  # ITM or ATM long call
-            if lc_k >= S: lc_k = snap(S, g)
-            sc_k = lc_k + max(2 * g, min_wing)  # OTM short call
-            lc_p = BSM.call(S,lc_k,T,r,iv); sc_p = BSM.call(S,sc_k,T,r,iv)
-            nd = lc_p - sc_p  # net debit
-            nc = -nd  # for quality computation
-            if nd <= 0: return None
-            mp = (sc_k - lc_k) - nd  # max profit = width - debit
-            ml = nd  # max loss = debit paid
-            if mp < _min_prem: return None
-            legs = [{'type':'Buy Call','strike':lc_k,'premium':lc_p,'qty':1},
-                    {'type':'Sell Call','strike':sc_k,'premium':sc_p,'qty':1}]
-            pop_b = BSM.prob_otm(S, lc_k, T, iv, 'put')  # prob stock > long strike
-            pop_m, ev, std = MC.analyze(S, iv, T, [
-                {'type':'Buy Call','strike':lc_k,'premium':lc_p,'qty':1},
-                {'type':'Sell Call','strike':sc_k,'premium':sc_p,'qty':1}], sim_vol=sim_vol)
-            ng = compute_full_greeks(S, T, r, iv, [{'strike':lc_k,'otype':'call','qty':1}, {'strike':sc_k,'otype':'call','qty':-1}])
-            return _adaptive_tail(name, legs, mp, ml, pop_b, pop_m, ev, std, ng, iv,
-                lc_k+nd, sc_k, nc=0, width=sc_k-lc_k, settings=settings, regime=regime)
-
-        elif name == 'Bear Put Spread':
-            # Debit spread: buy higher put, sell lower put — bearish
-            n_long = _n_gaps(0.3)  # v4.0: adaptive
-            lp_k = snap(S + n_long * g, g)  # ITM or ATM long put
-            if lp_k <= S: lp_k = snap(S, g)
-            sp_k = lp_k - max(2 * g, min_wing)  # OTM short put
-            lp_p = BSM.put(S,lp_k,T,r,iv); sp_p = BSM.put(S,sp_k,T,r,iv)
-            nd = lp_p - sp_p  # net debit
-            nc = -nd
-            if nd <= 0: return None
-            mp = (lp_k - sp_k) - nd
-            ml = nd
-            if mp < _min_prem: return None
-            legs = [{'type':'Buy Put','strike':lp_k,'premium':lp_p,'qty':1},
-                    {'type':'Sell Put','strike':sp_k,'premium':sp_p,'qty':1}]
-            pop_b = BSM.prob_otm(S, lp_k, T, iv, 'call')  # prob stock < long strike
-            pop_m, ev, std = MC.analyze(S, iv, T, [
-                {'type':'Buy Put','strike':lp_k,'premium':lp_p,'qty':1},
-                {'type':'Sell Put','strike':sp_k,'premium':sp_p,'qty':1}], sim_vol=sim_vol)
-            ng = compute_full_greeks(S, T, r, iv, [{'strike':lp_k,'otype':'put','qty':1}, {'strike':sp_k,'otype':'put','qty':-1}])
-            return _adaptive_tail(name, legs, mp, ml, pop_b, pop_m, ev, std, ng, iv,
-                sp_k, lp_k-nd, nc=0, width=lp_k-sp_k, settings=settings, regime=regime)
-
-        elif name == 'Long Straddle':
-            # Debit: buy ATM call + put — profit on big move either direction
-            K = snap(S, g)
-            cp = BSM.call(S,K,T,r,iv); pp = BSM.put(S,K,T,r,iv)
-            nd = cp + pp  # total debit
-            nc = -nd
-            if nd <= 0: return None
-            ml = nd  # max loss = debit paid
-            mp = S * 0.5  # theoretical unlimited (cap for display)
-            legs = [{'type':'Buy Call','strike':K,'premium':cp,'qty':1},
-                    {'type':'Buy Put','strike':K,'premium':pp,'qty':1}]
-            # MC: simulate terminal PnL
-            terminal = MC.terminal_prices(S, iv, T)
-            pnl = np.maximum(terminal - K, 0) + np.maximum(K - terminal, 0) - nd
-            pop_m = float(np.mean(pnl > 0))
-            ev = float(np.mean(pnl))
-            std = float(np.std(pnl))
-            pop_b = min(1.0, (1 - BSM.prob_otm(S,K+nd,T,iv,'call')) + (1 - BSM.prob_otm(S,K-nd,T,iv,'put')))
-            ng = compute_full_greeks(S, T, r, iv, [{'strike':K,'otype':'call','qty':1}, {'strike':K,'otype':'put','qty':1}])
-            return _adaptive_tail(name, legs, mp, ml, pop_b, pop_m, ev, std, ng, iv,
-                K-nd, K+nd, nc=0, width=0, settings=settings, regime=regime)
-
-        elif name == 'Long Strangle':
-            # Debit: buy OTM call + OTM put — cheaper than straddle, needs bigger move
-            n_otm = _n_gaps(1.0)  # v4.0: adaptive
-            cK = snap(S + n_otm * g, g)
-            pK = snap(S - n_otm * g, g)
-            if cK <= S: cK = snap(S + g, g)
-            if pK >= S: pK = snap(S - g, g)
-            cp = BSM.call(S,cK,T,r,iv); pp = BSM.put(S,pK,T,r,iv)
-            nd = cp + pp
-            nc = -nd
-            if nd <= 0: return None
-            ml = nd
-            mp = S * 0.5  # theoretical unlimited
-            legs = [{'type':'Buy Call','strike':cK,'premium':cp,'qty':1},
-                    {'type':'Buy Put','strike':pK,'premium':pp,'qty':1}]
-            terminal = MC.terminal_prices(S, iv, T)
-            pnl = np.maximum(terminal - cK, 0) + np.maximum(pK - terminal, 0) - nd
-            pop_m = float(np.mean(pnl > 0))
-            ev = float(np.mean(pnl))
-            std = float(np.std(pnl))
-            pop_b = min(1.0, (1 - BSM.prob_otm(S,cK+nd,T,iv,'call')) + (1 - BSM.prob_otm(S,pK-nd,T,iv,'put')))
-            ng = compute_full_greeks(S, T, r, iv, [{'strike':cK,'otype':'call','qty':1}, {'strike':pK,'otype':'put','qty':1}])
-            return _adaptive_tail(name, legs, mp, ml, pop_b, pop_m, ev, std, ng, iv,
-                pK-nd, cK+nd, nc=0, width=0, settings=settings, regime=regime)
-
-        elif name == 'Jade Lizard':
-            nc_otm = max(2, _n_gaps(0.8))  # v4.0: adaptive
-            np_otm = _n_gaps(0.6)  # v4.0: adaptive
-            cK = snap(S + nc_otm * g, g)
-            sp_k = snap(S - np_otm * g, g)
-            lp_k = min(snap(S - (np_otm + max(2, _n_gaps(0.8))) * g, g), sp_k - min_wing)
-            cp_v = BSM.call(S,cK,T,r,iv); sp_v = BSM.put(S,sp_k,T,r,iv); lp_v = BSM.put(S,lp_k,T,r,iv)
-            nc = cp_v + sp_v - lp_v
-            if nc < _min_prem: return None
-            ml = max((sp_k - lp_k) - nc, 1)
-            legs = [{'type':'Sell Call','strike':cK,'premium':cp_v,'qty':1},
-                    {'type':'Sell Put','strike':sp_k,'premium':sp_v,'qty':1},
-                    {'type':'Buy Put','strike':lp_k,'premium':lp_v,'qty':1}]
-            pop_m, ev, std = MC.analyze(S, iv, T, legs, sim_vol=sim_vol)
-            pop_b = max(0, BSM.prob_otm(S,cK,T,iv,'call') + BSM.prob_otm(S,sp_k,T,iv,'put') - 1)
-            ng = compute_full_greeks(S, T, r, iv, [{'strike':cK,'otype':'call','qty':-1}, {'strike':sp_k,'otype':'put','qty':-1}, {'strike':lp_k,'otype':'put','qty':1}])
-            return _adaptive_tail(name, legs, nc, ml, pop_b, pop_m, ev, std, ng, iv,
-                sp_k-nc, cK+nc, nc=nc, width=sp_k-lp_k, settings=settings, regime=regime)
-
-        elif name == 'Calendar Spread':
-            K = snap(S, g)
-            # Front: sell near expiry, Back: buy further expiry
-            fT = max(T * 0.5, 1/365)
-            bT = max(T * 1.5, T + 7/365)
-            fp = BSM.call(S,K,fT,r,iv)
-            bp = BSM.call(S,K,bT,r,iv*0.95)  # back month lower IV (term structure)
-            nd = bp - fp  # net debit
-            nc = -nd
-            if nd <= 0: return None  # shouldn't happen normally
-            # Max profit ≈ when stock at K at front expiry: time value diff
-            # Approximate: front decays fully, back retains time value
-            mp = BSM.call(S, K, bT - fT, r, iv*0.95) - max(S - K, 0)
-            mp = max(mp, fp * 0.5)  # FIX #9: realistic floor
-            ml = nd  # max loss is debit paid
-            legs = [{'type':'Sell Call','strike':K,'premium':fp,'qty':1},
-                    {'type':'Buy Call','strike':K,'premium':bp,'qty':1}]
-            # For MC: at front expiry, what's the back month worth?
-            pop_b = 0.55 if vr in (VolRegime.LOW, VolRegime.COMPRESSED) else 0.45
-            # Calendar MC: simulate to front expiry, estimate back value
-            terminal = MC.terminal_prices(S, iv, fT)
-            back_values = np.array([BSM.call(st, K, bT-fT, r, iv*0.95) for st in terminal[:500]])  # subsample for speed
-            front_values = np.maximum(terminal[:500] - K, 0)
-            cal_pnl = back_values - front_values - nd
-            pop_m = float(np.mean(cal_pnl > 0))
-            ev = float(np.mean(cal_pnl))
-            std = float(np.std(cal_pnl))
-            ng = compute_full_greeks(S, T, r, iv, [{'strike':K,'otype':'call','qty':-1}, {'strike':K,'otype':'call','qty':1}])
-            return _adaptive_tail(name, legs, mp, ml, pop_b, pop_m, ev, std, ng, iv,
-                K-mp, K+mp, nc=0, width=0, settings=settings, regime=regime)
-
-        elif name == 'Broken Wing Butterfly':
-            c = snap(S, g)
-            n_lo = max(2, _n_gaps(0.9))  # v4.0: adaptive
-            n_hi = max(3, _n_gaps(1.3))  # v4.0: adaptive
-            lo = snap(S - n_lo * g, g)
-            hi = snap(S + n_hi * g, g)
-            if c - lo < min_wing: lo = c - min_wing
-            if hi - c < min_wing: hi = c + min_wing
-            # BWB: Buy 1 low, Sell 2 center, Buy 1 high (unbalanced)
-            lo_p = BSM.call(S,lo,T,r,iv); c_p = BSM.call(S,c,T,r,iv); hi_p = BSM.call(S,hi,T,r,iv)
-            nc = 2*c_p - lo_p - hi_p  # net credit (can be small or debit)
-            mp = (c - lo) + nc  # max profit at center
-            ml = max((hi - c) - nc, 1)  # max loss on upside
-            if mp < _min_prem and nc < _min_prem: return None
-            legs = [{'type':'Buy Call','strike':lo,'premium':lo_p,'qty':1},
-                    {'type':'Sell Call','strike':c,'premium':c_p,'qty':2},
-                    {'type':'Buy Call','strike':hi,'premium':hi_p,'qty':1}]
-            # Proper MC for BWB
-            terminal = MC.terminal_prices(S, iv, T)
-            bwb_pnl = (-lo_p + np.maximum(terminal - lo, 0) +
-                        2*(c_p - np.maximum(terminal - c, 0)) +
-                       -hi_p + np.maximum(terminal - hi, 0))
-            pop_m = float(np.mean(bwb_pnl > 0))
-            ev = float(np.mean(bwb_pnl))
-            std = float(np.std(bwb_pnl))
-            pop_b = 0.50
-            ng = compute_full_greeks(S, T, r, iv, [{'strike':lo,'otype':'call','qty':1}, {'strike':c,'otype':'call','qty':-1}, {'strike':hi,'otype':'call','qty':1}])
-            return _adaptive_tail(name, legs, mp, ml, pop_b, pop_m, ev, std, ng, iv,
-                lo, hi, nc=nc, width=hi-lo, settings=settings, regime=regime)
-
-        elif name == 'Ratio Spread':
-            lK = snap(S, g)
-            n_otm = max(2, _n_gaps(0.9))  # v4.0: adaptive
-            sK = max(snap(S + n_otm * g, g), lK + min_wing)
-            lp_v = BSM.call(S,lK,T,r,iv); sp_v = BSM.call(S,sK,T,r,iv)
-            nc = 2*sp_v - lp_v  # sell 2 OTM, buy 1 ATM
-            # Max profit at short strike: intrinsic of long - premium paid
-            mp = (sK - lK) + nc  # value at sK
-            ml = span_margin(S, iv) * 0.5  # unlimited risk above sK (reduced margin for partial hedge)
-            if mp < _min_prem: return None
-            legs = [{'type':'Buy Call','strike':lK,'premium':lp_v,'qty':1},
-                    {'type':'Sell Call','strike':sK,'premium':sp_v,'qty':2}]
-            # Proper MC for ratio spread
-            terminal = MC.terminal_prices(S, iv, T)
-            ratio_pnl = (-lp_v + np.maximum(terminal - lK, 0) +
-                         2*(sp_v - np.maximum(terminal - sK, 0)))
-            pop_m = float(np.mean(ratio_pnl > 0))
-            ev = float(np.mean(ratio_pnl))
-            std = float(np.std(ratio_pnl))
-            pop_b = 0.55 if 'UP' in tr.value or tr==TrendRegime.NEUTRAL else 0.40
-            ng = compute_full_greeks(S, T, r, iv, [{'strike':lK,'otype':'call','qty':1}, {'strike':sK,'otype':'call','qty':-1}])
-            return _adaptive_tail(name, legs, mp, ml, pop_b, pop_m, ev, std, ng, iv,
-                lK, 2*sK-lK+nc, nc=nc, width=sK-lK, settings=settings, regime=regime)
-
-    except Exception as _inner_ex:
-        import traceback as _tb
-        # v4.0: Log first error per run to help diagnose issues
-        if not hasattr(score_strategy, '_logged'):
-            score_strategy._logged = True
-            import sys
-            print(f"[VAAYDO] score_strategy error: {name} → {type(_inner_ex).__name__}: {_inner_ex}", file=sys.stderr)
-            _tb.print_exc(file=sys.stderr)
-        return None
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# L7: UNIVERSE SCAN — every stock × strategy, memoized on its inputs
+# ═══════════════════════════════════════════════════════════════════════════════
+
+class Trade(Mapping):
+    """One scan trade as a read-only mapping over its `TradeBook` columns and,
+    through its row position, the scanned analytics frame."""
+    __slots__ = ('book', 'i')
+
+    def __init__(self, book: 'TradeBook', i: int):
+        self.book = book; self.i = i
+
+    def __getitem__(self, k):
+        b = self.book
+        if k == '_result':
+            return b.result(self.i)
+        if k in b.cols:
+            return b.cols[k][self.i]
+        return b.frame[k][b.row[self.i]]
+
+    def __iter__(self):
+        yield from self.book.frame
+        yield from (k for k in self.book.cols if k not in self.book.frame)
+        yield '_result'
+
+    def __len__(self):
+        return len(self.book.frame) + sum(k not in self.book.frame for k in self.book.cols) + 1
+
+class TradeBook:
+    """Scan trades stored by column: one array per trade field, plus each
+    trade's row position in the scanned frame instead of a copy of that row.
+    Items are `Trade` views, so callers keep reading t['IVPercentile'],
+    t.get(...), t.items(); `_result` (the full `StrategyResult`, legs and
+    Greeks) is built only when asked for."""
+    __slots__ = ('frame', 'row', 'cols', 'result')
+
+    def __init__(self, frame: Dict[str, np.ndarray], row: np.ndarray, cols: Dict[str, np.ndarray],
+                 result: Callable[[int], 'StrategyResult']):
+        self.frame = frame; self.row = row; self.cols = cols; self.result = result
+
+    def __len__(self):
+        return len(self.row)
+
+    def __getitem__(self, i):
+        return Trade(self, range(len(self.row))[i])
+
+    def __iter__(self):
+        return (Trade(self, i) for i in range(len(self.row)))
+
+    @classmethod
+    def empty(cls):
+        return cls({}, np.zeros(0, dtype=np.int64), {}, lambda i: None)
+
+
+_SHORT_LABEL = {'Iron Condor': ('Short Iron Condor', 'Long Iron Condor'),
+                'Iron Butterfly': ('Short Iron Butterfly', 'Long Iron Butterfly')}
+_ALT_LABEL = {'Iron Condor': ('Short IC', 'Long IC'), 'Iron Butterfly': ('Short IB', 'Long IB')}
+
+def _label(name, net_credit, labels):
+    """Dynamic strategy labeling (credit/debit auto-detection)."""
+    return labels[name][0 if net_credit > 0 else 1] if name in labels else name
+
+
+@dataclass
+class UniverseScan:
+    """Best/alternate trade per stock for one analytics snapshot and DTE.
+
+    A pure function of `key` (snapshot digest, DTE, engine code, release,
+    surface epoch), so reruns from sliders, tabs or "Analyze" reuse it and
+    only the filters and views downstream run again.
+    """
+    key: str
+    trades: TradeBook
+    diag: Dict
+    dropped_count: int
+    engine: object
+    seconds: float
+    hits: int = 0
+    rankings: Dict[str, List] = field(default_factory=dict)   # Deep Analysis, per instrument
+
+def run_universe_scan(df, settings, key):
+    t0 = time.time()
+    st.session_state.dropped_count = 0
+    _diag = {'stocks': 0, 'skipped_data': 0, 'strategies_tried': 0, 'strategies_scored': 0, 'strategies_viab_skip': 0, 'stocks_with_best': 0, 'surfaces_live': 0}
+    rows, pos, trends = [], [], []
+    day = date.today().isoformat()
+    _engine.begin_cycle()
+    for p, rd in enumerate(df.to_dict('records')):
+        if pd.isna(rd.get('price')) or pd.isna(rd.get('ATMIV')) or rd['price'] <= 0 or rd['ATMIV'] <= 0:
+            _diag['skipped_data'] += 1
+            continue
+        _diag['stocks'] += 1
+        rows.append(rd); pos.append(p)
+        trends.append(detect_trend(rd['price'], rd.get('ma20_daily', rd['price']),
+            rd.get('ma50_daily', rd['price']), rd.get('rsi_daily', 50),
+            rd.get('% change', 0), rd.get('adx', 20), rd.get('kalman_trend', 0)))
+    # v4.0: Fuzzy regimes for the whole universe — each sticky to its own previous-day regime
+    symbols = [rd.get('Instrument') for rd in rows]
+    regime_batch = _engine.compute_regimes(rows, [regime_store.prev(sym, day) for sym in symbols])
+    regimes = regime_batch.states()
+    for sym, regime in zip(symbols, regimes):
+        regime_store.put(sym, day, regime)
+    regime_store.flush()
+    # v4.0: Continuous viability replaces binary gates; near-zero viability = skip (graceful)
+    viab = _engine.compute_viability_batch(ALL_STRATS, regime_batch, settings['dte'])
+    _diag['strategies_viab_skip'] = int((viab < 0.05).sum())
+    _diag['strategies_tried'] = viab.size - _diag['strategies_viab_skip']
+    # Every stock × strategy candidate built, simulated and scored as arrays;
+    # best / alternate come back as columns over the stocks that have one
+    batch = UniverseBatch.from_rows(rows, regime_batch,
+        [('UP' in tr.value or tr == TrendRegime.NEUTRAL) for tr in trends],
+        settings['dte'], surfaces=vol_surfaces)
+    _diag['surfaces_live'] = batch.surfaces.n_live if batch.surfaces is not None else 0
+    pairs = score_universe(batch, ALL_STRATS, viab, _engine)
+    st.session_state.dropped_count += pairs.n_hollow
+    _diag['strategies_scored'] = len(pairs)
+    best_i, alt_i = pairs.best_two(len(rows))
+    has = np.flatnonzero(best_i >= 0)
+    best = pairs.result_columns(best_i[has], batch.stability[has])
+    alt = pairs.result_columns(np.maximum(alt_i[has], 0), batch.stability[has])
+    alt['name'] = np.where(alt_i[has] >= 0, alt['name'], None)
+    kept, stab = pairs.take(best_i[has]), batch.stability[has]
+    result = lambda j: StrategyResult(**kept.result_fields(j, stab[j]))
+    _diag['stocks_with_best'] = len(has)
+    # Trade entries from each stock's best candidate, by column
+    frame = {c: df[c].to_numpy() for c in df.columns}
+    row = np.array(pos, dtype=np.int64)[has]
+    lot = frame['lot_size'][row].astype(np.float64) if 'lot_size' in frame else np.ones(len(row))
+    names = best['name']
+    sname = np.array([_label(n, nc, _SHORT_LABEL) for n, nc in zip(names, best['net_credit'])], dtype=object)
+    mp_lot = np.round(best['max_profit'] * lot, 2); ml_lot = np.round(best['max_loss'] * lot, 2)
+    ivp = frame['IVPercentile'][row] if 'IVPercentile' in frame else np.full(len(row), 50.0)
+    cols = {
+        'strategy': sname, 'conviction_score': best['conviction_score'],
+        'pop': best['pop_ensemble'], 'ev': best['expected_value'], 'sharpe': best['sharpe_ratio'],
+        'kelly_frac': best['kelly_fraction'], 'net_credit': best['net_credit'],
+        'max_profit': best['max_profit'], 'max_loss': best['max_loss'],
+        'risk_score': best['risk_score'], 'stability': best['stability_score'],
+        'vol_regime': np.array([detect_vol_regime(v).value for v in ivp], dtype=object),
+        'trend_regime': np.array([trends[i].value for i in has], dtype=object),
+        'mp_lot': mp_lot, 'ml_lot': ml_lot, 'ev_lot': best['expected_value'] * lot,
+        'nc_lot': best['net_credit'] * lot, 'theta_day': best['net_greeks'][:, 2] * lot,
+        'rom_pct': mp_lot / np.maximum(ml_lot, 1) * 100,
+        'alt_strategy': np.array([_label(n, nc, _ALT_LABEL) if n else None
+                                  for n, nc in zip(alt['name'], alt['net_credit'])], dtype=object),
+        'alt_conviction': np.where([n is not None for n in alt['name']], alt['conviction_score'], 0),
+        'bias': np.array([get_bias(s) for s in sname], dtype=object),
+        'stype': np.array([STRATEGY_TYPE.get(n, 'HYBRID') for n in names], dtype=object),
+        'conviction_std': best['conviction_std'],
+        'conviction_ci_lower': best['conviction_ci_lower'], 'conviction_ci_upper': best['conviction_ci_upper'],
+        'viability': best['viability'], 'model_agreement': best['model_agreement'], 'pop_std': best['pop_std'],
+        'direction': np.array([STRATEGY_STRUCTURE.get(n, {}).get('direction', 'NEUTRAL') for n in names], dtype=object),
+        'price': frame['price'][row],
+    }
+    _engine.end_cycle()
+    return UniverseScan(key=key, trades=TradeBook(frame, row, cols, result), diag=_diag,
+                        dropped_count=st.session_state.get('dropped_count', 0),
+                        engine=_engine, seconds=time.time() - t0)
 
 
 # ═══════════════════════════════════════════════════════════════════════════════
@@ -1499,16 +1222,20 @@ def ui_deep_analysis(filtered, df, settings):
         st.markdown('<div class="divider"></div>', unsafe_allow_html=True)
         st.markdown("<span style='font-weight:700;color:#EAEAEA;'>Strategy Rankings</span><span style='color:#888;margin-left:0.75rem;font-size:0.85rem;'>All 14 strategies · Adaptive scoring · Full Greeks</span>", unsafe_allow_html=True)
 
-        # v4.0: compute regime for this stock
-        _da_regime = _engine.compute_regime(row) if _engine else None
-        strats = []
-        for sn in ALL_STRATS:
+        # All-strategy ranking for this stock, memoized on the universe scan it belongs to
+        scan = st.session_state.get('_universe_scan')
+        strats = scan.rankings.get(sel) if scan is not None else None
+        if strats is None:
+            # v4.0: compute regime for this stock
+            _da_regime = _engine.compute_regime(row, prev_regime=regime_store.prev(sel, date.today().isoformat())) \
+                if _engine else None
             try:
-                res = score_strategy(sn, row, settings, regime=_da_regime)
-                if res: strats.append(res)
+                strats = score_strategies(row, settings, regime=_da_regime)
             except Exception:
-                continue
-        strats.sort(key=lambda x: x.conviction_score, reverse=True)
+                strats = []
+            strats.sort(key=lambda x: x.conviction_score, reverse=True)
+            if scan is not None:
+                scan.rankings[sel] = strats
 
         for rank, s in enumerate(strats[:5], 1):
             cv = s.conviction_score
@@ -1527,7 +1254,7 @@ def ui_deep_analysis(filtered, df, settings):
                     st.plotly_chart(gauge(cv), width='stretch', key=f'gauge_{s.name}_{rank}')
                     st.markdown(f"""<div class='ib'><h4>Analytics</h4><p>
                         <strong>POP (BSM):</strong> <span class='mono tg'>{s.pop_bsm*100:.1f}%</span><br>
-                        <strong>POP (MC):</strong> <span class='mono tg'>{s.pop_mc*100:.1f}%</span><br>
+                        <strong>POP (MC):</strong> <span class='mono tg'>{s.pop_mc*100:.1f}%</span> <span style='color:#888;font-size:0.8rem;'>{f'{s.mc_paths:,} paths' if s.mc_paths else 'closed form'}</span><br>
                         <strong>POP (Ensemble):</strong> <span class='mono tg'>{s.pop_ensemble*100:.1f}%</span><br>
                         <strong>EV:</strong> <span class='mono {"tg" if s.expected_value>0 else "tr"}'>{fmt(s.expected_value)}</span><br>
                         <strong>Max Profit:</strong> <span class='mono tg'>{fmt(s.max_profit)}</span><br>
@@ -1712,7 +1439,7 @@ def main():
                                      index=0, key="data_source", horizontal=True)
             if _data_source == "NseKit (Live+Scan)":
                 if 'nse_pipeline' not in st.session_state:
-                    st.session_state.nse_pipeline = NsekitDataPipeline()
+                    st.session_state.nse_pipeline = NsekitDataPipeline(surfaces=vol_surfaces)
                     st.session_state.nse_pipeline.initialize()
                 
                 pipeline = st.session_state.nse_pipeline
@@ -1767,6 +1494,17 @@ def main():
                 'ts': time.time()
             }
             _data_source_label = "NseKit"
+        # Skew-consistent pricing: every SURFACE_LEASE, refit the surfaces that have
+        # aged out, warm from the cached fit, into the store the scan prices from
+        # (and keys on the epoch of). Symbols with no usable chain wait a lease too.
+        _stale = []
+        if time.time() - st.session_state.get('_surface_sweep_ts', 0) > SURFACE_LEASE:
+            _stale = vol_surfaces.stale(symbols)
+            st.session_state['_surface_sweep_ts'] = time.time()
+        if _stale:
+            with st.spinner(f"Refitting volatility surfaces for {len(_stale)} securities..."):
+                _fitted = npipe.refresh_vol_surfaces(_stale, max_age=None)
+            st.toast(f"📐 Vol surfaces: {len(_fitted)}/{len(_stale)} refit", icon="✅")
     else:
         # Fallback: yfinance
         with st.spinner("Fetching F&O universe..."):
@@ -1784,99 +1522,31 @@ def main():
         return
     st.toast(f"🔌 [{_data_source_label}] {sym_status} → {data_status}", icon="✅")
 
-    # ── v4.0 ADAPTIVE ENGINE INITIALIZATION ──
+    # ── v4.0 ADAPTIVE ENGINE INITIALIZATION + UNIVERSE SCAN ──
+    # Memoized per session on its inputs: slider, tab and "Analyze" reruns reuse the
+    # calibrated engine and the scored trades; only the filters and views below rerun
     global _engine
-    if _engine is None:
-        cal_placeholder = st.empty()
-        cal_placeholder.markdown("<div class='mc info'>Calibrating adaptive intelligence engine...</div>", unsafe_allow_html=True)
-        _engine = AdaptiveEngine()
-        _engine.calibrate(df)
-        cal_placeholder.empty()
-    
-    _sys_entropy = _engine.system_entropy() if _engine else 0.5
-
-    with st.spinner("Running adaptive scoring: BSM + MC + Bayesian conviction..."):
-        st.session_state.dropped_count = 0
-        all_trades = []
-        _diag = {'stocks': 0, 'skipped_data': 0, 'strategies_tried': 0, 'strategies_scored': 0, 'strategies_viab_skip': 0, 'stocks_with_best': 0, 'first_error': None}
-        score_strategy._logged = False  # reset error logging per run
-        _last_regime = None
-        for _, row in df.iterrows():
-            rd = row.to_dict()
-            if pd.isna(rd.get('price')) or pd.isna(rd.get('ATMIV')) or rd['price'] <= 0 or rd['ATMIV'] <= 0:
-                _diag['skipped_data'] += 1
-                continue
-            _diag['stocks'] += 1
-            # v4.0: Compute fuzzy regime per stock — with stickiness smoothing
-            regime = _engine.compute_regime(rd, prev_regime=_last_regime)
-            _last_regime = regime
-            best = None; alt = None
-            for sn in ALL_STRATS:
-                # v4.0: Continuous viability replaces binary gates
-                viability = _engine.compute_viability(sn, regime, settings['dte'])
-                if viability < 0.05:
-                    _diag['strategies_viab_skip'] += 1
-                    continue  # near-zero viability = skip (graceful)
-                _diag['strategies_tried'] += 1
-                try:
-                    res = score_strategy(sn, rd, settings, iv_mult=1.0, regime=regime)
-                    if res:
-                        _diag['strategies_scored'] += 1
-                        if best is None or res.conviction_score > best.conviction_score:
-                            alt = best
-                            best = res
-                        elif alt is None or res.conviction_score > alt.conviction_score:
-                            alt = res
-                except Exception as _ex:
-                    if _diag['first_error'] is None:
-                        import traceback as _tb
-                        _diag['first_error'] = f"{sn} on {rd.get('Instrument','?')}: {type(_ex).__name__}: {_ex}\n{_tb.format_exc()}"
-                    continue
-            # ── END of strategy loop ── now build trade entry from best
-            if best:
-                _diag['stocks_with_best'] += 1
-                vr = detect_vol_regime(rd.get('IVPercentile', 50))
-                tr = detect_trend(rd['price'], rd.get('ma20_daily', rd['price']),
-                    rd.get('ma50_daily', rd['price']), rd.get('rsi_daily', 50),
-                    rd.get('% change', 0), rd.get('adx', 20), rd.get('kalman_trend', 0))
-                # Dynamic strategy labeling (credit/debit auto-detection)
-                _sname = best.name
-                if _sname == 'Iron Condor':
-                    _sname = 'Short Iron Condor' if best.net_credit > 0 else 'Long Iron Condor'
-                elif _sname == 'Iron Butterfly':
-                    _sname = 'Short Iron Butterfly' if best.net_credit > 0 else 'Long Iron Butterfly'
-                _bias = get_bias(_sname)
-                _lot = rd.get('lot_size', 1)
-                _mp_lot = round(best.max_profit * _lot, 2)
-                _ml_lot = round(best.max_loss * _lot, 2)
-                _ev_lot = best.expected_value * _lot
-                _nc_lot = best.net_credit * _lot
-                _theta_day = best.net_greeks.theta * _lot if best.net_greeks else 0
-                _rom = (_mp_lot / max(_ml_lot, 1)) * 100
-                _alt_name = None; _alt_cv = 0
-                if alt:
-                    _an = alt.name
-                    if _an == 'Iron Condor': _an = 'Short IC' if alt.net_credit > 0 else 'Long IC'
-                    elif _an == 'Iron Butterfly': _an = 'Short IB' if alt.net_credit > 0 else 'Long IB'
-                    _alt_name = _an; _alt_cv = alt.conviction_score
-                all_trades.append({**rd, 'strategy': _sname, 'conviction_score': best.conviction_score,
-                    'pop': best.pop_ensemble, 'ev': best.expected_value, 'sharpe': best.sharpe_ratio,
-                    'kelly_frac': best.kelly_fraction, 'net_credit': best.net_credit,
-                    'max_profit': best.max_profit, 'max_loss': best.max_loss,
-                    'risk_score': best.risk_score, 'stability': best.stability_score,
-                    'vol_regime': vr.value, 'trend_regime': tr.value, '_result': best,
-                    'mp_lot': _mp_lot, 'ml_lot': _ml_lot, 'ev_lot': _ev_lot, 'nc_lot': _nc_lot,
-                    'theta_day': _theta_day, 'rom_pct': _rom,
-                    'alt_strategy': _alt_name, 'alt_conviction': _alt_cv,
-                    'bias': get_bias(_sname), 'stype': STRATEGY_TYPE.get(best.name, 'HYBRID'),
-                    'conviction_std': getattr(best, 'conviction_std', 0),
-                    'conviction_ci_lower': getattr(best, 'conviction_ci_lower', 0),
-                    'conviction_ci_upper': getattr(best, 'conviction_ci_upper', 0),
-                    'viability': getattr(best, 'viability', 0),
-                    'model_agreement': getattr(best, 'model_agreement', 0),
-                    'pop_std': getattr(best, 'pop_std', 0),
-                    'direction': STRATEGY_STRUCTURE.get(best.name, {}).get('direction', 'NEUTRAL'),
-                    'price': rd.get('price', 0)})
+    scan_key = params_salt(VERSION, SCAN_ENGINE_CODE, snapshot=frame_digest(df), dte=settings['dte'],
+                           surfaces=vol_surfaces.epoch())
+    scan = st.session_state.get('_universe_scan')
+    if scan is not None and scan.key == scan_key:
+        scan.hits += 1
+        _engine = scan.engine
+    else:
+        if _engine is None:
+            cal_placeholder = st.empty()
+            cal_placeholder.markdown("<div class='mc info'>Calibrating adaptive intelligence engine...</div>", unsafe_allow_html=True)
+            _engine = AdaptiveEngine()
+            _engine.calibrate(df, streaming=True)
+            cal_placeholder.empty()
+        else:
+            # New snapshot: rebuild universe stats only if it drifted from them
+            _engine.refresh(df)
+        with st.spinner("Running adaptive scoring: BSM + MC + Bayesian conviction..."):
+            scan = run_universe_scan(df, settings, scan_key)
+        st.session_state['_universe_scan'] = scan
+    st.session_state.dropped_count = scan.dropped_count
+    all_trades, _diag = scan.trades, scan.diag
 
     filtered = [t for t in all_trades if t['IVPercentile'] >= min_ivp and t['conviction_score'] >= min_cv]
     filtered.sort(key=lambda x: x['conviction_score'], reverse=True)
@@ -1887,9 +1557,10 @@ def main():
     top = _engine.diversify(filtered, 9) if _engine and len(filtered) > 9 else filtered[:9]
 
     # Diagnostic toast
-    st.toast(f"🔬 Stocks: {_diag['stocks']} | Tried: {_diag['strategies_tried']} | Scored: {_diag['strategies_scored']} | Best: {_diag['stocks_with_best']} | Trades: {len(all_trades)} | Filtered: {len(filtered)}", icon="📊")
-    if _diag['first_error']:
-        st.warning(f"First scoring error:\n```\n{_diag['first_error'][:500]}\n```")
+    _scan_src = f"cached ×{scan.hits}" if scan.hits else f"{scan.seconds:.1f}s"
+    _cal = _engine.calibration
+    _cal_age = f"{int(_cal.age() // 60)}m{int(_cal.age() % 60):02d}s"
+    st.toast(f"🔬 Stocks: {_diag['stocks']} | Tried: {_diag['strategies_tried']} | Scored: {_diag['strategies_scored']} | Best: {_diag['stocks_with_best']} | Trades: {len(all_trades)} | Filtered: {len(filtered)} | Scan: {_scan_src} | Surfaces: {_diag['surfaces_live']} | Calib: {_cal_age} ago, {_cal.ms:.0f} ms, drift {_cal.drift:.2f}", icon="📊")
 
     # ── METRICS BAR ──
     avg_iv = df['IVPercentile'].mean(); avg_pcr = df['PCR'].mean()
@@ -2007,12 +1678,10 @@ def main():
             st.plotly_chart(fig2, width='stretch', key='mc_paths')
             lg = auto_gap(lS)
             strikes = [snap(lS + i * lg, lg) for i in range(-3, 4)]
-            gdata = []
-            for K in strikes:
-                cg = BSM.greeks(lS, K, lT, BSM.R, liv, 'call'); pg = BSM.greeks(lS, K, lT, BSM.R, liv, 'put')
-                gdata.append({'Strike': fmt(K), 'C.Δ': f"{cg.delta:.3f}", 'P.Δ': f"{pg.delta:.3f}", 'Γ': f"{cg.gamma:.5f}",
-                             'C.Θ': f"{cg.theta:.2f}", 'P.Θ': f"{pg.theta:.2f}", 'ν': f"{cg.vega:.2f}",
-                             'Vanna': f"{cg.vanna:.4f}", 'Volga': f"{cg.volga:.4f}"})
+            cg = BSM.greeks(lS, np.array(strikes), lT, BSM.R, liv, 'call'); pg = BSM.greeks(lS, np.array(strikes), lT, BSM.R, liv, 'put')
+            gdata = [{'Strike': fmt(K), 'C.Δ': f"{cg.delta[i]:.3f}", 'P.Δ': f"{pg.delta[i]:.3f}", 'Γ': f"{cg.gamma[i]:.5f}",
+                      'C.Θ': f"{cg.theta[i]:.2f}", 'P.Θ': f"{pg.theta[i]:.2f}", 'ν': f"{cg.vega[i]:.2f}",
+                      'Vanna': f"{cg.vanna[i]:.4f}", 'Volga': f"{cg.volga[i]:.4f}"} for i, K in enumerate(strikes)]
             st.dataframe(pd.DataFrame(gdata), width='stretch', hide_index=True)
 
     # ═══════════════════════════════════════════════════════════════════
@@ -2074,7 +1743,7 @@ def main():
                         rets = df_audit['% change'].values if '% change' in df_audit.columns else np.random.normal(0, 0.01, len(df_audit))
                         runner.run_risk_governance(returns=rets, score_fn=_score_proxy, base_data=df_audit.iloc[0].to_dict())
 
-                    # all_trades is already a list of dicts
+                    # all_trades is a TradeBook of read-only mappings
                     trade_dicts = all_trades if all_trades else []
 
                     # VI. Execution Realism
@@ -2083,7 +1752,7 @@ def main():
 
                     # VII. Robustness
                     if trade_dicts:
-                        _sample = trade_dicts[0]
+                        _sample = dict(trade_dicts[0])     # perturbation tests copy and edit it
                         runner.run_robustness(_score_proxy, _sample)
 
                     # VIII. Monitoring
@@ -0,0 +1,1009 @@
+"""
+    ╔══════════════════════════════════════════════════════════════════════════╗
+    ║  VAAYDO — Performance Benchmarks                                       ║
+    ║  Wall-clock & memory measurements for the data and scoring engines     ║
+    ║  Hemrek Capital                                                        ║
+    ╚══════════════════════════════════════════════════════════════════════════╝
+
+Run:  python benchmarks.py <name> [options]
+
+Sections:
+  §0  Harness            — synthetic universes, peak-RSS sampler
+  §1  Shared panel       — loky fan-out: pickled download vs shared memory
+  §2  Chain sweep        — sequential chain+quote vs token-bucket bulk fetcher
+  §3  Chain parse        — per-quote dataclasses vs columnar OptionChain
+  §4  IV solve           — batched safeguarded-Newton IV over a universe of quotes
+  §5  Vol surface        — SVI/SSVI fit per symbol, cold vs warm-started refit
+  §6  Scan               — stock × strategy scoring, per-stock calls vs one universe batch
+  §7  Analytic P&L       — closed-form lognormal PoP/EV/σ vs the Monte Carlo engine
+  §8  QMC sampler        — scrambled Sobol vs antithetic: error against wall time
+  §9  Fused P&L          — P&L array + three reductions vs one fused pass
+  §10 BSM ufuncs         — per-strike scalar dispatch vs broadcasting ufuncs
+  §11 Trade book         — full app scan: per-trade dicts vs the columnar TradeBook
+  §12 Engine state       — 1,000 simulated reruns against a retained-memory ceiling
+  §13 Regime batch       — per-stock FuzzyRegime/AdaptiveGating calls vs one matrix pass
+  §14 Universe sketch    — batch universe stats vs streaming, mergeable sketches
+  §15 Recalibration      — full recalibration per snapshot vs drift-gated refresh
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import threading
+import time
+import json
+import zlib
+import numpy as np
+import pandas as pd
+from typing import Dict, List
+
+try:
+    import psutil
+    PSUTIL_AVAILABLE = True
+except ImportError:
+    PSUTIL_AVAILABLE = False
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# §0  HARNESS
+# ═══════════════════════════════════════════════════════════════════════════════
+
+def synthetic_download(n_symbols: int, n_bars: int = 250, seed: int = 0) -> pd.DataFrame:
+    """yf.download(group_by='ticker')-shaped frame with ragged histories."""
+    rng = np.random.default_rng(seed)
+    idx = pd.bdate_range(end='2026-01-30', periods=n_bars)
+    cols, blocks = [], []
+    for i in range(n_symbols):
+        sym = f"SYM{i:04d}.NS"
+        r = rng.normal(0.0003, 0.018, n_bars)
+        close = 100 * np.exp(np.cumsum(r))
+        openp = close * np.exp(rng.normal(0, 0.006, n_bars))
+        high = np.maximum(openp, close) * np.exp(np.abs(rng.normal(0, 0.008, n_bars)))
+        low = np.minimum(openp, close) * np.exp(-np.abs(rng.normal(0, 0.008, n_bars)))
+        vol = rng.integers(1e5, 5e6, n_bars).astype(float)
+        block = np.column_stack([openp, high, low, close, vol])
+        block[:rng.integers(0, 40)] = np.nan              # late listings
+        blocks.append(block)
+        cols += [(sym, f) for f in ('Open', 'High', 'Low', 'Close', 'Volume')]
+    return pd.DataFrame(np.hstack(blocks), index=idx, columns=pd.MultiIndex.from_tuples(cols))
+
+class PeakRSS:
+    """Samples resident memory of this process plus all children (loky workers).
+
+    Uses PSS where the platform exposes it, so a shared block mapped by every
+    worker is counted once rather than once per process.
+    """
+
+    def __init__(self, interval: float = 0.01):
+        self.interval = interval
+        self.base = 0
+        self.peak = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    @staticmethod
+    def _resident(proc) -> int:
+        try:
+            return proc.memory_full_info().pss
+        except (AttributeError, psutil.AccessDenied):
+            return proc.memory_info().rss
+
+    def _sample(self) -> int:
+        proc = psutil.Process()
+        total = self._resident(proc)
+        for child in proc.children(recursive=True):
+            try:
+                total += self._resident(child)
+            except psutil.Error:
+                pass
+        return total
+
+    def _run(self):
+        while not self._stop.is_set():
+            self.peak = max(self.peak, self._sample())
+            time.sleep(self.interval)
+
+    def __enter__(self):
+        if PSUTIL_AVAILABLE:
+            self.base = self._sample()
+            self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        if PSUTIL_AVAILABLE:
+            self._thread.join()
+            self.peak = max(self.peak, self._sample())
+
+def _run_isolated(name: str, **kw) -> Dict:
+    """One measurement per fresh interpreter so RSS baselines don't leak."""
+    args = [sys.executable, os.path.abspath(__file__), name, '--worker']
+    for k, v in kw.items():
+        args += [f'--{k}', str(v)]
+    out = subprocess.run(args, capture_output=True, text=True, check=True).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# §1  SHARED PANEL — pickled download vs shared-memory handle
+# ═══════════════════════════════════════════════════════════════════════════════
+# `full`   — legacy app path: every task receives the whole download
+# `slice`  — legacy NseKit path: every task receives its own column slice
+# `shared` — tasks receive a PanelHandle and attach to one float64 block
+
+def _task_full(sym_ns: str, raw: pd.DataFrame):
+    from panel_analytics import panel_from_download, compute_panel_analytics
+    return compute_panel_analytics(panel_from_download(raw, [sym_ns], True))
+
+def _task_slice(sym_ns: str, df: pd.DataFrame):
+    from panel_analytics import panel_from_download, compute_panel_analytics
+    return compute_panel_analytics(panel_from_download(df, [sym_ns], False))
+
+def _task_shared(handle, syms: List[str]):
+    from panel_analytics import SharedOHLCVPanel, compute_panel_analytics
+    shared = SharedOHLCVPanel.attach(handle)
+    try:
+        panel = shared.as_panel()
+        mask = np.isin(np.array(panel.symbols, dtype=object), syms)
+        return compute_panel_analytics(panel.select(mask))
+    finally:
+        shared.close()
+
+def bench_shared_panel(n_symbols: int, mode: str, jobs: int = 4) -> Dict:
+    from joblib import Parallel, delayed
+    from panel_analytics import panel_from_download, SharedOHLCVPanel
+    raw = synthetic_download(n_symbols)
+    symbols = list(raw.columns.get_level_values(0).unique())
+    # Warm the worker pool and Numba caches outside the timed region
+    Parallel(n_jobs=jobs, backend='loky')(delayed(_task_slice)(s, raw[s]) for s in symbols[:2 * jobs])
+    with SharedOHLCVPanel.create(panel_from_download(raw, symbols[:jobs], True)) as warm:
+        Parallel(n_jobs=jobs, backend='loky')(delayed(_task_shared)(warm.handle, [s]) for s in symbols[:jobs])
+
+    with PeakRSS() as mem:
+        t0 = time.perf_counter()
+        if mode == 'full':
+            parts = Parallel(n_jobs=jobs, backend='loky')(delayed(_task_full)(s, raw) for s in symbols)
+        elif mode == 'slice':
+            parts = Parallel(n_jobs=jobs, backend='loky')(delayed(_task_slice)(s, raw[s]) for s in symbols)
+        else:
+            panel = panel_from_download(raw, symbols, True)
+            chunks = [c.tolist() for c in np.array_split(np.array(symbols, dtype=object), 32)]
+            with SharedOHLCVPanel.create(panel) as shared:
+                parts = Parallel(n_jobs=jobs, backend='loky')(
+                    delayed(_task_shared)(shared.handle, c) for c in chunks)
+        elapsed = time.perf_counter() - t0
+    rows = sum(len(p) for p in parts)
+    return {'symbols': n_symbols, 'mode': mode, 'jobs': jobs, 'rows': rows,
+            'wall_s': round(elapsed, 3), 'peak_rss_mb': round(mem.peak / 2 ** 20, 1),
+            'delta_rss_mb': round((mem.peak - mem.base) / 2 ** 20, 1)}
+
+def report_shared_panel(jobs: int, sizes=(200, 1000), modes=('full', 'slice', 'shared')):
+    print(f"{'symbols':>8} {'mode':>7} {'jobs':>5} {'wall s':>8} {'peak PSS MB':>12} {'Δ PSS MB':>9}")
+    for n in sizes:
+        for m in modes:
+            r = _run_isolated('shared_panel', symbols=n, mode=m, jobs=jobs)
+            print(f"{r['symbols']:>8} {r['mode']:>7} {r['jobs']:>5} {r['wall_s']:>8.2f} {r['peak_rss_mb']:>12.1f} {r['delta_rss_mb']:>9.1f}")
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# §2  CHAIN SWEEP — stand-in NSE server with a server-side rate limit
+# ═══════════════════════════════════════════════════════════════════════════════
+# `sequential` — legacy get_option_chain loop: chain + stock_quote per symbol,
+#                client throttled at the configured RPS
+# `bulk`       — BulkChainFetcher at the configured RPS, spot from payload
+# `overdrive`  — BulkChainFetcher at 2× the server limit: exercises 429 backoff
+
+CHAIN_RPS = 10.0               # scaled-up NSE budget so a sweep fits in seconds
+CHAIN_LATENCY = 0.15           # server think time per request
+CHAIN_NO_SPOT = 0.1            # fraction of payloads without underlyingValue
+
+def _spot(symbol: str) -> float:
+    return 100.0 + zlib.crc32(symbol.encode()) % 5000
+
+class StandInNSE:
+    """Threaded local HTTP server: /chain, /quote, /board, 429 above `rps`."""
+
+    def __init__(self, rps: float = CHAIN_RPS, latency: float = CHAIN_LATENCY):
+        from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+        from urllib.parse import urlparse, parse_qs
+        self.rps, self.latency = rps, latency
+        self.tokens, self.last = rps, time.monotonic()
+        self.lock = threading.Lock()
+        self.hits = self.throttled = 0
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *a):
+                pass
+
+            def do_GET(self):
+                url = urlparse(self.path)
+                if not server._admit():
+                    self.send_response(429)
+                    self.send_header('Retry-After', '1')
+                    self.end_headers()
+                    return
+                time.sleep(server.latency)
+                sym = parse_qs(url.query).get('symbol', [''])[0]
+                spot = _spot(sym)
+                if url.path == '/chain':
+                    side = lambda k: {'lastPrice': max(spot - k, 1.0), 'openInterest': 1000,
+                                      **({} if zlib.crc32(sym.encode()) % 100 < 100 * CHAIN_NO_SPOT
+                                         else {'underlyingValue': spot})}
+                    body = [{'strikePrice': spot + k, 'CE': side(k), 'PE': side(-k)}
+                            for k in np.linspace(-0.2 * spot, 0.2 * spot, 41)]
+                elif url.path == '/quote':
+                    body = {'lastPrice': spot}
+                else:
+                    body = {'data': [{'symbol': f'S{i:04d}', 'lastPrice': _spot(f'S{i:04d}')} for i in range(2000)]}
+                data = json.dumps(body).encode()
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+        self.httpd = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.url = f"http://127.0.0.1:{self.httpd.server_address[1]}"
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+
+    def _admit(self) -> bool:
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.rps, self.tokens + (now - self.last) * self.rps)
+            self.last = now
+            self.hits += 1
+            if self.tokens >= 1.0:
+                self.tokens -= 1.0
+                return True
+            self.throttled += 1
+            return False
+
+    def get(self, path: str, symbol: str = ''):
+        from urllib.request import urlopen
+        from urllib.error import HTTPError
+        from chain_fetcher import RateLimited
+        try:
+            with urlopen(f"{self.url}{path}?symbol={symbol}", timeout=10) as r:
+                return json.loads(r.read())
+        except HTTPError as e:
+            if e.code == 429:
+                raise RateLimited(float(e.headers.get('Retry-After', 1)))
+            raise
+
+    def close(self):
+        self.httpd.shutdown()
+
+def bench_chain_sweep(n_symbols: int, mode: str, jobs: int = 8) -> Dict:
+    from chain_fetcher import BulkChainFetcher, spot_from_payload
+    server = StandInNSE()
+    symbols = [f"S{i:04d}" for i in range(n_symbols)]
+    rank = {s: float(r) for r, s in enumerate(np.random.default_rng(1).permutation(symbols))}
+    t0 = time.perf_counter()
+    first = 0.0
+    requests = failed = 0
+    if mode == 'sequential':
+        interval, last = 1.0 / CHAIN_RPS, 0.0
+        for s in symbols:
+            for path in ('/chain', '/quote'):
+                wait = last + interval - time.perf_counter()
+                if wait > 0:
+                    time.sleep(wait)
+                last = time.perf_counter()
+                requests += 1
+                try:
+                    server.get(path, s)
+                except Exception:
+                    failed += 1
+            first = first or time.perf_counter() - t0
+        stats = None
+    else:
+        rps = CHAIN_RPS if mode == 'bulk' else 2 * CHAIN_RPS
+        board = lambda syms: {d['symbol']: d['lastPrice'] for d in server.get('/board')['data']}
+        fetcher = BulkChainFetcher(lambda s: server.get('/chain', s), rps=rps, quotes=board, workers=jobs, seed=0)
+        out = [(r.elapsed, r.ok, r.spot > 0) for r in fetcher.iter(symbols, rank)]
+        stats = fetcher.stats
+        requests, failed, first = stats.requests, stats.failed, stats.first_result_s
+        assert all(ok and spot for _, ok, spot in out), "every chain should arrive with a spot"
+    elapsed = time.perf_counter() - t0
+    server.close()
+    return {'symbols': n_symbols, 'mode': mode, 'jobs': jobs, 'wall_s': round(elapsed, 2),
+            'first_s': round(first, 2), 'requests': requests, 'failed': failed,
+            'server_429': server.throttled, 'retries': stats.retries if stats else 0}
+
+def report_chain_sweep(jobs: int, sizes=(100,), modes=('sequential', 'bulk', 'overdrive')):
+    print(f"server limit {CHAIN_RPS:.0f} rps · latency {CHAIN_LATENCY * 1000:.0f} ms")
+    print(f"{'symbols':>8} {'mode':>10} {'wall s':>8} {'1st s':>6} {'requests':>9} {'429s':>5} {'retries':>8} {'failed':>7}")
+    for n in sizes:
+        for m in modes:
+            r = _run_isolated('chain_sweep', symbols=n, mode=m, jobs=jobs)
+            print(f"{r['symbols']:>8} {r['mode']:>10} {r['wall_s']:>8.2f} {r['first_s']:>6.2f} {r['requests']:>9} "
+                  f"{r['server_429']:>5} {r['retries']:>8} {r['failed']:>7}")
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# §3  CHAIN PARSE — per-contract OptionQuote objects vs struct-of-arrays
+# ═══════════════════════════════════════════════════════════════════════════════
+# `objects`  — the pre-columnar parser: one OptionQuote per strike per side
+# `columnar` — OptionChain.from_payload
+
+def synthetic_chain_payload(n_strikes: int, spot: float = 24000.0, seed: int = 0) -> List[Dict]:
+    """NSE-shaped strike list with a few one-sided strikes at the wings."""
+    rng = np.random.default_rng(seed)
+    strikes = spot + 50.0 * (np.arange(n_strikes) - n_strikes // 2)
+    items = []
+    for j, k in enumerate(strikes):
+        item = {'strikePrice': float(k), 'expiryDate': '30-Jan-2026'}
+        for side, intrinsic in (('CE', max(spot - k, 0.0)), ('PE', max(k - spot, 0.0))):
+            if (side == 'CE' and j < 3) or (side == 'PE' and j >= n_strikes - 3):
+                continue
+            ltp = round(intrinsic + 40.0 * float(np.exp(-abs(k - spot) / 1500)) + 0.05, 2)
+            item[side] = {
+                'strikePrice': float(k), 'lastPrice': ltp, 'bidprice': round(ltp - 0.5, 2),
+                'askPrice': round(ltp + 0.5, 2), 'bidQty': int(rng.integers(1, 5000)),
+                'askQty': int(rng.integers(1, 5000)), 'totalTradedVolume': int(rng.integers(0, 10 ** 6)),
+                'openInterest': int(rng.integers(0, 10 ** 6)), 'impliedVolatility': round(float(rng.uniform(8, 30)), 2),
+                'totalBuyQuantity': int(rng.integers(0, 10 ** 5)), 'totalSellQuantity': int(rng.integers(0, 10 ** 5)),
+                'underlyingValue': spot,
+            }
+        items.append(item)
+    return items
+
+def _parse_objects(symbol: str, raw: List[Dict], expiry, spot: float):
+    from option_chain import OptionQuote
+    expiry_str = expiry.strftime('%d-%b-%Y').upper()
+    calls, puts = [], []
+    for item in raw:
+        strike = float(item['strikePrice'])
+        for otype in ['CE', 'PE']:
+            side = item.get(otype)
+            if not side: continue
+            quote = OptionQuote(
+                instrument_token=0, tradingsymbol=f"{symbol}{expiry_str}{strike}{otype}",
+                strike=strike, option_type=otype, expiry=expiry,
+                last_price=side.get('lastPrice', 0),
+                bid=side.get('bidprice', side.get('lastPrice', 0)), ask=side.get('askPrice', side.get('lastPrice', 0)),
+                bid_qty=side.get('bidQty', 0), ask_qty=side.get('askQty', 0),
+                volume=side.get('totalTradedVolume', 0), oi=side.get('openInterest', 0),
+                iv=side.get('impliedVolatility', 0), total_buy_qty=side.get('totalBuyQuantity', 0),
+                total_sell_qty=side.get('totalSellQuantity', 0), is_liquid=True)
+            if otype == 'CE': calls.append(quote)
+            else: puts.append(quote)
+    return calls, puts
+
+def bench_chain_parse(n_strikes: int, mode: str, jobs: int = 0) -> Dict:
+    import tracemalloc
+    from datetime import date
+    from option_chain import OptionChain
+    raw = synthetic_chain_payload(n_strikes)
+    expiry = date(2026, 1, 30)
+    parse = (lambda: _parse_objects('NIFTY', raw, expiry, 24000.0)) if mode == 'objects' else \
+            (lambda: OptionChain.from_payload('NIFTY', raw, expiry, 24000.0))
+    parse()
+    reps = max(5, 20000 // n_strikes)
+    best = float('inf')
+    for _ in range(5):
+        t0 = time.perf_counter()
+        for _ in range(reps):
+            parse()
+        best = min(best, (time.perf_counter() - t0) / reps)
+    tracemalloc.start()
+    held = parse()
+    retained = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del held
+    return {'symbols': n_strikes, 'mode': mode, 'parse_us': round(best * 1e6, 1), 'retained_kb': round(retained / 1024, 1)}
+
+def report_chain_parse(jobs: int, sizes=(100, 300, 1000), modes=('objects', 'columnar')):
+    print(f"{'strikes':>8} {'mode':>9} {'parse µs':>10} {'retained KB':>12}")
+    for n in sizes:
+        for m in modes:
+            r = _run_isolated('chain_parse', symbols=n, mode=m, jobs=jobs)
+            print(f"{r['symbols']:>8} {r['mode']:>9} {r['parse_us']:>10.1f} {r['retained_kb']:>12.1f}")
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# §4  IV SOLVE — implied_vol_batch on quotes priced from known σ
+# ═══════════════════════════════════════════════════════════════════════════════
+# `cold` — no seed (Brenner–Subrahmanyam start)
+# `warm` — seeded with σ·e^{N(0, 0.1)}, as the exchange IV seeds a live chain
+
+def bench_iv_solve(n_quotes: int, mode: str, jobs: int = 0) -> Dict:
+    from adaptive_engine import implied_vol_batch, bsm_price_numba, BSM
+    rng = np.random.default_rng(0)
+    S = np.full(n_quotes, 24000.0)
+    K = S * np.exp(rng.uniform(-0.25, 0.25, n_quotes))
+    T = rng.uniform(1 / 365, 1.0, n_quotes)
+    sigma = rng.uniform(0.06, 0.9, n_quotes)
+    is_call = rng.random(n_quotes) < 0.5
+    price = np.array([bsm_price_numba(S[i], K[i], T[i], BSM.R, sigma[i], is_call[i]) for i in range(n_quotes)])
+    guess = sigma * np.exp(rng.normal(0, 0.1, n_quotes)) if mode == 'warm' else np.zeros(n_quotes)
+    implied_vol_batch(price[:8], S[:8], K[:8], T[:8], BSM.R, is_call[:8], guess[:8])
+    best = float('inf')
+    for _ in range(5):
+        t0 = time.perf_counter()
+        out = implied_vol_batch(price, S, K, T, BSM.R, is_call, guess)
+        best = min(best, time.perf_counter() - t0)
+    solved = ~np.isnan(out[0])
+    informative = solved & (out[4] * 100 / S > 1e-9)      # price moves with σ at fp precision
+    return {'symbols': n_quotes, 'mode': mode, 'ms': round(best * 1000, 1), 'solved': int(solved.sum()),
+            'max_err': float(np.abs(out[0] - sigma)[informative].max()),
+            'median_iters': float(np.median(out[5][solved]))}
+
+def report_iv_solve(jobs: int, sizes=(50000,), modes=('cold', 'warm')):
+    print(f"{'quotes':>8} {'mode':>6} {'ms':>8} {'solved':>8} {'max |Δσ|':>10} {'iters':>6}")
+    for n in sizes:
+        for m in modes:
+            r = _run_isolated('iv_solve', symbols=n, mode=m, jobs=jobs)
+            print(f"{r['symbols']:>8} {r['mode']:>6} {r['ms']:>8.1f} {r['solved']:>8} {r['max_err']:>10.1e} {r['median_iters']:>6.0f}")
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# §5  VOL SURFACE — per-symbol SVI/SSVI fit on chains priced from a known SVI
+# ═══════════════════════════════════════════════════════════════════════════════
+# `cold` — every symbol fitted from scratch
+# `warm` — an intraday refit: spot +0.3%, ATM variance up, fresh quote noise,
+#          seeded by the previous snapshot's surface
+
+def synthetic_surface_chains(symbol: str, spot: float, now, shift: float = 0.0, seed: int = 0,
+                             n_strikes: int = 41, n_expiries: int = 3):
+    """Chains for `n_expiries` monthly expiries, quotes priced from a skewed SVI."""
+    from datetime import timedelta
+    from adaptive_engine import bsm_price_numba, BSM
+    from option_chain import OptionChain, solve_chains, EXPIRY_CLOSE, YEAR_SECONDS
+    from vol_surface import svi_w
+    rng = np.random.default_rng(seed)
+    chains = []
+    for j in range(n_expiries):
+        expiry = (now + timedelta(days=22 + 28 * j)).date()
+        T = (pd.Timestamp.combine(expiry, EXPIRY_CLOSE) - now).total_seconds() / YEAR_SECONDS
+        strikes = np.round(spot * np.exp(np.linspace(-0.2, 0.2, n_strikes)) / 5) * 5
+        k = np.log(strikes / (spot * np.exp(BSM.R * T)))
+        a, b, rho, m, s = 0.002 * (j + 1) + shift * 0.01, 0.036 * (1 + 0.3 * j), -0.55, 0.02, 0.12
+        vol = np.sqrt([svi_w(x, a, b, rho, m, s) / T for x in k]) * np.exp(rng.normal(0, 0.002, n_strikes))
+        raw = [{'strikePrice': float(K),
+                'CE': {'lastPrice': bsm_price_numba(spot, K, T, BSM.R, v, True), 'impliedVolatility': v * 100},
+                'PE': {'lastPrice': bsm_price_numba(spot, K, T, BSM.R, v, False), 'impliedVolatility': v * 100}}
+               for K, v in zip(strikes, vol)]
+        chains.append(OptionChain.from_payload(symbol, raw, expiry, spot))
+    solve_chains(chains, now=now)
+    return chains
+
+def bench_vol_surface(n_symbols: int, mode: str, jobs: int = 0) -> Dict:
+    from datetime import datetime
+    from vol_surface import fit_surface
+    now = datetime(2026, 1, 5, 11, 0)
+    spots = [500.0 + 10 * i for i in range(n_symbols)]
+    base = [synthetic_surface_chains(f"S{i}", spots[i], now, seed=i) for i in range(n_symbols)]
+    prev = [fit_surface(f"S{i}", base[i], now=now) for i in range(n_symbols)]
+    if mode == 'warm':
+        chains = [synthetic_surface_chains(f"S{i}", spots[i] * 1.003, now, shift=0.3, seed=10_000 + i)
+                  for i in range(n_symbols)]
+    else:
+        chains, prev = base, [None] * n_symbols
+    best = float('inf')
+    for _ in range(3):
+        t0 = time.perf_counter()
+        out = [fit_surface(f"S{i}", chains[i], prev=prev[i], now=now) for i in range(n_symbols)]
+        best = min(best, time.perf_counter() - t0)
+    return {'symbols': n_symbols, 'mode': mode, 'ms': round(best * 1000, 1),
+            'median_iters': float(np.median([s.iters for s in out])),
+            'max_rmse': float(max(s.rmse_vol.max() for s in out))}
+
+def report_vol_surface(jobs: int, sizes=(200,), modes=('cold', 'warm')):
+    print(f"{'symbols':>8} {'mode':>6} {'ms':>8} {'iters':>6} {'RMSE (vol pts)':>15}")
+    for n in sizes:
+        for m in modes:
+            r = _run_isolated('vol_surface', symbols=n, mode=m, jobs=jobs)
+            print(f"{r['symbols']:>8} {r['mode']:>6} {r['ms']:>8.1f} {r['median_iters']:>6.0f} {r['max_rmse']:>15.2f}")
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# §6  SCAN — every viable stock × strategy candidate through the batch engine
+# ═══════════════════════════════════════════════════════════════════════════════
+# 'per_stock' calls the engine once per underlying (the old loop's granularity,
+# minus its per-leg Python); 'batch' scores the whole universe in one call.
+
+def synthetic_analytics(n_symbols: int, seed: int = 0) -> pd.DataFrame:
+    """Analytics-frame rows with the columns the regime and scoring layers read."""
+    rng = np.random.default_rng(seed)
+    S = np.exp(rng.uniform(np.log(40), np.log(9000), n_symbols))
+    iv = rng.uniform(15, 70, n_symbols)
+    df = pd.DataFrame({
+        'Instrument': [f"SYM{i:04d}" for i in range(n_symbols)], 'price': S, 'ATMIV': iv,
+        'IVPercentile': rng.uniform(0, 100, n_symbols),
+        'GARCH_Vol': iv * rng.uniform(0.6, 1.1, n_symbols), 'RV_Composite': iv * rng.uniform(0.5, 1.1, n_symbols),
+        'rsi_daily': rng.uniform(20, 80, n_symbols), 'adx': rng.uniform(10, 45, n_symbols),
+        'kalman_trend': rng.normal(0, 1.2, n_symbols), 'GARCH_Persistence': rng.uniform(0.8, 0.99, n_symbols),
+        'PCR': rng.uniform(0.5, 1.5, n_symbols), 'CUSUM_Alert': rng.random(n_symbols) < 0.2,
+        'ma20_daily': S * rng.uniform(0.95, 1.05, n_symbols), 'ma50_daily': S * rng.uniform(0.9, 1.1, n_symbols),
+        'lot_size': rng.integers(100, 2000, n_symbols)})
+    df['% change'] = rng.normal(0, 2, n_symbols)
+    return df
+
+def bench_scan(n_symbols: int, mode: str, jobs: int = 0) -> Dict:
+    from adaptive_engine import AdaptiveEngine, STRATEGY_STRUCTURE
+    from strategy_batch import UniverseBatch, score_universe
+    names = list(STRATEGY_STRUCTURE)
+    df = synthetic_analytics(n_symbols)
+    engine = AdaptiveEngine(); engine.calibrate(df)
+    rows = [r.to_dict() for _, r in df.iterrows()]
+    rb = engine.compute_regimes(rows); regimes = rb.states()
+    viab = engine.compute_viability_batch(names, rb, 12)
+    u = UniverseBatch.from_rows(rows, regimes, [True] * n_symbols, dte=12)
+    score_universe(UniverseBatch.from_rows(rows[:4], regimes[:4], [True] * 4, dte=12), names, viab[:4], engine)
+    t0 = time.perf_counter()
+    if mode == 'per_stock':
+        scored = 0
+        for i in range(n_symbols):
+            ui = UniverseBatch.from_rows(rows[i:i + 1], regimes[i:i + 1], [True], dte=12)
+            scored += len(score_universe(ui, names, viab[i:i + 1], engine))
+    else:
+        scored = len(score_universe(u, names, viab, engine))
+    dt = time.perf_counter() - t0
+    return {'symbols': n_symbols, 'mode': mode, 'ms': round(dt * 1000, 1),
+            'candidates': int((viab >= 0.05).sum()), 'scored': scored,
+            'per_candidate_us': round(dt * 1e6 / max((viab >= 0.05).sum(), 1), 1)}
+
+def report_scan(jobs: int, sizes=(200, 2000), modes=('per_stock', 'batch')):
+    print(f"{'symbols':>8} {'mode':>10} {'ms':>9} {'candidates':>11} {'scored':>7} {'µs/cand':>8}")
+    for n in sizes:
+        for m in modes:
+            r = _run_isolated('scan', symbols=n, mode=m, jobs=jobs)
+            print(f"{r['symbols']:>8} {r['mode']:>10} {r['ms']:>9.1f} {r['candidates']:>11} {r['scored']:>7} {r['per_candidate_us']:>8.1f}")
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# §7  ANALYTIC P&L — closed-form lognormal statistics vs Monte Carlo
+# ═══════════════════════════════════════════════════════════════════════════════
+# Every single-expiry candidate of a synthetic scan, valued both ways; `mode`
+# picks which one is timed. z-scores use the iid standard error; antithetic
+# pairs shrink it for monotone payoffs and widen it for even ones (straddles),
+# so over thousands of candidates the extremes reach |z| ≈ 5.
+
+def bench_analytic(n_symbols: int, mode: str, jobs: int = 0) -> Dict:
+    from adaptive_engine import AdaptiveEngine, STRATEGY_STRUCTURE, BSM
+    from strategy_batch import UniverseBatch, score_universe, analytic_pairs, simulate_pairs, MC_PAIRS
+    names = list(STRATEGY_STRUCTURE)
+    df = synthetic_analytics(n_symbols)
+    engine = AdaptiveEngine(); engine.calibrate(df)
+    rows = [r.to_dict() for _, r in df.iterrows()]
+    rb = engine.compute_regimes(rows); regimes = rb.states()
+    viab = engine.compute_viability_batch(names, rb, 12)
+    pairs = score_universe(UniverseBatch.from_rows(rows, regimes, [True] * n_symbols, dte=12), names, viab, engine)
+    one = pairs.cols['mc_paths'] == 0
+    legs, n_legs = pairs.legs[one], pairs.n_legs[one]
+    S, sig, H = df['price'].to_numpy()[pairs.stock[one]], pairs.cols['sim'][one], pairs.cols['H'][one]
+    K, is_call, qty, prem = legs[:, :, 0], legs[:, :, 1] > 0, legs[:, :, 2] * legs[:, :, 3], legs[:, :, 4]
+    P = len(S)
+    zero = np.zeros((P, legs.shape[1]))
+
+    def mc():
+        return simulate_pairs(S, sig, H, BSM.R, K, is_call, qty, prem, zero, zero, n_legs,
+                              np.arange(P + 1, dtype=np.int64), np.arange(P, dtype=np.int64),
+                              np.full(P, MC_PAIRS, dtype=np.int64), MC_PAIRS, 0.0, np.zeros(P))
+
+    analytic_pairs(S[:2], sig[:2], H[:2], K[:2], is_call[:2], qty[:2], prem[:2], n_legs[:2])
+    t0 = time.perf_counter(); pop, ev, sd = analytic_pairs(S, sig, H, K, is_call, qty, prem, n_legs)
+    t_exact = time.perf_counter() - t0
+    t0 = time.perf_counter(); pop_m, ev_m, sd_m, paths = mc(); t_mc = time.perf_counter() - t0
+    N = 2 * MC_PAIRS
+    z_pop = (pop_m - pop) / np.sqrt(np.maximum(pop * (1 - pop), 1e-6) / N)
+    z_ev = (ev_m - ev) / np.maximum(sd / np.sqrt(N), 1e-12)
+    dt = t_exact if mode == 'analytic' else t_mc
+    return {'symbols': n_symbols, 'mode': mode, 'candidates': P, 'ms': round(dt * 1000, 2),
+            'per_candidate_us': round(dt * 1e6 / max(P, 1), 2),
+            'max_z_pop': float(np.abs(z_pop).max()), 'max_z_ev': float(np.abs(z_ev).max()),
+            'max_sd_rel': float(np.max(np.abs(sd_m - sd) / np.maximum(sd, 1e-12)))}
+
+def report_analytic(jobs: int, sizes=(2000,), modes=('mc', 'analytic')):
+    print(f"{'symbols':>8} {'mode':>9} {'cands':>6} {'ms':>9} {'µs/cand':>8} {'max|z| PoP':>11} {'max|z| EV':>10} {'max σ err':>10}")
+    for n in sizes:
+        for m in modes:
+            r = _run_isolated('analytic', symbols=n, mode=m, jobs=jobs)
+            print(f"{r['symbols']:>8} {r['mode']:>9} {r['candidates']:>6} {r['ms']:>9.2f} {r['per_candidate_us']:>8.2f} "
+                  f"{r['max_z_pop']:>11.2f} {r['max_z_ev']:>10.2f} {r['max_sd_rel']:>10.1e}")
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# §8  QMC SAMPLER — scrambled Sobol vs antithetic pseudo-random pairs
+# ═══════════════════════════════════════════════════════════════════════════════
+# `n` is terminal paths per estimate. A fixed set of four-leg and two-leg
+# structures over random spot / σ / horizon is valued REPS times per sampler
+# (fresh seed or scrambling each time); RMS error is against the closed form
+# (`MC.analytic`), time is per estimate including the draw.
+
+QMC_REPS = 32
+
+def _qmc_cases(n_cases: int = 24):
+    rng = np.random.default_rng(17)
+    cases = []
+    for _ in range(n_cases):
+        S, sig, T = 100.0, rng.uniform(0.15, 0.6), rng.uniform(7, 60) / 365
+        w = S * sig * np.sqrt(T)
+        kc, kp = S + rng.uniform(0.3, 1.2) * w, S - rng.uniform(0.3, 1.2) * w
+        legs = [{'type': 'Sell Call', 'strike': kc, 'premium': 0.4 * w}, {'type': 'Sell Put', 'strike': kp, 'premium': 0.4 * w}]
+        if rng.random() < 0.5:
+            legs += [{'type': 'Buy Call', 'strike': kc + w, 'premium': 0.1 * w}, {'type': 'Buy Put', 'strike': kp - w, 'premium': 0.1 * w}]
+        cases.append((S, sig, T, legs))
+    return cases
+
+def bench_qmc(n_paths: int, mode: str, jobs: int = 0) -> Dict:
+    from adaptive_engine import MC
+    cases = _qmc_cases()
+    S, sig, T, legs = cases[0]
+    MC.analyze(S, sig, T, legs, n=64, sampler=mode)                 # compile
+    err_pop, err_ev, dt = [], [], 0.0
+    for S, sig, T, legs in cases:
+        pop, ev, sd = MC.analytic(S, sig, T, legs)
+        for rep in range(QMC_REPS):
+            np.random.seed(rep)
+            t0 = time.perf_counter()
+            p, e, _ = MC.analyze(S, sig, T, legs, n=n_paths // 2, sampler=mode)
+            dt += time.perf_counter() - t0
+            err_pop.append(p - pop); err_ev.append((e - ev) / max(sd, 1e-12))
+    return {'paths': n_paths, 'mode': mode, 'us_per_estimate': round(dt * 1e6 / len(err_pop), 1),
+            'rmse_pop': float(np.sqrt(np.mean(np.square(err_pop)))),
+            'rmse_ev_sd': float(np.sqrt(np.mean(np.square(err_ev))))}
+
+def report_qmc(jobs: int, sizes=(1024, 4096, 16384, 65536), modes=('antithetic', 'sobol')):
+    print(f"{'paths':>7} {'mode':>11} {'µs/est':>9} {'RMSE PoP':>10} {'RMSE EV/σ':>10}")
+    for n in sizes:
+        for m in modes:
+            r = _run_isolated('qmc', symbols=n, mode=m, jobs=jobs)
+            print(f"{r['paths']:>7} {r['mode']:>11} {r['us_per_estimate']:>9.1f} {r['rmse_pop']:>10.2e} {r['rmse_ev_sd']:>10.2e}")
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# §9  FUSED P&L — materialized P&L array vs one fused reduction pass
+# ═══════════════════════════════════════════════════════════════════════════════
+# `n` is antithetic pairs per estimate, over the §8 cases. `array` draws the
+# terminal array, materializes P&L and reduces it three times (the previous
+# `MC.analyze`); `fused` is `MC.analyze`; `fused_cvar` adds the 5% CVaR.
+
+def bench_pnl_reduce(n_pairs: int, mode: str, jobs: int = 0) -> Dict:
+    from adaptive_engine import MC, generate_terminal_prices, compute_strategy_pnl_numba
+    cases = _qmc_cases()
+
+    def array(S, sig, T, legs):
+        pnl = compute_strategy_pnl_numba(generate_terminal_prices(S, sig, T, n_pairs), *MC._leg_arrays(legs))
+        return float(np.mean(pnl > 0)), float(np.mean(pnl)), float(np.std(pnl))
+
+    run = {'array': array,
+           'fused': lambda S, sig, T, legs: MC.analyze(S, sig, T, legs, n=n_pairs),
+           'fused_cvar': lambda S, sig, T, legs: MC.analyze(S, sig, T, legs, n=n_pairs, tail=0.05)}[mode]
+    run(*cases[0])                                                  # compile
+    t0 = time.perf_counter()
+    for _ in range(10):
+        for case in cases:
+            run(*case)
+    dt = (time.perf_counter() - t0) / (10 * len(cases))
+    return {'pairs': n_pairs, 'mode': mode, 'us_per_estimate': round(dt * 1e6, 1),
+            'materialized_mb': round((4 * n_pairs * 8 if mode == 'array' else 0) / 2 ** 20, 2)}
+
+def report_pnl_reduce(jobs: int, sizes=(10_000, 100_000), modes=('array', 'fused', 'fused_cvar')):
+    print(f"{'pairs':>8} {'mode':>11} {'µs/est':>9} {'arrays MB':>10}")
+    for n in sizes:
+        for m in modes:
+            r = _run_isolated('pnl_reduce', symbols=n, mode=m, jobs=jobs)
+            print(f"{r['pairs']:>8} {r['mode']:>11} {r['us_per_estimate']:>9.1f} {r['materialized_mb']:>10.2f}")
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# §10 BSM UFUNCS — per-element dispatch vs one broadcasting call
+# ═══════════════════════════════════════════════════════════════════════════════
+# `n` terminal prices revalued as a call (the calendar back month's shape)
+# with price and all nine Greeks. `scalar` loops `BSM.call` + `BSM.greeks`;
+# `ufunc` calls `BSM.call` then one ufunc per Greek; `combined` is one
+# `BSM.price_greeks` pass.
+
+def bench_bsm_vec(n: int, mode: str, jobs: int = 0) -> Dict:
+    from adaptive_engine import (BSM, bsm_delta_vec, bsm_gamma_vec, bsm_theta_vec, bsm_vega_vec, bsm_rho_vec,
+                                 bsm_vanna_vec, bsm_volga_vec, bsm_charm_vec, bsm_speed_vec)
+    S = np.random.default_rng(3).lognormal(np.log(100.0), 0.1, n)
+    K, T, sig = 100.0, 0.1, 0.25
+    vecs = (bsm_delta_vec, bsm_gamma_vec, bsm_theta_vec, bsm_vega_vec, bsm_rho_vec,
+            bsm_vanna_vec, bsm_volga_vec, bsm_charm_vec, bsm_speed_vec)
+
+    def scalar():
+        return [(BSM.call(s, K, T, BSM.R, sig), BSM.greeks(s, K, T, BSM.R, sig)) for s in S]
+
+    def ufunc():
+        return [BSM.call(S, K, T, BSM.R, sig)] + [f(S, K, T, BSM.R, sig, True) for f in vecs]
+
+    run = {'scalar': scalar, 'ufunc': ufunc, 'combined': lambda: BSM.price_greeks(S, K, T, BSM.R, sig)}[mode]
+    run()                                                           # compile
+    reps = max(1, 20_000 // n)
+    t0 = time.perf_counter()
+    for _ in range(reps):
+        run()
+    dt = (time.perf_counter() - t0) / reps
+    return {'n': n, 'mode': mode, 'us': round(dt * 1e6, 1), 'ns_per_element': round(dt * 1e9 / n, 1)}
+
+def report_bsm_vec(jobs: int, sizes=(500, 50_000), modes=('scalar', 'ufunc', 'combined')):
+    print(f"{'n':>7} {'mode':>9} {'µs':>11} {'ns/elem':>9}")
+    for n in sizes:
+        for m in modes:
+            r = _run_isolated('bsm_vec', symbols=n, mode=m, jobs=jobs)
+            print(f"{r['n']:>7} {r['mode']:>9} {r['us']:>11.1f} {r['ns_per_element']:>9.1f}")
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# §11 TRADE BOOK — what a finished scan keeps in memory
+# ═══════════════════════════════════════════════════════════════════════════════
+# The full `app.run_universe_scan` (needs streamlit importable). `book` keeps
+# its `TradeBook`; `dicts` expands it to the former shape — every trade a
+# dict holding a copy of its analytics row plus a built `StrategyResult`.
+# Retained = traced bytes still alive after the scan, peak = during it.
+
+def bench_trade_book(n_symbols: int, mode: str, jobs: int = 0) -> Dict:
+    import gc
+    import tracemalloc
+    import app
+    from adaptive_engine import AdaptiveEngine
+    df = synthetic_analytics(n_symbols)
+
+    def scan():
+        app._engine = AdaptiveEngine(); app._engine.calibrate(df)
+        trades = app.run_universe_scan(df, {'dte': 12}, 'bench').trades
+        return [dict(t) for t in trades] if mode == 'dicts' else trades
+
+    scan()                                                          # compile
+    t0 = time.perf_counter(); scan(); dt = time.perf_counter() - t0
+    gc.collect(); tracemalloc.start()
+    base = tracemalloc.get_traced_memory()[0]
+    kept = scan()
+    gc.collect(); cur, peak = tracemalloc.get_traced_memory(); tracemalloc.stop()
+    return {'symbols': n_symbols, 'mode': mode, 'trades': len(kept), 'scan_ms': round(dt * 1000, 1),
+            'retained_mb': round((cur - base) / 2 ** 20, 2), 'peak_mb': round((peak - base) / 2 ** 20, 2)}
+
+def report_trade_book(jobs: int, sizes=(200, 2000), modes=('dicts', 'book')):
+    print(f"{'symbols':>8} {'mode':>6} {'trades':>7} {'scan ms':>9} {'retained MB':>12} {'peak MB':>8}")
+    for n in sizes:
+        for m in modes:
+            r = _run_isolated('trade_book', symbols=n, mode=m, jobs=jobs)
+            print(f"{r['symbols']:>8} {r['mode']:>6} {r['trades']:>7} {r['scan_ms']:>9.1f} {r['retained_mb']:>12.2f} {r['peak_mb']:>8.2f}")
+
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# §12  ENGINE STATE — long-session memory ceiling for the AdaptiveEngine
+# ═══════════════════════════════════════════════════════════════════════════════
+# One engine across RERUNS simulated Streamlit reruns, as `main()` keeps it:
+# every rerun reads the governance metrics and Deep-Analyses one stock, every
+# RESCAN_EVERY-th rerun rescans the universe as a new cycle. Retained memory is
+# sampled after the first rescan interval and at the end; the session is
+# bounded when the growth between them stays under ENGINE_CEILING_KB, and the
+# report exits non-zero when any run is not.
+
+RERUNS = 1000
+RESCAN_EVERY = 50
+ENGINE_CEILING_KB = 64
+
+def bench_engine_state(n_symbols: int, mode: str, jobs: int = 0) -> Dict:
+    import gc
+    import tracemalloc
+    from adaptive_engine import AdaptiveEngine, STRATEGY_STRUCTURE
+    from strategy_batch import UniverseBatch, score_universe
+    names = list(STRATEGY_STRUCTURE)
+    df = synthetic_analytics(n_symbols)
+    rows = df.to_dict('records')
+    engine = AdaptiveEngine(); engine.calibrate(df)
+
+    def scan():
+        engine.begin_cycle()
+        rb = engine.compute_regimes(rows)
+        viab = engine.compute_viability_batch(names, rb, 12)
+        score_universe(UniverseBatch.from_rows(rows, rb, [True] * n_symbols, dte=12), names, viab, engine)
+        engine.end_cycle()
+
+    def rerun(i):
+        if i % RESCAN_EVERY == 0: scan()
+        engine.system_entropy(); engine.confidence_threshold(); engine.max_naked_fraction()
+        engine.adaptation_speed()
+        rd = rows[i % n_symbols]; rg = engine.compute_regime(rd)
+        viab = engine.compute_viability_batch(names, [rg], 12)
+        score_universe(UniverseBatch.from_rows([rd], [rg], [True], dte=12), names, viab, engine)
+
+    rerun(1)                                                        # compile
+    tracemalloc.start()
+    t0 = time.perf_counter()
+    for i in range(RESCAN_EVERY):
+        rerun(i)
+    gc.collect(); early = tracemalloc.get_traced_memory()[0]
+    for i in range(RESCAN_EVERY, RERUNS):
+        rerun(i)
+    dt = time.perf_counter() - t0
+    gc.collect(); late = tracemalloc.get_traced_memory()[0]; tracemalloc.stop()
+    t1 = time.perf_counter()
+    for _ in range(1000):
+        engine.system_entropy(); engine.risk_budget(); engine.adaptation_speed()
+    gov_us = (time.perf_counter() - t1) * 1e3
+    growth = (late - early) / 1024
+    return {'symbols': n_symbols, 'mode': mode, 'reruns': RERUNS, 'cycles': engine.cycle,
+            'rerun_ms': round(dt * 1000 / RERUNS, 2), 'growth_kb': round(growth, 1),
+            'regimes_kept': len(engine.regime_states), 'governance_us': round(gov_us, 2),
+            'bounded': bool(growth < ENGINE_CEILING_KB)}
+
+def report_engine_state(jobs: int, sizes=(50, 200), modes=('reruns',)):
+    print(f"{'symbols':>8} {'reruns':>7} {'cycles':>7} {'ms/rerun':>9} {'growth KB':>10} {'regimes':>8} {'gov µs':>7} {'bounded':>8}")
+    over = []
+    for n in sizes:
+        for m in modes:
+            r = _run_isolated('engine_state', symbols=n, mode=m, jobs=jobs)
+            print(f"{r['symbols']:>8} {r['reruns']:>7} {r['cycles']:>7} {r['rerun_ms']:>9.2f} {r['growth_kb']:>10.1f} "
+                  f"{r['regimes_kept']:>8} {r['governance_us']:>7.2f} {str(r['bounded']):>8}")
+            if not r['bounded']:
+                over.append(f"{r['symbols']} symbols: +{r['growth_kb']} KB")
+    if over:
+        sys.exit(f"engine state over the {ENGINE_CEILING_KB} KB ceiling — " + '; '.join(over))
+
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# §13  REGIME BATCH — per-stock regimes and viability vs one matrix pass
+# ═══════════════════════════════════════════════════════════════════════════════
+# 'per_stock' is the old scan front end: `compute_regime` per row, then
+# `compute_viability` per (stock, strategy); 'batch' is `compute_regimes` and
+# one N × 14 `compute_viability_batch`. `viable` counts the pairs the mask
+# passes on to pricing.
+
+def bench_regime_batch(n_symbols: int, mode: str, jobs: int = 0) -> Dict:
+    from adaptive_engine import AdaptiveEngine, STRATEGY_STRUCTURE
+    from strategy_batch import MIN_VIABILITY
+    names = list(STRATEGY_STRUCTURE)
+    df = synthetic_analytics(n_symbols)
+    rows = df.to_dict('records')
+    engine = AdaptiveEngine()
+    t0 = time.perf_counter(); engine.calibrate(df); t_cal = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    if mode == 'per_stock':
+        regimes = [engine.compute_regime(rd) for rd in rows]
+        t1 = time.perf_counter()
+        viab = np.array([[engine.compute_viability(sn, rg, 12) for sn in names] for rg in regimes])
+    else:
+        rb = engine.compute_regimes(rows)
+        t1 = time.perf_counter()
+        viab = engine.compute_viability_batch(names, rb, 12)
+    t2 = time.perf_counter()
+    return {'symbols': n_symbols, 'mode': mode, 'calibrate_ms': round(t_cal * 1000, 1),
+            'regime_ms': round((t1 - t0) * 1000, 1), 'viability_ms': round((t2 - t1) * 1000, 1),
+            'viable': int((~(viab < MIN_VIABILITY)).sum())}
+
+def report_regime_batch(jobs: int, sizes=(200, 2000), modes=('per_stock', 'batch')):
+    print(f"{'symbols':>8} {'mode':>10} {'calibrate ms':>13} {'regime ms':>10} {'viability ms':>13} {'viable':>7}")
+    for n in sizes:
+        for m in modes:
+            r = _run_isolated('regime_batch', symbols=n, mode=m, jobs=jobs)
+            print(f"{r['symbols']:>8} {r['mode']:>10} {r['calibrate_ms']:>13.1f} {r['regime_ms']:>10.1f} "
+                  f"{r['viability_ms']:>13.1f} {r['viable']:>7}")
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# §14  UNIVERSE SKETCH — batch universe stats vs streaming mergeable sketches
+# ═══════════════════════════════════════════════════════════════════════════════
+# 'batch' recomputes `compute_universe_stats` from the whole frame each time;
+# 'streaming' keeps a `UniverseSketch` on the engine. `first` is the initial
+# calibration, `refresh` recalibrates after 5 symbols' signals move, `rolling`
+# calibrates over 5 daily universes (batch: the concatenated frame; streaming:
+# `UniverseSketch.merged` over per-day shards). `pct_err` is the largest
+# relative error of the refreshed percentile grid against batch.
+
+def bench_universe_sketch(n_symbols: int, mode: str, jobs: int = 0) -> Dict:
+    from adaptive_engine import AdaptiveEngine, SignalSpace
+    from universe_sketch import UniverseSketch
+    streaming = mode == 'streaming'
+    df = synthetic_analytics(n_symbols)
+    moved = df.copy()
+    idx = moved.index[:5]
+    moved.loc[idx, 'IVPercentile'] *= 0.5
+    moved.loc[idx, 'adx'] += 3
+    days = [synthetic_analytics(n_symbols, seed=10 + d) for d in range(5)]
+    engine = AdaptiveEngine()
+    t0 = time.perf_counter(); engine.calibrate(df, streaming=streaming); t_first = time.perf_counter() - t0
+    t0 = time.perf_counter(); stats = engine.calibrate(moved, streaming=streaming); t_refresh = time.perf_counter() - t0
+    if streaming:
+        shards = []
+        for d, frame in enumerate(days):
+            sh = UniverseSketch(len(SignalSpace.RAW_SIGNALS), tag=f'day{d}')
+            sh.update(frame['Instrument'].tolist(), SignalSpace.extract_frame(frame))
+            shards.append(sh)
+        t0 = time.perf_counter(); AdaptiveEngine().calibrate_from(UniverseSketch.merged(shards))
+    else:
+        rolled = pd.concat(days, ignore_index=True)
+        t0 = time.perf_counter(); AdaptiveEngine().calibrate(rolled)
+    t_rolling = time.perf_counter() - t0
+    exact = AdaptiveEngine().calibrate(moved)['pct_grid']
+    err = np.abs(stats['pct_grid'] - exact) / np.maximum(np.abs(exact), 1e-3)
+    return {'symbols': n_symbols, 'mode': mode, 'first_ms': round(t_first * 1000, 1),
+            'refresh_ms': round(t_refresh * 1000, 1), 'rolling_ms': round(t_rolling * 1000, 1),
+            'pct_err': float(err.max())}
+
+def report_universe_sketch(jobs: int, sizes=(200, 2000), modes=('batch', 'streaming')):
+    print(f"{'symbols':>8} {'mode':>10} {'first ms':>9} {'refresh ms':>11} {'5-day ms':>9} {'pct err':>9}")
+    for n in sizes:
+        for m in modes:
+            r = _run_isolated('universe_sketch', symbols=n, mode=m, jobs=jobs)
+            print(f"{r['symbols']:>8} {r['mode']:>10} {r['first_ms']:>9.1f} {r['refresh_ms']:>11.1f} "
+                  f"{r['rolling_ms']:>9.1f} {r['pct_err']:>9.2e}")
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# §15  RECALIBRATION — full recalibration per snapshot vs drift-gated refresh
+# ═══════════════════════════════════════════════════════════════════════════════
+# `n` is symbols; 60 snapshots, each moving 5 symbols' IV percentile and ADX,
+# with the whole universe drawn afresh every 20th (a new trading day).
+# 'always' calls `calibrate(df)` per snapshot; 'drift' calls `refresh(df)`.
+# `recals` counts the rebuilds, `max_drift` is the largest drift the stats
+# were left carrying.
+
+def bench_recalibrate(n_symbols: int, mode: str, jobs: int = 0) -> Dict:
+    from adaptive_engine import AdaptiveEngine, SignalSpace
+    rng = np.random.default_rng(0)
+    frames, df = [], synthetic_analytics(n_symbols)
+    for k in range(60):
+        if k and k % 20 == 0:
+            df = synthetic_analytics(n_symbols, seed=k)
+        else:
+            df = df.copy()
+            idx = df.index[rng.choice(n_symbols, 5, replace=False)]
+            df.loc[idx, 'IVPercentile'] = rng.uniform(0, 100, 5)
+            df.loc[idx, 'adx'] += rng.normal(0, 3, 5)
+        frames.append(df)
+    engine = AdaptiveEngine()
+    engine.calibrate(frames[0], streaming=mode == 'drift')
+    recals, max_drift, elapsed = 0, 0.0, 0.0
+    for frame in frames[1:]:
+        t0 = time.perf_counter()
+        if mode == 'always':
+            engine.calibrate(frame)
+            recals += 1
+        else:
+            recals += engine.refresh(frame)
+        elapsed += time.perf_counter() - t0
+        max_drift = max(max_drift, engine.drift(SignalSpace.extract_frame(frame)))
+    return {'symbols': n_symbols, 'mode': mode, 'total_ms': round(elapsed * 1000, 1),
+            'per_snapshot_ms': round(elapsed * 1000 / (len(frames) - 1), 2),
+            'recals': recals, 'max_drift': round(max_drift, 3)}
+
+def report_recalibrate(jobs: int, sizes=(200, 2000), modes=('always', 'drift')):
+    print(f"{'symbols':>8} {'mode':>7} {'total ms':>9} {'ms/snap':>8} {'recals':>7} {'max drift':>10}")
+    for n in sizes:
+        for m in modes:
+            r = _run_isolated('recalibrate', symbols=n, mode=m, jobs=jobs)
+            print(f"{r['symbols']:>8} {r['mode']:>7} {r['total_ms']:>9.1f} {r['per_snapshot_ms']:>8.2f} "
+                  f"{r['recals']:>7} {r['max_drift']:>10.3f}")
+
+
+BENCHMARKS = {
+    'shared_panel': (bench_shared_panel, report_shared_panel),
+    'chain_sweep': (bench_chain_sweep, report_chain_sweep),
+    'chain_parse': (bench_chain_parse, report_chain_parse),
+    'iv_solve': (bench_iv_solve, report_iv_solve),
+    'vol_surface': (bench_vol_surface, report_vol_surface),
+    'scan': (bench_scan, report_scan),
+    'analytic': (bench_analytic, report_analytic),
+    'qmc': (bench_qmc, report_qmc),
+    'pnl_reduce': (bench_pnl_reduce, report_pnl_reduce),
+    'bsm_vec': (bench_bsm_vec, report_bsm_vec),
+    'trade_book': (bench_trade_book, report_trade_book),
+    'engine_state': (bench_engine_state, report_engine_state),
+    'regime_batch': (bench_regime_batch, report_regime_batch),
+    'universe_sketch': (bench_universe_sketch, report_universe_sketch),
+    'recalibrate': (bench_recalibrate, report_recalibrate),
+}
+
+if __name__ == '__main__':
+    ap = argparse.ArgumentParser(description='VAAYDO performance benchmarks')
+    ap.add_argument('name', choices=sorted(BENCHMARKS))
+    ap.add_argument('--worker', action='store_true')
+    ap.add_argument('--symbols', type=int, default=200)
+    ap.add_argument('--mode', default='shared')
+    ap.add_argument('--jobs', type=int, default=4, help='loky workers (explicit: n_jobs=-1 on one core runs in-process)')
+    a = ap.parse_args()
+    bench, report = BENCHMARKS[a.name]
+    if a.worker:
+        print(json.dumps(bench(a.symbols, a.mode, a.jobs)))
+    else:
+        report(a.jobs)
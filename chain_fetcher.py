@@ -0,0 +1,270 @@
+"""
+    ╔══════════════════════════════════════════════════════════════════════════╗
+    ║  VAAYDO — Bulk Option Chain Fetcher v1.0                               ║
+    ║  Token-bucket scheduled, prioritized, streaming chain sweep            ║
+    ║  Hemrek Capital                                                        ║
+    ╚══════════════════════════════════════════════════════════════════════════╝
+
+A chain sweep over the F&O universe is bound by NSE's request budget, not
+by CPU. The fetcher spends that budget on chains only:
+  • one token bucket pinned at `NseConfig.max_rps` paces every request,
+    while a small thread pool overlaps request latency
+  • spot comes from the chain payload (`underlyingValue`); symbols whose
+    payload lacks it share one batched quote call at the end
+  • failures retry with full-jitter exponential backoff; a 429 also drains
+    the bucket so the whole sweep backs off, not just one worker
+  • symbols go out in scan-rank order and results stream back as they
+    arrive, so scoring starts on the best candidates immediately
+
+The transport is injected (`fetch(symbol) -> payload`), so the same
+scheduler drives NseKit in the app and a local stand-in server in
+`benchmarks.py`.
+"""
+
+import asyncio
+import logging
+import queue
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Callable, Dict, Iterator, List, Optional
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_RPS = 2.0
+DEFAULT_RETRIES = 3
+BACKOFF_BASE = 0.5             # seconds; attempt k waits U(0, min(cap, base·2^k))
+BACKOFF_CAP = 8.0
+DEFAULT_WORKERS = 8            # in-flight requests; the bucket, not this, sets throughput
+
+
+class RateLimited(Exception):
+    """Transport signal for HTTP 429 / throttling; `retry_after` in seconds if known."""
+
+    def __init__(self, retry_after: Optional[float] = None):
+        super().__init__(f"rate limited (retry after {retry_after}s)")
+        self.retry_after = retry_after
+
+
+@dataclass
+class ChainResult:
+    """One symbol's outcome, in arrival order."""
+    symbol: str
+    payload: Any = None
+    spot: float = 0.0
+    attempts: int = 0
+    error: Optional[str] = None
+    elapsed: float = 0.0       # since sweep start
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None and self.payload is not None
+
+
+@dataclass
+class SweepStats:
+    requests: int = 0
+    rate_limited: int = 0
+    retries: int = 0
+    failed: int = 0
+    quote_batches: int = 0
+    first_result_s: float = 0.0
+    wall_s: float = 0.0
+
+    def summary(self) -> str:
+        return (f"{self.requests} requests · {self.retries} retries · {self.rate_limited}×429 · "
+                f"{self.failed} failed · first chain {self.first_result_s:.1f}s · {self.wall_s:.1f}s")
+
+
+def spot_from_payload(payload: Any) -> float:
+    """`underlyingValue` from an NSE chain payload (records dict or strike list)."""
+    if isinstance(payload, dict):
+        records = payload.get('records', payload)
+        v = records.get('underlyingValue')
+        if v:
+            return float(v)
+        payload = records.get('data', [])
+    if isinstance(payload, list):
+        for item in payload:
+            for side in ('CE', 'PE'):
+                v = (item.get(side) or {}).get('underlyingValue') if isinstance(item, dict) else None
+                if v:
+                    return float(v)
+    return 0.0
+
+
+class TokenBucket:
+    """Async token bucket: `rate` tokens/s, at most `burst` banked."""
+
+    def __init__(self, rate: float, burst: float = 1.0):
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        self.rate = rate
+        self.burst = max(burst, 1.0)
+        self._tokens = self.burst
+        self._last = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.burst, self._tokens + (now - self._last) * self.rate)
+        self._last = now
+
+    async def acquire(self):
+        # The lock serializes waiters, so tokens are handed out FIFO at `rate`
+        async with self._lock:
+            while True:
+                self._refill()
+                if self._tokens >= 1.0:
+                    self._tokens -= 1.0
+                    return
+                await asyncio.sleep((1.0 - self._tokens) / self.rate)
+
+    def penalize(self, seconds: float):
+        """Server pushed back: go into debt so every worker pauses ~`seconds`."""
+        self._refill()
+        self._tokens = min(self._tokens, 0.0) - seconds * self.rate
+
+
+class BulkChainFetcher:
+    """Rate-limited, prioritized, streaming sweep over many option chains.
+
+    fetch   — `symbol -> payload` (blocking; raises `RateLimited` on 429,
+              any other exception or an empty payload counts as a failure)
+    quotes  — optional `symbols -> {symbol: spot}` batched call for payloads
+              without an underlying value
+    """
+
+    def __init__(self, fetch: Callable[[str], Any], rps: float = DEFAULT_RPS,
+                 quotes: Optional[Callable[[List[str]], Dict[str, float]]] = None,
+                 retries: int = DEFAULT_RETRIES, workers: int = DEFAULT_WORKERS,
+                 burst: float = 1.0, seed: Optional[int] = None):
+        self.fetch = fetch
+        self.quotes = quotes
+        self.rps = rps
+        self.burst = burst
+        self.retries = retries
+        self.workers = workers
+        self.stats = SweepStats()
+        self._rng = random.Random(seed)
+
+    def _backoff(self, attempt: int) -> float:
+        return self._rng.uniform(0.0, min(BACKOFF_CAP, BACKOFF_BASE * 2 ** attempt))
+
+    @staticmethod
+    def _ordered(symbols: List[str], rank: Optional[Dict[str, float]]) -> List[str]:
+        """Best scan rank first (lower is better); unranked symbols keep their order, last."""
+        if not rank:
+            return list(symbols)
+        return sorted(symbols, key=lambda s: (s not in rank, rank.get(s, 0.0)))
+
+    async def stream(self, symbols: List[str], rank: Optional[Dict[str, float]] = None
+                     ) -> AsyncIterator[ChainResult]:
+        """Yield each symbol's `ChainResult` as soon as it is final."""
+        self.stats = stats = SweepStats()
+        t0 = time.monotonic()
+        loop = asyncio.get_running_loop()
+        bucket = TokenBucket(self.rps, self.burst)
+        pending: asyncio.PriorityQueue = asyncio.PriorityQueue()
+        done: asyncio.Queue = asyncio.Queue()
+        for prio, sym in enumerate(self._ordered(symbols, rank)):
+            pending.put_nowait((prio, sym, 0))
+        executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='chain')
+
+        async def worker():
+            while True:
+                prio, sym, attempt = await pending.get()
+                await bucket.acquire()
+                stats.requests += 1
+                error = None
+                try:
+                    payload = await loop.run_in_executor(executor, self.fetch, sym)
+                    if not payload:
+                        error = "empty payload"
+                except RateLimited as e:
+                    stats.rate_limited += 1
+                    bucket.penalize(e.retry_after if e.retry_after is not None else self._backoff(attempt))
+                    error = str(e)
+                except Exception as e:
+                    error = f"{type(e).__name__}: {e}"
+                if error is None:
+                    done.put_nowait(ChainResult(sym, payload, spot_from_payload(payload), attempt + 1))
+                elif attempt < self.retries:
+                    stats.retries += 1
+                    # Re-queue at its original priority once the backoff elapses
+                    loop.call_later(self._backoff(attempt + 1), pending.put_nowait, (prio, sym, attempt + 1))
+                else:
+                    done.put_nowait(ChainResult(sym, None, 0.0, attempt + 1, error))
+
+        tasks = [asyncio.create_task(worker()) for _ in range(self.workers)]
+        no_spot: List[ChainResult] = []
+        try:
+            for _ in range(len(symbols)):
+                res = await done.get()
+                res.elapsed = time.monotonic() - t0
+                if not res.ok:
+                    stats.failed += 1
+                    logger.warning(f"Chain fetch failed for {res.symbol}: {res.error}")
+                elif res.spot <= 0 and self.quotes is not None:
+                    no_spot.append(res)
+                    continue
+                if not stats.first_result_s:
+                    stats.first_result_s = res.elapsed
+                yield res
+        finally:
+            for t in tasks:
+                t.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            executor.shutdown(wait=False, cancel_futures=True)
+
+        # One batched quote call covers every payload that lacked a spot
+        if no_spot:
+            await bucket.acquire()
+            stats.requests += 1
+            stats.quote_batches += 1
+            try:
+                spots = await loop.run_in_executor(None, self.quotes, [r.symbol for r in no_spot]) or {}
+            except Exception as e:
+                logger.warning(f"Batched quote failed: {e}")
+                spots = {}
+            for res in no_spot:
+                res.spot = float(spots.get(res.symbol, 0.0) or 0.0)
+                res.elapsed = time.monotonic() - t0
+                if not stats.first_result_s:
+                    stats.first_result_s = res.elapsed
+                yield res
+        stats.wall_s = time.monotonic() - t0
+
+    def iter(self, symbols: List[str], rank: Optional[Dict[str, float]] = None) -> Iterator[ChainResult]:
+        """Blocking bridge for sync callers (Streamlit): the sweep runs on its
+        own event loop in a background thread and results stream through a queue."""
+        out: queue.Queue = queue.Queue()
+        end = object()
+
+        def run():
+            async def pump():
+                async for res in self.stream(symbols, rank):
+                    out.put(res)
+            try:
+                asyncio.run(pump())
+            except Exception as e:
+                out.put(e)
+            finally:
+                out.put(end)
+
+        thread = threading.Thread(target=run, name='chain-sweep', daemon=True)
+        thread.start()
+        while True:
+            item = out.get()
+            if item is end:
+                break
+            if isinstance(item, Exception):
+                raise item
+            yield item
+        thread.join()
+
+    def sweep(self, symbols: List[str], rank: Optional[Dict[str, float]] = None) -> Dict[str, ChainResult]:
+        """Whole sweep at once, keyed by symbol."""
+        return {r.symbol: r for r in self.iter(symbols, rank)}
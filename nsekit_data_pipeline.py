@@ -13,66 +13,34 @@ import json
 import os
 import time
 import logging
-import hashlib
 from datetime import datetime, timedelta, date
-from typing import Dict, List, Tuple, Optional, Any
-from dataclasses import dataclass, field
+from typing import Dict, Iterator, List, Tuple, Optional, Any
 import warnings
 from NseKit import Nse, NseConfig
 from joblib import Parallel, delayed
 import diskcache
-import yfinance as yf
+from panel_analytics import panel_from_download, SharedOHLCVPanel, PanelHandle, fit_garch_panel, GARCH_DEFAULT
+from ohlcv_store import OHLCVStore, SYNC_LEASE
+from option_chain import OptionChain, OptionQuote, solve_chains
+from chain_fetcher import BulkChainFetcher, spot_from_payload
+from vol_surface import SurfaceStore, VolSurface, SURFACE_LEASE
+from analytics_cache import RowCache, input_fingerprints, params_salt, code_digest, anchored_window, WINDOW_SLACK_DAYS
 
 warnings.filterwarnings('ignore')
 logger = logging.getLogger(__name__)
 
 # § Configuration
+PIPELINE_VERSION = "1.0"
 NseConfig.max_rps = 2.0
 NseConfig.retries = 3
 
-@dataclass
-class OptionQuote:
-    """Rich option quote with Greeks and Liquidity mapping."""
-    instrument_token: int
-    tradingsymbol: str
-    strike: float
-    option_type: str  # CE/PE
-    expiry: date
-    last_price: float
-    bid: float
-    ask: float
-    bid_qty: int
-    ask_qty: int
-    volume: int
-    oi: int
-    iv: float = 0.0
-    delta: float = 0.0
-    gamma: float = 0.0
-    theta: float = 0.0
-    vega: float = 0.0
-    total_buy_qty: int = 0
-    total_sell_qty: int = 0
-    bid_ask_spread: float = 0.0
-    spread_pct: float = 0.0
-    liquidity_score: float = 0.0
-    is_liquid: bool = False
-
-@dataclass
-class OptionChain:
-    symbol: str
-    underlying_price: float
-    expiry: date
-    calls: List[OptionQuote]
-    puts: List[OptionQuote]
-    timestamp: datetime
-
 class NsekitDataPipeline:
     """
     NSE-direct data pipeline using NseKit.
     Replaces Zerodha Kite Connect as the primary data source.
     """
     
-    def __init__(self):
+    def __init__(self, surfaces: Optional[SurfaceStore] = None):
         self.nse = Nse()
         self._lot_sizes = {
             "NIFTY": 50, "BANKNIFTY": 15, "FINNIFTY": 40,
@@ -81,6 +49,10 @@ class NsekitDataPipeline:
         # § Persistence Layer
         cache_dir = os.path.join(os.path.expanduser("~"), ".vaaydo_cache")
         self.cache = diskcache.Cache(cache_dir)
+        self.store = OHLCVStore(os.path.join(cache_dir, "ohlcv"))
+        self.rows = RowCache(self.cache, "nse_row")
+        self.surfaces = surfaces if surfaces is not None else SurfaceStore(self.cache)
+        self.last_sweep = None
 
     def initialize(self):
         """Pre-fetch or warm up local indices."""
@@ -113,36 +85,59 @@ class NsekitDataPipeline:
         import time as _time
         t0 = _time.time()
         
-        # 1. Cache Check
-        sym_hash = hashlib.md5("".join(sorted(symbols)).encode()).hexdigest()
-        cache_key = f"nse_analytics_{sym_hash}_{datetime.now().strftime('%Y%m%d_%H')}"
-        
-        cached_df = self.cache.get(cache_key)
-        if cached_df is not None:
-            return cached_df, f"✓ Analytics loaded from cache ({len(cached_df)} symbols)"
-
-        # 2. Bulk History Fetch (Fastest way for 252 days)
+        # 1. Bulk History — local store, yfinance only for bars newer than stored
         yf_symbols = [f"{s}.NS" for s in symbols]
         try:
-            raw = yf.download(yf_symbols, period="1y", interval="1d", group_by="ticker", progress=False)
+            raw, sync = self.store.sync(yf_symbols, datetime.now() - timedelta(days=365 + WINDOW_SLACK_DAYS),
+                                        max_age=SYNC_LEASE)
         except Exception as e:
             return pd.DataFrame(), f"⚠ Failed to fetch history: {str(e)}"
-        
-        # 3. Parallel Compute
-        results = Parallel(n_jobs=-1, backend="loky")(
-            delayed(self._compute_analytics_single)(sym, raw[f"{sym}.NS"] if f"{sym}.NS" in raw.columns.levels[0] else None)
-            for sym in symbols
-        )
-        results = [r for r in results if r is not None]
-        
+        if raw.empty:
+            return pd.DataFrame(), "⚠ No history available"
+        raw = anchored_window(raw, 365)
+
+        # 2. Content-addressed rows — recompute only symbols whose inputs changed
+        is_multi = isinstance(raw.columns, pd.MultiIndex)
+        lot_sizes = {sym: self.get_lot_size(sym) for sym in symbols}
+        salt = params_salt(PIPELINE_VERSION, code_digest(self._analytics_from_frame, _analytics_chunk))
+        keys = input_fingerprints(raw, yf_symbols, salt, per_symbol={f"{s}.NS": n for s, n in lot_sizes.items()})
+        rows, stale = self.rows.lookup(keys) if is_multi else ({}, list(yf_symbols))
+        detail = f"{len(stale)}/{len(symbols)} recomputed · {sync.summary()}"
+
+        # 3. Parallel Compute — workers attach to one shared panel by name
+        if stale:
+            panel = panel_from_download(raw, stale, is_multi)
+            # GARCH(1,1) MLE for the stale symbols in one batch, warm-started
+            warm = self.cache.get("nse_garch_params") or {}
+            garch = fit_garch_panel(panel, warm)
+            self.cache.set("nse_garch_params", {**warm, **garch.params()})
+            garch_cols = garch.columns()
+            fits = {s.replace('.NS', ''): ((garch.omega[i], garch.alpha[i], garch.beta[i]), garch_cols[i])
+                    for i, s in enumerate(garch.symbols)}
+            todo = [s.replace('.NS', '') for s in stale]
+            chunks = [c.tolist() for c in np.array_split(np.array(todo, dtype=object), min(len(todo), 32)) if len(c)]
+            with SharedOHLCVPanel.create(panel) as shared:
+                parts = Parallel(n_jobs=-1, backend="loky")(
+                    delayed(_analytics_chunk)(shared.handle, chunk, lot_sizes, fits) for chunk in chunks
+                )
+            fresh = {f"{sym}.NS": r for chunk, part in zip(chunks, parts) for sym, r in zip(chunk, part)}
+            self.rows.store(keys, fresh)
+            rows.update({s: r for s, r in fresh.items() if r})
+            detail += f" · {garch.summary()}"
+
+        results = RowCache.present(rows, yf_symbols)
         df_final = pd.DataFrame(results)
-        if not df_final.empty:
-            self.cache.set(cache_key, df_final, expire=3600)
-            
-        return df_final, f"✓ Hybrid Analytics for {len(results)} symbols via NseKit ({_time.time()-t0:.1f}s)"
+        return df_final, (f"✓ Hybrid Analytics for {len(results)} symbols via NseKit "
+                          f"({detail} · {self.rows.counters.summary()}, {_time.time()-t0:.1f}s)")
 
     def _compute_analytics_single(self, sym: str, df: Optional[pd.DataFrame]) -> Optional[Dict]:
         """Ported analytics engine from legacy pipeline."""
+        return self._analytics_from_frame(sym, df, self.get_lot_size(sym))
+
+    @staticmethod
+    def _analytics_from_frame(sym: str, df: Optional[pd.DataFrame], lot_size: int,
+                              fit: Optional[Tuple[Tuple[float, float, float], Dict]] = None) -> Optional[Dict]:
+        """Stateless analytics core — runs in workers without pickling the pipeline."""
         if df is None or df.empty: return None
         try:
             df = df.dropna()
@@ -169,8 +164,8 @@ class NsekitDataPipeline:
             ivp = float(np.sum(rv_composite <= current_rv) / len(rv_composite) * 100) if len(rv_composite) > 20 else 50.0
             atmiv = current_rv * 1.12 * 100 
             
-            # --- GARCH ---
-            omega, alpha, beta = 0.000005, 0.10, 0.85
+            # --- GARCH (per-symbol MLE parameters; legacy constants if unfitted) ---
+            (omega, alpha, beta), garch_cols = fit if fit is not None else (GARCH_DEFAULT, {})
             var_t = current_rv**2 / 252
             for ret in lr.values[-60:]:
                 var_t = max(omega + alpha * ret**2 + beta * var_t, 1e-10)
@@ -190,12 +185,12 @@ class NsekitDataPipeline:
                 'Instrument': sym, 'price': round(price, 2),
                 'ATMIV': round(atmiv, 2), 'IVPercentile': round(ivp, 1),
                 'RV_Composite': round(current_rv * 100, 2),
-                'GARCH_Vol': round(garch_vol * 100, 2),
+                'GARCH_Vol': round(garch_vol * 100, 2), **garch_cols,
                 'PCR': 1.0, 'volume': int(V.iloc[-1]),
                 'rsi_daily': round(rsi_val, 2), 
                 'ma20_daily': round(ma20, 2), 'ma50_daily': round(ma50, 2),
                 '% change': round(float(Cl.pct_change().iloc[-1] * 100), 2),
-                'lot_size': self.get_lot_size(sym),
+                'lot_size': lot_size,
                 'CUSUM_Alert': False
             }
         except Exception:
@@ -206,48 +201,82 @@ class NsekitDataPipeline:
         try:
             expiry_str = expiry.strftime('%d-%b-%Y').upper() if expiry else None
             raw = self.nse.fno_live_option_chain(symbol, expiry_date=expiry_str)
-            
-            underlying_price = 0
-            if raw and isinstance(raw, list) and len(raw) > 0:
-                # NseKit return list of strike info
-                # To get spot, we do a quick single stock quote
-                underlying_price = float(self.nse.stock_quote(symbol).get('lastPrice', 0))
 
-            calls, puts = [], []
-            for item in raw:
-                strike = float(item['strikePrice'])
-                
-                for otype in ['CE', 'PE']:
-                    side = item.get(otype)
-                    if not side: continue
-                    
-                    quote = OptionQuote(
-                        instrument_token=0,
-                        tradingsymbol=f"{symbol}{expiry_str if expiry_str else ''}{strike}{otype}",
-                        strike=strike,
-                        option_type=otype,
-                        expiry=expiry or date.today(),
-                        last_price=side.get('lastPrice', 0),
-                        bid=side.get('bidprice', side.get('lastPrice', 0)),
-                        ask=side.get('askPrice', side.get('lastPrice', 0)),
-                        bid_qty=side.get('bidQty', 0),
-                        ask_qty=side.get('askQty', 0),
-                        volume=side.get('totalTradedVolume', 0),
-                        oi=side.get('openInterest', 0),
-                        iv=side.get('impliedVolatility', 0),
-                        total_buy_qty=side.get('totalBuyQuantity', 0),
-                        total_sell_qty=side.get('totalSellQuantity', 0),
-                        is_liquid=True # Simplified
-                    )
-                    
-                    if otype == 'CE': calls.append(quote)
-                    else: puts.append(quote)
-            
-            return OptionChain(symbol, underlying_price, expiry or date.today(), calls, puts, datetime.now())
+            underlying_price = spot_from_payload(raw)
+            if not underlying_price and raw and isinstance(raw, list):
+                # Payload without underlyingValue: fall back to a single stock quote
+                underlying_price = float(self.nse.stock_quote(symbol).get('lastPrice', 0))
+            return self._parse_option_chain(symbol, raw, expiry, underlying_price)
         except Exception as e:
             logger.error(f"NseKit Option Chain failed for {symbol}: {e}")
             return None
 
+    def stream_option_chains(self, symbols: List[str], expiry: Optional[date] = None,
+                             rank: Optional[Dict[str, float]] = None) -> Iterator[OptionChain]:
+        """Bulk sweep: chains in scan-rank order, yielded as they arrive.
+
+        Paced at `NseConfig.max_rps` by one token bucket; spot comes from each
+        payload or a single batched F&O quote call. `self.last_sweep` holds the
+        sweep's request/retry/429 counts afterwards.
+        """
+        expiry_str = expiry.strftime('%d-%b-%Y').upper() if expiry else None
+        fetcher = BulkChainFetcher(lambda sym: self.nse.fno_live_option_chain(sym, expiry_date=expiry_str),
+                                   rps=NseConfig.max_rps, quotes=self._batch_quotes)
+        self.last_sweep = fetcher.stats
+        for res in fetcher.iter(symbols, rank):
+            self.last_sweep = fetcher.stats
+            if not res.ok:
+                continue
+            try:
+                yield self._parse_option_chain(res.symbol, res.payload, expiry, res.spot)
+            except Exception as e:
+                logger.error(f"NseKit Option Chain parse failed for {res.symbol}: {e}")
+
+    def refresh_vol_surfaces(self, symbols: List[str], expiries: Optional[List[Optional[date]]] = None,
+                             rank: Optional[Dict[str, float]] = None,
+                             max_age: Optional[float] = SURFACE_LEASE) -> Dict[str, VolSurface]:
+        """Sweep chains per expiry and refit each symbol's SVI/SSVI surface.
+
+        Refits start warm from the cached surface, so an intraday refresh is
+        a few Newton steps per slice; the app's pricer reads the same cache.
+        `expiries=None` sweeps the nearest expiry only. Symbols whose cached
+        surface is younger than `max_age` are leased and not swept (None
+        sweeps all).
+        """
+        if max_age is not None:
+            symbols = self.surfaces.stale(symbols, max_age)
+        if not symbols:
+            return {}
+        by_symbol: Dict[str, List[OptionChain]] = {}
+        for expiry in expiries or [None]:
+            for chain in self.stream_option_chains(symbols, expiry, rank):
+                by_symbol.setdefault(chain.symbol, []).append(chain)
+        fitted = {}
+        for sym, chains in by_symbol.items():
+            try:
+                surface = self.surfaces.refit(sym, chains)
+            except Exception as e:
+                logger.error(f"Vol surface fit failed for {sym}: {e}")
+                continue
+            if surface is not None:
+                fitted[sym] = surface
+        return fitted
+
+    def _batch_quotes(self, symbols: List[str]) -> Dict[str, float]:
+        """Spot for many symbols in one request (NSE 'SECURITIES IN F&O' board)."""
+        board = self.nse.index_live_indices_stocks_data("SECURITIES IN F&O")
+        if board is None or len(board) == 0:
+            return {}
+        prices = dict(zip(board['symbol'], board['lastPrice']))
+        return {s: float(prices[s]) for s in symbols if s in prices}
+
+    @staticmethod
+    def _parse_option_chain(symbol: str, raw: Any, expiry: Optional[date], underlying_price: float) -> OptionChain:
+        """NSE strike list → columnar OptionChain with solved IV and Greeks."""
+        chain = OptionChain.from_payload(symbol, raw, expiry, underlying_price)
+        solve_chains([chain])
+        return chain
+
     def fetch_strategy_margin(self, legs: List[Dict], spot_price: float = 0) -> Dict[str, float]:
         """Estimated Margin Estimator."""
         total_margin = 0
@@ -267,6 +296,17 @@ class NsekitDataPipeline:
             "exposure_margin": total_margin * 0.2
         }
 
+def _analytics_chunk(handle: PanelHandle, syms: List[str], lot_sizes: Dict[str, int],
+                     fits: Dict[str, Tuple]) -> List[Optional[Dict]]:
+    """Loky task: attach to the shared panel, read this chunk's columns zero-copy."""
+    panel = SharedOHLCVPanel.attach(handle)
+    try:
+        return [NsekitDataPipeline._analytics_from_frame(sym, panel.frame(f"{sym}.NS"), lot_sizes.get(sym, 1),
+                                                         fits.get(sym))
+                for sym in syms]
+    finally:
+        panel.close()
+
 def render_nsekit_info():
     """Information block for Streamlit."""
     import streamlit as st
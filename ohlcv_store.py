@@ -0,0 +1,252 @@
+"""
+    ╔══════════════════════════════════════════════════════════════════════════╗
+    ║  VAAYDO — Local OHLCV Store v1.0                                       ║
+    ║  Per-symbol Parquet history with delta sync against yfinance           ║
+    ║  Hemrek Capital                                                        ║
+    ╚══════════════════════════════════════════════════════════════════════════╝
+
+Every symbol's daily bars live in `~/.vaaydo_cache/ohlcv/<SYMBOL>.parquet`.
+A sync only asks yfinance for bars from each symbol's second-to-last stored
+date onwards (the last bar is re-fetched so an intraday partial gets
+finalized) and merges them in. Cold start becomes a disk read, and replay/backtests
+read a stable history instead of whatever the hour's download returned.
+
+Adjusted prices move when a dividend or split lands. The re-fetched, already
+final, overlap bar doubles as a check: if its close disagrees with the stored close the
+symbol's whole history is fetched again rather than mixing price bases.
+
+A small `_coverage.json` manifest records the earliest date each symbol was
+fully requested from, so a recent listing with a short history is not
+mistaken for a gap and re-downloaded on every sync.
+"""
+
+import os
+import json
+import logging
+import time
+import numpy as np
+import pandas as pd
+from datetime import datetime
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Tuple
+
+try:
+    import pyarrow  # noqa: F401 — Parquet engine for pandas
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+OHLCV_COLUMNS = ['Open', 'High', 'Low', 'Close', 'Volume']
+DEFAULT_ROOT = os.path.join(os.path.expanduser("~"), ".vaaydo_cache", "ohlcv")
+ADJUSTMENT_TOL = 1e-4          # relative close mismatch that signals a re-adjustment
+SYNC_LEASE = 300.0             # seconds a sync is trusted before yfinance is asked again
+
+
+@dataclass
+class SyncStats:
+    """What one sync cost: symbols by path taken and bars pulled over the wire."""
+    cold: int = 0             # no local history → full download
+    delta: int = 0            # appended from last stored date
+    refetched: int = 0        # adjustment mismatch → full re-download
+    leased: int = 0           # synced within max_age → served from disk
+    failed: int = 0
+    bars_fetched: int = 0
+
+    def summary(self) -> str:
+        return (f"{self.delta} delta · {self.cold} cold · {self.refetched} re-adjusted · "
+                f"{self.leased} leased · {self.bars_fetched} bars fetched")
+
+class OHLCVStore:
+    """Persistent per-symbol daily bars. Disabled (pass-through) without pyarrow."""
+
+    def __init__(self, root: str = DEFAULT_ROOT, downloader: Optional[Callable] = None):
+        self.root = root
+        self.enabled = PYARROW_AVAILABLE
+        self._download = downloader
+        self._coverage: Dict[str, str] = {}
+        if self.enabled:
+            os.makedirs(self.root, exist_ok=True)
+            try:
+                with open(os.path.join(self.root, '_coverage.json')) as f:
+                    self._coverage = json.load(f)
+            except (OSError, ValueError):
+                self._coverage = {}
+
+    def _save_coverage(self):
+        p = os.path.join(self.root, '_coverage.json')
+        tmp = f"{p}.{os.getpid()}.tmp"
+        with open(tmp, 'w') as f:
+            json.dump(self._coverage, f)
+        os.replace(tmp, p)
+
+    def covers(self, symbol: str, start: datetime) -> bool:
+        """Stored history was fetched from `start` or earlier."""
+        since = self._coverage.get(symbol)
+        return since is not None and pd.Timestamp(since) <= pd.Timestamp(start).normalize()
+
+    def path(self, symbol: str) -> str:
+        safe = symbol.replace('/', '_').replace('^', '_')
+        return os.path.join(self.root, f"{safe}.parquet")
+
+    def read(self, symbol: str) -> Optional[pd.DataFrame]:
+        p = self.path(symbol)
+        if not self.enabled or not os.path.exists(p):
+            return None
+        try:
+            return pd.read_parquet(p)
+        except Exception as e:
+            logger.warning(f"OHLCV store: unreadable {p} ({e}); will re-download")
+            return None
+
+    def synced_at(self, symbol: str) -> float:
+        """Epoch seconds of the last successful write (0 if never)."""
+        try:
+            return os.path.getmtime(self.path(symbol))
+        except OSError:
+            return 0.0
+
+    def write(self, symbol: str, df: pd.DataFrame):
+        """Atomic replace so a crash mid-write never leaves a torn file."""
+        p = self.path(symbol)
+        tmp = f"{p}.{os.getpid()}.tmp"
+        df.to_parquet(tmp)
+        os.replace(tmp, p)
+
+    @staticmethod
+    def clean(df: pd.DataFrame) -> pd.DataFrame:
+        """Canonical layout: OHLCV float columns, tz-naive sorted unique dates."""
+        df = df.reindex(columns=OHLCV_COLUMNS).astype(np.float64)
+        df = df.dropna(how='all')
+        idx = pd.DatetimeIndex(df.index)
+        if idx.tz is not None:
+            idx = idx.tz_localize(None)
+        df.index = idx.normalize()
+        df.index.name = 'Date'
+        return df[~df.index.duplicated(keep='last')].sort_index()
+
+    @staticmethod
+    def merge(old: pd.DataFrame, new: pd.DataFrame) -> pd.DataFrame:
+        """New bars win on overlapping dates (finalizes yesterday's partial bar)."""
+        both = pd.concat([old, new])
+        return both[~both.index.duplicated(keep='last')].sort_index()
+
+    @staticmethod
+    def adjusted_since(old: pd.DataFrame, new: pd.DataFrame) -> bool:
+        """True if the overlap bar's close moved, i.e. history was re-adjusted."""
+        common = old.index.intersection(new.index)
+        if len(common) == 0:
+            return False
+        d = common[0]
+        a, b = old.at[d, 'Close'], new.at[d, 'Close']
+        if np.isnan(a) or np.isnan(b):
+            return False
+        return abs(b / a - 1.0) > ADJUSTMENT_TOL
+
+    # ── Delta sync ──
+
+    def _fetch(self, symbols: List[str], start: datetime, end: datetime) -> Dict[str, pd.DataFrame]:
+        """One grouped download → {symbol: clean bars}. Empty symbols are omitted."""
+        download = self._download
+        if download is None:
+            import yfinance as yf
+            download = yf.download
+        raw = download(symbols, start=start, end=end, progress=False, auto_adjust=True,
+                       group_by='ticker', threads=True)
+        out = {}
+        if raw is None or raw.empty:
+            return out
+        tickers = set(raw.columns.get_level_values(0)) if isinstance(raw.columns, pd.MultiIndex) else set()
+        for sym in symbols:
+            if sym in tickers:
+                df = raw[sym]
+            elif not tickers and len(symbols) == 1:
+                df = raw
+            else:
+                continue
+            df = self.clean(df)
+            if not df.empty:
+                out[sym] = df
+        return out
+
+    def sync(self, symbols: List[str], start: datetime, end: Optional[datetime] = None,
+             max_age: float = 0.0) -> Tuple[pd.DataFrame, SyncStats]:
+        """Bring every symbol up to `end`, then return `start..end` as a
+        `yf.download(group_by='ticker')`-shaped frame for the panel engines.
+
+        Symbols synced less than `max_age` seconds ago are served from disk
+        without touching the network (UI reruns, repeated refreshes). The
+        file's mtime is the sync time, so the lease survives process restarts.
+        """
+        end = end or datetime.now()
+        stats = SyncStats()
+        now = time.time()
+        if not self.enabled:
+            fetched = self._fetch(symbols, start, end)
+            stats.cold = len(fetched)
+            stats.failed = len(symbols) - len(fetched)
+            stats.bars_fetched = sum(len(d) for d in fetched.values())
+            return self._as_download(fetched, start, end), stats
+
+        history: Dict[str, pd.DataFrame] = {}
+        cold: List[str] = []
+        by_start: Dict[pd.Timestamp, List[str]] = {}
+        for sym in symbols:
+            df = self.read(sym)
+            if df is None or df.empty or not self.covers(sym, start):
+                cold.append(sym)             # missing or shorter than the requested window
+            else:
+                history[sym] = df
+                if now - self.synced_at(sym) < max_age:
+                    stats.leased += 1
+                else:
+                    # Re-fetch from the bar before the last: it is final, so a
+                    # moved close there means re-adjustment, not a finalized partial
+                    by_start.setdefault(df.index[-2] if len(df) > 1 else df.index[-1], []).append(sym)
+
+        # Delta: one download per distinct last-stored date (usually just one)
+        for last, group in by_start.items():
+            fresh = self._fetch(group, last.to_pydatetime(), end)
+            for sym in group:
+                new = fresh.get(sym)
+                if new is None:
+                    continue
+                if self.adjusted_since(history[sym], new):
+                    cold.append(sym)
+                    stats.refetched += 1
+                    continue
+                stats.delta += 1
+                stats.bars_fetched += len(new)
+                history[sym] = self.merge(history[sym], new)
+                self.write(sym, history[sym])
+
+        # Cold: full window for new symbols and re-adjusted histories
+        if cold:
+            fresh = self._fetch(cold, start, end)
+            for sym in cold:
+                new = fresh.get(sym)
+                if new is None:
+                    stats.failed += 1        # a stale-but-consistent history beats none
+                    continue
+                if sym not in history:
+                    stats.cold += 1
+                stats.bars_fetched += len(new)
+                history[sym] = new
+                self.write(sym, new)
+                self._coverage[sym] = pd.Timestamp(start).strftime('%Y-%m-%d')
+            self._save_coverage()
+
+        return self._as_download(history, start, end), stats
+
+    def load(self, symbols: List[str], start: datetime, end: Optional[datetime] = None) -> pd.DataFrame:
+        """Stored bars only — no network. For replay and backtests."""
+        end = end or datetime.now()
+        return self._as_download({s: d for s in symbols if (d := self.read(s)) is not None}, start, end)
+
+    @staticmethod
+    def _as_download(frames: Dict[str, pd.DataFrame], start: datetime, end: datetime) -> pd.DataFrame:
+        if not frames:
+            return pd.DataFrame()
+        lo, hi = pd.Timestamp(start).normalize(), pd.Timestamp(end)
+        return pd.concat({s: d.loc[lo:hi] for s, d in frames.items()}, axis=1)
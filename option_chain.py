@@ -0,0 +1,299 @@
+"""
+    ╔══════════════════════════════════════════════════════════════════════════╗
+    ║  VAAYDO — Columnar Option Chain v1.0                                   ║
+    ║  Struct-of-arrays chain: sorted strikes, per-side NumPy columns        ║
+    ║  Hemrek Capital                                                        ║
+    ╚══════════════════════════════════════════════════════════════════════════╝
+
+An NSE chain is a table — strikes × {CE, PE} × fields — so it is stored as
+one: a sorted float64 strike axis and, per side, one float64 array per
+field aligned to it plus a `present` mask for strikes listed on that side.
+
+  • parsing is one pass per side over the decoded JSON into a contiguous
+    (field × strike) block — no per-contract Python objects
+  • strike lookup is `np.searchsorted` — O(log n)
+  • `calls` / `puts` still return `List[OptionQuote]`, built on demand, so
+    existing consumers keep working unchanged
+  • `solve_chains` inverts BSM for every quote of many chains in one Numba
+    batch and fills `iv` and the Greeks in place
+"""
+
+import time as _time
+import numpy as np
+from itertools import chain
+from operator import itemgetter
+from dataclasses import dataclass, field
+from datetime import date, datetime, time
+from typing import Dict, List, Optional
+from adaptive_engine import BSM, implied_vol_batch
+
+# (array name, NSE payload key) — order defines the parse block's columns
+PAYLOAD_FIELDS = (
+    ('ltp', 'lastPrice'), ('bid', 'bidprice'), ('ask', 'askPrice'),
+    ('bid_qty', 'bidQty'), ('ask_qty', 'askQty'), ('volume', 'totalTradedVolume'),
+    ('oi', 'openInterest'), ('iv', 'impliedVolatility'),
+    ('total_buy_qty', 'totalBuyQuantity'), ('total_sell_qty', 'totalSellQuantity'),
+)
+GREEK_FIELDS = ('delta', 'gamma', 'theta', 'vega')
+_PAYLOAD_KEYS = tuple(k for _, k in PAYLOAD_FIELDS)
+_PAYLOAD_GETTER = itemgetter(*_PAYLOAD_KEYS)
+_FIELD_INDEX = {f: j for j, (f, _) in enumerate(PAYLOAD_FIELDS)}
+_GREEK_INDEX = {g: j for j, g in enumerate(GREEK_FIELDS)}
+_LTP, _BID, _ASK = _FIELD_INDEX['ltp'], _FIELD_INDEX['bid'], _FIELD_INDEX['ask']
+EXPIRY_CLOSE = time(15, 30)    # F&O contracts expire at the close, exchange time
+YEAR_SECONDS = 365.0 * 86400   # calendar-day year, as `dte / 365` elsewhere
+
+
+@dataclass
+class OptionQuote:
+    """Rich option quote with Greeks and Liquidity mapping."""
+    instrument_token: int
+    tradingsymbol: str
+    strike: float
+    option_type: str  # CE/PE
+    expiry: date
+    last_price: float
+    bid: float
+    ask: float
+    bid_qty: int
+    ask_qty: int
+    volume: int
+    oi: int
+    iv: float = 0.0
+    delta: float = 0.0
+    gamma: float = 0.0
+    theta: float = 0.0
+    vega: float = 0.0
+    total_buy_qty: int = 0
+    total_sell_qty: int = 0
+    bid_ask_spread: float = 0.0
+    spread_pct: float = 0.0
+    liquidity_score: float = 0.0
+    is_liquid: bool = False
+
+
+class ChainSide:
+    """One side (CE or PE) of a chain: float64 columns aligned to the strike axis.
+
+    Payload fields live in one contiguous (field × strike) block; `ltp`,
+    `bid`, ... are row views into it. Greeks are allocated on first write.
+    """
+
+    __slots__ = ('present', 'block', 'greeks')
+
+    def __init__(self, present: np.ndarray, block: np.ndarray, greeks: Optional[np.ndarray] = None):
+        self.present = present                # bool — contract listed at this strike
+        self.block = block                    # (len(PAYLOAD_FIELDS), n) float64
+        self.greeks = greeks                  # (len(GREEK_FIELDS), n) float64 or None
+
+    @classmethod
+    def from_items(cls, sides: List[Optional[Dict]]) -> 'ChainSide':
+        """Payload side dicts (None/empty = not listed) → columns.
+
+        Same defaults as the legacy per-quote parser: missing bid/ask fall
+        back to LTP, every other missing number is 0.
+        """
+        n, m = len(sides), len(PAYLOAD_FIELDS)
+        present = np.fromiter(map(bool, sides), bool, n)
+        listed = [x for x in sides if x]
+        try:
+            # Complete records (the common case): one C-level tuple per contract
+            flat = chain.from_iterable(map(_PAYLOAD_GETTER, listed))
+            rows = np.fromiter(flat, np.float64, len(listed) * m)
+        except (KeyError, TypeError):
+            flat = chain.from_iterable((x.get(k, np.nan) for k in _PAYLOAD_KEYS) for x in listed)
+            rows = np.fromiter((np.nan if v is None else v for v in flat), np.float64, len(listed) * m)
+        block = np.zeros((m, n))
+        block[:, present] = rows.reshape(len(listed), m).T
+        for j in (_BID, _ASK):
+            miss = np.isnan(block[j])
+            block[j, miss] = block[_LTP, miss]
+        np.nan_to_num(block, copy=False, nan=0.0)
+        return cls(present, block)
+
+    def take(self, idx: np.ndarray) -> 'ChainSide':
+        return ChainSide(self.present[idx], self.block[:, idx],
+                         None if self.greeks is None else self.greeks[:, idx])
+
+    def __getattr__(self, name: str) -> np.ndarray:
+        j = _FIELD_INDEX.get(name)
+        if j is not None:
+            return self.block[j]
+        j = _GREEK_INDEX.get(name)
+        if j is not None:
+            return self.greeks[j] if self.greeks is not None else np.zeros(self.block.shape[1])
+        raise AttributeError(name)
+
+    def set_greeks(self, delta: np.ndarray, gamma: np.ndarray, theta: np.ndarray, vega: np.ndarray):
+        self.greeks = np.vstack([delta, gamma, theta, vega]).astype(np.float64)
+
+    def __len__(self) -> int:
+        return self.block.shape[1]
+
+    @property
+    def mid(self) -> np.ndarray:
+        return 0.5 * (self.bid + self.ask)
+
+    def price(self) -> np.ndarray:
+        """Mid where the book is two-sided and uncrossed, else last traded."""
+        two_sided = (self.bid > 0) & (self.ask >= self.bid)
+        return np.where(two_sided, self.mid, self.ltp)
+
+    @property
+    def nbytes(self) -> int:
+        return self.present.nbytes + self.block.nbytes + (0 if self.greeks is None else self.greeks.nbytes)
+
+
+@dataclass
+class OptionChain:
+    """One underlying × one expiry, columnar. `calls`/`puts` are compatibility views."""
+    symbol: str
+    underlying_price: float
+    expiry: date
+    strikes: np.ndarray                       # sorted ascending, unique
+    ce: ChainSide
+    pe: ChainSide
+    timestamp: datetime = field(default_factory=datetime.now)
+
+    # ── Construction ──
+
+    @classmethod
+    def from_payload(cls, symbol: str, raw: List[Dict], expiry: Optional[date],
+                     underlying_price: float) -> 'OptionChain':
+        """NSE strike list (`strikePrice`, `CE`, `PE`) → columnar chain."""
+        strikes = np.array([item['strikePrice'] for item in raw], dtype=np.float64)
+        ce = ChainSide.from_items([item.get('CE') for item in raw])
+        pe = ChainSide.from_items([item.get('PE') for item in raw])
+        if (np.diff(strikes) < 0).any():
+            order = np.argsort(strikes, kind='stable')
+            strikes, ce, pe = strikes[order], ce.take(order), pe.take(order)
+        return cls(symbol, float(underlying_price), expiry or date.today(), strikes, ce, pe)
+
+    # ── Lookup ──
+
+    def side(self, option_type: str) -> ChainSide:
+        return self.ce if option_type == 'CE' else self.pe
+
+    def index(self, strike: float) -> int:
+        """Position of `strike` on the axis, or -1 if not listed."""
+        i = int(np.searchsorted(self.strikes, strike))
+        return i if i < len(self.strikes) and self.strikes[i] == strike else -1
+
+    def nearest(self, strike: float) -> int:
+        """Position of the listed strike closest to `strike`."""
+        n = len(self.strikes)
+        if n == 0:
+            return -1
+        i = int(np.searchsorted(self.strikes, strike))
+        if i == 0:
+            return 0
+        if i == n:
+            return n - 1
+        return i if self.strikes[i] - strike < strike - self.strikes[i - 1] else i - 1
+
+    def atm_index(self) -> int:
+        return self.nearest(self.underlying_price)
+
+    def years_to_expiry(self, now: Optional[datetime] = None) -> float:
+        close = datetime.combine(self.expiry, EXPIRY_CLOSE)
+        return max((close - (now or datetime.now())).total_seconds(), 0.0) / YEAR_SECONDS
+
+    def atm_iv(self) -> float:
+        """Mean of the ATM call and put IV (percent); 0 if neither is quoted."""
+        i = self.atm_index()
+        if i < 0:
+            return 0.0
+        ivs = [s.iv[i] for s in (self.ce, self.pe) if s.present[i] and s.iv[i] > 0]
+        return float(np.mean(ivs)) if ivs else 0.0
+
+    # ── Compatibility views ──
+
+    def quote(self, strike: float, option_type: str) -> Optional[OptionQuote]:
+        i = self.index(strike)
+        if i < 0 or not self.side(option_type).present[i]:
+            return None
+        return self._quote(i, option_type)
+
+    def _quote(self, i: int, option_type: str) -> OptionQuote:
+        s = self.side(option_type)
+        strike = float(self.strikes[i])
+        expiry_tag = self.expiry.strftime('%d-%b-%Y').upper() if self.expiry else ''
+        return OptionQuote(
+            instrument_token=0, tradingsymbol=f"{self.symbol}{expiry_tag}{strike}{option_type}",
+            strike=strike, option_type=option_type, expiry=self.expiry,
+            last_price=float(s.ltp[i]), bid=float(s.bid[i]), ask=float(s.ask[i]),
+            bid_qty=int(s.bid_qty[i]), ask_qty=int(s.ask_qty[i]), volume=int(s.volume[i]),
+            oi=int(s.oi[i]), iv=float(s.iv[i]),
+            delta=float(s.delta[i]), gamma=float(s.gamma[i]), theta=float(s.theta[i]), vega=float(s.vega[i]),
+            total_buy_qty=int(s.total_buy_qty[i]), total_sell_qty=int(s.total_sell_qty[i]),
+            is_liquid=True)
+
+    def _quotes(self, option_type: str) -> List[OptionQuote]:
+        return [self._quote(i, option_type) for i in np.flatnonzero(self.side(option_type).present)]
+
+    @property
+    def calls(self) -> List[OptionQuote]:
+        return self._quotes('CE')
+
+    @property
+    def puts(self) -> List[OptionQuote]:
+        return self._quotes('PE')
+
+    @property
+    def nbytes(self) -> int:
+        return self.strikes.nbytes + self.ce.nbytes + self.pe.nbytes
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# IMPLIED VOLATILITY — one batch across every quote of every chain
+# ═══════════════════════════════════════════════════════════════════════════════
+
+@dataclass
+class IVSolveStats:
+    quotes: int = 0
+    solved: int = 0
+    median_iters: float = 0.0
+    seconds: float = 0.0
+
+    def summary(self) -> str:
+        return (f"IV {self.solved}/{self.quotes} solved, median {self.median_iters:.0f} iters, "
+                f"{self.seconds * 1000:.0f} ms")
+
+def solve_chains(chains: List[OptionChain], r: float = BSM.R,
+                 now: Optional[datetime] = None) -> IVSolveStats:
+    """Invert BSM at each quote's price (see `ChainSide.price`) and fill Greeks.
+
+    Solved quotes get `iv` in percent (the payload's units); quotes outside
+    the arbitrage bounds keep the exchange IV and get zero Greeks. The
+    exchange IV seeds Newton, so a typical quote converges in 2-4 steps.
+    """
+    t0 = _time.perf_counter()
+    now = now or datetime.now()
+    parts = []
+    for ch in chains:
+        T = ch.years_to_expiry(now)
+        for side, is_call in ((ch.ce, True), (ch.pe, False)):
+            idx = np.flatnonzero(side.present)
+            parts.append((side, idx, side.price()[idx], ch.strikes[idx], side.iv[idx] / 100.0,
+                          np.full(len(idx), ch.underlying_price), np.full(len(idx), T),
+                          np.full(len(idx), is_call)))
+    stats = IVSolveStats()
+    if not parts:
+        return stats
+    price, K, guess, S, T, is_call = (np.concatenate([p[k] for p in parts]) for k in range(2, 8))
+    sigma, delta, gamma, theta, vega, iters = implied_vol_batch(price, S, K, T, r, is_call, guess)
+
+    ok = ~np.isnan(sigma)
+    at = 0
+    for side, idx, *_ in parts:
+        sl = slice(at, at + len(idx))
+        at += len(idx)
+        g = np.zeros((len(GREEK_FIELDS), len(side)))
+        g[:, idx] = np.vstack([delta[sl], gamma[sl], theta[sl], vega[sl]])
+        side.greeks = g
+        solved = ok[sl]
+        side.block[_FIELD_INDEX['iv'], idx[solved]] = sigma[sl][solved] * 100.0
+    stats.quotes, stats.solved = len(price), int(ok.sum())
+    stats.median_iters = float(np.median(iters[ok])) if ok.any() else 0.0
+    stats.seconds = _time.perf_counter() - t0
+    return stats
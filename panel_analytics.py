@@ -0,0 +1,1041 @@
+"""
+    ╔══════════════════════════════════════════════════════════════════════════╗
+    ║  VAAYDO — Panel Analytics Engine v1.0                                  ║
+    ║  Universe-wide OHLCV analytics on 2-D (date × symbol) arrays           ║
+    ║  Hemrek Capital                                                        ║
+    ╚══════════════════════════════════════════════════════════════════════════╝
+
+Vectorized replacement for the per-symbol `_compute_yf_analytics_single`
+worker. Every symbol's valid bars are right-aligned into one panel so the
+last bar of every symbol sits on the final row; rolling windows that reach
+into the NaN padding behave exactly like the shorter pandas series did.
+
+Sections:
+  §1  Panel construction — yfinance download → aligned float64 arrays
+  §2  Rolling kernels    — Numba column-parallel rolling mean / variance
+  §3  Panel analytics    — C2C/Park/GK/YZ, IVP, GARCH, TA, Kalman, CUSUM
+  §4  Shared-memory panel — one float64 block workers attach to by name
+"""
+
+import math
+import numpy as np
+import pandas as pd
+from dataclasses import dataclass
+from multiprocessing import shared_memory
+from typing import Dict, List, Optional, Tuple
+from numba import njit, prange
+
+OHLCV_FIELDS = ('Open', 'High', 'Low', 'Close', 'Volume')
+MIN_BARS = 60
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# §1  PANEL CONSTRUCTION
+# ═══════════════════════════════════════════════════════════════════════════════
+
+@dataclass
+class OHLCVPanel:
+    """Date × symbol OHLCV arrays, right-aligned on each symbol's valid closes."""
+    symbols: List[str]
+    open: np.ndarray
+    high: np.ndarray
+    low: np.ndarray
+    close: np.ndarray
+    volume: np.ndarray
+    n_bars: np.ndarray           # valid bars per symbol
+
+    @property
+    def shape(self):
+        return self.close.shape
+
+    def select(self, mask: np.ndarray) -> 'OHLCVPanel':
+        """Column subset (e.g. symbols with enough history)."""
+        idx = np.flatnonzero(mask)
+        return OHLCVPanel(
+            symbols=[self.symbols[i] for i in idx],
+            open=self.open[:, idx], high=self.high[:, idx], low=self.low[:, idx],
+            close=self.close[:, idx], volume=self.volume[:, idx],
+            n_bars=self.n_bars[idx])
+
+
+def align_panel(symbols: List[str], fields: Dict[str, np.ndarray]) -> OHLCVPanel:
+    """Drop NaN closes per symbol and right-align the survivors.
+
+    Mirrors `df.dropna(subset=['Close'])` column by column without a Python
+    loop: a stable argsort on the validity mask moves each column's valid
+    rows to the bottom in their original order.
+    """
+    close = fields['Close']
+    T = close.shape[0]
+    valid = ~np.isnan(close)
+    order = np.argsort(valid, axis=0, kind='stable')
+    n_bars = valid.sum(axis=0)
+    pad = np.arange(T)[:, None] < (T - n_bars)[None, :]
+    aligned = {}
+    for f in OHLCV_FIELDS:
+        a = np.take_along_axis(fields[f], order, axis=0)
+        a[pad] = np.nan
+        aligned[f] = a
+    return OHLCVPanel(symbols=list(symbols), open=aligned['Open'], high=aligned['High'],
+                      low=aligned['Low'], close=aligned['Close'], volume=aligned['Volume'],
+                      n_bars=n_bars)
+
+
+def panel_from_download(raw: pd.DataFrame, symbols_ns: List[str], is_multi: bool) -> OHLCVPanel:
+    """Slice a `yf.download(..., group_by='ticker')` frame into a panel."""
+    if is_multi:
+        tickers = set(raw.columns.get_level_values(0))
+        present = [s for s in symbols_ns if s in tickers]
+        fields = {f: raw.xs(f, level=1, axis=1).reindex(columns=present).to_numpy(dtype=np.float64)
+                  for f in OHLCV_FIELDS}
+    else:
+        # Flat frame: every requested symbol maps onto the same columns
+        flat = raw.copy()
+        if isinstance(flat.columns, pd.MultiIndex):
+            flat.columns = flat.columns.get_level_values(0)
+        present = list(symbols_ns)
+        fields = {f: np.repeat(flat[f].to_numpy(dtype=np.float64)[:, None], len(present), axis=1)
+                  for f in OHLCV_FIELDS}
+    return align_panel(present, fields)
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# §2  ROLLING KERNELS (Numba, column-parallel)
+# ═══════════════════════════════════════════════════════════════════════════════
+# pandas semantics: a window containing any NaN yields NaN (min_periods=window).
+
+@njit(parallel=True, cache=True)
+def rolling_mean_2d(x: np.ndarray, w: int) -> np.ndarray:
+    T, N = x.shape
+    out = np.full((T, N), np.nan)
+    for j in prange(N):
+        for t in range(w - 1, T):
+            s = 0.0
+            ok = True
+            for k in range(t - w + 1, t + 1):
+                v = x[k, j]
+                if math.isnan(v):
+                    ok = False
+                    break
+                s += v
+            if ok:
+                out[t, j] = s / w
+    return out
+
+@njit(parallel=True, cache=True)
+def rolling_var_2d(x: np.ndarray, w: int) -> np.ndarray:
+    """Sample variance (ddof=1), two-pass inside each window."""
+    T, N = x.shape
+    out = np.full((T, N), np.nan)
+    for j in prange(N):
+        for t in range(w - 1, T):
+            s = 0.0
+            ok = True
+            for k in range(t - w + 1, t + 1):
+                v = x[k, j]
+                if math.isnan(v):
+                    ok = False
+                    break
+                s += v
+            if not ok:
+                continue
+            m = s / w
+            ss = 0.0
+            for k in range(t - w + 1, t + 1):
+                dv = x[k, j] - m
+                ss += dv * dv
+            out[t, j] = ss / (w - 1)
+    return out
+
+
+def _shift(x: np.ndarray) -> np.ndarray:
+    """Row shift by one bar (pandas `.shift(1)`)."""
+    out = np.empty_like(x)
+    out[0] = np.nan
+    out[1:] = x[:-1]
+    return out
+
+def _fill0(x: np.ndarray) -> np.ndarray:
+    return np.where(np.isnan(x), 0.0, x)
+
+def _nan_if_zero(x: np.ndarray) -> np.ndarray:
+    return np.where(x == 0, np.nan, x)
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# §3  PANEL ANALYTICS
+# ═══════════════════════════════════════════════════════════════════════════════
+
+def compute_panel_analytics(panel: OHLCVPanel, lot_sizes: Optional[Dict[str, int]] = None,
+                            garch: Optional['GarchFit'] = None) -> List[Dict]:
+    """All symbols in one pass. Output rows match `_compute_yf_analytics_single`
+    (whose GARCH uses the §6 fallback constants) when `garch` is None."""
+    lot_sizes = lot_sizes or {}
+    panel = panel.select(panel.n_bars >= MIN_BARS)
+    if not panel.symbols:
+        return []
+    garch = (garch or GarchFit.default(panel.symbols)).take(panel.symbols)
+
+    O, H, L, Cl, V = panel.open, panel.high, panel.low, panel.close, panel.volume
+    T, N = Cl.shape
+    n = panel.n_bars
+    start = T - n                                   # first valid row per symbol
+    rows = np.arange(T)[:, None]
+    padding = rows < start
+    sq252 = np.sqrt(252)
+    price = Cl[-1]
+
+    with np.errstate(all='ignore'):
+        Cp = _shift(Cl)
+        lr = np.log(Cl / Cp)
+
+        # ── §3.2: Multi-Estimator Volatility ──
+        rv_c2c = np.sqrt(rolling_var_2d(lr, 20)) * sq252
+        hl = np.log(H / L)
+        rv_park = np.sqrt(rolling_mean_2d(hl ** 2, 20) / (4 * np.log(2))) * sq252
+        u = np.log(H / O); d = np.log(L / O); c = np.log(Cl / O)
+        gk_var = rolling_mean_2d(0.5 * u ** 2 - (2 * np.log(2) - 1) * c ** 2 + 0.5 * d ** 2, 20)
+        gk_pos = np.clip(gk_var, 0, None)
+        rv_gk = np.sqrt(gk_pos) * sq252
+        yz_o = rolling_var_2d(np.log(O / Cp), 20); yz_c = rolling_var_2d(c, 20)
+        k = 0.34 / (1.34 + 21 / 19)
+        yz_var = yz_o + k * yz_c + (1 - k) * gk_pos
+        rv_yz = np.sqrt(np.clip(yz_var, 0, None)) * sq252
+
+        rv_composite = (0.15 * _fill0(rv_c2c) + 0.20 * _fill0(rv_park) +
+                        0.25 * _fill0(rv_gk) + 0.40 * _fill0(rv_yz))
+        rv_composite[rows <= start] = np.nan        # C2C has no bar on a symbol's first row
+        current_rv = np.where(np.isnan(rv_composite[-1]), 0.25, rv_composite[-1])
+        current_rv = np.maximum(current_rv, 0.05)
+
+        # ── §3.3: IV Estimation with VRP ──
+        lookback = np.minimum(252, n - 1)
+        in_lb = rows >= T - lookback
+        ivp = np.sum((rv_composite <= current_rv) & in_lb, axis=0) / lookback * 100
+        ivp = np.where(lookback > 20, ivp, 50.0)
+        vrp_factor = np.where(ivp > 70, 1.08, np.where(ivp < 30, 1.18, 1.12))
+        atmiv = current_rv * vrp_factor * 100
+
+        # ── GARCH(1,1): per-symbol MLE parameters (§6) ──
+        omega, alpha, beta = garch.omega, garch.alpha, garch.beta
+        var_t = current_rv ** 2 / 252
+        for t in range(max(T - 60, 0), T):
+            r = lr[t]
+            var_t = np.where(np.isnan(r), var_t, np.maximum(omega + alpha * r ** 2 + beta * var_t, 1e-10))
+        garch_vol = np.sqrt(var_t * 252)
+
+        # ── L2: Technical Analysis ──
+        delta_c = Cl - Cp
+        gain_raw = np.where(delta_c > 0, delta_c, 0.0); gain_raw[padding] = np.nan
+        loss_raw = -np.where(delta_c < 0, delta_c, 0.0); loss_raw[padding] = np.nan
+        gain = rolling_mean_2d(gain_raw, 14)[-1]
+        loss = rolling_mean_2d(loss_raw, 14)[-1]
+        rsi = 100 - (100 / (1 + gain / _nan_if_zero(loss)))
+        rsi_val = np.where(np.isnan(rsi), 50.0, rsi)
+
+        # §4.3: ADX
+        plus_dm = np.clip(H - _shift(H), 0, None)
+        minus_dm = np.clip(-(L - _shift(L)), 0, None)
+        plus_dm = np.where(plus_dm > minus_dm, plus_dm, 0.0)
+        minus_dm = np.where(minus_dm > plus_dm, minus_dm, 0.0)
+        plus_dm[padding] = np.nan; minus_dm[padding] = np.nan
+        true_range = np.fmax(H - L, np.fmax(np.abs(H - Cp), np.abs(L - Cp)))
+        atr14 = rolling_mean_2d(true_range, 14)
+        plus_di = 100 * rolling_mean_2d(plus_dm, 14) / _nan_if_zero(atr14)
+        minus_di = 100 * rolling_mean_2d(minus_dm, 14) / _nan_if_zero(atr14)
+        dx = 100 * np.abs(plus_di - minus_di) / _nan_if_zero(plus_di + minus_di)
+        adx_val = rolling_mean_2d(dx, 14)[-1]
+        adx_val = np.where(np.isnan(adx_val), 20.0, adx_val)
+
+        atr_val = np.where(np.isnan(atr14[-1]), price * 0.02, atr14[-1])
+        ma20 = np.mean(Cl[-20:], axis=0)
+        ma50 = np.mean(Cl[-50:], axis=0)
+        ma200 = np.where(n >= 200, np.mean(Cl[-200:], axis=0) if T >= 200 else price, price)
+
+        # §5.3: Kalman Filter
+        kalman_price = price.copy()
+        kalman_var = atr_val ** 2
+        R_noise = (price * 0.01) ** 2
+        Q_proc = (price * 0.002) ** 2
+        for t in range(T - 20, T):
+            p_val = Cl[t]
+            ok = ~np.isnan(p_val)
+            pred_var = kalman_var + Q_proc
+            K_gain = pred_var / (pred_var + R_noise)
+            kalman_price = np.where(ok, kalman_price + K_gain * (p_val - kalman_price), kalman_price)
+            kalman_var = np.where(ok, (1 - K_gain) * pred_var, kalman_var)
+        kalman_trend = (price - kalman_price) / np.maximum(atr_val, 0.01)
+
+        vol_curr = np.where(np.isnan(V[-1]), 0.0, V[-1])
+        vol20 = np.mean(V[-20:], axis=0)
+
+        up = Cl[-20:] > Cp[-20:]; dn = Cl[-20:] < Cp[-20:]
+        up_v = np.sum(np.where(up, V[-20:], 0.0), axis=0)
+        dn_v = np.sum(np.where(dn, V[-20:], 0.0), axis=0)
+        pcr = np.clip(dn_v / np.maximum(up_v, 1), 0.2, 3.0)
+        pct_change = (Cl[-1] / Cl[-2] - 1) * 100
+
+        # §5.4: CUSUM
+        recent_lr = lr[-30:]
+        mu_lr = np.mean(recent_lr, axis=0)
+        sd_lr = np.maximum(np.std(recent_lr, axis=0), 1e-6)
+        cusum_pos = np.zeros(N); cusum_neg = np.zeros(N)
+        cusum_alert = np.zeros(N, dtype=bool)
+        for t in range(T - 10, T):
+            z = (lr[t] - mu_lr) / sd_lr
+            cusum_pos = np.maximum(0, cusum_pos + z - 0.5)
+            cusum_neg = np.maximum(0, cusum_neg - z - 0.5)
+            hit = (cusum_pos > 4.0) | (cusum_neg > 4.0)
+            cusum_alert |= hit
+            cusum_pos[hit] = 0; cusum_neg[hit] = 0
+
+    last_rv = {'RV_C2C': rv_c2c[-1], 'RV_Parkinson': rv_park[-1], 'RV_GK': rv_gk[-1], 'RV_YZ': rv_yz[-1]}
+    cols = {
+        'price': price, 'atmiv': atmiv, 'ivp': ivp, 'current_rv': current_rv,
+        'garch_vol': garch_vol, 'vrp_factor': vrp_factor, 'pcr': pcr,
+        'vol_curr': vol_curr, 'vol20': vol20, 'rsi': rsi_val, 'atr': atr_val,
+        'adx': adx_val, 'kalman_trend': kalman_trend, 'ma20': ma20, 'ma50': ma50,
+        'ma200': ma200, 'pct_change': pct_change, 'cusum': cusum_alert,
+    }
+    return _format_rows(panel.symbols, cols, last_rv, garch, lot_sizes)
+
+
+def _format_rows(symbols: List[str], cols: Dict[str, np.ndarray], last_rv: Dict[str, np.ndarray],
+                 garch: 'GarchFit', lot_sizes: Dict[str, int]) -> List[Dict]:
+    """Last-bar column vectors → per-symbol analytics dicts (schema & rounding)."""
+    def safe_rv(values):
+        return [round(v * 100, 2) if not np.isnan(v) else 0.0 for v in values.tolist()]
+
+    cols = {key: np.asarray(v).tolist() for key, v in cols.items()}
+    rv_cols = {key: safe_rv(v) for key, v in last_rv.items()}
+    g = garch.columns()
+
+    results = []
+    for j, sym_ns in enumerate(symbols):
+        sym = sym_ns.replace('.NS', '')
+        results.append({
+            'Instrument': sym, 'price': round(cols['price'][j], 2),
+            'ATMIV': round(cols['atmiv'][j], 2), 'IVPercentile': round(cols['ivp'][j], 1),
+            'RV_Composite': round(cols['current_rv'][j] * 100, 2),
+            'GARCH_Vol': round(cols['garch_vol'][j] * 100, 2),
+            'VRP_Factor': cols['vrp_factor'][j],
+            **g[j],
+            'PCR': round(cols['pcr'][j], 3), 'volume': cols['vol_curr'][j], 'vol20': cols['vol20'][j],
+            'rsi_daily': round(cols['rsi'][j], 2), 'atr_daily': round(cols['atr'][j], 2),
+            'adx': round(cols['adx'][j], 1), 'kalman_trend': round(cols['kalman_trend'][j], 3),
+            'ma20_daily': round(cols['ma20'][j], 2), 'ma50_daily': round(cols['ma50'][j], 2),
+            'ma200_daily': round(cols['ma200'][j], 2), '% change': round(cols['pct_change'][j], 2),
+            'CUSUM_Alert': bool(cols['cusum'][j]),
+            'lot_size': lot_sizes.get(sym, 1),
+            'RV_C2C': rv_cols['RV_C2C'][j], 'RV_Parkinson': rv_cols['RV_Parkinson'][j],
+            'RV_GK': rv_cols['RV_GK'][j], 'RV_YZ': rv_cols['RV_YZ'][j],
+        })
+    return results
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# §4  SHARED-MEMORY PANEL
+# ═══════════════════════════════════════════════════════════════════════════════
+# Loky workers used to receive a pickled copy of the download with every task.
+# The panel is now written once into a (field × date × symbol) float64 block;
+# tasks carry only a small handle and read their columns zero-copy.
+
+@dataclass(frozen=True)
+class PanelHandle:
+    """Picklable address of a shared panel: block name + symbol index."""
+    name: str
+    shape: Tuple[int, int, int]
+    symbols: Tuple[str, ...]
+    n_bars: Tuple[int, ...]
+
+class SharedOHLCVPanel:
+    """Contiguous OHLCV block in shared memory. The creator owns and unlinks it."""
+
+    def __init__(self, shm: shared_memory.SharedMemory, handle: PanelHandle, owner: bool):
+        self._shm = shm
+        self.handle = handle
+        self.owner = owner
+        self.block = np.ndarray(handle.shape, dtype=np.float64, buffer=shm.buf)
+        self._index = {s: j for j, s in enumerate(handle.symbols)}
+
+    @classmethod
+    def create(cls, panel: OHLCVPanel) -> 'SharedOHLCVPanel':
+        T, N = panel.shape
+        shape = (len(OHLCV_FIELDS), T, N)
+        shm = shared_memory.SharedMemory(create=True, size=max(int(np.prod(shape)) * 8, 8))
+        handle = PanelHandle(name=shm.name, shape=shape, symbols=tuple(panel.symbols),
+                             n_bars=tuple(int(x) for x in panel.n_bars))
+        shared = cls(shm, handle, owner=True)
+        for i, arr in enumerate((panel.open, panel.high, panel.low, panel.close, panel.volume)):
+            shared.block[i] = arr
+        return shared
+
+    @classmethod
+    def attach(cls, handle: PanelHandle) -> 'SharedOHLCVPanel':
+        # Pool workers share the creator's resource tracker, so the block
+        # outlives them and is reaped only by `unlink` (or tracker shutdown)
+        return cls(shared_memory.SharedMemory(name=handle.name), handle, owner=False)
+
+    @property
+    def symbols(self) -> Tuple[str, ...]:
+        return self.handle.symbols
+
+    def __contains__(self, symbol: str) -> bool:
+        return symbol in self._index
+
+    def frame(self, symbol: str) -> Optional[pd.DataFrame]:
+        """Valid bars of one symbol as a DataFrame view over the block."""
+        j = self._index.get(symbol)
+        if j is None:
+            return None
+        n = self.handle.n_bars[j]
+        T = self.handle.shape[1]
+        return pd.DataFrame(self.block[:, T - n:, j].T, columns=list(OHLCV_FIELDS), copy=False)
+
+    def as_panel(self) -> OHLCVPanel:
+        b = self.block
+        return OHLCVPanel(symbols=list(self.handle.symbols), open=b[0], high=b[1], low=b[2],
+                          close=b[3], volume=b[4], n_bars=np.array(self.handle.n_bars))
+
+    def close(self):
+        """Detach. Views handed out by `frame`/`as_panel` must not outlive this."""
+        self.block = None
+        self._shm.close()
+
+    def unlink(self):
+        if self.owner:
+            self._shm.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        self.unlink()
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# §5  INCREMENTAL INDICATOR STATE
+# ═══════════════════════════════════════════════════════════════════════════════
+# A refresh usually adds one bar per symbol. Instead of re-running §3 over the
+# whole history, every rolling estimator keeps a per-symbol ring of its
+# inputs plus running window sums (and NaN counts, so pandas' "any NaN in the
+# window → NaN" rule still holds); a new bar is one add and one subtract per
+# window. GARCH, Kalman and CUSUM are defined in §3 as fixed-window replays
+# seeded from the current RV/price (60/20/30 bars), so they replay their
+# short ring: cost is bounded by the window, never by history length.
+#
+# `compute_panel_analytics` stays the full-recompute path; `verify` diffs
+# the two on the same panel.
+
+RESUM_EVERY = 1024              # re-sum windows from the rings to cap float drift
+
+class _Ring:
+    """One per-bar series for N symbols: ring buffer + running window sums."""
+
+    def __init__(self, n: int, windows: Tuple[int, ...] = (), squares: bool = False, depth: int = 0):
+        self.windows = windows
+        self.cap = max(windows + (depth,)) + 2      # +2: one bar of rewind headroom
+        self.buf = np.full((self.cap, n), np.nan)
+        self.sum = {w: np.zeros(n) for w in windows}
+        self.sq = {w: np.zeros(n) for w in windows} if squares else {}
+        self.nan = {w: np.full(n, w) for w in windows}
+
+    def push(self, x: np.ndarray, cols: np.ndarray, pos: np.ndarray):
+        """Append `x` for symbols `cols`, whose next slot is `pos` (pre-increment)."""
+        x_nan = np.isnan(x)
+        a = np.where(x_nan, 0.0, x)
+        for w in self.windows:
+            leaving = self.buf[(pos - w) % self.cap, cols]
+            l_nan = np.isnan(leaving)
+            b = np.where(l_nan, 0.0, leaving)
+            self.sum[w][cols] += a - b
+            self.nan[w][cols] += x_nan.astype(np.int64) - l_nan.astype(np.int64)
+            if self.sq:
+                self.sq[w][cols] += a * a - b * b
+        self.buf[pos % self.cap, cols] = x
+
+    def pop(self, cols: np.ndarray, pos: np.ndarray):
+        """Undo the newest bar (at `pos - 1`) for symbols `cols`."""
+        p = pos - 1
+        x = self.buf[p % self.cap, cols]
+        entering = {w: self.buf[(p - w) % self.cap, cols] for w in self.windows}
+        for w in self.windows:
+            x_nan, e_nan = np.isnan(x), np.isnan(entering[w])
+            a, b = np.where(x_nan, 0.0, x), np.where(e_nan, 0.0, entering[w])
+            self.sum[w][cols] += b - a
+            self.nan[w][cols] += e_nan.astype(np.int64) - x_nan.astype(np.int64)
+            if self.sq:
+                self.sq[w][cols] += b * b - a * a
+        self.buf[p % self.cap, cols] = np.nan
+
+    def resum(self, pos: np.ndarray):
+        for w in self.windows:
+            win = self.last(w, pos)
+            self.sum[w] = np.nansum(win, axis=0)
+            self.nan[w] = np.isnan(win).sum(axis=0)
+            if self.sq:
+                self.sq[w] = np.nansum(win * win, axis=0)
+
+    def last(self, k: int, pos: np.ndarray) -> np.ndarray:
+        """(k, N) newest-last window; rows before a symbol's first bar are NaN."""
+        rows = (pos[None, :] - k + np.arange(k)[:, None]) % self.cap
+        return self.buf[rows, np.arange(self.buf.shape[1])[None, :]]
+
+    def newest(self, pos: np.ndarray, age: int = 0) -> np.ndarray:
+        return self.buf[(pos - 1 - age) % self.cap, np.arange(self.buf.shape[1])]
+
+    def mean(self, w: int) -> np.ndarray:
+        return np.where(self.nan[w] == 0, self.sum[w] / w, np.nan)
+
+    def var(self, w: int) -> np.ndarray:
+        """Sample variance (ddof=1) from running sums."""
+        v = (self.sq[w] - self.sum[w] ** 2 / w) / (w - 1)
+        return np.where(self.nan[w] == 0, np.maximum(v, 0.0), np.nan)
+
+class IndicatorState:
+    """Per-symbol streaming state for every §3 analytic. Picklable for diskcache."""
+
+    def __init__(self, symbols: List[str]):
+        N = len(symbols)
+        self.symbols = list(symbols)
+        self.n = np.zeros(N, dtype=np.int64)          # bars pushed == next ring slot
+        self.dates = np.full((3, N), -1, dtype=np.int64)   # day numbers, ring of 3
+        self._since_resum = 0
+        self.garch: Optional[GarchFit] = None
+        self.garch_n = np.zeros(N, dtype=np.int64)       # bars seen at the last fit
+        self.rings = {
+            'open': _Ring(N, depth=1), 'high': _Ring(N, depth=1), 'low': _Ring(N, depth=1),
+            'close': _Ring(N, windows=(20, 50, 200), depth=20),
+            'volume': _Ring(N, windows=(20,)),
+            'lr': _Ring(N, windows=(20,), squares=True, depth=60),
+            'hl2': _Ring(N, windows=(20,)),
+            'gk': _Ring(N, windows=(20,)),
+            'yz_o': _Ring(N, windows=(20,), squares=True),
+            'yz_c': _Ring(N, windows=(20,), squares=True),
+            'gain': _Ring(N, windows=(14,)), 'loss': _Ring(N, windows=(14,)),
+            'tr': _Ring(N, windows=(14,)),
+            'pdm': _Ring(N, windows=(14,)), 'mdm': _Ring(N, windows=(14,)),
+            'dx': _Ring(N, windows=(14,)),
+            'up_v': _Ring(N, windows=(20,)), 'dn_v': _Ring(N, windows=(20,)),
+            'comp': _Ring(N, depth=252),
+        }
+
+    # ── Construction ──
+
+    @classmethod
+    def from_download(cls, raw: pd.DataFrame, symbols_ns: List[str]) -> 'IndicatorState':
+        """Stream every bar of a `group_by='ticker'` download into a fresh state."""
+        tickers = set(raw.columns.get_level_values(0))
+        state = cls([s for s in symbols_ns if s in tickers])
+        dates, fields = state._frame_arrays(raw)
+        for r in range(len(dates)):
+            cols = np.flatnonzero(~np.isnan(fields['Close'][r]))
+            if len(cols):
+                state._push(cols, dates[r], {f: a[r, cols] for f, a in fields.items()})
+        return state
+
+    def _frame_arrays(self, raw: pd.DataFrame):
+        dates = pd.DatetimeIndex(raw.index).normalize().values.astype('datetime64[D]').astype(np.int64)
+        fields = {f: raw.xs(f, level=1, axis=1).reindex(columns=self.symbols).to_numpy(dtype=np.float64)
+                  for f in OHLCV_FIELDS}
+        return dates, fields
+
+    # ── O(1) update ──
+
+    def _window_stats(self, cols: np.ndarray):
+        """Rolling vols and DI terms at each symbol's newest bar (subset `cols`)."""
+        R = self.rings
+        sq252 = np.sqrt(252)
+        rv_c2c = np.sqrt(R['lr'].var(20)[cols]) * sq252
+        rv_park = np.sqrt(R['hl2'].mean(20)[cols] / (4 * np.log(2))) * sq252
+        gk_pos = np.clip(R['gk'].mean(20)[cols], 0, None)
+        rv_gk = np.sqrt(gk_pos) * sq252
+        k = 0.34 / (1.34 + 21 / 19)
+        yz_var = R['yz_o'].var(20)[cols] + k * R['yz_c'].var(20)[cols] + (1 - k) * gk_pos
+        rv_yz = np.sqrt(np.clip(yz_var, 0, None)) * sq252
+        return rv_c2c, rv_park, rv_gk, rv_yz
+
+    def _push(self, cols: np.ndarray, day: int, bar: Dict[str, np.ndarray]):
+        R = self.rings
+        pos = self.n[cols]
+        O, H, L, C, V = bar['Open'], bar['High'], bar['Low'], bar['Close'], bar['Volume']
+        Cp = R['close'].newest(self.n)[cols]
+        Hp = R['high'].newest(self.n)[cols]
+        Lp = R['low'].newest(self.n)[cols]
+        first = pos == 0
+
+        with np.errstate(all='ignore'):
+            c = np.log(C / O)
+            delta_c = C - Cp
+            plus_dm = np.clip(H - Hp, 0, None)
+            minus_dm = np.clip(-(L - Lp), 0, None)
+            plus_dm = np.where(plus_dm > minus_dm, plus_dm, 0.0)
+            minus_dm = np.where(minus_dm > plus_dm, minus_dm, 0.0)
+            terms = {
+                'open': O, 'high': H, 'low': L, 'close': C, 'volume': V,
+                'lr': np.log(C / Cp),
+                'hl2': np.log(H / L) ** 2,
+                'gk': 0.5 * np.log(H / O) ** 2 - (2 * np.log(2) - 1) * c ** 2 + 0.5 * np.log(L / O) ** 2,
+                'yz_o': np.log(O / Cp), 'yz_c': c,
+                'gain': np.where(delta_c > 0, delta_c, 0.0),
+                'loss': -np.where(delta_c < 0, delta_c, 0.0),
+                'tr': np.fmax(H - L, np.fmax(np.abs(H - Cp), np.abs(L - Cp))),
+                'pdm': plus_dm, 'mdm': minus_dm,
+                'up_v': np.where(C > Cp, V, 0.0), 'dn_v': np.where(C < Cp, V, 0.0),
+            }
+            for name, x in terms.items():
+                R[name].push(x, cols, pos)
+
+            # Terms that depend on this bar's window values
+            atr14 = _nan_if_zero(R['tr'].mean(14)[cols])
+            plus_di = 100 * R['pdm'].mean(14)[cols] / atr14
+            minus_di = 100 * R['mdm'].mean(14)[cols] / atr14
+            R['dx'].push(100 * np.abs(plus_di - minus_di) / _nan_if_zero(plus_di + minus_di), cols, pos)
+            rv_c2c, rv_park, rv_gk, rv_yz = self._window_stats(cols)
+            comp = (0.15 * _fill0(rv_c2c) + 0.20 * _fill0(rv_park) +
+                    0.25 * _fill0(rv_gk) + 0.40 * _fill0(rv_yz))
+            R['comp'].push(np.where(first, np.nan, comp), cols, pos)
+
+        self.dates[pos % 3, cols] = day
+        self.n[cols] += 1
+        self._since_resum += 1
+        if self._since_resum >= RESUM_EVERY:
+            for ring in R.values():
+                ring.resum(self.n)
+            self._since_resum = 0
+
+    def _pop(self, cols: np.ndarray):
+        for ring in self.rings.values():
+            ring.pop(cols, self.n[cols])
+        self.dates[(self.n[cols] - 1) % 3, cols] = -1
+        self.n[cols] -= 1
+
+    def last_dates(self) -> np.ndarray:
+        return self.dates[(self.n - 1) % 3, np.arange(len(self.symbols))]
+
+    def advance(self, raw: pd.DataFrame, tol: float = 1e-4) -> bool:
+        """Fold the bars of `raw` newer than the state into it.
+
+        The newest stored bar is popped and re-pushed from `raw` so an
+        intraday partial gets its final values. Returns False (state must be
+        rebuilt) if the symbol set changed, the download no longer reaches
+        back to the stored bar, or the prior close moved (re-adjusted prices).
+        """
+        if not isinstance(raw.columns, pd.MultiIndex):
+            return False
+        present = set(raw.columns.get_level_values(0))
+        tickers = [s for s in self.symbols if s in present]
+        if tickers != self.symbols or np.any(self.n < 2):
+            return False
+        # Only the tail from the oldest prior bar onwards is converted
+        all_cols = np.arange(len(self.symbols))
+        last = self.last_dates()
+        prior = self.dates[(self.n - 2) % 3, all_cols]
+        since = pd.Timestamp(np.datetime64(int(prior.min()), 'D'))
+        dates, fields = self._frame_arrays(raw.loc[pd.DatetimeIndex(raw.index).normalize() >= since])
+        close = fields['Close']
+        r0 = np.searchsorted(dates, last)
+        if np.any(r0 >= len(dates)) or np.any(dates[np.minimum(r0, len(dates) - 1)] != last):
+            return False
+        if np.any(np.isnan(close[r0, all_cols])):
+            return False
+
+        self._pop(all_cols)
+        prev_day = self.last_dates()
+        rp = np.searchsorted(dates, prev_day)
+        reach = (rp < len(dates)) & (dates[np.minimum(rp, len(dates) - 1)] == prev_day)
+        stored = self.rings['close'].newest(self.n)
+        fetched = close[np.minimum(rp, len(dates) - 1), all_cols]
+        with np.errstate(all='ignore'):
+            moved = reach & (np.abs(fetched / stored - 1.0) > tol)
+        if np.any(moved):
+            return False
+
+        for r in range(int(r0.min()), len(dates)):
+            cols = np.flatnonzero((r >= r0) & ~np.isnan(close[r]))
+            if len(cols):
+                self._push(cols, dates[r], {f: a[r, cols] for f, a in fields.items()})
+        return True
+
+    # ── Read-out ──
+
+    def snapshot(self, lot_sizes: Optional[Dict[str, int]] = None,
+                 symbols: Optional[List[str]] = None) -> List[Dict]:
+        """Analytics rows for symbols with ≥ MIN_BARS, same schema as §3."""
+        lot_sizes = lot_sizes or {}
+        keep = self.n >= MIN_BARS
+        if symbols is not None:
+            keep &= np.isin(np.array(self.symbols, dtype=object), list(symbols))
+        cols = np.flatnonzero(keep)
+        if not len(cols):
+            return []
+        R, n, N = self.rings, self.n[cols], len(cols)
+        pos = self.n
+
+        with np.errstate(all='ignore'):
+            price = R['close'].newest(pos)[cols]
+            rv_c2c, rv_park, rv_gk, rv_yz = self._window_stats(cols)
+            comp_now = R['comp'].newest(pos)[cols]
+            current_rv = np.maximum(np.where(np.isnan(comp_now), 0.25, comp_now), 0.05)
+
+            lookback = np.minimum(252, n - 1)
+            comp_win = R['comp'].last(252, pos)[:, cols]
+            in_lb = np.arange(252)[:, None] >= 252 - lookback[None, :]
+            ivp = np.sum((comp_win <= current_rv) & in_lb, axis=0) / lookback * 100
+            ivp = np.where(lookback > 20, ivp, 50.0)
+            vrp_factor = np.where(ivp > 70, 1.08, np.where(ivp < 30, 1.18, 1.12))
+            atmiv = current_rv * vrp_factor * 100
+
+            symbols = [self.symbols[j] for j in cols]
+            garch = (self.garch or GarchFit.default(symbols)).take(symbols)
+            omega, alpha, beta = garch.omega, garch.alpha, garch.beta
+            var_t = current_rv ** 2 / 252
+            for r in R['lr'].last(60, pos)[:, cols]:
+                var_t = np.where(np.isnan(r), var_t, np.maximum(omega + alpha * r ** 2 + beta * var_t, 1e-10))
+            garch_vol = np.sqrt(var_t * 252)
+
+            gain, loss = R['gain'].mean(14)[cols], R['loss'].mean(14)[cols]
+            rsi = 100 - (100 / (1 + gain / _nan_if_zero(loss)))
+            rsi_val = np.where(np.isnan(rsi), 50.0, rsi)
+            adx_val = R['dx'].mean(14)[cols]
+            adx_val = np.where(np.isnan(adx_val), 20.0, adx_val)
+            atr14 = R['tr'].mean(14)[cols]
+            atr_val = np.where(np.isnan(atr14), price * 0.02, atr14)
+
+            ma20 = R['close'].mean(20)[cols]
+            ma50 = R['close'].mean(50)[cols]
+            ma200 = np.where(n >= 200, R['close'].mean(200)[cols], price)
+
+            kalman_price = price.copy()
+            kalman_var = atr_val ** 2
+            R_noise = (price * 0.01) ** 2
+            Q_proc = (price * 0.002) ** 2
+            for p_val in R['close'].last(20, pos)[:, cols]:
+                ok = ~np.isnan(p_val)
+                pred_var = kalman_var + Q_proc
+                K_gain = pred_var / (pred_var + R_noise)
+                kalman_price = np.where(ok, kalman_price + K_gain * (p_val - kalman_price), kalman_price)
+                kalman_var = np.where(ok, (1 - K_gain) * pred_var, kalman_var)
+            kalman_trend = (price - kalman_price) / np.maximum(atr_val, 0.01)
+
+            V_now = R['volume'].newest(pos)[cols]
+            vol_curr = np.where(np.isnan(V_now), 0.0, V_now)
+            vol20 = R['volume'].mean(20)[cols]
+            up_v = np.where(R['up_v'].nan[20][cols] == 0, R['up_v'].sum[20][cols], np.nan)
+            dn_v = np.where(R['dn_v'].nan[20][cols] == 0, R['dn_v'].sum[20][cols], np.nan)
+            pcr = np.clip(dn_v / np.maximum(up_v, 1), 0.2, 3.0)
+            pct_change = (price / R['close'].newest(pos, age=1)[cols] - 1) * 100
+
+            recent_lr = R['lr'].last(30, pos)[:, cols]
+            mu_lr = np.mean(recent_lr, axis=0)
+            sd_lr = np.maximum(np.std(recent_lr, axis=0), 1e-6)
+            cusum_pos = np.zeros(N); cusum_neg = np.zeros(N)
+            cusum_alert = np.zeros(N, dtype=bool)
+            for r in recent_lr[-10:]:
+                z = (r - mu_lr) / sd_lr
+                cusum_pos = np.maximum(0, cusum_pos + z - 0.5)
+                cusum_neg = np.maximum(0, cusum_neg - z - 0.5)
+                hit = (cusum_pos > 4.0) | (cusum_neg > 4.0)
+                cusum_alert |= hit
+                cusum_pos[hit] = 0; cusum_neg[hit] = 0
+
+        last_rv = {'RV_C2C': rv_c2c, 'RV_Parkinson': rv_park, 'RV_GK': rv_gk, 'RV_YZ': rv_yz}
+        out = {
+            'price': price, 'atmiv': atmiv, 'ivp': ivp, 'current_rv': current_rv,
+            'garch_vol': garch_vol, 'vrp_factor': vrp_factor, 'pcr': pcr,
+            'vol_curr': vol_curr, 'vol20': vol20, 'rsi': rsi_val, 'atr': atr_val,
+            'adx': adx_val, 'kalman_trend': kalman_trend, 'ma20': ma20, 'ma50': ma50,
+            'ma200': ma200, 'pct_change': pct_change, 'cusum': cusum_alert,
+        }
+        return _format_rows(symbols, out, last_rv, garch, lot_sizes)
+
+    def set_garch(self, fit: 'GarchFit'):
+        """Merge fresh fits; refitted symbols restart their GARCH age."""
+        self.garch = fit if self.garch is None else self.garch.merge(fit)
+        index = {s: j for j, s in enumerate(self.symbols)}
+        cols = [index[s] for s in fit.symbols if s in index]
+        self.garch_n[cols] = self.n[cols]
+
+    def garch_stale(self, symbols: Optional[List[str]] = None) -> List[str]:
+        """Symbols never fitted or ≥ GARCH_REFIT_BARS bars past their last fit."""
+        fitted = set(self.garch.symbols) if self.garch is not None else set()
+        want = set(symbols) if symbols is not None else None
+        return [s for j, s in enumerate(self.symbols)
+                if (want is None or s in want)
+                and (s not in fitted or self.n[j] - self.garch_n[j] >= GARCH_REFIT_BARS)]
+
+    def verify(self, raw: pd.DataFrame, lot_sizes: Optional[Dict[str, int]] = None) -> Dict[str, float]:
+        """Full-recompute check: max |Δ| per field between this state and §3."""
+        ref = compute_panel_analytics(panel_from_download(raw, self.symbols, True), lot_sizes, self.garch)
+        got = {r['Instrument']: r for r in self.snapshot(lot_sizes)}
+        diffs: Dict[str, float] = {}
+        for row in ref:
+            other = got.get(row['Instrument'])
+            if other is None:
+                diffs['missing'] = diffs.get('missing', 0) + 1
+                continue
+            for key, v in row.items():
+                if isinstance(v, str):
+                    continue
+                a, b = float(v), float(other[key])
+                d = 0.0 if (np.isnan(a) and np.isnan(b)) else abs(a - b)
+                diffs[key] = max(diffs.get(key, 0.0), d)
+        return diffs
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# §6  GARCH(1,1) MAXIMUM LIKELIHOOD (Numba, symbol-parallel)
+# ═══════════════════════════════════════════════════════════════════════════════
+# Gaussian quasi-MLE of h_t = ω + α·r²_{t-1} + β·h_{t-1} on demeaned log
+# returns, one Nelder–Mead per symbol inside a single prange batch. The
+# search runs on unconstrained θ = (log ω/σ², logit(α+β), logit(α/(α+β))),
+# so positivity and stationarity hold by construction. The simplex restarts
+# at its optimum until the likelihood stops improving; warm starts reuse the
+# previous fit with a tighter simplex. A symbol falls back to the legacy
+# constants if it has too few returns or the search does not converge.
+
+GARCH_DEFAULT = (0.000005, 0.10, 0.85)      # ω, α, β — legacy fixed parameters
+GARCH_MIN_OBS = 100
+GARCH_MAX_ITER = 400
+GARCH_RESTARTS = 4
+GARCH_REFIT_BARS = 1                        # refit once per new daily bar, not per intraday refresh
+
+@njit(cache=True)
+def _garch_unpack(theta, var0):
+    p = 1.0 / (1.0 + math.exp(-theta[1]))
+    s = 1.0 / (1.0 + math.exp(-theta[2]))
+    return math.exp(theta[0]) * var0, p * s, p * (1.0 - s)
+
+@njit(cache=True)
+def _garch_pack(omega, alpha, beta, var0):
+    p = min(max(alpha + beta, 1e-4), 0.9999)
+    s = min(max(alpha / p, 1e-4), 0.9999)
+    theta = np.empty(3)
+    theta[0] = math.log(max(omega, 1e-20) / var0)
+    theta[1] = math.log(p / (1.0 - p))
+    theta[2] = math.log(s / (1.0 - s))
+    return theta
+
+@njit(cache=True)
+def _garch_nll(theta, x, n, var0):
+    omega, a, b = _garch_unpack(theta, var0)
+    h = var0
+    nll = 0.0
+    for t in range(n):
+        if t > 0:
+            h = omega + a * x[t - 1] * x[t - 1] + b * h
+        if h < 1e-20:
+            h = 1e-20
+        nll += math.log(h) + x[t] * x[t] / h
+    return 0.5 * nll
+
+@njit(cache=True)
+def _garch_nelder_mead(x, n, var0, theta0, step, max_iter):
+    """Standard NM (reflect 1, expand 2, contract ½, shrink ½) in 3-D.
+
+    Stops on the relative spread of the simplex values (Numerical Recipes
+    criterion): flat likelihood directions, e.g. α/β split when α ≈ 0, need
+    not pin θ down to count as converged.
+    """
+    ftol = 1e-10
+    S = np.empty((4, 3))
+    f = np.empty(4)
+    for i in range(4):
+        S[i] = theta0
+        if i > 0:
+            S[i, i - 1] += step
+        f[i] = _garch_nll(S[i], x, n, var0)
+    it = 0
+    converged = False
+    while it < max_iter:
+        order = np.argsort(f)
+        S = S[order]
+        f = f[order]
+        if 2.0 * abs(f[3] - f[0]) <= ftol * (abs(f[3]) + abs(f[0]) + 1e-20):
+            converged = True
+            break
+        it += 1
+        c = (S[0] + S[1] + S[2]) / 3.0
+        xr = c + (c - S[3]); fr = _garch_nll(xr, x, n, var0)
+        if fr < f[0]:
+            xe = c + 2.0 * (c - S[3]); fe = _garch_nll(xe, x, n, var0)
+            if fe < fr:
+                S[3] = xe; f[3] = fe
+            else:
+                S[3] = xr; f[3] = fr
+        elif fr < f[2]:
+            S[3] = xr; f[3] = fr
+        else:
+            if fr < f[3]:
+                xc = c + 0.5 * (xr - c)
+            else:
+                xc = c + 0.5 * (S[3] - c)
+            fc = _garch_nll(xc, x, n, var0)
+            if fc < min(fr, f[3]):
+                S[3] = xc; f[3] = fc
+            else:
+                for i in range(1, 4):
+                    S[i] = S[0] + 0.5 * (S[i] - S[0])
+                    f[i] = _garch_nll(S[i], x, n, var0)
+    best = np.argmin(f)
+    return S[best].copy(), f[best], it, converged
+
+@njit(cache=True)
+def _garch_search(x, n, var0, theta0, step, max_iter):
+    """NM, restarted at its optimum until the likelihood stops improving."""
+    th, fbest, it, ok = _garch_nelder_mead(x, n, var0, theta0, step, max_iter)
+    for _ in range(GARCH_RESTARTS):
+        if not ok or it >= max_iter:
+            break
+        th2, f2, it2, ok = _garch_nelder_mead(x, n, var0, th, 0.25 * step, max_iter - it)
+        it += it2
+        improved = fbest - f2 > 1e-7 * abs(fbest)
+        if f2 < fbest:
+            th, fbest = th2, f2
+        if not improved:
+            break
+    return th, fbest, it, ok
+
+@njit(parallel=True, cache=True)
+def garch_mle_batch(r: np.ndarray, warm: np.ndarray, warm_ok: np.ndarray, max_iter: int):
+    """Fit every column of `r` (T × N log returns, NaN = no bar).
+
+    Returns params (N×3: ω, α, β), log-likelihood, iterations, converged
+    flag and observation count per symbol.
+    """
+    T, N = r.shape
+    params = np.full((N, 3), np.nan)
+    loglik = np.full(N, np.nan)
+    iters = np.zeros(N, dtype=np.int64)
+    conv = np.zeros(N, dtype=np.bool_)
+    nobs = np.zeros(N, dtype=np.int64)
+    for j in prange(N):
+        x = np.empty(T)
+        n = 0
+        s = 0.0
+        for t in range(T):
+            v = r[t, j]
+            if not math.isnan(v):
+                x[n] = v
+                s += v
+                n += 1
+        nobs[j] = n
+        if n < 10:
+            continue
+        mu = s / n
+        var0 = 0.0
+        for t in range(n):
+            x[t] -= mu
+            var0 += x[t] * x[t]
+        var0 /= n
+        if var0 <= 0.0:
+            continue
+        if warm_ok[j]:
+            th, fbest, it, ok = _garch_search(x, n, var0, _garch_pack(warm[j, 0], warm[j, 1], warm[j, 2], var0),
+                                              0.1, max_iter)
+        else:
+            # Cold: a high- and a low-persistence seed, keep the better optimum
+            th, fbest, it, ok = _garch_search(x, n, var0, _garch_pack(var0 * 0.05, 0.10, 0.85, var0),
+                                              0.5, max_iter)
+            th2, f2, it2, ok2 = _garch_search(x, n, var0, _garch_pack(var0 * 0.45, 0.05, 0.50, var0),
+                                              0.5, max_iter)
+            it += it2
+            if f2 < fbest:
+                th, fbest, ok = th2, f2, ok2
+        omega, a, b = _garch_unpack(th, var0)
+        params[j, 0] = omega; params[j, 1] = a; params[j, 2] = b
+        loglik[j] = -fbest - 0.5 * n * math.log(2.0 * math.pi)
+        iters[j] = it
+        conv[j] = ok
+    return params, loglik, iters, conv, nobs
+
+@dataclass
+class GarchFit:
+    """Per-symbol GARCH(1,1) parameters with convergence diagnostics."""
+    symbols: List[str]
+    omega: np.ndarray
+    alpha: np.ndarray
+    beta: np.ndarray
+    loglik: np.ndarray
+    iters: np.ndarray
+    converged: np.ndarray
+    fallback: np.ndarray
+
+    @property
+    def persistence(self) -> np.ndarray:
+        return self.alpha + self.beta
+
+    @property
+    def half_life(self) -> np.ndarray:
+        p = self.persistence
+        with np.errstate(all='ignore'):
+            hl = -np.log(2) / np.log(np.maximum(p, 0.001))
+        return np.where(p < 1, np.minimum(hl, 999.0), 999.0)
+
+    @classmethod
+    def default(cls, symbols: List[str]) -> 'GarchFit':
+        N = len(symbols)
+        omega, alpha, beta = GARCH_DEFAULT
+        return cls(symbols=list(symbols), omega=np.full(N, omega), alpha=np.full(N, alpha),
+                   beta=np.full(N, beta), loglik=np.full(N, np.nan), iters=np.zeros(N, dtype=np.int64),
+                   converged=np.zeros(N, dtype=bool), fallback=np.ones(N, dtype=bool))
+
+    def take(self, symbols: List[str]) -> 'GarchFit':
+        """Re-index to `symbols`; unknown symbols get the fallback constants."""
+        index = {s: i for i, s in enumerate(self.symbols)}
+        out = GarchFit.default(symbols)
+        for j, s in enumerate(symbols):
+            i = index.get(s)
+            if i is None:
+                continue
+            for f in ('omega', 'alpha', 'beta', 'loglik', 'iters', 'converged', 'fallback'):
+                getattr(out, f)[j] = getattr(self, f)[i]
+        return out
+
+    def merge(self, other: 'GarchFit') -> 'GarchFit':
+        """Union by symbol; `other` wins where both have a fit."""
+        fresh = set(other.symbols)
+        symbols = [s for s in self.symbols if s not in fresh] + list(other.symbols)
+        old = self.take([s for s in self.symbols if s not in fresh])
+        return GarchFit(symbols=symbols, **{f: np.concatenate([getattr(old, f), getattr(other, f)])
+                                           for f in ('omega', 'alpha', 'beta', 'loglik', 'iters',
+                                                     'converged', 'fallback')})
+
+    def columns(self) -> List[Dict]:
+        """Analytics-frame fields per symbol: persistence, half-life, diagnostics."""
+        p, hl = self.persistence.tolist(), self.half_life.tolist()
+        ll, it = self.loglik.tolist(), self.iters.tolist()
+        return [{'GARCH_Persistence': round(p[j], 3), 'GARCH_HalfLife': round(hl[j], 1),
+                 'GARCH_LogLik': round(ll[j], 2), 'GARCH_Iters': it[j],
+                 'GARCH_Converged': bool(self.converged[j]), 'GARCH_Fallback': bool(self.fallback[j])}
+                for j in range(len(self.symbols))]
+
+    def params(self) -> Dict[str, Tuple[float, float, float]]:
+        """Converged fits only — the warm-start cache for the next run."""
+        return {s: (float(self.omega[i]), float(self.alpha[i]), float(self.beta[i]))
+                for i, s in enumerate(self.symbols) if not self.fallback[i]}
+
+    def summary(self) -> str:
+        n = len(self.symbols)
+        return f"GARCH {n - int(self.fallback.sum())}/{n} fitted, median {int(np.median(self.iters)) if n else 0} iters"
+
+def fit_garch_panel(panel: OHLCVPanel, warm: Optional[Dict[str, Tuple[float, float, float]]] = None,
+                    max_iter: int = GARCH_MAX_ITER) -> GarchFit:
+    """Batch MLE over every symbol's log returns in the panel."""
+    warm = warm or {}
+    N = len(panel.symbols)
+    with np.errstate(all='ignore'):
+        r = np.log(panel.close / _shift(panel.close))
+    w = np.zeros((N, 3)); w_ok = np.zeros(N, dtype=np.bool_)
+    for j, s in enumerate(panel.symbols):
+        if s in warm:
+            w[j] = warm[s]; w_ok[j] = True
+    params, loglik, iters, conv, nobs = garch_mle_batch(np.ascontiguousarray(r), w, w_ok, max_iter)
+    fallback = ~conv | (nobs < GARCH_MIN_OBS) | ~np.all(np.isfinite(params), axis=1)
+    omega, alpha, beta = GARCH_DEFAULT
+    return GarchFit(symbols=list(panel.symbols),
+                    omega=np.where(fallback, omega, params[:, 0]),
+                    alpha=np.where(fallback, alpha, params[:, 1]),
+                    beta=np.where(fallback, beta, params[:, 2]),
+                    loglik=loglik, iters=iters, converged=conv, fallback=fallback)
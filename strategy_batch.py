@@ -0,0 +1,652 @@
+"""
+    ╔══════════════════════════════════════════════════════════════════════════╗
+    ║  VAAYDO — Batched Strategy Scoring v1.0                                ║
+    ║  Every stock × strategy candidate built, priced and scored as arrays   ║
+    ║  Hemrek Capital                                                        ║
+    ╚══════════════════════════════════════════════════════════════════════════╝
+
+The universe scan used to call `score_strategy` once per (stock, strategy):
+14 × N Python calls, each pricing a handful of legs, drawing its own 20k
+Monte Carlo paths and walking the adaptive scoring tail one scalar at a
+time. Here the same construction rules run column-wise:
+
+  Build  — `evaluate` turns any `strategy_specs.StrategySpec` into strike
+           columns (delta-targeted gaps, the 3-step premium tightening as
+           masks), prices legs off the vol surface and applies the spec's
+           formulas and rejection rule for every viable stock at once.
+  Price  — BSM prices, prob-OTM and net Greeks in `prange` kernels.
+  Sim    — one kernel simulates every candidate. Each underlying draws
+           its antithetic normals once (seeded by symbol, so results are
+           reproducible) and all of its strategies are valued on the same
+           terminal prices — common random numbers, so best-vs-alternate
+           comparisons are not swamped by independent noise. P&L reduces to
+           PoP / EV / σ; legs that outlive the horizon (calendar back month)
+           are revalued with BSM on every path.
+  Score  — cost scrub, ensemble fusion, conviction and Kelly as array
+           twins of the scalar `AdaptiveEngine` calls.
+
+`score_strategies` in app.py (Deep Analysis) is a
+one-stock call into the same path, so both report identical candidates.
+"""
+
+import math
+import zlib
+import numpy as np
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence
+from numba import njit, prange
+
+from adaptive_engine import (
+    BSM, Greeks, AdaptiveGating, AdaptiveStrikes, CostScrub, AdaptiveEnsemble, ComputeTriage,
+    STRATEGY_STRUCTURE, RegimeBatch,
+    MC_DRIFT, bsm_price_numba, bsm_all_numba, bsm_prob_otm_numba, lognormal_pnl_stats,
+)
+from strategy_specs import STRATEGY_SPECS, StrategySpec, FRONT, BACK
+
+MAX_LEGS = 4
+MC_PAIRS = 10_000              # cap on antithetic pairs per candidate (20k paths), as MC.analyze
+MIN_VIABILITY = 0.05           # below this a (stock, strategy) pair is not built
+QUAD_NODES = 401               # uniform z-grid on ±8σ for EV / σ of BSM-screened candidates
+GAP_BREAKS = np.array([50, 250, 500, 1000, 2500, 5000, 10000], dtype=np.float64)
+GAP_SIZES = np.array([0.5, 2.5, 5, 10, 25, 50, 100, 500], dtype=np.float64)
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# §1  KERNELS
+# ═══════════════════════════════════════════════════════════════════════════════
+
+@njit(parallel=True, cache=True)
+def price_batch(S, K, T, r, sigma, is_call):
+    out = np.empty(len(K))
+    for i in prange(len(K)):
+        out[i] = bsm_price_numba(S[i], K[i], T[i], r, sigma[i], is_call)
+    return out
+
+@njit(parallel=True, cache=True)
+def prob_otm_batch(S, K, T, r, sigma, is_call):
+    """`BSM.prob_otm` per row."""
+    out = np.empty(len(K))
+    for i in prange(len(K)):
+        out[i] = bsm_prob_otm_numba(S[i], K[i], T[i], r, sigma[i], is_call)
+    return out
+
+@njit(parallel=True, cache=True)
+def net_greeks_batch(S, T, r, K, is_call, qty, sigma, n_legs):
+    """Σ qty·Greeks per candidate at each leg's own expiry `T[p, j]`, columns
+    in `Greeks` field order."""
+    P = len(S)
+    out = np.zeros((P, 9))
+    for p in prange(P):
+        for j in range(n_legs[p]):
+            greeks = bsm_all_numba(S[p], K[p, j], T[p, j], r, sigma[p, j], is_call[p, j])
+            for k in range(9):
+                out[p, k] += greeks[k + 1] * qty[p, j]
+    return out
+
+@njit(parallel=True, cache=True)
+def simulate_pairs(S, sigma, H, r, K, is_call, qty, prem, rem, rsig, n_legs, start, seed,
+                   budget, batch, pop_se, ev_se):
+    """Sequential PoP / EV / σ of each candidate's P&L on antithetic terminal prices.
+
+    Candidates are grouped by underlying (`start` offsets, one `seed` each):
+    a stock draws its normals once and every strategy on it is valued on
+    them (common random numbers), with terminal prices built lazily once per
+    distinct (σ, horizon H). Each candidate consumes `batch` pairs at a time
+    until the PoP standard error is under `pop_se` and the EV's under
+    `ev_se[p]`, or its `budget[p]` pairs are spent. Leg value at H is
+    intrinsic, or BSM with `rem` years left at `rsig` for legs that outlive
+    the horizon; P&L = Σ qty·(value − premium). Returns pop, ev, σ, paths.
+    """
+    P = len(S)
+    pop = np.empty(P); ev = np.empty(P); sd = np.empty(P); paths = np.zeros(P, dtype=np.int64)
+    for b in prange(len(start) - 1):
+        lo, hi = start[b], start[b + 1]
+        n = 0
+        for p in range(lo, hi):
+            n = max(n, budget[p])
+        np.random.seed(seed[b])
+        z = np.random.standard_normal(n)
+        g_sig = np.empty(hi - lo); g_H = np.empty(hi - lo); filled = np.zeros(hi - lo, dtype=np.int64)
+        term = np.empty((hi - lo, 2 * n))
+        n_g = 0
+        for p in range(lo, hi):
+            g = -1
+            for k in range(n_g):
+                if g_sig[k] == sigma[p] and g_H[k] == H[p]:
+                    g = k
+                    break
+            if g < 0:
+                g = n_g; n_g += 1
+                g_sig[g] = sigma[p]; g_H[g] = H[p]
+            drift, vol = 0.0, 0.0
+            if H[p] > 0 and sigma[p] > 0:
+                drift = (MC_DRIFT - 0.5 * sigma[p] ** 2) * H[p]
+                vol = sigma[p] * math.sqrt(H[p])
+            done, wins, m, m2 = 0, 0, 0.0, 0.0
+            while done < budget[p]:
+                end = min(done + batch, budget[p])
+                for i in range(filled[g], end):
+                    term[g, 2 * i] = S[p] * math.exp(drift + vol * z[i])
+                    term[g, 2 * i + 1] = S[p] * math.exp(drift - vol * z[i])
+                filled[g] = max(filled[g], end)
+                for i in range(2 * done, 2 * end):
+                    st = term[g, i]
+                    v = 0.0
+                    for j in range(n_legs[p]):
+                        if rem[p, j] > 0:
+                            x = bsm_price_numba(st, K[p, j], rem[p, j], r, rsig[p, j], is_call[p, j])
+                        elif is_call[p, j]:
+                            x = max(st - K[p, j], 0.0)
+                        else:
+                            x = max(K[p, j] - st, 0.0)
+                        v += qty[p, j] * (x - prem[p, j])
+                    if v > 0:
+                        wins += 1
+                    # Welford running mean / M2
+                    d = v - m
+                    m += d / (i + 1)
+                    m2 += d * (v - m)
+                done = end
+                cnt = 2 * done
+                q = wins / cnt
+                if (math.sqrt(max(q * (1 - q), 1e-4) / cnt) <= pop_se
+                        and math.sqrt(m2 / cnt) / math.sqrt(cnt) <= ev_se[p]):
+                    break
+            cnt = 2 * done
+            pop[p] = wins / cnt; ev[p] = m; sd[p] = math.sqrt(m2 / cnt); paths[p] = cnt
+    return pop, ev, sd, paths
+
+@njit(parallel=True, cache=True)
+def analytic_pairs(S, sigma, H, K, is_call, qty, prem, n_legs):
+    """Closed-form PoP / EV / σ (`lognormal_pnl_stats`) for candidates whose legs
+    all expire at the horizon."""
+    P = len(S)
+    pop = np.empty(P); ev = np.empty(P); sd = np.empty(P)
+    for p in prange(P):
+        pop[p], ev[p], sd[p] = lognormal_pnl_stats(S[p], sigma[p], H[p], K[p], is_call[p], qty[p], prem[p], n_legs[p])
+    return pop, ev, sd
+
+@njit(parallel=True, cache=True)
+def quadrature_pairs(S, sigma, H, r, K, is_call, qty, prem, rem, rsig, n_legs, z, w):
+    """EV / σ of each candidate's P&L at the horizon by quadrature over the
+    terminal price (`z`, `w`: standard-normal nodes and weights summing to 1,
+    same GBM as `simulate_pairs`). Legs that outlive the horizon are
+    BSM-valued, so this covers calendars where `analytic_pairs` cannot. A
+    uniform grid rather than Gauss–Hermite: the payoff kinks at the strikes."""
+    P = len(S)
+    ev = np.empty(P); sd = np.empty(P)
+    for p in prange(P):
+        drift, vol = 0.0, 0.0
+        if H[p] > 0 and sigma[p] > 0:
+            drift = (MC_DRIFT - 0.5 * sigma[p] ** 2) * H[p]
+            vol = sigma[p] * math.sqrt(H[p])
+        m, m2 = 0.0, 0.0
+        for i in range(len(z)):
+            st = S[p] * math.exp(drift + vol * z[i])
+            v = 0.0
+            for j in range(n_legs[p]):
+                if rem[p, j] > 0:
+                    x = bsm_price_numba(st, K[p, j], rem[p, j], r, rsig[p, j], is_call[p, j])
+                elif is_call[p, j]:
+                    x = max(st - K[p, j], 0.0)
+                else:
+                    x = max(K[p, j] - st, 0.0)
+                v += qty[p, j] * (x - prem[p, j])
+            m += w[i] * v
+            m2 += w[i] * v * v
+        ev[p] = m; sd[p] = math.sqrt(max(m2 - m * m, 0.0))
+    return ev, sd
+
+_QUAD_Z = np.linspace(-8.0, 8.0, QUAD_NODES)
+_QUAD_W = np.exp(-0.5 * _QUAD_Z ** 2)
+_QUAD_W /= _QUAD_W.sum()
+
+@njit(cache=True)
+def best_two(stock, score, n_stocks):
+    """Best and runner-up candidate per stock, scanning in (stock, strategy)
+    order with the scalar loop's strict `>` tie-break; −1 where none."""
+    best = np.full(n_stocks, -1); alt = np.full(n_stocks, -1)
+    for p in range(len(stock)):
+        s = stock[p]
+        if best[s] < 0 or score[p] > score[best[s]]:
+            alt[s] = best[s]; best[s] = p
+        elif alt[s] < 0 or score[p] > score[alt[s]]:
+            alt[s] = p
+    return best, alt
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# §2  UNIVERSE INPUTS
+# ═══════════════════════════════════════════════════════════════════════════════
+
+def strike_gap(S: np.ndarray) -> np.ndarray:
+    """NSE strike interval per price (`auto_gap`)."""
+    return GAP_SIZES[np.searchsorted(GAP_BREAKS, S, side='left')]
+
+def span_margin(S: np.ndarray, iv: np.ndarray, dte: int = 30) -> np.ndarray:
+    t_factor = max(dte, 1) / 365
+    return np.maximum(S * 0.12, S * iv * np.sqrt(t_factor) * 2.5)
+
+
+@dataclass
+class UniverseBatch:
+    """Per-stock inputs for one scan: spot, flat ATM IV, simulation σ, strike
+    grid, regime fields and (optionally) the packed vol surfaces."""
+    symbols: List[str]
+    S: np.ndarray
+    iv: np.ndarray
+    ivp: np.ndarray
+    sim_vol: np.ndarray
+    trend_up: np.ndarray           # UP / STRONG UP / NEUTRAL trend (Ratio PoP prior)
+    iv_rank: np.ndarray
+    entropy: np.ndarray
+    transition: np.ndarray
+    stability: np.ndarray
+    dte: int
+    surfaces: object = None        # vol_surface.SurfacePack
+
+    def __post_init__(self):
+        self.T = self.dte / 365
+        self.g = strike_gap(self.S)
+        self.min_wing = np.maximum(self.g, 1)
+        self.min_prem = AdaptiveGating.min_premium_batch(self.S, self.dte)
+        self.valid = np.isfinite(self.ivp)
+        self._gaps: Dict[str, np.ndarray] = {}
+
+    @classmethod
+    def from_rows(cls, rows: Sequence[dict], regimes: Sequence, trend_up: Sequence[bool],
+                  dte: int, surfaces=None) -> 'UniverseBatch':
+        """From analytics rows (`price`/`ATMIV` > 0) and their regimes (a
+        `RegimeBatch` or `RegimeState`s); `surfaces` is a `SurfaceStore` to
+        pack fresh surfaces from."""
+        rb = RegimeBatch.from_states(regimes)
+        S = np.array([rd['price'] for rd in rows], dtype=np.float64)
+        iv = np.array([rd['ATMIV'] for rd in rows], dtype=np.float64) / 100
+        rv = np.array([rd.get('RV_Composite', v * 100) for rd, v in zip(rows, iv)], dtype=np.float64)
+        garch = np.array([rd.get('GARCH_Vol', v * 100) for rd, v in zip(rows, iv)], dtype=np.float64)
+        # VRP: simulate at realized vol capped by IV — NaN inputs fall through like min/max do
+        s = np.where(garch > rv, garch, rv) / 100 * 1.05
+        sim_vol = np.where(s < iv, s, iv)
+        symbols = [rd.get('Instrument', '') for rd in rows]
+        return cls(symbols=symbols, S=S, iv=iv,
+                   ivp=np.array([rd.get('IVPercentile', 50) for rd in rows], dtype=np.float64),
+                   sim_vol=sim_vol, trend_up=np.asarray(trend_up, dtype=bool),
+                   iv_rank=rb.iv_regime_rank, entropy=rb.entropy,
+                   transition=rb.transition_risk, stability=rb.stability,
+                   dte=dte, surfaces=surfaces.pack(symbols, S, iv) if surfaces is not None else None)
+
+    def __len__(self):
+        return len(self.S)
+
+    # ── Column helpers (r = row indices of the stocks being built) ──
+    def vol(self, r, K, t=None, fallback=None) -> np.ndarray:
+        """σ(K, t) off the packed surface; flat IV (or `fallback`) without one."""
+        t = self.T if t is None else t
+        if self.surfaces is not None:
+            return self.surfaces.sigma(r, K, t, fallback)
+        return (self.iv[r] if fallback is None else np.asarray(fallback, dtype=np.float64)) + 0 * K
+
+    def price(self, r, K, is_call: bool, t=None, sigma=None) -> np.ndarray:
+        t = self.T if t is None else t
+        K = np.asarray(K, dtype=np.float64) + 0 * r
+        sigma = self.vol(r, K, t) if sigma is None else sigma
+        return price_batch(self.S[r], K, np.full(len(K), t), BSM.R, sigma, is_call)
+
+    def call(self, r, K, t=None, sigma=None):
+        return self.price(r, K, True, t, sigma)
+
+    def put(self, r, K, t=None, sigma=None):
+        return self.price(r, K, False, t, sigma)
+
+    def prob_otm(self, r, K, is_call: bool) -> np.ndarray:
+        K = np.asarray(K, dtype=np.float64) + 0 * r
+        return prob_otm_batch(self.S[r], K, np.full(len(K), self.T), BSM.R, self.vol(r, K), is_call)
+
+    def snap(self, r, x) -> np.ndarray:
+        return np.round(x / self.g[r]) * self.g[r]
+
+    def gaps(self, name: str, r) -> np.ndarray:
+        """Delta-targeted strike distance in gaps (`_n_gaps` with an engine)."""
+        if name not in self._gaps:
+            td = AdaptiveStrikes.target_delta_batch(name, self.iv_rank, self.entropy)
+            self._gaps[name] = np.maximum(1, AdaptiveStrikes.gaps_for_delta_batch(
+                td, self.S, self.T, self.iv, self.g))
+        return self._gaps[name][r]
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# §3  GENERIC LEG PRICER
+# ═══════════════════════════════════════════════════════════════════════════════
+# One evaluator for every `StrategySpec`: place strikes, price legs, apply the
+# spec's formulas. Strike placement runs spot-based legs → clamps → clearance
+# → wings, so wings always hang off the final body strikes.
+
+BACK_MONTH_IV = 0.95           # σ for legs past the scan expiry without a surface, × front ATM IV
+
+
+def _expiry(u: UniverseBatch, e: str) -> float:
+    if e == FRONT:
+        return max(u.T * 0.5, 1 / 365)
+    if e == BACK:
+        return max(u.T * 1.5, u.T + 7 / 365)
+    return u.T
+
+
+class Priced:
+    """What a spec's formulas see for rows `r` (see `strategy_specs`)."""
+
+    def __init__(self, u: UniverseBatch, r: np.ndarray, spec: StrategySpec, K, prem, hold):
+        self.u, self.r = u, r
+        self.S, self.K, self.prem, self.hold = u.S[r], K, prem, hold
+        self.credit = sum(-leg.side * leg.qty * p for leg, p in zip(spec.legs, prem))
+        self.debit = -self.credit
+        self.min_prem, self.dte = u.min_prem[r], u.dte
+        self.ivp, self.trend_up = u.ivp[r], u.trend_up[r]
+        self.mp = None
+
+    def span(self, dte: int) -> np.ndarray:
+        return span_margin(self.S, self.u.iv[self.r], dte)
+
+    def below(self, K) -> np.ndarray:
+        """P(S_T < K) — `BSM.prob_otm` of a call at K."""
+        return self.u.prob_otm(self.r, K, True)
+
+    def above(self, K) -> np.ndarray:
+        return self.u.prob_otm(self.r, K, False)
+
+
+def _place(spec: StrategySpec, u: UniverseBatch, r, name: str, body: Dict[int, np.ndarray]) -> List[np.ndarray]:
+    """All leg strikes from the spot-based ones in `body`."""
+    S, g, mw = u.S[r], u.g[r], u.min_wing[r]
+    K = dict(body)
+    for i, leg in enumerate(spec.legs):
+        s = leg.strike
+        if s.clamp and i in K:
+            K[i] = np.where(s.dir * (K[i] - S) <= 0, u.snap(r, S + s.dir * g if s.clamp == 'otm' else S), K[i])
+    for i, leg in enumerate(spec.legs):
+        s = leg.strike
+        if s.clear >= 0:
+            K[i] = np.minimum(K[i], K[s.clear] - mw) if s.dir < 0 else np.maximum(K[i], K[s.clear] + mw)
+    for i, leg in enumerate(spec.legs):
+        s = leg.strike
+        if s.wing_of >= 0:
+            n = 2 if s.wing == 'spread' else np.maximum(2, u.gaps(name, r))
+            K[i] = K[s.wing_of] + s.dir * np.maximum(n * g, mw)
+    return [K[i] for i in range(len(spec.legs))]
+
+
+def _price_legs(spec: StrategySpec, u: UniverseBatch, r, K: List[np.ndarray]):
+    """Premium, expiry and σ per leg; legs past the scan expiry fall back to a
+    discounted flat IV."""
+    prem, t, sig = [], [], []
+    for leg, k in zip(spec.legs, K):
+        tl = _expiry(u, leg.expiry)
+        fb = u.iv[r] * BACK_MONTH_IV if tl > u.T else None
+        s = u.vol(r, k, tl, fb)
+        prem.append(u.price(r, k, leg.right == 'C', tl, s)); t.append(tl); sig.append(s)
+    return prem, t, sig
+
+
+def evaluate(name: str, u: UniverseBatch, r: np.ndarray) -> dict:
+    """Place, price and apply `STRATEGY_SPECS[name]` for rows `r`.
+
+    Returns the spec's `legs`; per-leg lists `K`, `prem`, `t`, `sig` and
+    `rem`/`rsig` (time left and σ at the horizon for legs that outlive it);
+    the `ok` mask; the summary columns mp/ml/be_lo/be_hi/nc/width/pop_b; the
+    simulation σ `sim` and the horizon `H`.
+    """
+    spec = STRATEGY_SPECS[name]
+    S, g = u.S[r], u.g[r]
+    body = {}
+    for i, leg in enumerate(spec.legs):
+        s = leg.strike
+        if s.wing_of >= 0:
+            continue
+        if s.dir == 0:
+            body[i] = u.snap(r, S)
+        else:
+            n = u.gaps(name, r)
+            m = np.maximum(s.gaps, n) + (np.maximum(s.plus, n) if s.plus else 0)
+            body[i] = u.snap(r, S + s.dir * m * g)
+
+    if spec.tighten:
+        # while the credit is under the minimum premium, walk short OTM strikes one gap in (≤3 times)
+        moving = [i for i, leg in enumerate(spec.legs) if leg.side < 0 and leg.strike.dir and i in body]
+        done = np.zeros(len(r), dtype=bool)
+        for _ in range(3):
+            prem, _, _ = _price_legs(spec, u, r, _place(spec, u, r, name, body))
+            done |= sum(-leg.side * leg.qty * p for leg, p in zip(spec.legs, prem)) >= u.min_prem[r]
+            for i in moving:
+                d = spec.legs[i].strike.dir
+                step = np.maximum(body[i] - g, u.snap(r, S + g)) if d > 0 else np.minimum(body[i] + g, u.snap(r, S - g))
+                body[i] = np.where(done, body[i], step)
+
+    K = _place(spec, u, r, name, body)
+    prem, t, sig = _price_legs(spec, u, r, K)
+    H = min(t)
+    rem = [tl - H for tl in t]
+    rsig, hold = [], []
+    for leg, k, tl, rm in zip(spec.legs, K, t, rem):
+        if rm > 0:
+            rs = u.vol(r, k, rm, u.iv[r] * BACK_MONTH_IV if tl > u.T else None)
+            hold.append(u.price(r, k, leg.right == 'C', rm, rs))
+        else:
+            rs = np.zeros(len(r))
+            hold.append(np.maximum(S - k, 0) if leg.right == 'C' else np.maximum(k - S, 0))
+        rsig.append(rs)
+
+    c = Priced(u, r, spec, K, prem, hold)
+    c.mp = spec.max_profit(c)
+    ml = spec.max_loss(c)
+    be_lo, be_hi = spec.breakevens(c)
+    debit_only = STRATEGY_STRUCTURE.get(name, {}).get('type') == 'DEBIT'
+    return dict(ok=spec.accept(c), legs=spec.legs, K=K, prem=prem, t=t, sig=sig, rem=rem, rsig=rsig,
+                mp=c.mp, ml=ml, be_lo=be_lo, be_hi=be_hi,
+                nc=0 * S if debit_only else c.credit, width=spec.width(c), pop_b=spec.pop(c),
+                sim=u.iv[r] if spec.sim == 'implied' else u.sim_vol[r], H=H)
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# §4  BATCH SCORING
+# ═══════════════════════════════════════════════════════════════════════════════
+
+def clamp_sharpe_batch(ev, std, max_loss):
+    """Sharpe per row, on returns over max loss where that is positive,
+    clipped to ±5; 0 for σ < 0.01 or NaN inputs."""
+    with np.errstate(divide='ignore', invalid='ignore'):
+        norm = max_loss > 0
+        ml = np.where(norm, max_loss, 1.0)
+        std_n = np.where(norm, std / ml, std)
+        res = np.where(norm, (ev / ml) / std_n, ev / std)
+        res = np.where(norm & (std_n < 0.001), 0.0, res)
+        res = np.where((std < 0.01) | np.isnan(ev) | np.isnan(std), 0.0, res)
+    return np.where(np.isnan(res), 0.0, np.clip(res, -5.0, 5.0))
+
+def clamp_rr_batch(nc, ml):
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(ml <= 0, 0.0, np.clip(nc / np.where(ml > 0, ml, 1.0), 0.0, 50.0))
+
+
+@dataclass
+class ScoredPairs:
+    """Columnar scored candidates, ordered by (stock, strategy).
+
+    `legs` is P × MAX_LEGS × 5 (strike, is_call, side ±1, qty, premium);
+    `greeks` is P × 9 in `Greeks` field order.
+    """
+    names: List[str]
+    stock: np.ndarray
+    strategy: np.ndarray
+    n_legs: np.ndarray
+    legs: np.ndarray
+    greeks: np.ndarray
+    cols: Dict[str, np.ndarray]
+    n_built: int = 0               # candidates that passed their spec's rules
+    n_hollow: int = 0              # dropped by the cost scrub
+    dte: int = 0
+
+    def __len__(self):
+        return len(self.stock)
+
+    def best_two(self, n_stocks: int):
+        return best_two(self.stock, self.cols['conviction'], n_stocks)
+
+    def take(self, idx: np.ndarray) -> 'ScoredPairs':
+        """The candidates `idx` only, so a caller can keep its picks without
+        holding every scored candidate."""
+        return ScoredPairs(self.names, self.stock[idx], self.strategy[idx], self.n_legs[idx],
+                           self.legs[idx], self.greeks[idx], {k: v[idx] for k, v in self.cols.items()},
+                           self.n_built, self.n_hollow, self.dte)
+
+    def leg_dicts(self, i: int) -> List[Dict]:
+        out = []
+        for K, is_call, side, qty, prem in self.legs[i, :self.n_legs[i]]:
+            out.append({'type': f"{'Buy' if side > 0 else 'Sell'} {'Call' if is_call else 'Put'}",
+                        'strike': float(K), 'premium': float(prem), 'qty': int(qty)})
+        return out
+
+    # StrategyResult field ← score column
+    RESULT_COLS = dict(
+        max_profit='mp', max_loss='ml', breakeven_lower='be_lo', breakeven_upper='be_hi',
+        pop_bsm='pop_b', pop_mc='pop_m', pop_ensemble='pop_mean', expected_value='ev',
+        sharpe_ratio='sharpe', kelly_fraction='kelly', conviction_score='conviction',
+        risk_score='risk', width='width', net_credit='nc', risk_reward='rr',
+        regime_alignment='viability', conviction_std='conviction_std',
+        conviction_ci_lower='ci_lower', conviction_ci_upper='ci_upper', viability='viability',
+        model_agreement='agreement', pop_std='pop_std', mp_lot='mp')
+
+    def result_fields(self, i: int, stability: float) -> dict:
+        """Keyword arguments for `StrategyResult` of candidate `i`."""
+        return dict({f: float(self.cols[k][i]) for f, k in self.RESULT_COLS.items()},
+                    name=self.names[self.strategy[i]], legs=self.leg_dicts(i),
+                    net_greeks=Greeks(*(float(x) for x in self.greeks[i])),
+                    optimal_dte=self.dte, stability_score=float(stability),
+                    lot_size=1, mc_paths=int(self.cols['mc_paths'][i]))
+
+    def result_columns(self, idx: np.ndarray, stability: np.ndarray) -> Dict[str, np.ndarray]:
+        """`result_fields` of candidates `idx` as columns: the scalar fields plus
+        `name` and `net_greeks` (len(idx) × 9, `Greeks` field order); no legs."""
+        names = np.array(self.names, dtype=object)
+        return dict({f: self.cols[k][idx] for f, k in self.RESULT_COLS.items()},
+                    name=names[self.strategy[idx]], net_greeks=self.greeks[idx],
+                    stability_score=np.asarray(stability, dtype=np.float64),
+                    mc_paths=self.cols['mc_paths'][idx].astype(np.int64))
+
+
+def _take(b: dict, keep: np.ndarray) -> dict:
+    """`evaluate` output restricted to the rows in `keep` (scalars pass through)."""
+    sub = lambda x: x[keep] if isinstance(x, np.ndarray) and x.shape == keep.shape else x
+    return {k: [sub(x) for x in v] if isinstance(v, list) else sub(v) for k, v in b.items()}
+
+
+def _assemble(u: UniverseBatch, built: List[tuple]):
+    """Concatenate `evaluate` outputs into padded per-candidate arrays."""
+    P = sum(len(r) for _, r, _ in built)
+    a = dict(stock=np.zeros(P, dtype=np.int64), strategy=np.zeros(P, dtype=np.int64),
+             n_legs=np.zeros(P, dtype=np.int64), legs=np.zeros((P, MAX_LEGS, 5)),
+             t=np.zeros((P, MAX_LEGS)), sig=np.zeros((P, MAX_LEGS)),
+             rem=np.zeros((P, MAX_LEGS)), rsig=np.zeros((P, MAX_LEGS)))
+    cols = {k: np.zeros(P) for k in ('mp', 'ml', 'be_lo', 'be_hi', 'nc', 'width', 'pop_b', 'sim', 'H')}
+    o = 0
+    for j, r, b in built:
+        n = len(r); sl = slice(o, o + n)
+        a['stock'][sl] = r; a['strategy'][sl] = j; a['n_legs'][sl] = len(b['K'])
+        for l, leg in enumerate(b['legs']):
+            a['legs'][sl, l] = np.column_stack([b['K'][l] + 0 * r, np.full(n, leg.right == 'C'),
+                                                np.full(n, leg.side), np.full(n, leg.qty), b['prem'][l]])
+            a['t'][sl, l] = b['t'][l]; a['sig'][sl, l] = b['sig'][l]
+            a['rem'][sl, l] = b['rem'][l]; a['rsig'][sl, l] = b['rsig'][l]
+        for k in cols:
+            cols[k][sl] = b[k]
+        o += n
+    return a, cols
+
+
+def score_universe(u: UniverseBatch, names: Sequence[str], viability: np.ndarray,
+                   engine, seed: int = 0, n_paths: int = MC_PAIRS,
+                   min_viability: float = MIN_VIABILITY) -> ScoredPairs:
+    """Build, price, simulate and score every viable (stock, strategy) pair.
+
+    `viability` is N × len(names) (`AdaptiveEngine.compute_viability_batch`); pairs
+    under `min_viability` or on stocks with a NaN IV percentile are skipped.
+    `n_paths` caps the antithetic pairs any candidate may simulate. The
+    low-viability pairs are masked out before anything is priced. Scores feed
+    the engine's current cycle, and Kelly sizing uses one risk budget for the
+    whole batch.
+    """
+    names = list(names)
+    build = ~(viability < min_viability) & u.valid[:, None]
+    built = []
+    for j, name in enumerate(names):
+        r = np.flatnonzero(build[:, j])
+        if not len(r):
+            continue
+        b = evaluate(name, u, r)
+        keep = b['ok'] & np.isfinite(b['mp']) & np.isfinite(b['ml'])
+        if keep.any():
+            built.append((j, r[keep], _take(b, keep)))
+
+    a, c = _assemble(u, built)
+    order = np.lexsort((a['strategy'], a['stock']))
+    a = {k: v[order] for k, v in a.items()}
+    c = {k: v[order] for k, v in c.items()}
+    n_built = len(order)
+
+    # ── Economic gate: drop candidates whose costs eat the edge ──
+    costs = CostScrub.calculate_batch(c['nc'], c['mp'], 1, a['n_legs'], c['be_lo'])
+    keep = ~costs['is_hollow']
+    a = {k: v[keep] for k, v in a.items()}
+    c = {k: v[keep] for k, v in c.items()}
+    stock, strategy, n_legs, legs = a['stock'], a['strategy'], a['n_legs'], a['legs']
+    S, iv, penalty = u.S[stock], u.iv[stock], costs['penalty'][keep]
+
+    # ── Greeks, every leg at its own strike and expiry ──
+    is_call = legs[:, :, 1] > 0
+    signed = legs[:, :, 2] * legs[:, :, 3]
+    greeks = net_greeks_batch(S, a['t'], BSM.R, legs[:, :, 0], is_call, signed, a['sig'], n_legs)
+
+    # ── P&L statistics: closed form when every leg expires at the horizon; BSM-screened
+    #    candidates take BSM's PoP and a quadrature EV / σ (no paths); the rest run
+    #    triage + sequential Monte Carlo to the SE targets within a viability-scaled budget ──
+    via = viability[stock, strategy]
+    exact = ~(a['rem'] > 0).any(axis=1)
+    pop_m, ev, std = analytic_pairs(S, c['sim'], c['H'], legs[:, :, 0], is_call, signed, legs[:, :, 4], n_legs)
+    paths = np.zeros(len(stock), dtype=np.int64)
+    run_mc = ~exact & ComputeTriage.should_run_mc_batch(c['pop_b'], via)
+    quad = np.flatnonzero(~exact & ~run_mc)
+    if len(quad):
+        pop_m[quad] = c['pop_b'][quad]
+        ev[quad], std[quad] = quadrature_pairs(S[quad], c['sim'][quad], c['H'][quad], BSM.R, legs[quad, :, 0],
+                                               is_call[quad], signed[quad], legs[quad, :, 4], a['rem'][quad],
+                                               a['rsig'][quad], n_legs[quad], _QUAD_Z, _QUAD_W)
+    sim = np.flatnonzero(run_mc)
+    if len(sim):
+        st = stock[sim]
+        budget = np.minimum(ComputeTriage.adaptive_mc_paths_batch(via[sim]), n_paths).astype(np.int64)
+        ev_se = ComputeTriage.EV_SE * np.maximum(np.abs(np.sum(signed[sim] * legs[sim, :, 4], axis=1)), 0.01)
+        # one draw per underlying, seeded by symbol, so a one-stock call reproduces the scan's paths
+        start = np.r_[0, np.flatnonzero(np.diff(st)) + 1, len(st)].astype(np.int64)
+        seeds = np.array([zlib.crc32(f"{u.symbols[s] or s}".encode(), seed) for s in st[start[:-1]]],
+                         dtype=np.int64)
+        pop_m[sim], ev[sim], std[sim], paths[sim] = simulate_pairs(
+            S[sim], c['sim'][sim], c['H'][sim], BSM.R, legs[sim, :, 0], is_call[sim], signed[sim],
+            legs[sim, :, 4], a['rem'][sim], a['rsig'][sim], n_legs[sim], start, seeds, budget,
+            ComputeTriage.BATCH, ComputeTriage.POP_SE, ev_se)
+
+    # ── Adaptive tail ──
+    pop_mean, pop_std, agreement = AdaptiveEnsemble.fuse_batch(
+        c['pop_b'], pop_m, np.where(exact, np.inf, np.where(run_mc, paths, 0)))
+    sh = clamp_sharpe_batch(ev, std, np.abs(c['ml']))
+    ev_ratio = ev / np.maximum(np.where(c['nc'] != 0, np.abs(c['nc']), np.abs(c['mp'])), 0.01)
+    cd = engine.score_batch(pop_mean, pop_std, ev_ratio, sh, via,
+                            u.entropy[stock], u.transition[stock], agreement, penalty)
+    kf = engine.kelly_batch(pop_mean, pop_std, np.abs(c['mp']), np.abs(c['ml']), ev, std)
+
+    c.update(pop_m=pop_m, ev=ev, mc_std=std, mc_paths=paths, pop_mean=pop_mean, pop_std=pop_std,
+             agreement=agreement, viability=via, sharpe=sh, kelly=kf,
+             conviction=cd['mean'], conviction_std=cd['std'],
+             ci_lower=cd['ci_lower'], ci_upper=cd['ci_upper'],
+             risk=BSM.risk_score_batch(greeks, iv, 1.0), rr=clamp_rr_batch(c['nc'], c['ml']))
+    return ScoredPairs(names=names, stock=stock, strategy=strategy, n_legs=n_legs,
+                       legs=legs, greeks=greeks, cols=c, n_built=n_built,
+                       n_hollow=int((~keep).sum()), dte=u.dte)
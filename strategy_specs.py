@@ -0,0 +1,183 @@
+"""
+    ╔══════════════════════════════════════════════════════════════════════════╗
+    ║  VAAYDO — Strategy Specs v1.0                                          ║
+    ║  Every structure declared as data: legs, strike rules, payoff formulas ║
+    ║  Hemrek Capital                                                        ║
+    ╚══════════════════════════════════════════════════════════════════════════╝
+
+A strategy is a tuple of `Leg`s plus a few closed-form figures. Each leg is
+a right, a side, a quantity, an expiry and a `Strike` rule:
+
+  at the money        Strike()
+  n gaps out          Strike(+1) / Strike(-1): at least `gaps` strike gaps
+                      beyond spot, pushed further by the regime's delta
+                      target (`AdaptiveStrikes`)
+  wing                Strike(+1, wing_of=i): one wing width beyond leg i
+  clearance           Strike(..., clear=i): at least one minimum wing beyond
+                      leg i
+
+`strategy_batch.evaluate` places, prices and simulates any spec for a whole
+column of stocks, so a new structure is a new entry in `STRATEGY_SPECS`
+(plus its row in `adaptive_engine.STRATEGY_STRUCTURE`), never new pricing
+code. Formulas receive a `strategy_batch.Priced` view `c`: `c.K[i]`,
+`c.prem[i]`, `c.credit` (Σ short − long premium), `c.debit`, `c.S`,
+`c.min_prem`, `c.span(dte)`, `c.above(K)`/`c.below(K)` (BSM P(S_T ≷ K)),
+`c.hold[i]` (leg i's value at the horizon, spot unchanged), `c.mp`.
+"""
+
+import numpy as np
+from dataclasses import dataclass
+from typing import Callable, Dict, Tuple
+
+FRONT, BACK = 'front', 'back'          # calendar expiries relative to the scan DTE
+
+
+@dataclass(frozen=True)
+class Strike:
+    dir: int = 0                # 0 at the money, +1 above spot, −1 below
+    gaps: int = 1               # minimum distance in strike gaps (the delta target can push further)
+    plus: int = 0               # a further max(plus, delta gaps) gaps out
+    clamp: str = ''             # 'otm': must sit strictly beyond spot, else one gap out; 'atm': else at the money
+    clear: int = -1             # keep at least one minimum wing beyond leg `clear`
+    wing_of: int = -1           # a wing: measured from leg `wing_of` rather than spot
+    wing: str = 'spread'        # wing width — 'spread': max(2 gaps, min wing); 'delta': max(max(2, delta gaps) gaps, min wing)
+
+ATM = Strike()
+
+
+@dataclass(frozen=True)
+class Leg:
+    right: str                  # 'C' | 'P'
+    side: int                   # +1 long, −1 short
+    strike: Strike = ATM
+    qty: int = 1
+    expiry: str = ''            # '' scan expiry, FRONT / BACK for calendars
+
+
+@dataclass(frozen=True)
+class StrategySpec:
+    legs: Tuple[Leg, ...]
+    accept: Callable            # c → mask of candidates worth scoring
+    max_profit: Callable
+    max_loss: Callable
+    breakevens: Callable        # c → (lower, upper)
+    width: Callable
+    pop: Callable               # BSM probability of profit
+    tighten: bool = False       # walk short OTM strikes in (≤3 gaps) until credit ≥ min premium
+    sim: str = 'realized'       # Monte Carlo σ: 'realized' (VRP-capped sim vol) or 'implied'
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# FORMULA HELPERS
+# ═══════════════════════════════════════════════════════════════════════════════
+
+def inside(c, hi, lo):
+    """P(lo < S_T < hi) as P(S_T < hi) + P(S_T > lo) − 1, floored at 0."""
+    return np.maximum(0, c.below(hi) + c.above(lo) - 1)
+
+def outside(c, hi, lo):
+    return np.minimum(1.0, (1 - c.below(hi)) + (1 - c.above(lo)))
+
+credit_ok = lambda c: c.credit >= c.min_prem
+credit = lambda c: c.credit
+debit = lambda c: c.debit
+zero = lambda c: 0 * c.S
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# REGISTRY — order is the scan's strategy order
+# ═══════════════════════════════════════════════════════════════════════════════
+
+STRATEGY_SPECS: Dict[str, StrategySpec] = {
+    'Short Strangle': StrategySpec(
+        legs=(Leg('C', -1, Strike(+1, clamp='otm')), Leg('P', -1, Strike(-1, clamp='otm'))),
+        tighten=True, accept=credit_ok, max_profit=credit,
+        max_loss=lambda c: c.span(c.dte),
+        breakevens=lambda c: (c.K[1] - c.credit, c.K[0] + c.credit),
+        width=lambda c: c.K[0] - c.K[1], pop=lambda c: inside(c, c.K[0], c.K[1])),
+    'Short Straddle': StrategySpec(
+        legs=(Leg('C', -1), Leg('P', -1)),
+        accept=credit_ok, max_profit=credit,
+        max_loss=lambda c: c.span(c.dte),
+        breakevens=lambda c: (c.K[0] - c.credit, c.K[0] + c.credit),
+        width=zero, pop=lambda c: inside(c, c.K[0] + c.credit, c.K[0] - c.credit)),
+    'Iron Condor': StrategySpec(
+        legs=(Leg('C', -1, Strike(+1)), Leg('C', +1, Strike(+1, wing_of=0)),
+              Leg('P', -1, Strike(-1)), Leg('P', +1, Strike(-1, wing_of=2))),
+        tighten=True, accept=credit_ok, max_profit=credit,
+        max_loss=lambda c: np.maximum((c.K[1] - c.K[0]) - c.credit, 1),
+        breakevens=lambda c: (c.K[2] - c.credit, c.K[0] + c.credit),
+        width=lambda c: c.K[1] - c.K[0], pop=lambda c: inside(c, c.K[0], c.K[2])),
+    'Iron Butterfly': StrategySpec(
+        legs=(Leg('C', -1), Leg('P', -1),
+              Leg('C', +1, Strike(+1, wing_of=0, wing='delta')), Leg('P', +1, Strike(-1, wing_of=1, wing='delta'))),
+        accept=credit_ok, max_profit=credit,
+        max_loss=lambda c: np.maximum((c.K[2] - c.K[0]) - c.credit, 1),
+        breakevens=lambda c: (c.K[0] - c.credit, c.K[0] + c.credit),
+        width=lambda c: c.K[2] - c.K[0], pop=lambda c: inside(c, c.K[0] + c.credit, c.K[0] - c.credit)),
+    'Bull Put Spread': StrategySpec(
+        legs=(Leg('P', -1, Strike(-1)), Leg('P', +1, Strike(-1, wing_of=0))),
+        tighten=True, accept=credit_ok, max_profit=credit,
+        max_loss=lambda c: np.maximum((c.K[0] - c.K[1]) - c.credit, 1),
+        breakevens=lambda c: (c.K[0] - c.credit, c.S * 10),
+        width=lambda c: c.K[0] - c.K[1], pop=lambda c: c.above(c.K[0])),
+    'Bear Call Spread': StrategySpec(
+        legs=(Leg('C', -1, Strike(+1)), Leg('C', +1, Strike(+1, wing_of=0))),
+        tighten=True, accept=credit_ok, max_profit=credit,
+        max_loss=lambda c: np.maximum((c.K[1] - c.K[0]) - c.credit, 1),
+        breakevens=lambda c: (0 * c.S, c.K[0] + c.credit),
+        width=lambda c: c.K[1] - c.K[0], pop=lambda c: c.below(c.K[0])),
+    'Bull Call Spread': StrategySpec(
+        legs=(Leg('C', +1, Strike(-1, clamp='atm')), Leg('C', -1, Strike(+1, wing_of=0))),
+        accept=lambda c: (c.debit > 0) & (c.mp >= c.min_prem),
+        max_profit=lambda c: (c.K[1] - c.K[0]) - c.debit, max_loss=debit,
+        breakevens=lambda c: (c.K[0] + c.debit, c.K[1]),
+        width=lambda c: c.K[1] - c.K[0], pop=lambda c: c.above(c.K[0])),
+    'Bear Put Spread': StrategySpec(
+        legs=(Leg('P', +1, Strike(+1, clamp='atm')), Leg('P', -1, Strike(-1, wing_of=0))),
+        accept=lambda c: (c.debit > 0) & (c.mp >= c.min_prem),
+        max_profit=lambda c: (c.K[0] - c.K[1]) - c.debit, max_loss=debit,
+        breakevens=lambda c: (c.K[1], c.K[0] - c.debit),
+        width=lambda c: c.K[0] - c.K[1], pop=lambda c: c.below(c.K[0])),
+    'Long Straddle': StrategySpec(
+        legs=(Leg('C', +1), Leg('P', +1)), sim='implied',
+        accept=lambda c: c.debit > 0, max_profit=lambda c: c.S * 0.5, max_loss=debit,
+        breakevens=lambda c: (c.K[0] - c.debit, c.K[0] + c.debit),
+        width=zero, pop=lambda c: outside(c, c.K[0] + c.debit, c.K[0] - c.debit)),
+    'Long Strangle': StrategySpec(
+        legs=(Leg('C', +1, Strike(+1, clamp='otm')), Leg('P', +1, Strike(-1, clamp='otm'))), sim='implied',
+        accept=lambda c: c.debit > 0, max_profit=lambda c: c.S * 0.5, max_loss=debit,
+        breakevens=lambda c: (c.K[1] - c.debit, c.K[0] + c.debit),
+        width=zero, pop=lambda c: outside(c, c.K[0] + c.debit, c.K[1] - c.debit)),
+    'Calendar Spread': StrategySpec(
+        # short front month, long back month; max profit ≈ the back month's time value at the front expiry
+        legs=(Leg('C', -1, expiry=FRONT), Leg('C', +1, expiry=BACK)), sim='implied',
+        accept=lambda c: c.debit > 0,
+        max_profit=lambda c: np.maximum(c.hold[1] - np.maximum(c.S - c.K[0], 0), c.prem[0] * 0.5),
+        max_loss=debit,
+        breakevens=lambda c: (c.K[0] - c.mp, c.K[0] + c.mp),
+        width=zero, pop=lambda c: np.where(c.ivp <= 30, 0.55, 0.45)),      # LOW / COMPRESSED vol regime
+    'Jade Lizard': StrategySpec(
+        legs=(Leg('C', -1, Strike(+1, gaps=2)), Leg('P', -1, Strike(-1)),
+              Leg('P', +1, Strike(-1, plus=2, clear=1))),
+        accept=credit_ok, max_profit=credit,
+        max_loss=lambda c: np.maximum((c.K[1] - c.K[2]) - c.credit, 1),
+        breakevens=lambda c: (c.K[1] - c.credit, c.K[0] + c.credit),
+        width=lambda c: c.K[1] - c.K[2], pop=lambda c: inside(c, c.K[0], c.K[1])),
+    'Broken Wing Butterfly': StrategySpec(
+        legs=(Leg('C', +1, Strike(-1, gaps=2, clear=1)), Leg('C', -1, qty=2),
+              Leg('C', +1, Strike(+1, gaps=3, clear=1))), sim='implied',
+        accept=lambda c: ~((c.mp < c.min_prem) & (c.credit < c.min_prem)),
+        max_profit=lambda c: (c.K[1] - c.K[0]) + c.credit,
+        max_loss=lambda c: np.maximum((c.K[2] - c.K[1]) - c.credit, 1),
+        breakevens=lambda c: (c.K[0], c.K[2]),
+        width=lambda c: c.K[2] - c.K[0], pop=lambda c: np.full(len(c.S), 0.50)),
+    'Ratio Spread': StrategySpec(
+        # buy 1 ATM, sell 2 OTM; risk above the shorts is carried at half SPAN
+        legs=(Leg('C', +1), Leg('C', -1, Strike(+1, gaps=2, clear=0), qty=2)), sim='implied',
+        accept=lambda c: c.mp >= c.min_prem,
+        max_profit=lambda c: (c.K[1] - c.K[0]) + c.credit,
+        max_loss=lambda c: c.span(30) * 0.5,
+        breakevens=lambda c: (c.K[0], 2 * c.K[1] - c.K[0] + c.credit),
+        width=lambda c: c.K[1] - c.K[0], pop=lambda c: np.where(c.trend_up, 0.55, 0.40)),
+}
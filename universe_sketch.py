@@ -0,0 +1,343 @@
+"""
+    ╔══════════════════════════════════════════════════════════════════════════╗
+    ║  VAAYDO — Universe Sketches v1.0                                       ║
+    ║  Mergeable, updatable summaries of the calibration signal matrix       ║
+    ║  Hemrek Capital                                                        ║
+    ╚══════════════════════════════════════════════════════════════════════════╝
+
+`SignalSpace.compute_universe_stats` needs, per signal, location/scale and a
+percentile grid, the cross-signal correlation, and a few shape statistics
+(crowding, histogram entropy, pairwise interactions). A `UniverseSketch`
+carries enough of the universe to derive all of them without the matrix:
+
+  Quantiles    — `QuantileSketch`, log-bucketed counts with relative accuracy
+                 α (DDSketch). Counts add and subtract, so a symbol's old row
+                 can be taken out when it changes; shards merge by adding.
+  Moments      — `MomentSketch`, count/mean/co-moment matrix (Welford, Chan's
+                 pairwise merge and its inverse for removal): exact means,
+                 standard deviations and correlations.
+  Shape        — `SampleSketch`, a bottom-k sample by a stable hash of the
+                 row key. Mergeable, and while the universe fits in k it is
+                 the universe: percentiles are then taken from it exactly.
+
+Updating c symbols costs O(c); deriving stats costs O(buckets + k·d + d²)
+whatever the universe size, so a rolling window of per-day shards merged
+together calibrates as cheaply as a single day.
+"""
+
+import zlib
+import numpy as np
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+QUANTILE_ALPHA = 0.002         # relative accuracy of every percentile
+ZERO_BAND = 1e-9               # |x| below this counts as exactly zero
+SAMPLE_SIZE = 512              # rows kept for the shape statistics
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# §1  QUANTILES — relative-error log buckets (DDSketch)
+# ═══════════════════════════════════════════════════════════════════════════════
+
+class _Buckets:
+    """Dense counts over a contiguous key range [offset, offset + len(counts))."""
+    __slots__ = ('offset', 'counts')
+
+    def __init__(self):
+        self.offset = 0
+        self.counts = np.zeros(0)
+
+    def _cover(self, lo: int, hi: int):
+        if not len(self.counts):
+            self.offset, self.counts = lo, np.zeros(hi - lo + 1)
+            return
+        new_lo, new_hi = min(lo, self.offset), max(hi, self.offset + len(self.counts) - 1)
+        if new_lo < self.offset or new_hi >= self.offset + len(self.counts):
+            grown = np.zeros(new_hi - new_lo + 1)
+            grown[self.offset - new_lo:self.offset - new_lo + len(self.counts)] = self.counts
+            self.offset, self.counts = new_lo, grown
+
+    def add(self, keys: np.ndarray, weight: float):
+        if not len(keys):
+            return
+        self._cover(int(keys.min()), int(keys.max()))
+        at = keys - self.offset
+        np.add.at(self.counts, at, weight)
+        c = self.counts[at]
+        self.counts[at] = np.where(c < 0.5, 0.0, c)   # removals cancel exactly
+
+    def merge(self, other: '_Buckets'):
+        if len(other.counts):
+            self._cover(other.offset, other.offset + len(other.counts) - 1)
+            at = other.offset - self.offset
+            self.counts[at:at + len(other.counts)] += other.counts
+
+    def items(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Occupied keys (ascending) and their counts."""
+        i = np.flatnonzero(self.counts)
+        return i + self.offset, self.counts[i]
+
+
+class QuantileSketch:
+    """Counts per log-bucket ⌈ln|x| / ln γ⌉ for each sign, γ = (1+α)/(1−α).
+
+    Any quantile is returned within relative error α of a true order
+    statistic; `np.percentile`'s linear interpolation is applied between the
+    two bracketing ranks. Non-finite values are ignored, like `nanpercentile`.
+    """
+    __slots__ = ('alpha', 'log_gamma', 'pos', 'neg', 'zero', '_index')
+
+    def __init__(self, alpha: float = QUANTILE_ALPHA):
+        self.alpha = alpha
+        self.log_gamma = np.log((1 + alpha) / (1 - alpha))
+        self.pos, self.neg = _Buckets(), _Buckets()
+        self.zero = 0.0
+        self._index = None             # (sorted representatives, cumulative counts)
+
+    def add(self, values, weight: float = 1.0):
+        """Add (weight > 0) or remove (weight < 0) values."""
+        x = np.asarray(values, dtype=np.float64).ravel()
+        x = x[np.isfinite(x)]
+        if not len(x):
+            return
+        small = np.abs(x) < ZERO_BAND
+        self.zero = max(self.zero + weight * small.sum(), 0.0)
+        for store, part in ((self.pos, x[~small & (x > 0)]), (self.neg, -x[~small & (x < 0)])):
+            store.add(np.ceil(np.log(part) / self.log_gamma).astype(np.int64), weight)
+        self._index = None
+
+    def merge(self, other: 'QuantileSketch'):
+        """Fold `other` (same α) into this sketch."""
+        self.pos.merge(other.pos)
+        self.neg.merge(other.neg)
+        self.zero += other.zero
+        self._index = None
+
+    def _value(self, keys: np.ndarray) -> np.ndarray:
+        return 2 * np.exp(keys * self.log_gamma) / (1 + np.exp(self.log_gamma))
+
+    def index(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Bucket representatives in ascending order and their cumulative counts."""
+        if self._index is None:
+            nk, nc = self.neg.items()
+            pk, pc = self.pos.items()
+            z = [self.zero] if self.zero > 0.5 else []
+            reps = np.concatenate([-self._value(nk[::-1]), np.zeros(len(z)), self._value(pk)])
+            self._index = (reps, np.cumsum(np.concatenate([nc[::-1], z, pc])))
+        return self._index
+
+    def quantiles(self, q) -> np.ndarray:
+        """Values at quantile levels `q` ∈ [0, 1] (NaN while empty)."""
+        q = np.asarray(q, dtype=np.float64)
+        reps, cum = self.index()
+        if not len(reps):
+            return np.full(q.shape, np.nan)
+        rank = q * (cum[-1] - 1)
+        lo, frac = np.floor(rank), rank - np.floor(rank)
+        at = lambda r: reps[np.minimum(np.searchsorted(cum, r, side='right'), len(reps) - 1)]
+        v_lo, v_hi = at(lo), at(lo + 1)
+        return np.where(frac > 0, v_lo + frac * (v_hi - v_lo), v_lo)
+
+    def cdf(self, x) -> np.ndarray:
+        """Fraction of values whose bucket representative is ≤ x."""
+        reps, cum = self.index()
+        if not len(reps):
+            return np.full(np.shape(x), np.nan)
+        i = np.searchsorted(reps, x, side='right')
+        return np.where(i > 0, cum[np.maximum(i - 1, 0)], 0.0) / cum[-1]
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# §2  MOMENTS — Welford / Chan count, mean and co-moment matrix
+# ═══════════════════════════════════════════════════════════════════════════════
+
+class MomentSketch:
+    """n, column means and Σ(x−x̄)(x−x̄)ᵀ over complete rows."""
+    __slots__ = ('n', 'mean', 'comoment')
+
+    def __init__(self, d: int):
+        self.n = 0
+        self.mean = np.zeros(d)
+        self.comoment = np.zeros((d, d))
+
+    def _fold(self, n_b: int, mean_b: np.ndarray, co_b: np.ndarray, sign: int):
+        if sign > 0:
+            n = self.n + n_b
+            delta = mean_b - self.mean
+            self.comoment = self.comoment + co_b + np.outer(delta, delta) * (self.n * n_b / n)
+            self.mean = self.mean + delta * (n_b / n)
+            self.n = n
+            return
+        n_a = self.n - n_b
+        if n_a <= 0:
+            self.n, self.mean, self.comoment = 0, np.zeros_like(self.mean), np.zeros_like(self.comoment)
+            return
+        mean_a = (self.n * self.mean - n_b * mean_b) / n_a
+        delta = mean_b - mean_a
+        self.comoment = self.comoment - co_b - np.outer(delta, delta) * (n_a * n_b / self.n)
+        self.mean, self.n = mean_a, n_a
+
+    def add(self, X: np.ndarray, sign: int = 1):
+        """Add (sign=+1) or remove (sign=−1) the rows of X."""
+        X = np.asarray(X, dtype=np.float64).reshape(-1, len(self.mean))
+        if not len(X):
+            return
+        m = X.mean(axis=0)
+        c = (X - m).T @ (X - m)
+        self._fold(len(X), m, c, sign)
+
+    def merge(self, other: 'MomentSketch'):
+        if other.n:
+            self._fold(other.n, other.mean, other.comoment, 1)
+
+    def std(self) -> np.ndarray:
+        return np.sqrt(np.maximum(np.diag(self.comoment), 0) / max(self.n, 1))
+
+    def corr(self) -> np.ndarray:
+        sd = np.sqrt(np.maximum(np.diag(self.comoment), 0))
+        with np.errstate(divide='ignore', invalid='ignore'):
+            r = self.comoment / np.outer(sd, sd)
+        return np.nan_to_num(np.clip(r, -1, 1), nan=0)
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# §3  SHAPE — bottom-k sample by stable key hash
+# ═══════════════════════════════════════════════════════════════════════════════
+
+def _key_hash(key: str) -> int:
+    return zlib.crc32(key.encode())
+
+class SampleSketch:
+    """The k rows with the smallest key hashes seen (a uniform sample that is
+    the same whatever the arrival order or sharding). Removing a sampled key
+    shrinks the sample until a new key takes its place."""
+    __slots__ = ('k', 'rows')
+
+    def __init__(self, k: int = SAMPLE_SIZE):
+        self.k = k
+        self.rows: Dict[str, Tuple[int, np.ndarray]] = {}
+
+    def add(self, keys: Sequence[str], rows: Sequence[np.ndarray]):
+        for key, row in zip(keys, rows):
+            self.rows[key] = (_key_hash(key), row)
+        self._trim()
+
+    def remove(self, key: str):
+        self.rows.pop(key, None)
+
+    def merge(self, other: 'SampleSketch'):
+        self.rows.update(other.rows)
+        self._trim()
+
+    def _trim(self):
+        if len(self.rows) > self.k:
+            keep = sorted(self.rows, key=lambda r: self.rows[r][0])[:self.k]
+            self.rows = {r: self.rows[r] for r in keep}
+
+    def matrix(self, d: int) -> np.ndarray:
+        """Sampled rows in key-hash order (deterministic)."""
+        order = sorted(self.rows.values(), key=lambda hr: hr[0])
+        return np.array([r for _, r in order], dtype=np.float64).reshape(len(order), d)
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# §4  UNIVERSE SKETCH
+# ═══════════════════════════════════════════════════════════════════════════════
+
+class UniverseSketch:
+    """Sketch of an N × d signal matrix keyed by symbol.
+
+    A live sketch remembers each symbol's current row, so `update` can take
+    the old row out before adding the new one and `sync` can drop symbols that
+    left the universe. Merged sketches (e.g. a rolling window of day shards,
+    `tag` = the day) are frozen: they summarize, they no longer track symbols.
+    Rows with a NaN are left out, as `AdaptiveEngine.calibrate` does.
+    """
+
+    def __init__(self, d: int, tag: str = "", alpha: float = QUANTILE_ALPHA, sample: int = SAMPLE_SIZE):
+        self.d = d
+        self.tag = tag
+        self.quantiles = [QuantileSketch(alpha) for _ in range(d)]
+        self.moments = MomentSketch(d)
+        self.sample = SampleSketch(sample)
+        self.rows: Optional[Dict[str, np.ndarray]] = {}
+
+    @property
+    def n(self) -> int:
+        return self.moments.n
+
+    def _key(self, symbol) -> str:
+        return f"{self.tag}|{symbol}"
+
+    def _apply(self, X: np.ndarray, sign: int):
+        self.moments.add(X, sign)
+        for j, q in enumerate(self.quantiles):
+            q.add(X[:, j], sign)
+
+    def update(self, symbols: Sequence, X: np.ndarray) -> int:
+        """Set the rows of `symbols` (others untouched) → number of rows changed.
+        Unchanged rows are found in one vectorized compare and cost nothing more."""
+        if self.rows is None:
+            raise ValueError("merged UniverseSketch is frozen; update its day shards instead")
+        X = np.asarray(X, dtype=np.float64).reshape(len(symbols), self.d)
+        prev = [self.rows.get(sym) for sym in symbols]
+        known = np.array([p is not None for p in prev], dtype=bool)
+        ok = ~np.isnan(X).any(axis=1)
+        same = np.zeros(len(X), dtype=bool)
+        if known.any():
+            same[known] = (np.array([p for p in prev if p is not None]) == X[known]).all(axis=1)
+        same |= ~known & ~ok                             # absent and still incomplete
+        old, new, keys = [], [], []
+        for i in np.flatnonzero(~same):
+            sym = symbols[i]
+            if known[i]:
+                old.append(prev[i]); del self.rows[sym]; self.sample.remove(self._key(sym))
+            if ok[i]:
+                x = X[i].copy()
+                new.append(x); keys.append(self._key(sym)); self.rows[sym] = x
+        if old:
+            self._apply(np.array(old), -1)
+        if new:
+            self._apply(np.array(new), 1)
+            self.sample.add(keys, new)
+        return int((~same).sum())
+
+    def remove(self, symbols: Iterable) -> int:
+        old = []
+        for sym in symbols:
+            prev = self.rows.pop(sym, None)
+            if prev is not None:
+                old.append(prev); self.sample.remove(self._key(sym))
+        if old:
+            self._apply(np.array(old), -1)
+        return len(old)
+
+    def sync(self, symbols: Sequence, X: np.ndarray) -> int:
+        """Make the sketch hold exactly this universe: changed rows are
+        replaced, missing symbols dropped, unchanged rows not touched."""
+        present = set(symbols)
+        return self.remove([s for s in list(self.rows) if s not in present]) + self.update(symbols, X)
+
+    @classmethod
+    def merged(cls, shards: Sequence['UniverseSketch']) -> 'UniverseSketch':
+        """One frozen sketch over all `shards` (same d and α)."""
+        out = cls(shards[0].d, tag="+".join(s.tag for s in shards),
+                  alpha=shards[0].quantiles[0].alpha, sample=shards[0].sample.k)
+        for s in shards:
+            for q, sq in zip(out.quantiles, s.quantiles):
+                q.merge(sq)
+            out.moments.merge(s.moments)
+            out.sample.merge(s.sample)
+        out.rows = None
+        return out
+
+    def complete(self) -> bool:
+        """True while the sample holds every row, i.e. is the universe itself."""
+        return len(self.sample.rows) == self.n
+
+    def percentiles(self, levels) -> np.ndarray:
+        """len(levels) × d grid of percentiles (levels in 0–100): exact from the
+        sample while it is complete, from the quantile sketches beyond that."""
+        q = np.asarray(levels, dtype=np.float64)
+        if self.complete() and self.n:
+            return np.percentile(self.sample.matrix(self.d), q, axis=0).reshape(len(q), self.d)
+        return np.array([qs.quantiles(q / 100) for qs in self.quantiles]).T.reshape(len(q), self.d)
@@ -0,0 +1,582 @@
+"""
+    ╔══════════════════════════════════════════════════════════════════════════╗
+    ║  VAAYDO — Volatility Surface v1.0                                      ║
+    ║  SVI per expiry, SSVI across expiries, warm-started intraday refits    ║
+    ║  Hemrek Capital                                                        ║
+    ╚══════════════════════════════════════════════════════════════════════════╝
+
+Total implied variance w(k) = σ²T in log-forward-moneyness k = ln(K/F).
+
+  Slice  — raw SVI per expiry, w(k) = a + b(ρ(k−m) + √((k−m)² + s²)),
+           fitted quasi-explicitly: for fixed (m, s) the model is linear in
+           (a, bρs, bs), so a 2-D Nelder–Mead over (m, log s) wraps a 3×3
+           weighted least-squares solve (Zeliade).
+  Term   — SSVI, w(k, θ) = θ/2·(1 + ρφk + √((φk + ρ)² + 1 − ρ²)) with a
+           power-law φ(θ) = η/(θ^γ(1+θ)^(1−γ)), fitted once across all
+           slices. It stands in for any slice with too few quotes.
+
+`sigma(K, T)` interpolates total variance linearly in T between slices at
+fixed k and extrapolates at constant implied vol, so any leg of any DTE
+gets a skew-consistent σ. Parameters are cached per symbol; a refit
+Newton-polishes the previous snapshot's parameters, which for an intraday
+move converges in a handful of iterations (a small simplex takes over if
+the old optimum is no longer in a convex basin).
+"""
+
+import math
+import numpy as np
+from datetime import date, datetime
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Tuple
+from numba import njit
+
+from adaptive_engine import BSM
+from option_chain import OptionChain, EXPIRY_CLOSE, YEAR_SECONDS
+
+SVI_MIN_QUOTES = 5             # fewer OTM quotes → slice taken from SSVI
+SVI_MAX_ITER = 200
+SSVI_MAX_ITER = 400
+COLD_STEP, WARM_STEP = 0.10, 0.01
+SIMPLEX_XTOL = 1e-4            # parameter-space size at which a simplex counts as converged
+WARM_MAX_ITER = 8              # Newton steps for a warm refit before falling back to the simplex
+NEWTON_H = 1e-4                # finite-difference step in (transformed) parameter space
+SURFACE_MAX_AGE = 1800         # seconds a cached surface is trusted for pricing
+SURFACE_LEASE = 600            # seconds before the chain sweep refits a cached surface
+SURFACE_TTL = 7 * 86400        # kept this long as a warm start
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# §1  SVI SLICE KERNELS
+# ═══════════════════════════════════════════════════════════════════════════════
+
+@njit(cache=True)
+def svi_w(k: float, a: float, b: float, rho: float, m: float, s: float) -> float:
+    d = k - m
+    return a + b * (rho * d + math.sqrt(d * d + s * s))
+
+@njit(cache=True)
+def _svi_inner(k, w, wt, m, s):
+    """Best (a, b, ρ) for fixed (m, s) and its weighted SSE.
+
+    Weighted LS on the basis [1, x, z], x = (k−m)/s, z = √(x²+1), then
+    projected onto b ≥ 0, |ρ| < 1 and a + bs√(1−ρ²) ≥ 0 (w ≥ 0 everywhere).
+    """
+    n = len(k)
+    A = np.zeros((3, 3)); y = np.zeros(3)
+    for i in range(n):
+        x = (k[i] - m) / s
+        z = math.sqrt(x * x + 1.0)
+        u0, u1, u2 = 1.0, x, z
+        A[0, 0] += wt[i]; A[0, 1] += wt[i] * u1; A[0, 2] += wt[i] * u2
+        A[1, 1] += wt[i] * u1 * u1; A[1, 2] += wt[i] * u1 * u2; A[2, 2] += wt[i] * u2 * u2
+        y[0] += wt[i] * w[i]; y[1] += wt[i] * u1 * w[i]; y[2] += wt[i] * u2 * w[i]
+    A[1, 0] = A[0, 1]; A[2, 0] = A[0, 2]; A[2, 1] = A[1, 2]
+    for j in range(3):
+        A[j, j] += 1e-12 * (1.0 + A[j, j])
+    c = np.linalg.solve(A, y)
+    alpha, beta, gamma = c[0], c[1], c[2]
+    clipped = False
+    if gamma < 0.0:
+        gamma = 0.0; clipped = True
+    lim = 0.999 * gamma
+    if beta > lim:
+        beta = lim; clipped = True
+    elif beta < -lim:
+        beta = -lim; clipped = True
+    if clipped:
+        num = 0.0
+        for i in range(n):
+            x = (k[i] - m) / s
+            num += wt[i] * (w[i] - beta * x - gamma * math.sqrt(x * x + 1.0))
+        alpha = num / A[0, 0]
+    floor = -math.sqrt(max(gamma * gamma - beta * beta, 0.0))
+    if alpha < floor:
+        alpha = floor
+    sse = 0.0
+    for i in range(n):
+        x = (k[i] - m) / s
+        e = alpha + beta * x + gamma * math.sqrt(x * x + 1.0) - w[i]
+        sse += wt[i] * e * e
+    b = gamma / s
+    rho = beta / gamma if gamma > 0.0 else 0.0
+    return alpha, b, rho, sse
+
+@njit(cache=True)
+def _svi_obj(p, k, w, wt):
+    s = math.exp(p[1])
+    if s < 1e-4 or s > 5.0:
+        return 1e30
+    return _svi_inner(k, w, wt, p[0], s)[3]
+
+@njit(cache=True)
+def svi_fit_slice(k, w, wt, m0, s0, step, max_iter):
+    """Nelder–Mead over (m, log s). Returns (a, b, ρ, m, s, sse, iters)."""
+    P = np.empty((3, 2)); f = np.empty(3)
+    P[0, 0] = m0; P[0, 1] = math.log(s0)
+    P[1, 0] = m0 + step; P[1, 1] = P[0, 1]
+    P[2, 0] = m0; P[2, 1] = P[0, 1] + 5.0 * step
+    for i in range(3):
+        f[i] = _svi_obj(P[i], k, w, wt)
+    scale = 0.0
+    for i in range(len(w)):
+        scale += wt[i] * w[i] * w[i]
+    it = 0
+    while it < max_iter:
+        order = np.argsort(f)
+        P = P[order]; f = f[order]
+        # Converged when the simplex is tiny or its spread negligible against the data
+        size = max(np.abs(P[1] - P[0]).max(), np.abs(P[2] - P[0]).max())
+        if size < SIMPLEX_XTOL or f[2] - f[0] <= 1e-10 * (f[0] + 1e-6 * scale):
+            break
+        it += 1
+        c = 0.5 * (P[0] + P[1])
+        xr = c + (c - P[2]); fr = _svi_obj(xr, k, w, wt)
+        if fr < f[0]:
+            xe = c + 2.0 * (c - P[2]); fe = _svi_obj(xe, k, w, wt)
+            if fe < fr:
+                P[2] = xe; f[2] = fe
+            else:
+                P[2] = xr; f[2] = fr
+        elif fr < f[1]:
+            P[2] = xr; f[2] = fr
+        else:
+            xc = c + 0.5 * ((xr if fr < f[2] else P[2]) - c)
+            fc = _svi_obj(xc, k, w, wt)
+            if fc < min(fr, f[2]):
+                P[2] = xc; f[2] = fc
+            else:
+                for i in range(1, 3):
+                    P[i] = P[0] + 0.5 * (P[i] - P[0])
+                    f[i] = _svi_obj(P[i], k, w, wt)
+    j = np.argmin(f)
+    m, s = P[j, 0], math.exp(P[j, 1])
+    a, b, rho, sse = _svi_inner(k, w, wt, m, s)
+    return a, b, rho, m, s, sse, it
+
+@njit(cache=True)
+def svi_polish_slice(k, w, wt, m0, s0, max_iter):
+    """Damped Newton over (m, log s) from a warm start, central-difference Hessian.
+
+    Near the previous optimum this converges in a few steps where a fresh
+    simplex spends dozens shrinking. Returns (m, s, iters, ok); `ok` is
+    False when the curvature is useless or no step helps, and the caller
+    falls back to Nelder–Mead.
+    """
+    p = np.array([m0, math.log(s0)])
+    f = _svi_obj(p, k, w, wt)
+    h = NEWTON_H
+    g = np.empty(2); H = np.empty((2, 2)); fp = np.empty(2); fm = np.empty(2)
+    it = 0
+    while it < max_iter:
+        it += 1
+        for i in range(2):
+            e = p.copy(); e[i] += h; fp[i] = _svi_obj(e, k, w, wt)
+            e[i] -= 2.0 * h; fm[i] = _svi_obj(e, k, w, wt)
+            g[i] = (fp[i] - fm[i]) / (2.0 * h)
+            H[i, i] = (fp[i] - 2.0 * f + fm[i]) / (h * h)
+        e = p.copy(); e[0] += h; e[1] += h
+        H[0, 1] = H[1, 0] = (_svi_obj(e, k, w, wt) - fp[0] - fp[1] + f) / (h * h)
+        det = H[0, 0] * H[1, 1] - H[0, 1] * H[1, 0]
+        if H[0, 0] <= 0.0 or det <= 0.0:
+            return p[0], math.exp(p[1]), it, False
+        step = np.array([H[1, 1] * g[0] - H[0, 1] * g[1], H[0, 0] * g[1] - H[1, 0] * g[0]]) / det
+        lam = 1.0
+        while lam > 1e-3:
+            q = p - lam * step
+            fq = _svi_obj(q, k, w, wt)
+            if fq <= f:
+                break
+            lam *= 0.5
+        if lam <= 1e-3:
+            return p[0], math.exp(p[1]), it, np.abs(step).max() < SIMPLEX_XTOL
+        p = q; f = fq
+        if lam * np.abs(step).max() < SIMPLEX_XTOL:
+            return p[0], math.exp(p[1]), it, True
+    return p[0], math.exp(p[1]), it, False
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# §2  SSVI TERM STRUCTURE
+# ═══════════════════════════════════════════════════════════════════════════════
+
+@njit(cache=True)
+def _ssvi_unpack(p):
+    rho = math.tanh(p[0])
+    gamma = 1.0 / (1.0 + math.exp(-p[2]))
+    eta = min(math.exp(p[1]), 2.0 / (1.0 + abs(rho)))       # no-butterfly bound
+    return rho, eta, gamma
+
+def _ssvi_pack(rho: float, eta: float, gamma: float) -> np.ndarray:
+    g = min(max(gamma, 1e-6), 1.0 - 1e-6)
+    return np.array([math.atanh(max(min(rho, 0.99), -0.99)), math.log(eta), math.log(g / (1.0 - g))])
+
+@njit(cache=True)
+def _ssvi_phi(theta, eta, gamma):
+    return eta / (theta ** gamma * (1.0 + theta) ** (1.0 - gamma))
+
+@njit(cache=True)
+def ssvi_w(k, theta, rho, eta, gamma):
+    pk = _ssvi_phi(theta, eta, gamma) * k
+    return 0.5 * theta * (1.0 + rho * pk + math.sqrt((pk + rho) ** 2 + 1.0 - rho * rho))
+
+@njit(cache=True)
+def _ssvi_obj(p, k, w, wt, theta):
+    rho, eta, gamma = _ssvi_unpack(p)
+    sse = 0.0
+    for i in range(len(k)):
+        e = ssvi_w(k[i], theta[i], rho, eta, gamma) - w[i]
+        sse += wt[i] * e * e
+    return sse
+
+@njit(cache=True)
+def ssvi_fit(k, w, wt, theta, p0, step, max_iter):
+    """Nelder–Mead over (atanh ρ, log η, logit γ). Returns (ρ, η, γ, sse, iters)."""
+    P = np.empty((4, 3)); f = np.empty(4)
+    for i in range(4):
+        P[i] = p0
+        if i > 0:
+            P[i, i - 1] += step
+        f[i] = _ssvi_obj(P[i], k, w, wt, theta)
+    it = 0
+    while it < max_iter:
+        order = np.argsort(f)
+        P = P[order]; f = f[order]
+        size = 0.0
+        for i in range(1, 4):
+            size = max(size, np.abs(P[i] - P[0]).max())
+        if size < SIMPLEX_XTOL or 2.0 * abs(f[3] - f[0]) <= 1e-10 * (abs(f[3]) + abs(f[0]) + 1e-20):
+            break
+        it += 1
+        c = (P[0] + P[1] + P[2]) / 3.0
+        xr = c + (c - P[3]); fr = _ssvi_obj(xr, k, w, wt, theta)
+        if fr < f[0]:
+            xe = c + 2.0 * (c - P[3]); fe = _ssvi_obj(xe, k, w, wt, theta)
+            if fe < fr:
+                P[3] = xe; f[3] = fe
+            else:
+                P[3] = xr; f[3] = fr
+        elif fr < f[2]:
+            P[3] = xr; f[3] = fr
+        else:
+            xc = c + 0.5 * ((xr if fr < f[3] else P[3]) - c)
+            fc = _ssvi_obj(xc, k, w, wt, theta)
+            if fc < min(fr, f[3]):
+                P[3] = xc; f[3] = fc
+            else:
+                for i in range(1, 4):
+                    P[i] = P[0] + 0.5 * (P[i] - P[0])
+                    f[i] = _ssvi_obj(P[i], k, w, wt, theta)
+    rho, eta, gamma = _ssvi_unpack(P[0])
+    return rho, eta, gamma, f[0], it
+
+def ssvi_as_svi(theta: float, rho: float, eta: float, gamma: float) -> Tuple[float, float, float, float, float]:
+    """The SSVI slice at θ in raw SVI parameters (Gatheral–Jacquier)."""
+    phi = _ssvi_phi(theta, eta, gamma)
+    return (0.5 * theta * (1.0 - rho * rho), 0.5 * theta * phi, rho,
+            -rho / phi, math.sqrt(1.0 - rho * rho) / phi)
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# §3  SURFACE EVALUATION
+# ═══════════════════════════════════════════════════════════════════════════════
+
+@njit(cache=True)
+def _surface_w(k, t, Ts, J, params):
+    """Total variance at (k, t) from the first `J` slices of `params`."""
+    if t <= Ts[0] or J == 1:
+        j = 0 if t <= Ts[0] else J - 1
+        return svi_w(k, params[j, 0], params[j, 1], params[j, 2], params[j, 3], params[j, 4]) * t / Ts[j]
+    if t >= Ts[J - 1]:
+        j = J - 1
+        return svi_w(k, params[j, 0], params[j, 1], params[j, 2], params[j, 3], params[j, 4]) * t / Ts[j]
+    j = 1
+    while Ts[j] < t:
+        j += 1
+    w0 = svi_w(k, params[j - 1, 0], params[j - 1, 1], params[j - 1, 2], params[j - 1, 3], params[j - 1, 4])
+    w1 = svi_w(k, params[j, 0], params[j, 1], params[j, 2], params[j, 3], params[j, 4])
+    u = (t - Ts[j - 1]) / (Ts[j] - Ts[j - 1])
+    return w0 + u * (w1 - w0)
+
+@njit(cache=True)
+def surface_sigma_batch(k, T, Ts, params):
+    """σ(k, T) from slices at maturities `Ts` (ascending) with rows (a, b, ρ, m, s)."""
+    out = np.empty(len(k))
+    for i in range(len(k)):
+        t = max(T[i], 1e-6)
+        out[i] = math.sqrt(max(_surface_w(k[i], t, Ts, len(Ts), params), 1e-12) / t)
+    return out
+
+@njit(cache=True)
+def surface_sigma_packed(which, k, T, Ts, nT, params):
+    """σ for rows priced off different surfaces: row i uses surface `which[i]`
+    (padded `Ts`/`params`, `nT` slices each)."""
+    out = np.empty(len(k))
+    for i in range(len(k)):
+        j = which[i]
+        t = max(T[i], 1e-6)
+        out[i] = math.sqrt(max(_surface_w(k[i], t, Ts[j], nT[j], params[j]), 1e-12) / t)
+    return out
+
+
+@dataclass
+class VolSurface:
+    """One symbol's fitted surface; slice rows are (a, b, ρ, m, s) per expiry."""
+    symbol: str
+    spot: float
+    r: float
+    expiries: List[date]
+    params: np.ndarray                        # (n_expiries, 5)
+    ssvi: Tuple[float, float, float]          # (ρ, η, γ)
+    rmse_vol: np.ndarray                      # per slice, implied-vol points
+    n_quotes: np.ndarray
+    from_ssvi: np.ndarray                     # bool — slice taken from SSVI
+    iters: int = 0
+    warm: bool = False
+    fitted_at: datetime = field(default_factory=datetime.now)
+
+    def maturities(self, now: Optional[datetime] = None) -> np.ndarray:
+        now = now or datetime.now()
+        return np.array([max((datetime.combine(e, EXPIRY_CLOSE) - now).total_seconds(), 60.0) / YEAR_SECONDS
+                         for e in self.expiries])
+
+    def sigma(self, K, T, S: Optional[float] = None, now: Optional[datetime] = None) -> np.ndarray:
+        """Vectorized σ for strikes `K` at maturities `T` (years), spot `S`."""
+        K = np.atleast_1d(np.asarray(K, dtype=np.float64))
+        T = np.broadcast_to(np.asarray(T, dtype=np.float64), K.shape).astype(np.float64)
+        F = (S or self.spot) * np.exp(self.r * T)
+        return surface_sigma_batch(np.log(K / F), T, self.maturities(now), self.params)
+
+    def atm_vol(self, T: float, now: Optional[datetime] = None) -> float:
+        return float(self.sigma(self.spot * math.exp(self.r * T), T, now=now)[0])
+
+    def age(self, now: Optional[datetime] = None) -> float:
+        return ((now or datetime.now()) - self.fitted_at).total_seconds()
+
+    def summary(self) -> str:
+        src = "warm" if self.warm else "cold"
+        return (f"{self.symbol}: {len(self.expiries)} expiries, {int(self.n_quotes.sum())} quotes, "
+                f"RMSE {float(np.max(self.rmse_vol)):.2f} vol pts, {self.iters} iters ({src})")
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# §4  FIT
+# ═══════════════════════════════════════════════════════════════════════════════
+
+def surface_points(chain: OptionChain, r: float, now: datetime):
+    """OTM quotes with a solved IV → (k, w, weight, T). Puts below the forward, calls above."""
+    T = chain.years_to_expiry(now)
+    if T <= 0 or chain.underlying_price <= 0:
+        return None
+    F = chain.underlying_price * math.exp(r * T)
+    use_put = chain.strikes < F
+    iv = np.where(use_put, chain.pe.iv, chain.ce.iv) / 100.0
+    vega = np.where(use_put, chain.pe.vega, chain.ce.vega)
+    ok = np.where(use_put, chain.pe.present, chain.ce.present) & (iv > 0) & (vega > 0)
+    if not ok.any():
+        return None
+    k = np.log(chain.strikes[ok] / F)
+    return k, iv[ok] ** 2 * T, vega[ok] / vega[ok].max(), T
+
+def fit_surface(symbol: str, chains: List[OptionChain], prev: Optional[VolSurface] = None,
+                r: float = BSM.R, now: Optional[datetime] = None) -> Optional[VolSurface]:
+    """Fit SVI slices + SSVI for one symbol's chains (one chain per expiry).
+
+    Chains should carry solved IV/vega (`option_chain.solve_chains`). With
+    `prev`, each slice is Newton-polished from its (m, s) for the same expiry,
+    falling back to a small simplex around them.
+    """
+    now = now or datetime.now()
+    slices = []
+    for ch in sorted(chains, key=lambda c: c.expiry):
+        pts = surface_points(ch, r, now)
+        if pts is not None:
+            slices.append((ch.expiry, ch.underlying_price) + pts)
+    if not slices:
+        return None
+    warm = {e: prev.params[j] for j, e in enumerate(prev.expiries)} if prev is not None else {}
+
+    J = len(slices)
+    params = np.zeros((J, 5)); rmse = np.zeros(J); nq = np.zeros(J, dtype=np.int64)
+    fitted = np.zeros(J, dtype=bool)
+    theta = np.zeros(J)
+    iters = 0
+    for j, (expiry, spot, k, w, wt, T) in enumerate(slices):
+        nq[j] = len(k)
+        theta[j] = float(np.interp(0.0, k, w)) if len(k) > 1 else float(w[0])
+        if len(k) < SVI_MIN_QUOTES:
+            continue
+        seed = warm.get(expiry)
+        ok = False
+        if seed is not None:
+            m, s, it, ok = svi_polish_slice(k, w, wt, seed[3], seed[4], WARM_MAX_ITER)
+            iters += it
+        if ok:
+            a, b, rho, _ = _svi_inner(k, w, wt, m, s)
+        else:
+            m0, s0, step = (seed[3], seed[4], WARM_STEP) if seed is not None else (0.0, 0.1, COLD_STEP)
+            a, b, rho, m, s, _, it = svi_fit_slice(k, w, wt, m0, s0, step, SVI_MAX_ITER)
+            iters += it
+        params[j] = (a, b, rho, m, s)
+        fitted[j] = True
+        theta[j] = max(svi_w(0.0, a, b, rho, m, s), 1e-8)
+
+    # SSVI across every quote, θ per slice from its own ATM total variance. It
+    # only prices slices too sparse for SVI, so a warm refit with every slice
+    # fitted keeps the previous term-structure shape instead of refitting it.
+    if prev is not None and fitted.all():
+        rho, eta, gam = prev.ssvi
+    else:
+        k_all = np.concatenate([s[2] for s in slices]); w_all = np.concatenate([s[3] for s in slices])
+        wt_all = np.concatenate([s[4] for s in slices])
+        th_all = np.concatenate([np.full(len(s[2]), max(theta[j], 1e-8)) for j, s in enumerate(slices)])
+        p0, step = (_ssvi_pack(*prev.ssvi), WARM_STEP) if prev is not None else (_ssvi_pack(-0.3, 1.0, 0.5), 0.5)
+        rho, eta, gam, _, it = ssvi_fit(k_all, w_all, wt_all, th_all, p0, step, SSVI_MAX_ITER)
+        iters += it
+    for j in np.flatnonzero(~fitted):
+        params[j] = ssvi_as_svi(max(theta[j], 1e-8), rho, eta, gam)
+
+    for j, (_, _, k, w, _, T) in enumerate(slices):
+        model = np.sqrt(np.maximum([svi_w(x, *params[j]) for x in k], 1e-12) / T)
+        rmse[j] = float(np.sqrt(np.mean((model - np.sqrt(w / T)) ** 2)) * 100)
+    return VolSurface(symbol=symbol, spot=slices[0][1], r=r, expiries=[s[0] for s in slices],
+                      params=params, ssvi=(rho, eta, gam), rmse_vol=rmse, n_quotes=nq,
+                      from_ssvi=~fitted, iters=iters, warm=prev is not None, fitted_at=now)
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# §5  CACHE & PRICER HOOK
+# ═══════════════════════════════════════════════════════════════════════════════
+
+class SurfacePack:
+    """Fresh surfaces for a batch of rows, padded into arrays for one kernel call.
+
+    `sigma(K, T)` mirrors `SurfaceStore.leg_vol` row by row: rows without a
+    fresh surface (or with K ≤ 0 / T ≤ 0) get `fallback`, else the flat IV.
+    """
+
+    def __init__(self, surfaces: List[Optional[VolSurface]], spots: np.ndarray, flat: np.ndarray,
+                 now: Optional[datetime] = None):
+        self.spots = np.asarray(spots, dtype=np.float64)
+        self.flat = np.asarray(flat, dtype=np.float64)
+        live = [s for s in surfaces if s is not None]
+        self.which = np.full(len(surfaces), -1, dtype=np.int64)
+        J = max((len(s.expiries) for s in live), default=1)
+        self.Ts = np.ones((max(len(live), 1), J)); self.nT = np.ones(max(len(live), 1), dtype=np.int64)
+        self.params = np.zeros((max(len(live), 1), J, 5)); self.r = np.zeros(max(len(live), 1))
+        j = 0
+        for i, s in enumerate(surfaces):
+            if s is None:
+                continue
+            n = len(s.expiries)
+            self.which[i] = j
+            self.Ts[j, :n] = s.maturities(now); self.nT[j] = n
+            self.params[j, :n] = s.params; self.r[j] = s.r
+            j += 1
+        self.n_live = j
+
+    def sigma(self, rows: np.ndarray, K, T, fallback=None) -> np.ndarray:
+        K = np.asarray(K, dtype=np.float64)
+        T = np.broadcast_to(np.asarray(T, dtype=np.float64), K.shape).astype(np.float64)
+        out = (self.flat[rows] if fallback is None
+               else np.broadcast_to(np.asarray(fallback, dtype=np.float64), K.shape)).astype(np.float64)
+        if not self.n_live:
+            return out
+        which = self.which[rows]
+        use = (which >= 0) & (K > 0) & (T > 0)
+        if use.any():
+            w, r = which[use], self.r[which[use]]
+            k = np.log(K[use] / (self.spots[rows][use] * np.exp(r * T[use])))
+            out[use] = surface_sigma_packed(w, k, T[use], self.Ts, self.nT, self.params)
+        return out
+
+
+class SurfaceStore:
+    """Per-symbol surfaces in a diskcache namespace, memoized per process.
+
+    The memo holds hits only and is valid for one `epoch()`: a `put` from any
+    store on the same cache (e.g. the pipeline's sweep in another process)
+    moves the epoch, and the next lookup re-reads disk.
+    """
+
+    def __init__(self, cache, prefix: str = "vol_surface"):
+        self.cache = cache
+        self.prefix = prefix
+        self._memo: Dict[str, VolSurface] = {}
+        self._memo_epoch = -1
+
+    def _sync(self):
+        e = self.epoch()
+        if e != self._memo_epoch:
+            self._memo.clear()
+            self._memo_epoch = e
+
+    def _lookup(self, symbol: str) -> Optional[VolSurface]:
+        surface = self._memo.get(symbol)
+        if surface is None:
+            surface = self.cache.get(f"{self.prefix}_{symbol}")
+            if surface is not None:
+                self._memo[symbol] = surface
+        return surface
+
+    def get(self, symbol: str) -> Optional[VolSurface]:
+        self._sync()
+        return self._lookup(symbol)
+
+    def put(self, surface: VolSurface):
+        self._sync()
+        self.cache.set(f"{self.prefix}_{surface.symbol}", surface, expire=SURFACE_TTL)
+        e = self.cache.incr(f"{self.prefix}__epoch")
+        if e == self._memo_epoch + 1:           # no other writer in between: the memo stays current
+            self._memo[surface.symbol] = surface
+            self._memo_epoch = e
+
+    def stale(self, symbols: List[str], max_age: float = SURFACE_LEASE) -> List[str]:
+        """Symbols with no cached surface, or one older than `max_age`."""
+        self._sync()
+        now = datetime.now()
+        return [sym for sym in symbols if (s := self._lookup(sym)) is None or s.age(now) > max_age]
+
+    def epoch(self) -> int:
+        """Bumped on every `put`, so results priced off the surfaces can key on it."""
+        return int(self.cache.get(f"{self.prefix}__epoch", 0))
+
+    def refit(self, symbol: str, chains: List[OptionChain], r: float = BSM.R,
+              now: Optional[datetime] = None) -> Optional[VolSurface]:
+        """Fit warm from the cached snapshot (if any) and store the result."""
+        surface = fit_surface(symbol, chains, prev=self.get(symbol), r=r, now=now)
+        if surface is not None:
+            self.put(surface)
+        return surface
+
+    def pack(self, symbols: List[str], spots, flat, max_age: float = SURFACE_MAX_AGE) -> SurfacePack:
+        """`SurfacePack` over many symbols, with the same freshness rule as `leg_vol`."""
+        now = datetime.now()
+        fresh = []
+        self._sync()
+        for sym in symbols:
+            s = self._lookup(sym)
+            fresh.append(s if s is not None and s.age(now) <= max_age else None)
+        return SurfacePack(fresh, spots, flat, now)
+
+    def leg_vol(self, symbol: str, S: float, T: float, flat: float,
+                max_age: float = SURFACE_MAX_AGE) -> Callable[..., float]:
+        """`vol(K, t=T, fallback=flat)` for a strategy pricer.
+
+        Skew-consistent σ from a fresh surface, memoized per (K, t) since
+        strike searches revisit the same strikes; otherwise the flat IV (or
+        the per-call `fallback`), i.e. exactly the pre-surface pricing.
+        """
+        surface = self.get(symbol)
+        if surface is None or surface.age() > max_age:
+            return lambda K, t=T, fallback=None: flat if fallback is None else fallback
+
+        memo: Dict[Tuple[float, float], float] = {}
+
+        def vol(K, t=T, fallback=None):
+            if K <= 0 or t <= 0:
+                return flat if fallback is None else fallback
+            key = (float(K), float(t))
+            if key not in memo:
+                memo[key] = float(surface.sigma(K, t, S)[0])
+            return memo[key]
+        return vol